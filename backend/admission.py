@@ -0,0 +1,376 @@
+"""
+Admission control for What'sYourRecipe
+Per-route concurrency limits with bounded wait queues, per-user concurrency limits and
+token-bucket rate limits (per route and per user), so expensive endpoints shed load instead
+of starving the cheap ones that share the worker and the Supabase client.
+
+Rejections: 503 when the route's queue is full or the wait times out, 429 when a rate or
+per-user limit is hit; both carry Retry-After. Limits are keyed by route template, optionally
+split by a query-based variant (e.g. /recipes[trending]), and can be changed at runtime:
+LimitOverrides keeps changes in the shared store and every worker re-reads them on an interval.
+"""
+
+import asyncio
+import hashlib
+import math
+import threading
+import time
+from collections import OrderedDict, deque
+from dataclasses import asdict, dataclass, fields
+from typing import Optional
+from urllib.parse import parse_qs
+
+from metrics import ADMISSION_ACTIVE, ADMISSION_DECISIONS, ADMISSION_QUEUE_WAIT, ADMISSION_QUEUED, route_template
+
+# Per-user token buckets kept per route before the least recently used are dropped
+MAX_TRACKED_USERS = 10000
+
+# Bearer tokens the auth dependency has verified, remembered before the least recently used are dropped
+MAX_VERIFIED_TOKENS = 10000
+
+# Runtime overrides in the shared store: limit key -> settings, or {"removed": true}
+OVERRIDE_PREFIX = "admission:limit:"
+OVERRIDE_TTL_SECONDS = 365 * 24 * 3600
+
+
+@dataclass
+class RouteLimit:
+    max_concurrency: Optional[int] = None    # requests running at once on this route
+    max_queue: int = 0                       # requests allowed to wait for a slot
+    queue_timeout: float = 2.0               # seconds a queued request waits before 503
+    rate: Optional[float] = None             # route-wide requests per second
+    burst: Optional[int] = None              # route-wide bucket size (defaults to rate)
+    per_user_concurrency: Optional[int] = None
+    per_user_rate: Optional[float] = None
+    per_user_burst: Optional[int] = None
+
+
+LIMIT_FIELDS = tuple(field.name for field in fields(RouteLimit))
+
+LIMITS = {}    # limit key -> RouteLimit
+VARIANTS = {}  # route template -> function(query params) returning a variant name or None
+STATES = {}    # limit key -> live gate and buckets (kept when limits change)
+
+
+def configure_limit(key, **settings):
+    """Set (or replace) the limits for a route template or route[variant] key"""
+    unknown = set(settings) - set(LIMIT_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown limit settings: {', '.join(sorted(unknown))}")
+    LIMITS[key] = RouteLimit(**settings)
+    state = STATES.get(key)
+    if state is not None:
+        # Start the new rates with full buckets; in-flight requests keep their concurrency slots
+        state.bucket = None
+        state.user_buckets.clear()
+        # A raised limit admits queued requests now rather than one per completion
+        state.gate.wake(LIMITS[key].max_concurrency or math.inf)
+    return LIMITS[key]
+
+
+def remove_limit(key):
+    state = STATES.get(key)
+    if state is not None:
+        state.gate.wake(math.inf)
+    return LIMITS.pop(key, None) is not None
+
+
+def configure_variant(path, classify):
+    """Split a route's limits by request: classify(query params) -> variant name or None"""
+    VARIANTS[path] = classify
+
+
+class TokenBucket:
+    def __init__(self, burst):
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+
+    def take(self, rate, burst):
+        """Take one token; returns 0 on success, else seconds until one is available"""
+        now = time.monotonic()
+        self.tokens = min(float(burst), self.tokens + (now - self.updated) * rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0
+        return (1 - self.tokens) / rate
+
+
+class ConcurrencyGate:
+    """Counting semaphore with a bounded FIFO queue; the limit is read on every call so it can change"""
+
+    def __init__(self):
+        self.active = 0
+        self.waiters = deque()
+        self._loop = None
+
+    async def acquire(self, limit, max_queue, timeout):
+        """True once a slot is held; False if the queue is full or the wait timed out"""
+        if self.active < limit and not self.waiters:
+            self.active += 1
+            return True
+        if len(self.waiters) >= max_queue:
+            return False
+        self._loop = asyncio.get_running_loop()
+        waiter = self._loop.create_future()
+        self.waiters.append(waiter)
+        try:
+            await asyncio.wait_for(waiter, timeout)
+            return True
+        except asyncio.TimeoutError:
+            self._forget(waiter)
+            return False
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self.release(limit)  # granted just as the client went away
+            self._forget(waiter)
+            raise
+
+    def _forget(self, waiter):
+        try:
+            self.waiters.remove(waiter)
+        except ValueError:
+            pass
+
+    def release(self, limit):
+        # The slot goes straight to the next waiter unless the limit was lowered below usage
+        self.active -= 1
+        self._grant(limit)
+
+    def wake(self, limit):
+        """Admit queued requests up to a changed limit; safe to call from any thread"""
+        if self._loop is not None and self.waiters:
+            self._loop.call_soon_threadsafe(self._grant, limit)
+
+    def _grant(self, limit):
+        while self.active < limit and self.waiters:
+            waiter = self.waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(True)
+                self.active += 1
+
+
+class _RouteState:
+    def __init__(self):
+        self.gate = ConcurrencyGate()
+        self.bucket = None
+        self.user_buckets = OrderedDict()
+        self.user_active = {}
+
+
+def snapshot():
+    """Current limits and live usage, for /admin/limits"""
+    return {
+        key: {
+            **asdict(limit),
+            "active": STATES[key].gate.active if key in STATES else 0,
+            "queued": len(STATES[key].gate.waiters) if key in STATES else 0,
+        }
+        for key, limit in LIMITS.items()
+    }
+
+
+class LimitOverrides:
+    """Runtime limit changes (/admin/limits) shared by all workers through the shared store"""
+
+    def __init__(self, store, interval=2.0):
+        self.store = store
+        self.interval = interval
+        self.defaults = {key: asdict(limit) for key, limit in LIMITS.items()}  # limits configured at startup
+        self.applied = {}
+        self._task = None
+
+    def set(self, key, settings):
+        RouteLimit(**settings)  # reject unknown settings before sharing them
+        self.store.set(OVERRIDE_PREFIX + key, settings, OVERRIDE_TTL_SECONDS)
+        self.refresh()
+
+    def remove(self, key):
+        """Remove a route's limits in every worker; False when it has none"""
+        self.refresh()
+        if key not in LIMITS:
+            return False
+        self.store.set(OVERRIDE_PREFIX + key, {"removed": True}, OVERRIDE_TTL_SECONDS)
+        self.refresh()
+        return True
+
+    def refresh(self):
+        """Apply overrides added, changed or dropped since the last refresh"""
+        overrides = {key[len(OVERRIDE_PREFIX):]: value for key, value in self.store.scan(OVERRIDE_PREFIX)}
+        for key in set(self.applied) | set(overrides):
+            value = overrides.get(key)
+            if value == self.applied.get(key):
+                continue
+            if value is None and key in self.defaults:
+                configure_limit(key, **self.defaults[key])  # override expired: back to the startup limits
+            elif value is None or value.get("removed"):
+                remove_limit(key)
+            else:
+                configure_limit(key, **value)
+        self.applied = overrides
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await asyncio.to_thread(self.refresh)
+            except Exception as e:
+                print(f"Could not refresh admission limits: {e}")
+
+    async def start(self):
+        """Apply the current overrides, then keep re-reading them in the background"""
+        try:
+            await asyncio.to_thread(self.refresh)
+        except Exception as e:
+            print(f"Could not load admission limits, using the configured ones: {e}")
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+_verified_tokens = OrderedDict()  # sha256 of a bearer token -> user id
+_verified_lock = threading.Lock()  # the auth dependency runs in the threadpool
+
+
+def remember_verified_token(token, user_id):
+    """Record a bearer token Supabase accepted, so later requests with it count against user_id"""
+    digest = hashlib.sha256(token.encode("latin-1")).digest()  # header values are decoded as latin-1
+    with _verified_lock:
+        _verified_tokens[digest] = user_id
+        _verified_tokens.move_to_end(digest)
+        if len(_verified_tokens) > MAX_VERIFIED_TOKENS:
+            _verified_tokens.popitem(last=False)
+
+
+def client_key(scope):
+    """Who a request counts against: the user behind a verified bearer token, else the client address
+
+    Tokens are only trusted once the auth dependency has verified them; otherwise a client could
+    send a fresh random token on every request to get a fresh set of per-user buckets.
+    """
+    for name, value in scope.get("headers", []):
+        if name == b"authorization" and value[:7].lower() == b"bearer ":
+            user_id = _verified_tokens.get(hashlib.sha256(value[7:].strip()).digest())
+            if user_id is not None:
+                return f"user:{user_id}"
+            break
+    client = scope.get("client")
+    return f"ip:{client[0]}" if client else "anonymous"
+
+
+class AdmissionMiddleware:
+    """ASGI middleware applying LIMITS to HTTP requests"""
+
+    def __init__(self, app, fastapi_app):
+        self.app = app
+        self.fastapi_app = fastapi_app
+
+    def limit_key(self, scope):
+        route = route_template(self.fastapi_app, scope)
+        classify = VARIANTS.get(route)
+        if classify is not None:
+            params = {name: values[-1] for name, values in parse_qs(scope.get("query_string", b"").decode("latin-1")).items()}
+            variant = classify(params)
+            if variant and f"{route}[{variant}]" in LIMITS:
+                return f"{route}[{variant}]"
+        return route
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] == "OPTIONS":
+            await self.app(scope, receive, send)
+            return
+
+        key = self.limit_key(scope)
+        limit = LIMITS.get(key)
+        if limit is None:
+            await self.app(scope, receive, send)
+            return
+        state = STATES.setdefault(key, _RouteState())
+        user = client_key(scope)
+
+        # Rate limits: route-wide, then per user
+        if limit.rate:
+            burst = max(limit.burst or limit.rate, 1)
+            if state.bucket is None:
+                state.bucket = TokenBucket(burst)
+            wait = state.bucket.take(limit.rate, burst)
+            if wait:
+                await self._reject(send, key, "rate_limited", 429, wait, "Too many requests for this endpoint")
+                return
+        if limit.per_user_rate:
+            burst = max(limit.per_user_burst or limit.per_user_rate, 1)
+            bucket = state.user_buckets.get(user)
+            if bucket is None:
+                bucket = state.user_buckets[user] = TokenBucket(burst)
+                if len(state.user_buckets) > MAX_TRACKED_USERS:
+                    state.user_buckets.popitem(last=False)
+            state.user_buckets.move_to_end(user)
+            wait = bucket.take(limit.per_user_rate, burst)
+            if wait:
+                await self._reject(send, key, "user_rate_limited", 429, wait, "Too many requests, slow down")
+                return
+
+        # Per-user concurrency counts queued requests too: one client shouldn't fill the route's queue
+        if limit.per_user_concurrency and state.user_active.get(user, 0) >= limit.per_user_concurrency:
+            await self._reject(send, key, "user_concurrency", 429, 1, "Too many concurrent requests")
+            return
+        state.user_active[user] = state.user_active.get(user, 0) + 1
+        try:
+            await self._admit(scope, receive, send, key, limit, state)
+        finally:
+            remaining = state.user_active[user] - 1
+            if remaining:
+                state.user_active[user] = remaining
+            else:
+                del state.user_active[user]
+
+    async def _admit(self, scope, receive, send, key, limit, state):
+        """Wait for a concurrency slot (if the route has a limit), then run the request"""
+        if limit.max_concurrency:
+            queued = state.gate.active >= limit.max_concurrency or bool(state.gate.waiters)
+            if queued and len(state.gate.waiters) >= limit.max_queue:
+                await self._reject(send, key, "queue_full", 503, max(limit.queue_timeout, 1), "Server is busy, try again shortly")
+                return
+            if queued:
+                ADMISSION_QUEUED.inc(route=key)
+            started = time.perf_counter()
+            try:
+                admitted = await state.gate.acquire(limit.max_concurrency, limit.max_queue, limit.queue_timeout)
+            finally:
+                if queued:
+                    ADMISSION_QUEUED.dec(route=key)
+                    ADMISSION_QUEUE_WAIT.observe(time.perf_counter() - started, route=key)
+            if not admitted:
+                await self._reject(send, key, "queue_timeout", 503, max(limit.queue_timeout, 1), "Server is busy, try again shortly")
+                return
+
+        ADMISSION_DECISIONS.inc(route=key, outcome="admitted")
+        ADMISSION_ACTIVE.inc(route=key)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            ADMISSION_ACTIVE.dec(route=key)
+            if limit.max_concurrency:
+                state.gate.release(LIMITS.get(key, limit).max_concurrency or math.inf)
+
+    async def _reject(self, send, key, outcome, status, retry_after, detail):
+        ADMISSION_DECISIONS.inc(route=key, outcome=outcome)
+        body = ('{"detail":"' + detail + '"}').encode("utf-8")
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode("latin-1")),
+                (b"retry-after", str(max(1, math.ceil(retry_after))).encode("latin-1")),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,216 @@
+"""
+Avatar handling for What'sYourRecipe
+Streams uploads to disk with an early size cutoff, resizes them to fixed WebP sizes in a
+process pool, stores the results under content-addressed names, and renders initials
+avatars as SVG for users without one
+"""
+
+import asyncio
+import hashlib
+import html
+import io
+import os
+import re
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+from python_multipart.multipart import MultipartParser, parse_options_header
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # Pillow is optional; without it uploads are refused
+    Image = None
+
+AVATAR_DIR = os.getenv("AVATAR_STORAGE_DIR") or os.path.join(os.path.dirname(os.path.abspath(__file__)), "media", "avatars")
+MAX_AVATAR_BYTES = int(os.getenv("AVATAR_MAX_BYTES", 5 * 1024 * 1024))
+AVATAR_WORKERS = int(os.getenv("AVATAR_WORKERS", 2))
+
+# Square sizes written for every upload; the largest is the one stored on the profile
+AVATAR_SIZES = (48, 96, 256)
+WEBP_QUALITY = 82
+# Refuse images that would decode to more pixels than this (decompression bombs)
+MAX_IMAGE_PIXELS = 40_000_000
+
+AVATAR_FILENAME_PATTERN = re.compile(r"^[0-9a-f]{32}-(\d+)\.webp$")
+
+# Coffee-toned backgrounds for initials avatars, picked by a hash of the name
+INITIALS_PALETTE = ("#8B4513", "#6F4E37", "#A0522D", "#4B3621", "#7B3F00", "#5D4037", "#3E2723", "#9C6644")
+
+_pool = None
+
+
+class AvatarError(Exception):
+    """Upload or processing failure, carrying the HTTP status to answer with"""
+
+    def __init__(self, status_code, detail):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+def _size_message(max_bytes):
+    return f"File size must be less than {round(max_bytes / (1024 * 1024), 1):g}MB"
+
+
+def avatar_filename(key, size):
+    return f"{key}-{size}.webp"
+
+
+def avatar_url(key, size=AVATAR_SIZES[-1]):
+    """Path stored in profiles.avatar_url; clients swap the size suffix for smaller variants"""
+    return f"/avatars/{avatar_filename(key, size)}"
+
+
+async def receive_upload(request, field_name, destination, max_bytes=MAX_AVATAR_BYTES):
+    """Stream one file field of a multipart request into `destination` (an open binary file).
+
+    Stops reading as soon as the file passes `max_bytes`. Returns (sha256 hex digest, content type).
+    """
+    content_type, params = parse_options_header(request.headers.get("content-type", ""))
+    boundary = params.get(b"boundary")
+    if content_type != b"multipart/form-data" or not boundary:
+        raise AvatarError(400, "Expected a multipart/form-data upload")
+
+    declared = request.headers.get("content-length")
+    if declared and declared.isdigit() and int(declared) > max_bytes + 64 * 1024:
+        raise AvatarError(413, _size_message(max_bytes))
+
+    state = {"headers": {}, "field": b"", "value": b"", "target": False, "found": False, "size": 0, "type": ""}
+    digest = hashlib.sha256()
+
+    def on_part_begin():
+        state["headers"] = {}
+
+    def on_header_field(data, start, end):
+        state["field"] += data[start:end]
+
+    def on_header_value(data, start, end):
+        state["value"] += data[start:end]
+
+    def on_header_end():
+        state["headers"][state["field"].lower()] = state["value"]
+        state["field"], state["value"] = b"", b""
+
+    def on_headers_finished():
+        _, disposition = parse_options_header(state["headers"].get(b"content-disposition", b""))
+        is_target = disposition.get(b"name") == field_name.encode() and b"filename" in disposition
+        state["target"] = is_target and not state["found"]
+        if state["target"]:
+            state["type"] = state["headers"].get(b"content-type", b"").decode("latin-1")
+
+    def on_part_data(data, start, end):
+        if not state["target"]:
+            return
+        chunk = data[start:end]
+        state["size"] += len(chunk)
+        if state["size"] <= max_bytes:
+            destination.write(chunk)
+            digest.update(chunk)
+
+    def on_part_end():
+        if state["target"]:
+            state["found"] = True
+            state["target"] = False
+
+    parser = MultipartParser(boundary, {
+        "on_part_begin": on_part_begin,
+        "on_header_field": on_header_field,
+        "on_header_value": on_header_value,
+        "on_header_end": on_header_end,
+        "on_headers_finished": on_headers_finished,
+        "on_part_data": on_part_data,
+        "on_part_end": on_part_end,
+    })
+    async for chunk in request.stream():
+        parser.write(chunk)
+        if state["size"] > max_bytes:
+            raise AvatarError(413, _size_message(max_bytes))
+    parser.finalize()
+
+    if not state["found"]:
+        raise AvatarError(400, f"Missing '{field_name}' file")
+    if not state["type"].startswith("image/"):
+        raise AvatarError(400, "File must be an image")
+    return digest.hexdigest(), state["type"]
+
+
+def process_avatar(source_path, sizes=AVATAR_SIZES):
+    """Decode, square-crop and encode an image as WebP at each size (runs in a worker process)"""
+    Image.MAX_IMAGE_PIXELS = MAX_IMAGE_PIXELS
+    try:
+        with Image.open(source_path) as image:
+            image = ImageOps.exif_transpose(image)
+            image = image.convert("RGBA" if image.mode in ("RGBA", "LA", "P") else "RGB")
+    except (OSError, ValueError, Image.DecompressionBombError):
+        raise ValueError("File is not a supported image")
+
+    variants = {}
+    for size in sizes:
+        square = ImageOps.fit(image, (size, size), method=Image.LANCZOS)
+        buffer = io.BytesIO()
+        square.save(buffer, format="WEBP", quality=WEBP_QUALITY, method=6)
+        variants[size] = buffer.getvalue()
+    return variants
+
+
+def _get_pool():
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=AVATAR_WORKERS)
+    return _pool
+
+
+def shutdown_pool():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+async def store_avatar(request, field_name="avatar"):
+    """Receive, process and store an uploaded avatar; returns its content key"""
+    if Image is None:
+        raise AvatarError(503, "Image processing is not available (install Pillow)")
+
+    os.makedirs(AVATAR_DIR, exist_ok=True)
+    upload = tempfile.NamedTemporaryFile(dir=AVATAR_DIR, prefix=".upload-", delete=False)
+    try:
+        with upload:
+            digest, _ = await receive_upload(request, field_name, upload)
+        key = digest[:32]
+
+        # Same bytes uploaded before: the variants already exist
+        if all(os.path.exists(os.path.join(AVATAR_DIR, avatar_filename(key, size))) for size in AVATAR_SIZES):
+            return key
+
+        loop = asyncio.get_running_loop()
+        try:
+            variants = await loop.run_in_executor(_get_pool(), process_avatar, upload.name)
+        except ValueError as e:
+            raise AvatarError(400, str(e))
+
+        for size, data in variants.items():
+            path = os.path.join(AVATAR_DIR, avatar_filename(key, size))
+            partial = f"{path}.{os.getpid()}.tmp"
+            with open(partial, "wb") as f:
+                f.write(data)
+            os.replace(partial, path)
+        return key
+    finally:
+        os.unlink(upload.name)
+
+
+@lru_cache(maxsize=4096)
+def initials_svg(name):
+    """Initials avatar for a display name (deterministic, so it can be cached anywhere)"""
+    words = [word for word in re.split(r"[\s._-]+", name.strip()) if word]
+    letters = "".join(word[0] for word in words[:2]).upper() or "?"
+    color = INITIALS_PALETTE[int(hashlib.sha256(name.lower().encode()).hexdigest(), 16) % len(INITIALS_PALETTE)]
+    return (
+        '<svg xmlns="http://www.w3.org/2000/svg" width="256" height="256" viewBox="0 0 256 256">'
+        f'<rect width="256" height="256" fill="{color}"/>'
+        '<text x="50%" y="50%" dy=".35em" text-anchor="middle" fill="#fff" '
+        f'font-family="Helvetica, Arial, sans-serif" font-size="104" font-weight="700">{html.escape(letters)}</text>'
+        "</svg>"
+    ).encode("utf-8")
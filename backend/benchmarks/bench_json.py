@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+JSON encoding microbenchmark for What'sYourRecipe
+Compares the default FastAPI encode path with the orjson path on typical feed pages,
+and reports bytes on the wire with gzip and brotli
+
+Usage: python benchmarks/bench_json.py [--pages 20] [--votes 40] [--repeat 200]
+"""
+
+import argparse
+import os
+import random
+import sys
+import timeit
+import uuid
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from compression import brotli, compress
+from fast_json import FastJSONResponse, orjson
+
+BREW_METHODS = ["espresso", "pourover", "frenchPress", "aeropress", "coldBrew", "chemex"]
+REGIONS = ["chikmagalur", "coorg", "ethiopia", "colombia", "kenya", "sumatra"]
+
+
+def make_recipe(rng, votes, full=False):
+    """A recipe as PostgREST returns it for the feed (string timestamps, nested profile and votes)"""
+    created = datetime.now(timezone.utc) - timedelta(minutes=rng.randint(0, 60 * 24 * 7))
+    user_id = str(uuid.UUID(int=rng.getrandbits(128)))
+    recipe = {
+        "id": str(uuid.UUID(int=rng.getrandbits(128))),
+        "user_id": user_id,
+        "recipe_name": f"{rng.choice(BREW_METHODS).title()} #{rng.randint(1, 999)}",
+        "description": "Bright, juicy cup with notes of jaggery and citrus. #" + rng.choice(BREW_METHODS),
+        "rating": round(rng.uniform(5, 10), 1),
+        "is_public": True,
+        "bean_variety": "arabica",
+        "bean_region": rng.choice(REGIONS),
+        "roast_level": rng.choice(["light", "medium", "dark"]),
+        "brew_method": rng.choice(BREW_METHODS),
+        "coffee_amount": round(rng.uniform(12, 22), 1),
+        "water_amount": float(rng.randint(180, 360)),
+        "milk_preference": rng.choice([None, "oat", "whole"]),
+        "created_at": created.isoformat(),
+        "profiles": {
+            "id": user_id,
+            "username": f"brewer_{rng.randint(1, 10_000)}",
+            "full_name": "Coffee Lover",
+            "avatar_url": None,
+        },
+        "recipe_votes": [
+            {"vote_type": rng.choice(["up", "up", "up", "down"]), "user_id": str(uuid.UUID(int=rng.getrandbits(128)))}
+            for _ in range(votes)
+        ],
+    }
+    if full:
+        for field in ("brewing_notes", "overall_impression", "defects", "aroma_notes"):
+            recipe[field] = "Lorem ipsum dolor sit amet, consectetur adipiscing elit. " * 6
+        for field in ("tds", "calcium", "magnesium", "potassium", "sodium", "brew_time", "roast_time"):
+            recipe[field] = round(rng.uniform(0, 100), 2)
+    return recipe
+
+
+def default_encode(page):
+    """What FastAPI does for an un-modelled return value: jsonable_encoder then JSONResponse.render"""
+    return JSONResponse(jsonable_encoder(page)).body
+
+
+def fast_encode(page):
+    return FastJSONResponse(page).body
+
+
+def bench(label, func, page, repeat):
+    seconds = min(timeit.repeat(lambda: func(page), number=repeat, repeat=3)) / repeat
+    return label, seconds * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare JSON encode time and wire size for feed pages")
+    parser.add_argument("--pages", type=int, default=20, help="recipes per page")
+    parser.add_argument("--votes", type=int, default=40, help="votes embedded per recipe")
+    parser.add_argument("--repeat", type=int, default=200, help="encodes per timing run")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    scenarios = {
+        "feed page (card)": [make_recipe(rng, args.votes) for _ in range(args.pages)],
+        "feed page (detail)": [make_recipe(rng, args.votes, full=True) for _ in range(args.pages)],
+    }
+
+    print(f"orjson: {'yes' if orjson else 'NOT INSTALLED'}   brotli: {'yes' if brotli else 'NOT INSTALLED'}")
+    print("=" * 72)
+    for name, page in scenarios.items():
+        results = [bench("jsonable_encoder + json", default_encode, page, args.repeat)]
+        results.append(bench("FastJSONResponse (orjson)", fast_encode, page, args.repeat))
+
+        baseline = results[0][1]
+        print(f"{name}: {len(page)} recipes x {args.votes} votes")
+        for label, micros in results:
+            print(f"  {label:<28} {micros:>10.1f} us/page   {baseline / micros:>5.1f}x")
+
+        body = fast_encode(page)
+        print(f"  {'raw bytes':<28} {len(body):>10,}")
+        print(f"  {'gzip (level 6)':<28} {len(compress(body, 'gzip')):>10,}")
+        if brotli:
+            print(f"  {'brotli (quality 4)':<28} {len(compress(body, 'br')):>10,}")
+        print("-" * 72)
+
+
+if __name__ == "__main__":
+    main()
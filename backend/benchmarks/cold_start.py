@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Cold start benchmark for What'sYourRecipe
+Boots the API in a fresh process against a seeded local Supabase stand-in with simulated latency,
+and measures time until /health answers and the latency of the first requests a visitor's page
+makes, with the startup warm-up off and on. Also reports the process_startup_seconds phases the
+app exposes on /metrics (import, warmup, ready).
+
+Usage:
+    python benchmarks/cold_start.py
+    python benchmarks/cold_start.py --runs 5 --latency-ms 80
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from load_test import seed_world
+from local_supabase import create_local_client
+from worker_scaling import free_port
+
+# What the home page asks for first (see static/script.js)
+FIRST_REQUESTS = [
+    ("trending", "/recipes?view=trending&limit=10&trending_days=7"),
+    ("hashtags", "/trending-hashtags?limit=10&days_back=1"),
+    ("profile", "/users/{author}"),
+]
+MODES = {
+    "cold": {"STARTUP_WARMUP": "false"},
+    "warm": {"STARTUP_WARMUP": "true"},
+}
+
+
+def boot(port, database, latency_ms, snapshot, overrides, verbose):
+    env = dict(
+        os.environ,
+        SUPABASE_URL=database,
+        LOCAL_SUPABASE_LATENCY_MS=str(latency_ms),
+        SHARED_STORE_URL="memory://",
+        CACHE_SNAPSHOT_PATH=snapshot,
+        **overrides,
+    )
+    output = None if verbose else subprocess.DEVNULL
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port)],
+        cwd=BACKEND_DIR, env=env, stdout=output, stderr=output,
+    )
+
+
+def startup_phases(client, base_url):
+    phases = {}
+    for line in client.get(f"{base_url}/metrics").text.splitlines():
+        if line.startswith("process_startup_seconds{"):
+            phase = line.split('phase="', 1)[1].split('"', 1)[0]
+            phases[phase] = float(line.rsplit(" ", 1)[1])
+    return phases
+
+
+def run_once(args, database, token, author, overrides):
+    import httpx
+
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    snapshot = os.path.join(tempfile.mkdtemp(prefix="cold-start-"), "cache.json")  # never reuse one
+    started = time.perf_counter()
+    server = boot(port, database, args.latency_ms, snapshot, overrides, args.verbose)
+    timings = {}
+    try:
+        with httpx.Client(timeout=30) as client:
+            while True:
+                try:
+                    if client.get(f"{base_url}/health").status_code == 200:
+                        break
+                except httpx.TransportError:
+                    pass
+                if time.perf_counter() - started > 60:
+                    raise RuntimeError("Server did not become ready")
+                time.sleep(0.02)
+            timings["ready"] = time.perf_counter() - started
+            headers = {"Authorization": f"Bearer {token}"}
+            for name, path in FIRST_REQUESTS:
+                request_started = time.perf_counter()
+                client.get(base_url + path.format(author=author), headers=headers).raise_for_status()
+                timings[name] = time.perf_counter() - request_started
+            phases = startup_phases(client, base_url)
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+    return timings, phases
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure time to ready and first-request latency, warm-up off vs on")
+    parser.add_argument("--runs", type=int, default=3, help="boots per mode (medians are reported)")
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="simulated Supabase round-trip latency")
+    parser.add_argument("--users", type=int, default=50, help="seeded accounts")
+    parser.add_argument("--recipes", type=int, default=500, help="seeded recipes")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--verbose", action="store_true", help="show the servers' log output")
+    args = parser.parse_args()
+
+    database = f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='cold-start-'), 'bench.db')}"
+    with contextlib.redirect_stdout(io.StringIO()):
+        client = create_local_client(database, latency_ms=0)
+        world = seed_world(client, args.users, args.recipes, args.seed)
+        author = client.table("recipes").select("user_id").eq("is_public", True).order("created_at", desc=True).limit(1).execute().data[0]["user_id"]
+    print(f"Seeded {args.users} users, {len(world['recipe_ids'])} recipes; latency {args.latency_ms:g}ms per Supabase round trip")
+    print("=" * 96)
+    columns = ["ready"] + [name for name, _ in FIRST_REQUESTS]
+    phase_columns = ["import", "warmup", "ready"]  # the app's first_request is the readiness probe here
+    print(f"{'mode':<6}" + "".join(f"{name + ' ms':>14}" for name in columns) + "".join(f"{'app ' + name + ' ms':>18}" for name in phase_columns))
+
+    for mode, overrides in MODES.items():
+        runs = [run_once(args, database, world["accounts"][0]["token"], author, overrides) for _ in range(args.runs)]
+        timings = {name: statistics.median(run[0][name] for run in runs) * 1000 for name in columns}
+        phases = {name: statistics.median(run[1].get(name, 0) for run in runs) * 1000 for name in phase_columns}
+        print(f"{mode:<6}" + "".join(f"{timings[name]:>14.0f}" for name in columns) + "".join(f"{phases[name]:>18.0f}" for name in phase_columns))
+
+
+if __name__ == "__main__":
+    main()
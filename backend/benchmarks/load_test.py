@@ -0,0 +1,383 @@
+#!/usr/bin/env python3
+"""
+End-to-end load test for What'sYourRecipe
+Drives the real FastAPI app in-process (httpx ASGI transport) through the user journeys the
+frontend performs (static/api.js + script.js), against the local Supabase stand-in with injected
+round-trip latency. Reports throughput, p50/p95/p99 latency and Supabase round trips per request.
+
+Usage:
+    python benchmarks/load_test.py                                  # every scenario, concurrency 10
+    python benchmarks/load_test.py --scenario feed vote --concurrency 1 10 50
+    python benchmarks/load_test.py --output before.json             # save results
+    python benchmarks/load_test.py --compare before.json            # diff against saved results
+    python benchmarks/load_test.py --list
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from hashtags import sync_recipe_hashtags
+
+HASHTAGS = ["espresso", "pourover", "v60", "aeropress", "coldbrew", "chemex", "frenchpress", "chikmagalur", "lightroast", "naturals"]
+SEARCH_TERMS = ["espresso", "bright", "brewer", "v60", "jaggery", "coorg"]
+PASSWORD = "loadtest-password"
+
+
+def percentile(values, pct):
+    """Linear-interpolated percentile of a list of numbers"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+class Recorder:
+    """Collects one sample per HTTP request, grouped by journey step"""
+
+    def __init__(self):
+        self.samples = defaultdict(list)  # step -> [(seconds, status, upstream calls)]
+
+    def add(self, step, seconds, status, upstream):
+        self.samples[step].append((seconds, status, upstream))
+
+    def summarize(self, elapsed, journeys):
+        def stats(samples):
+            latencies = [s[0] * 1000 for s in samples]
+            upstream = [s[2] for s in samples if s[2] is not None]
+            return {
+                "requests": len(samples),
+                "errors": sum(1 for s in samples if s[1] >= 400),
+                "p50_ms": round(percentile(latencies, 50), 2),
+                "p95_ms": round(percentile(latencies, 95), 2),
+                "p99_ms": round(percentile(latencies, 99), 2),
+                "max_ms": round(max(latencies, default=0), 2),
+                "upstream_per_request": round(sum(upstream) / len(upstream), 2) if upstream else None,
+                "upstream_max": max(upstream, default=None),
+            }
+
+        everything = [sample for samples in self.samples.values() for sample in samples]
+        summary = stats(everything)
+        summary.update({
+            "duration_s": round(elapsed, 3),
+            "journeys": journeys,
+            "throughput_rps": round(len(everything) / elapsed, 2) if elapsed else 0,
+            "steps": {step: stats(samples) for step, samples in sorted(self.samples.items())},
+        })
+        return summary
+
+
+class VirtualUser:
+    """One simulated browser session (bearer token, seeded RNG) issuing requests like the frontend"""
+
+    def __init__(self, client, recorder, account, world, rng):
+        self.client = client
+        self.recorder = recorder
+        self.account = account
+        self.world = world
+        self.rng = rng
+        self.headers = {"Authorization": f"Bearer {account['token']}"}
+
+    async def call(self, step, method, url, **kwargs):
+        kwargs.setdefault("headers", self.headers)
+        start = time.perf_counter()
+        response = await self.client.request(method, url, **kwargs)
+        elapsed = time.perf_counter() - start
+        upstream = response.headers.get("x-upstream-calls")
+        self.recorder.add(step, elapsed, response.status_code, int(upstream) if upstream else None)
+        return response
+
+    def pick_recipe(self):
+        return self.rng.choice(self.world["recipe_ids"])
+
+    def pick_user(self):
+        return self.rng.choice([uid for uid in self.world["user_ids"] if uid != self.account["id"]])
+
+
+# Journeys (the request sequences the frontend issues for each user action)
+
+async def journey_login(user):
+    response = await user.call("POST /auth/login", "POST", "/auth/login", headers={},
+                               json={"email": user.account["email"], "password": PASSWORD})
+    token = response.json().get("access_token")
+    if token:
+        user.headers = {"Authorization": f"Bearer {token}"}
+    await user.call("GET /users/profile", "GET", "/users/profile")
+
+
+async def journey_feed(user):
+    response = await user.call("GET /recipes (feed)", "GET", "/recipes?page=1&limit=10&view=feed")
+    recipes = response.json() if response.status_code == 200 else []
+    if recipes:
+        await user.call("POST /status/batch", "POST", "/status/batch", json={"recipe_ids": [r["id"] for r in recipes]})
+
+
+async def journey_trending(user):
+    await user.call("GET /recipes (trending)", "GET", "/recipes?page=1&limit=10&view=trending&trending_days=7")
+    response = await user.call("GET /trending-hashtags", "GET", "/trending-hashtags?limit=10&days_back=1")
+    tags = [tag["tag"] for tag in response.json()] if response.status_code == 200 else []
+    tag = user.rng.choice(tags or HASHTAGS)
+    await user.call("GET /recipes/hashtag/{hashtag}", "GET", f"/recipes/hashtag/{tag}?sort_by=recent&limit=20")
+
+
+async def journey_vote(user):
+    await user.call("POST /votes", "POST", "/votes", json={"recipe_id": user.pick_recipe(), "vote_type": user.rng.choice(["up", "up", "down"])})
+
+
+async def journey_follow(user):
+    await user.call("GET /recommended-users", "GET", "/recommended-users?limit=5")
+    await user.call("POST /follow/{user_id}", "POST", f"/follow/{user.pick_user()}")
+
+
+async def journey_save(user):
+    recipe_id = user.pick_recipe()
+    await user.call("POST /save-recipe/{recipe_id}", "POST", f"/save-recipe/{recipe_id}")
+    await user.call("POST /status/batch", "POST", "/status/batch", json={"recipe_ids": [recipe_id]})
+
+
+async def journey_search(user):
+    query = user.rng.choice(SEARCH_TERMS)
+    # The search page fires both lookups at once (Promise.all)
+    await asyncio.gather(
+        user.call("GET /recipes/search/{query}", "GET", f"/recipes/search/{query}?limit=5"),
+        user.call("GET /users/search/{query}", "GET", f"/users/search/{query}?limit=5"),
+    )
+
+
+async def journey_profile(user):
+    user_id = user.pick_user()
+    await asyncio.gather(
+        user.call("GET /users/{user_id}", "GET", f"/users/{user_id}"),
+        user.call("GET /user-stats/{user_id}", "GET", f"/user-stats/{user_id}"),
+    )
+    await user.call("POST /status/batch", "POST", "/status/batch", json={"user_ids": [user_id]})
+    await user.call("GET /users/{user_id}/recipes", "GET", f"/users/{user_id}/recipes?page=1&limit=20")
+
+
+async def journey_recipe(user):
+    await user.call("GET /recipes/{recipe_id}", "GET", f"/recipes/{user.pick_recipe()}")
+
+
+async def journey_activity(user):
+    await user.call("GET /activity-feed", "GET", "/activity-feed?limit=10")
+
+
+JOURNEYS = {
+    "login": journey_login,
+    "feed": journey_feed,
+    "trending": journey_trending,
+    "vote": journey_vote,
+    "follow": journey_follow,
+    "save": journey_save,
+    "search": journey_search,
+    "profile": journey_profile,
+    "recipe": journey_recipe,
+    "activity": journey_activity,
+}
+
+# Relative frequency of each journey in the "mixed" scenario (browsing dominates writes)
+MIXED_WEIGHTS = {
+    "feed": 30, "recipe": 15, "trending": 10, "profile": 10, "search": 8,
+    "activity": 8, "vote": 10, "save": 4, "follow": 3, "login": 2,
+}
+
+SCENARIOS = list(JOURNEYS) + ["mixed"]
+
+
+def seed_world(client, users, recipes, seed):
+    """Create accounts, recipes, votes and follows directly through the stand-in client"""
+    rng = random.Random(seed)
+    accounts = []
+    for index in range(users):
+        email = f"loadtest{index}@example.com"
+        client.auth.sign_up({"email": email, "password": PASSWORD, "options": {"data": {"username": f"brewer_{index}", "full_name": f"Brewer {index}"}}})
+        session = client.auth.sign_in_with_password({"email": email, "password": PASSWORD}).session
+        accounts.append({"id": session.user.id, "email": email, "token": session.access_token})
+    user_ids = [account["id"] for account in accounts]
+
+    now = datetime.now(timezone.utc)
+    rows = []
+    for index in range(recipes):
+        tags = " ".join(f"#{tag}" for tag in rng.sample(HASHTAGS, rng.randint(0, 3)))
+        created = now - timedelta(minutes=rng.randint(0, 60 * 24 * 14))
+        rows.append({
+            # Power-law-ish authorship: a few prolific brewers, a long tail of occasional ones
+            "user_id": user_ids[min(int(rng.paretovariate(1.2)) - 1, users - 1)],
+            "recipe_name": f"{rng.choice(HASHTAGS).title()} #{index}",
+            "description": f"Bright, juicy cup with notes of jaggery and citrus. {tags}",
+            "date_created": created.date().isoformat(),
+            "rating": round(rng.uniform(5, 10), 1),
+            "brew_method": rng.choice(["espresso", "pourover", "aeropress", "frenchPress"]),
+            "bean_region": rng.choice(["chikmagalur", "coorg", "ethiopia", "colombia"]),
+            "is_public": rng.random() > 0.05,
+            "created_at": created.isoformat(),
+        })
+    recipes = client.table("recipes").insert(rows).execute().data
+    sync_recipe_hashtags(client, recipes)
+    recipe_ids = [row["id"] for row in recipes]
+
+    votes = []
+    for recipe_id in recipe_ids:
+        for voter in rng.sample(user_ids, min(users, int(rng.paretovariate(1.5)))):
+            votes.append({"recipe_id": recipe_id, "user_id": voter, "vote_type": "up" if rng.random() < 0.8 else "down"})
+    if votes:
+        client.table("recipe_votes").insert(votes).execute()
+
+    follows = []
+    for follower in user_ids:
+        for following in rng.sample(user_ids, min(users, 6)):
+            if following != follower:
+                follows.append({"follower_id": follower, "following_id": following})
+    if follows:
+        client.table("follows").insert(follows).execute()
+
+    return {"accounts": accounts, "user_ids": user_ids, "recipe_ids": recipe_ids, "votes": len(votes), "follows": len(follows)}
+
+
+async def run_scenario(app, world, scenario, concurrency, iterations, duration, seed):
+    import httpx
+
+    recorder = Recorder()
+    journeys = [0]
+    transport = httpx.ASGITransport(app=app)
+    deadline = time.perf_counter() + duration if duration else None
+
+    async def worker(index):
+        rng = random.Random(seed * 1000 + index)
+        account = world["accounts"][index % len(world["accounts"])]
+        async with httpx.AsyncClient(transport=transport, base_url="http://loadtest") as client:
+            user = VirtualUser(client, recorder, account, world, rng)
+            done = 0
+            while (deadline and time.perf_counter() < deadline) or (not deadline and done < iterations):
+                if scenario == "mixed":
+                    name = rng.choices(list(MIXED_WEIGHTS), weights=list(MIXED_WEIGHTS.values()))[0]
+                else:
+                    name = scenario
+                await JOURNEYS[name](user)
+                done += 1
+                journeys[0] += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(index) for index in range(concurrency)))
+    return recorder.summarize(time.perf_counter() - start, journeys[0])
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def print_result(name, concurrency, result, baseline=None):
+    def delta(key):
+        if not baseline or not baseline.get(key):
+            return ""
+        change = (result[key] - baseline[key]) / baseline[key] * 100
+        return f" ({change:+.0f}%)"
+
+    print(
+        f"{name:<10} c={concurrency:<4} {result['throughput_rps']:>8.1f} req/s{delta('throughput_rps'):<8} "
+        f"p50 {result['p50_ms']:>7.1f}ms{delta('p50_ms'):<8} p95 {result['p95_ms']:>7.1f}ms{delta('p95_ms'):<8} "
+        f"p99 {result['p99_ms']:>7.1f}ms   upstream/req {result['upstream_per_request'] or 0:>5.2f}{delta('upstream_per_request'):<8} "
+        f"errors {result['errors']}"
+    )
+    for step, stats in result["steps"].items():
+        print(
+            f"    {step:<34} n={stats['requests']:<6} p50 {stats['p50_ms']:>7.1f}ms  p95 {stats['p95_ms']:>7.1f}ms  "
+            f"p99 {stats['p99_ms']:>7.1f}ms  upstream {stats['upstream_per_request'] or 0:>5.2f} (max {stats['upstream_max'] or 0})"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the API through realistic user journeys against the local stand-in")
+    parser.add_argument("--scenario", nargs="+", default=SCENARIOS, choices=SCENARIOS, help="journeys to run (default: all)")
+    parser.add_argument("--concurrency", nargs="+", type=int, default=[10], help="concurrent virtual users (one run per value)")
+    parser.add_argument("--iterations", type=int, default=20, help="journeys per virtual user")
+    parser.add_argument("--duration", type=float, default=None, help="run each scenario for this many seconds instead")
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="simulated Supabase round-trip latency")
+    parser.add_argument("--jitter-ms", type=float, default=5.0, help="random extra latency per round trip")
+    parser.add_argument("--users", type=int, default=50, help="seeded accounts")
+    parser.add_argument("--recipes", type=int, default=500, help="seeded recipes")
+    parser.add_argument("--database", default="sqlite://", help="stand-in database URL (default: in-memory)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="write results as JSON to this file")
+    parser.add_argument("--compare", help="JSON results from a previous run to diff against")
+    parser.add_argument("--verbose", action="store_true", help="show the app's own log output")
+    parser.add_argument("--list", action="store_true", help="list scenarios and exit")
+    args = parser.parse_args()
+
+    if args.list:
+        for name in JOURNEYS:
+            print(name)
+        print("mixed      " + ", ".join(f"{name} {weight}%" for name, weight in MIXED_WEIGHTS.items()))
+        return
+
+    # Configure the app before importing it: local stand-in, debug headers for round-trip counts, no admission control
+    os.environ["SUPABASE_URL"] = args.database
+    os.environ["DEBUG"] = "true"
+    os.environ["LOCAL_SUPABASE_LATENCY_MS"] = "0"
+    os.environ["LOCAL_SUPABASE_JITTER_MS"] = "0"
+    os.environ["ADMISSION_CONTROL"] = "false"  # measure the journeys, not the shedding policy
+    os.chdir(BACKEND_DIR)
+
+    quiet = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(io.StringIO())
+    with quiet:
+        import main as app_module
+        db = app_module.supabase._client.db
+        world = seed_world(app_module.supabase._client, args.users, args.recipes, args.seed)
+
+    print(f"Seeded {args.users} users, {len(world['recipe_ids'])} recipes, {world['votes']} votes, {world['follows']} follows")
+    print(f"Latency {args.latency_ms:g}ms + jitter {args.jitter_ms:g}ms per Supabase round trip")
+    print("=" * 100)
+
+    db.latency = args.latency_ms / 1000
+    db.jitter = args.jitter_ms / 1000
+
+    baseline = {}
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f).get("results", {})
+
+    results = {}
+    for scenario in args.scenario:
+        for concurrency in args.concurrency:
+            key = f"{scenario}@{concurrency}"
+            with quiet:
+                result = asyncio.run(run_scenario(app_module.app, world, scenario, concurrency, args.iterations, args.duration, args.seed))
+            results[key] = result
+            print_result(scenario, concurrency, result, baseline.get(key))
+        print("-" * 100)
+
+    if args.output:
+        report = {
+            "meta": {
+                "revision": git_revision(),
+                "timestamp": datetime.now(timezone.utc).isoformat(),
+                "python": sys.version.split()[0],
+                "args": {k: v for k, v in vars(args).items() if k not in ("output", "compare", "list", "verbose")},
+            },
+            "results": results,
+        }
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
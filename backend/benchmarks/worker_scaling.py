@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Worker scaling benchmark for What'sYourRecipe
+Starts the production server (gunicorn -c gunicorn.conf.py) with 1, 2, 4... workers against a
+seeded local Supabase stand-in file, drives it over real HTTP connections, and reports
+throughput and latency per worker count. Scaling tops out at the number of CPUs available.
+
+Usage:
+    python benchmarks/worker_scaling.py                          # 1, 2 and 4 workers
+    python benchmarks/worker_scaling.py --workers 1 2 4 8 --concurrency 64 --duration 20
+    python benchmarks/worker_scaling.py --path "/recipes?limit=20" --path "/recipes?view=trending"
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from load_test import percentile, seed_world
+from local_supabase import create_local_client
+
+DEFAULT_PATHS = ["/recipes?limit=20", "/recipes?view=trending&limit=20", "/recipes/search/espresso"]
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(workers, port, database, store, latency_ms, verbose):
+    env = dict(
+        os.environ,
+        PORT=str(port),
+        WEB_CONCURRENCY=str(workers),
+        SUPABASE_URL=database,
+        SHARED_STORE_URL=store,
+        LOCAL_SUPABASE_LATENCY_MS=str(latency_ms),
+        ADMISSION_CONTROL="false",  # measure raw capacity, not the shedding policy
+        MAX_REQUESTS="0",
+    )
+    output = None if verbose else subprocess.DEVNULL
+    return subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "main:app"],
+        cwd=BACKEND_DIR, env=env, stdout=output, stderr=output,
+    )
+
+
+async def wait_ready(client, base_url, timeout=60):
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        try:
+            if (await client.get(f"{base_url}/health")).status_code == 200:
+                return
+        except Exception:
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError("Server did not become ready")
+
+
+async def drive(base_url, paths, tokens, concurrency, duration):
+    """Closed-loop load: `concurrency` clients each send requests back to back for `duration` seconds"""
+    import httpx
+
+    latencies = []
+    errors = [0]
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(limits=limits, timeout=30) as client:
+        await wait_ready(client, base_url)
+        # Warm every worker's caches and connections before measuring
+        for index in range(concurrency * 2):
+            await client.get(base_url + paths[index % len(paths)], headers={"Authorization": f"Bearer {tokens[index % len(tokens)]}"})
+
+        deadline = time.perf_counter() + duration
+
+        async def worker(index):
+            headers = {"Authorization": f"Bearer {tokens[index % len(tokens)]}"}
+            sent = index
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                try:
+                    response = await client.get(base_url + paths[sent % len(paths)], headers=headers)
+                    if response.status_code != 200:
+                        errors[0] += 1
+                except httpx.HTTPError:
+                    errors[0] += 1
+                latencies.append(time.perf_counter() - started)
+                sent += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(index) for index in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    return {
+        "requests": len(latencies),
+        "errors": errors[0],
+        "rps": len(latencies) / elapsed,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure throughput scaling with gunicorn worker count")
+    parser.add_argument("--workers", nargs="+", type=int, default=[1, 2, 4], help="worker counts to run (one server per value)")
+    parser.add_argument("--concurrency", type=int, default=32, help="concurrent client connections")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds measured per worker count")
+    parser.add_argument("--path", action="append", dest="paths", help="request path (repeatable; default: feed, trending, search)")
+    parser.add_argument("--latency-ms", type=float, default=5.0, help="simulated Supabase round-trip latency")
+    parser.add_argument("--users", type=int, default=50, help="seeded accounts")
+    parser.add_argument("--recipes", type=int, default=500, help="seeded recipes")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--verbose", action="store_true", help="show the servers' log output")
+    args = parser.parse_args()
+    paths = args.paths or DEFAULT_PATHS
+
+    workdir = tempfile.mkdtemp(prefix="worker-scaling-")
+    database = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    store = f"sqlite:///{os.path.join(workdir, 'shared.db')}"
+    with contextlib.redirect_stdout(io.StringIO()):
+        world = seed_world(create_local_client(database, latency_ms=0), args.users, args.recipes, args.seed)
+    tokens = [account["token"] for account in world["accounts"]]
+
+    cpus = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count()
+    print(f"Seeded {args.users} users, {len(world['recipe_ids'])} recipes; {cpus} CPU(s) available")
+    print(f"Paths: {', '.join(paths)}; concurrency {args.concurrency}, {args.duration:g}s per run, latency {args.latency_ms:g}ms")
+    print("=" * 90)
+    print(f"{'workers':>8} {'requests':>9} {'errors':>7} {'req/s':>9} {'speedup':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+
+    baseline = None
+    for workers in args.workers:
+        port = free_port()
+        server = start_server(workers, port, database, store, args.latency_ms, args.verbose)
+        try:
+            result = asyncio.run(drive(f"http://127.0.0.1:{port}", paths, tokens, args.concurrency, args.duration))
+        finally:
+            server.send_signal(signal.SIGTERM)
+            server.wait(timeout=60)
+        baseline = baseline or result["rps"]
+        print(
+            f"{workers:>8} {result['requests']:>9} {result['errors']:>7} {result['rps']:>9.1f} "
+            f"{result['rps'] / baseline:>7.2f}x {result['p50_ms']:>8.1f} {result['p95_ms']:>8.1f} {result['p99_ms']:>8.1f}"
+        )
+        if workers > cpus:
+            print(f"{'':>8} (more workers than CPUs: extra workers only help while requests wait on I/O)")
+
+
+if __name__ == "__main__":
+    main()
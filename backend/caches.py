@@ -0,0 +1,191 @@
+"""
+In-process TTL caches for What'sYourRecipe
+Hot public reads (trending candidates, trending hashtags, public profiles) are kept in memory for
+a few seconds at a time. They are warmed at startup and written to a snapshot file at shutdown,
+so a restarted worker can answer its first requests before Supabase has been asked anything.
+
+Each worker has its own caches. Invalidations are shared: a write drops the entry in the worker
+that handled it at once, and CacheInvalidations passes it on through the shared store so every
+other worker drops it within a second or so instead of serving it until the TTL runs out.
+"""
+
+import asyncio
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+from fast_json import dumps
+from metrics import record_cache
+
+DEFAULT_SNAPSHOT_PATH = os.path.join(tempfile.gettempdir(), "whatsyourrecipe-cache.json")
+
+CACHES = {}  # name -> TTLCache, everything that gets snapshotted
+
+# Shared invalidation records: cache name and key (or none for the whole cache) -> when it happened
+INVALIDATION_PREFIX = "cache:invalidated:"
+
+
+class TTLCache:
+    """Bounded LRU of JSON-serializable values that expire `ttl` seconds after they were stored"""
+
+    def __init__(self, name, ttl, max_entries=256, invalidations=None):
+        self.name = name
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.invalidations = invalidations  # CacheInvalidations sharing invalidate() with other workers
+        self._entries = OrderedDict()  # key -> (stored_at, value, as_of: when the value was read)
+        self._lock = threading.Lock()
+        CACHES[name] = self
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.time() - entry[0] > self.ttl:
+                del self._entries[key]
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+        record_cache(self.name, entry is not None)
+        return entry[1] if entry is not None else None
+
+    def set(self, key, value, as_of=None):
+        if self.ttl <= 0:
+            return
+        now = time.time()
+        with self._lock:
+            self._entries[key] = (now, value, as_of or now)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key=None):
+        """Drop one key, or everything when key is None, here and (if shared) in every other worker"""
+        self.drop(key)
+        if self.invalidations is not None:
+            self.invalidations.publish(self, key)
+
+    def drop(self, key=None, read_before=None):
+        """Drop one key (or everything) from this worker only; read_before spares values read since"""
+        with self._lock:
+            keys = list(self._entries) if key is None else [key] if key in self._entries else []
+            for k in keys:
+                if read_before is None or self._entries[k][2] < read_before:
+                    del self._entries[k]
+
+    def get_or_load(self, key, load):
+        """Cached value for key, else load() stored under it (None results are not cached)"""
+        value = self.get(key)
+        if value is None:
+            value = load()
+            if value is not None:
+                self.set(key, value)
+        return value
+
+    def items(self):
+        now = time.time()
+        with self._lock:
+            return [(key, as_of, value) for key, (stored_at, value, as_of) in self._entries.items() if now - stored_at <= self.ttl]
+
+
+class CacheInvalidations:
+    """Passes TTLCache invalidations to every worker through the shared store
+
+    publish() records the invalidation with its time; each worker re-reads the records on an
+    interval and drops the matching entries whose values were read before then. Records expire with the cache's
+    TTL, after which the entries they cover have expired anyway.
+    """
+
+    def __init__(self, store, interval=1.0):
+        self.store = store
+        self.interval = interval
+        self.applied = {}  # store key -> invalidation time already applied here
+        self._task = None
+
+    def publish(self, cache, key=None):
+        record = {"cache": cache.name, "key": key, "at": time.time()}
+        scope = "*" if key is None else f"={key}"
+        try:
+            self.store.set(f"{INVALIDATION_PREFIX}{cache.name}:{scope}", record, max(cache.ttl, 1))
+        except Exception as e:
+            print(f"Could not share invalidation of {cache.name} cache: {e}")
+
+    def refresh(self):
+        """Drop entries invalidated by other workers since the last refresh"""
+        records = dict(self.store.scan(INVALIDATION_PREFIX))
+        for store_key, record in records.items():
+            if self.applied.get(store_key) == record["at"]:
+                continue
+            cache = CACHES.get(record["cache"])
+            if cache is not None:
+                cache.drop(record["key"], read_before=record["at"])
+        self.applied = {store_key: record["at"] for store_key, record in records.items()}
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await asyncio.to_thread(self.refresh)
+            except Exception as e:
+                print(f"Could not read cache invalidations: {e}")
+
+    async def start(self):
+        """Apply the invalidations already recorded (e.g. to snapshot entries), then keep polling"""
+        try:
+            await asyncio.to_thread(self.refresh)
+        except Exception as e:
+            print(f"Could not read cache invalidations: {e}")
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+def save_snapshot(path=DEFAULT_SNAPSHOT_PATH):
+    """Write every cache's live entries to `path` (atomically; last writer wins across workers)"""
+    snapshot = {
+        "saved_at": time.time(),
+        "caches": {name: [[key, stored_at, value] for key, stored_at, value in cache.items()] for name, cache in CACHES.items()},
+    }
+    partial = f"{path}.{os.getpid()}.tmp"
+    with open(partial, "wb") as f:
+        f.write(dumps(snapshot))
+    os.replace(partial, path)
+    return sum(len(entries) for entries in snapshot["caches"].values())
+
+
+def load_snapshot(path=DEFAULT_SNAPSHOT_PATH, max_age=300):
+    """Refill the caches from a snapshot younger than `max_age` seconds; returns entries loaded.
+
+    Loaded entries get a fresh TTL: they tide the worker over until warm-up or the first misses
+    replace them, and are never older than max_age + ttl.
+    """
+    try:
+        with open(path, "rb") as f:
+            snapshot = json.loads(f.read())
+    except FileNotFoundError:
+        return 0
+    except (OSError, ValueError) as e:
+        print(f"Ignoring unreadable cache snapshot {path}: {e}")
+        return 0
+    if time.time() - snapshot.get("saved_at", 0) > max_age:
+        return 0
+
+    loaded = 0
+    for name, entries in snapshot.get("caches", {}).items():
+        cache = CACHES.get(name)
+        if cache is None:
+            continue
+        for key, as_of, value in entries:
+            cache.set(key, value, as_of=as_of)
+            loaded += 1
+    return loaded
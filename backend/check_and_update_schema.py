@@ -5,7 +5,8 @@ Checks for missing columns and reports what needs to be updated
 """
 
 import os
-from supabase import create_client, Client
+from supabase_client import get_client
+from local_supabase import is_local_url
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -16,11 +17,11 @@ class SchemaChecker:
         self.supabase_url = os.getenv("SUPABASE_URL")
         self.supabase_key = os.getenv("SUPABASE_SERVICE_KEY") or os.getenv("SUPABASE_ANON_KEY")
         
-        if not self.supabase_url or not self.supabase_key:
+        if not self.supabase_url or (not self.supabase_key and not is_local_url(self.supabase_url)):
             print("❌ Error: SUPABASE_URL and SUPABASE_SERVICE_KEY must be set")
             exit(1)
         
-        self.supabase: Client = create_client(self.supabase_url, self.supabase_key)
+        self.supabase = get_client(self.supabase_url, self.supabase_key)
         print(f"✅ Connected to Supabase: {self.supabase_url}")
 
     def get_table_columns(self, table_name):
@@ -87,6 +88,9 @@ class SchemaChecker:
                 'full_name': 'VARCHAR(100)',
                 'bio': 'TEXT',
                 'avatar_url': 'TEXT',
+                'followers_count': 'INTEGER',
+                'following_count': 'INTEGER',
+                'recipes_count': 'INTEGER',
                 'created_at': 'TIMESTAMP',
                 'updated_at': 'TIMESTAMP'
             },
@@ -0,0 +1,198 @@
+"""
+Response compression for What'sYourRecipe
+Negotiated brotli/gzip compression for text and JSON responses above a size threshold
+"""
+
+import gzip
+import zlib
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+# Content types worth compressing
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/javascript",
+    "application/x-ndjson",
+    "text/",
+    "image/svg+xml",
+)
+
+# Per-route settings keyed by route path template, e.g. "/recipes/{recipe_id}"
+# Values: {"minimum_size": int} to change the threshold, or {"enabled": False} to turn compression off
+ROUTE_SETTINGS = {}
+
+
+def configure_route(path, minimum_size=None, enabled=True):
+    """Override compression settings for one route template"""
+    settings = {"enabled": enabled}
+    if minimum_size is not None:
+        settings["minimum_size"] = minimum_size
+    ROUTE_SETTINGS[path] = settings
+
+
+def choose_encoding(accept_encoding):
+    """Pick the best supported encoding from an Accept-Encoding header (br > gzip)"""
+    offered = {}
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        if params.strip().startswith("q="):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                quality = 0.0
+        offered[name.strip()] = quality
+
+    if brotli is not None and offered.get("br", 0) > 0:
+        return "br"
+    if offered.get("gzip", 0) > 0:
+        return "gzip"
+    return None
+
+
+def compress(body, encoding, gzip_level=6, brotli_quality=4):
+    """Compress a complete body with the given encoding"""
+    if encoding == "br":
+        return brotli.compress(body, quality=brotli_quality)
+    return gzip.compress(body, compresslevel=gzip_level, mtime=0)
+
+
+class _StreamCompressor:
+    """Incremental compressor for streaming responses"""
+
+    def __init__(self, encoding, gzip_level, brotli_quality):
+        if encoding == "br":
+            self._compressor = brotli.Compressor(quality=brotli_quality)
+            self._compress = self._compressor.process
+            self._flush = self._compressor.finish
+        else:
+            self._compressor = zlib.compressobj(gzip_level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+            self._compress = self._compressor.compress
+            self._flush = self._compressor.flush
+
+    def process(self, chunk, final):
+        data = self._compress(chunk) if chunk else b""
+        if final:
+            data += self._flush()
+        return data
+
+
+class CompressionMiddleware:
+    """ASGI middleware that compresses eligible responses.
+
+    Complete bodies are compressed only when they reach the size threshold for
+    their route; streaming bodies are always compressed incrementally.
+    """
+
+    def __init__(self, app, minimum_size=1024, gzip_level=6, brotli_quality=4):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        accept_encoding = ""
+        for name, value in scope.get("headers", []):
+            if name == b"accept-encoding":
+                accept_encoding = value.decode("latin-1")
+                break
+
+        encoding = choose_encoding(accept_encoding) if accept_encoding else None
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        await _CompressedResponder(self, scope, encoding)(receive, send)
+
+
+class _CompressedResponder:
+    def __init__(self, middleware, scope, encoding):
+        self.middleware = middleware
+        self.scope = scope
+        self.encoding = encoding
+        self.start_message = None
+        self.compressor = None
+        self.passthrough = False
+
+    async def __call__(self, receive, send):
+        self.send = send
+        await self.middleware.app(self.scope, receive, self.send_wrapper)
+
+    def _route_settings(self):
+        # The router stores the matched route on the scope before the response starts
+        route = self.scope.get("route")
+        path = getattr(route, "path", None)
+        return ROUTE_SETTINGS.get(path, {})
+
+    def _eligible(self, headers):
+        if self._route_settings().get("enabled") is False:
+            return False
+        content_type = ""
+        for name, value in headers:
+            if name == b"content-encoding":
+                return False
+            if name == b"content-type":
+                content_type = value.decode("latin-1").lower()
+        return content_type.startswith(COMPRESSIBLE_TYPES)
+
+    async def send_wrapper(self, message):
+        if message["type"] == "http.response.start":
+            self.start_message = message
+            self.passthrough = not self._eligible(message.get("headers", []))
+            if self.passthrough:
+                await self.send(message)
+            return
+
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.compressor is None and not more_body:
+            # Whole body in one message: compress only if it is worth it
+            minimum_size = self._route_settings().get("minimum_size", self.middleware.minimum_size)
+            if len(body) < minimum_size:
+                await self.send(self.start_message)
+                await self.send(message)
+                return
+
+            compressed = compress(body, self.encoding, self.middleware.gzip_level, self.middleware.brotli_quality)
+            await self.send(self._compressed_start(len(compressed)))
+            await self.send({"type": "http.response.body", "body": compressed})
+            return
+
+        if self.compressor is None:
+            # Streaming body: switch to incremental compression
+            self.compressor = _StreamCompressor(self.encoding, self.middleware.gzip_level, self.middleware.brotli_quality)
+            await self.send(self._compressed_start(None))
+
+        data = self.compressor.process(body, final=not more_body)
+        if data or not more_body:
+            await self.send({"type": "http.response.body", "body": data, "more_body": more_body})
+
+    def _compressed_start(self, content_length):
+        headers = [
+            (name, value) for name, value in self.start_message.get("headers", [])
+            if name not in (b"content-length", b"vary")
+        ]
+        vary = [value for name, value in self.start_message.get("headers", []) if name == b"vary"]
+        vary_values = {v.strip().lower() for value in vary for v in value.decode("latin-1").split(",") if v.strip()}
+        vary_values.add("accept-encoding")
+
+        headers.append((b"content-encoding", self.encoding.encode("latin-1")))
+        headers.append((b"vary", ", ".join(sorted(vary_values)).encode("latin-1")))
+        if content_length is not None:
+            headers.append((b"content-length", str(content_length).encode("latin-1")))
+
+        start = dict(self.start_message)
+        start["headers"] = headers
+        return start
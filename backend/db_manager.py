@@ -4,25 +4,50 @@ Database Manager for What'sYourRecipe
 Manages Supabase database structure and migrations
 """
 
+import argparse
+import json
 import os
 import sys
+import time
 from datetime import datetime
-from supabase import create_client, Client
+from supabase_client import get_client
+from local_supabase import is_local_url
+from synthetic_data import TABLES, DatasetSpec, generate_auth_users, generate_recipes
+from hashtags import recipe_hashtags, sync_recipe_hashtags
+from schema_migrations import MIGRATIONS_DIR, MigrationRunner, load_migrations, plan
+from query_advisor import (MIN_SEQ_SCAN_ROWS, QUERY_CATALOG, QueryAdvisor, column_list, find_duplicates, find_unused,
+                           format_size, missing_indexes, next_migration_path, recommend, render_migration)
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
+# How long a transactional migration waits for a table lock before failing (Postgres interval)
+MIGRATION_LOCK_TIMEOUT = os.getenv("MIGRATION_LOCK_TIMEOUT", "5s")
+
+# Upper bound on each EXPLAIN ANALYZE in the analyze command (Postgres interval)
+ANALYZE_STATEMENT_TIMEOUT = os.getenv("ANALYZE_STATEMENT_TIMEOUT", "30s")
+
+# Older per-feature commands, now "apply migrations up to this version"
+MIGRATION_COMMANDS = {
+    "profiles": "0001",
+    "recipes": "0001",
+    "counters": "0002",
+    "hashtags": "0003",
+    "votes": "0004",
+    "comments": "0006",
+}
+
 class DatabaseManager:
     def __init__(self):
         self.supabase_url = os.getenv("SUPABASE_URL")
         self.supabase_key = os.getenv("SUPABASE_SERVICE_KEY")  # Use service key for admin operations
         
-        if not self.supabase_url or not self.supabase_key:
+        if not self.supabase_url or (not self.supabase_key and not is_local_url(self.supabase_url)):
             print("❌ Error: SUPABASE_URL and SUPABASE_SERVICE_KEY must be set in environment variables")
             sys.exit(1)
         
-        self.supabase: Client = create_client(self.supabase_url, self.supabase_key)
+        self.supabase = get_client(self.supabase_url, self.supabase_key)
         print(f"✅ Connected to Supabase: {self.supabase_url}")
 
     def execute_sql(self, sql_query, description=""):
@@ -36,299 +61,6 @@ class DatabaseManager:
             print(f"❌ Error {description}: {str(e)}")
             return None
 
-    def create_profiles_table(self):
-        """Create or update profiles table"""
-        sql = """
-        -- Create profiles table if not exists
-        CREATE TABLE IF NOT EXISTS public.profiles (
-            id UUID REFERENCES auth.users(id) ON DELETE CASCADE PRIMARY KEY,
-            username VARCHAR(50) UNIQUE NOT NULL,
-            full_name VARCHAR(100),
-            bio TEXT,
-            avatar_url TEXT,
-            created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
-            updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
-        );
-
-        -- Create indexes for better performance
-        CREATE INDEX IF NOT EXISTS idx_profiles_username ON public.profiles(username);
-        CREATE INDEX IF NOT EXISTS idx_profiles_created_at ON public.profiles(created_at);
-
-        -- Enable Row Level Security
-        ALTER TABLE public.profiles ENABLE ROW LEVEL SECURITY;
-
-        -- Create policies
-        DROP POLICY IF EXISTS "Public profiles are viewable by everyone" ON public.profiles;
-        CREATE POLICY "Public profiles are viewable by everyone" 
-        ON public.profiles FOR SELECT 
-        USING (true);
-
-        DROP POLICY IF EXISTS "Users can update own profile" ON public.profiles;
-        CREATE POLICY "Users can update own profile" 
-        ON public.profiles FOR UPDATE 
-        USING (auth.uid() = id);
-
-        DROP POLICY IF EXISTS "Users can insert own profile" ON public.profiles;
-        CREATE POLICY "Users can insert own profile" 
-        ON public.profiles FOR INSERT 
-        WITH CHECK (auth.uid() = id);
-        """
-        
-        return self.execute_sql(sql, "Creating/updating profiles table")
-
-    def create_recipes_table(self):
-        """Create or update recipes table"""
-        sql = """
-        -- Create recipes table if not exists
-        CREATE TABLE IF NOT EXISTS public.recipes (
-            id UUID DEFAULT gen_random_uuid() PRIMARY KEY,
-            user_id UUID REFERENCES auth.users(id) ON DELETE CASCADE NOT NULL,
-            recipe_name VARCHAR(200) NOT NULL,
-            description TEXT NOT NULL,
-            rating DECIMAL(3,1) CHECK (rating >= 1 AND rating <= 10),
-            date_created DATE,
-            is_public BOOLEAN DEFAULT true,
-            
-            -- Bean information
-            bean_variety VARCHAR(100),
-            bean_region VARCHAR(100),
-            india_estate VARCHAR(100),
-            processing_type VARCHAR(100),
-            
-            -- Roasting profile
-            roast_type VARCHAR(100),
-            roast_level VARCHAR(100),
-            crack_time VARCHAR(50),
-            roast_time DECIMAL(5,2),
-            development_time DECIMAL(5,2),
-            
-            -- Brewing parameters
-            brew_method VARCHAR(100),
-            grind_microns INTEGER,
-            water_composition VARCHAR(100),
-            tds DECIMAL(5,2),
-            calcium DECIMAL(5,2),
-            magnesium DECIMAL(5,2),
-            potassium DECIMAL(5,2),
-            sodium DECIMAL(5,2),
-            coffee_amount DECIMAL(6,2),
-            water_amount DECIMAL(8,2),
-            water_temp INTEGER,
-            brew_time DECIMAL(6,2),
-            
-            -- Serving preferences
-            milk_preference VARCHAR(100),
-            serving_temp VARCHAR(50),
-            sweetener VARCHAR(100),
-            sweetener_quantity DECIMAL(5,2),
-            serving_size DECIMAL(6,2),
-            
-            -- Sensory & evaluation
-            aroma_notes TEXT,
-            body VARCHAR(100),
-            acidity_type VARCHAR(100),
-            sweetness VARCHAR(100),
-            balance VARCHAR(100),
-            aftertaste VARCHAR(100),
-            clean_cup VARCHAR(100),
-            uniformity VARCHAR(100),
-            cupping_score DECIMAL(5,2) CHECK (cupping_score >= 0 AND cupping_score <= 100),
-            cupping_method VARCHAR(100),
-            defects TEXT,
-            overall_impression TEXT,
-            
-            -- Additional notes
-            brewing_notes TEXT,
-            
-            created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
-            updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
-        );
-
-        -- Create indexes
-        CREATE INDEX IF NOT EXISTS idx_recipes_user_id ON public.recipes(user_id);
-        CREATE INDEX IF NOT EXISTS idx_recipes_created_at ON public.recipes(created_at);
-        CREATE INDEX IF NOT EXISTS idx_recipes_is_public ON public.recipes(is_public);
-        CREATE INDEX IF NOT EXISTS idx_recipes_rating ON public.recipes(rating);
-
-        -- Enable Row Level Security
-        ALTER TABLE public.recipes ENABLE ROW LEVEL SECURITY;
-
-        -- Create policies
-        DROP POLICY IF EXISTS "Public recipes are viewable by everyone" ON public.recipes;
-        CREATE POLICY "Public recipes are viewable by everyone" 
-        ON public.recipes FOR SELECT 
-        USING (is_public = true OR auth.uid() = user_id);
-
-        DROP POLICY IF EXISTS "Users can manage own recipes" ON public.recipes;
-        CREATE POLICY "Users can manage own recipes" 
-        ON public.recipes FOR ALL 
-        USING (auth.uid() = user_id);
-        """
-        
-        return self.execute_sql(sql, "Creating/updating recipes table")
-
-    def create_recipe_votes_table(self):
-        """Create recipe votes table"""
-        sql = """
-        -- Create recipe votes table
-        CREATE TABLE IF NOT EXISTS public.recipe_votes (
-            id UUID DEFAULT gen_random_uuid() PRIMARY KEY,
-            recipe_id UUID REFERENCES public.recipes(id) ON DELETE CASCADE NOT NULL,
-            user_id UUID REFERENCES auth.users(id) ON DELETE CASCADE NOT NULL,
-            vote_type VARCHAR(10) CHECK (vote_type IN ('up', 'down')) NOT NULL,
-            created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
-            UNIQUE(recipe_id, user_id)
-        );
-
-        CREATE INDEX IF NOT EXISTS idx_recipe_votes_recipe_id ON public.recipe_votes(recipe_id);
-        CREATE INDEX IF NOT EXISTS idx_recipe_votes_user_id ON public.recipe_votes(user_id);
-
-        -- Enable RLS
-        ALTER TABLE public.recipe_votes ENABLE ROW LEVEL SECURITY;
-
-        -- Policies
-        DROP POLICY IF EXISTS "Recipe votes are viewable by everyone" ON public.recipe_votes;
-        CREATE POLICY "Recipe votes are viewable by everyone" 
-        ON public.recipe_votes FOR SELECT 
-        USING (true);
-
-        DROP POLICY IF EXISTS "Users can manage own votes" ON public.recipe_votes;
-        CREATE POLICY "Users can manage own votes" 
-        ON public.recipe_votes FOR ALL 
-        USING (auth.uid() = user_id);
-        """
-        
-        return self.execute_sql(sql, "Creating recipe votes table")
-
-    def create_follows_table(self):
-        """Create follows table"""
-        sql = """
-        -- Create follows table
-        CREATE TABLE IF NOT EXISTS public.follows (
-            id UUID DEFAULT gen_random_uuid() PRIMARY KEY,
-            follower_id UUID REFERENCES auth.users(id) ON DELETE CASCADE NOT NULL,
-            following_id UUID REFERENCES auth.users(id) ON DELETE CASCADE NOT NULL,
-            created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
-            UNIQUE(follower_id, following_id),
-            CHECK (follower_id != following_id)
-        );
-
-        CREATE INDEX IF NOT EXISTS idx_follows_follower_id ON public.follows(follower_id);
-        CREATE INDEX IF NOT EXISTS idx_follows_following_id ON public.follows(following_id);
-
-        -- Enable RLS
-        ALTER TABLE public.follows ENABLE ROW LEVEL SECURITY;
-
-        -- Policies
-        DROP POLICY IF EXISTS "Follows are viewable by everyone" ON public.follows;
-        CREATE POLICY "Follows are viewable by everyone" 
-        ON public.follows FOR SELECT 
-        USING (true);
-
-        DROP POLICY IF EXISTS "Users can manage own follows" ON public.follows;
-        CREATE POLICY "Users can manage own follows" 
-        ON public.follows FOR ALL 
-        USING (auth.uid() = follower_id);
-        """
-        
-        return self.execute_sql(sql, "Creating follows table")
-
-    def create_saved_recipes_table(self):
-        """Create saved recipes table"""
-        sql = """
-        -- Create saved recipes table
-        CREATE TABLE IF NOT EXISTS public.saved_recipes (
-            id UUID DEFAULT gen_random_uuid() PRIMARY KEY,
-            user_id UUID REFERENCES auth.users(id) ON DELETE CASCADE NOT NULL,
-            recipe_id UUID REFERENCES public.recipes(id) ON DELETE CASCADE NOT NULL,
-            created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
-            UNIQUE(user_id, recipe_id)
-        );
-
-        CREATE INDEX IF NOT EXISTS idx_saved_recipes_user_id ON public.saved_recipes(user_id);
-        CREATE INDEX IF NOT EXISTS idx_saved_recipes_recipe_id ON public.saved_recipes(recipe_id);
-
-        -- Enable RLS
-        ALTER TABLE public.saved_recipes ENABLE ROW LEVEL SECURITY;
-
-        -- Policies
-        DROP POLICY IF EXISTS "Users can manage own saved recipes" ON public.saved_recipes;
-        CREATE POLICY "Users can manage own saved recipes" 
-        ON public.saved_recipes FOR ALL 
-        USING (auth.uid() = user_id);
-        """
-        
-        return self.execute_sql(sql, "Creating saved recipes table")
-
-    def create_activities_table(self):
-        """Create activities table for activity feed"""
-        sql = """
-        -- Create activities table
-        CREATE TABLE IF NOT EXISTS public.activities (
-            id UUID DEFAULT gen_random_uuid() PRIMARY KEY,
-            user_id UUID REFERENCES auth.users(id) ON DELETE CASCADE NOT NULL,
-            activity_type VARCHAR(50) NOT NULL,
-            content TEXT,
-            recipe_id UUID REFERENCES public.recipes(id) ON DELETE CASCADE,
-            target_user_id UUID REFERENCES auth.users(id) ON DELETE CASCADE,
-            created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
-        );
-
-        CREATE INDEX IF NOT EXISTS idx_activities_user_id ON public.activities(user_id);
-        CREATE INDEX IF NOT EXISTS idx_activities_created_at ON public.activities(created_at);
-        CREATE INDEX IF NOT EXISTS idx_activities_type ON public.activities(activity_type);
-
-        -- Enable RLS
-        ALTER TABLE public.activities ENABLE ROW LEVEL SECURITY;
-
-        -- Policies
-        DROP POLICY IF EXISTS "Activities are viewable by followers" ON public.activities;
-        CREATE POLICY "Activities are viewable by followers" 
-        ON public.activities FOR SELECT 
-        USING (
-            auth.uid() = user_id OR 
-            EXISTS (
-                SELECT 1 FROM public.follows 
-                WHERE follower_id = auth.uid() AND following_id = user_id
-            )
-        );
-
-        DROP POLICY IF EXISTS "Users can create own activities" ON public.activities;
-        CREATE POLICY "Users can create own activities" 
-        ON public.activities FOR INSERT 
-        WITH CHECK (auth.uid() = user_id);
-        """
-        
-        return self.execute_sql(sql, "Creating activities table")
-
-    def create_hashtags_table(self):
-        """Create hashtags table"""
-        sql = """
-        -- Create hashtags table
-        CREATE TABLE IF NOT EXISTS public.hashtags (
-            id UUID DEFAULT gen_random_uuid() PRIMARY KEY,
-            tag VARCHAR(100) UNIQUE NOT NULL,
-            usage_count INTEGER DEFAULT 1,
-            last_used TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
-            created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
-        );
-
-        CREATE INDEX IF NOT EXISTS idx_hashtags_tag ON public.hashtags(tag);
-        CREATE INDEX IF NOT EXISTS idx_hashtags_usage_count ON public.hashtags(usage_count);
-        CREATE INDEX IF NOT EXISTS idx_hashtags_last_used ON public.hashtags(last_used);
-
-        -- Enable RLS
-        ALTER TABLE public.hashtags ENABLE ROW LEVEL SECURITY;
-
-        -- Policies
-        DROP POLICY IF EXISTS "Hashtags are viewable by everyone" ON public.hashtags;
-        CREATE POLICY "Hashtags are viewable by everyone" 
-        ON public.hashtags FOR SELECT 
-        USING (true);
-        """
-        
-        return self.execute_sql(sql, "Creating hashtags table")
-
     def create_storage_bucket(self):
         """Create storage bucket for avatars"""
         try:
@@ -366,38 +98,275 @@ class DatabaseManager:
         
         return self.execute_sql(sql, "Adding avatar_url column to profiles")
 
-    def create_all_tables(self):
-        """Create all tables and setup database structure"""
-        print("🚀 Setting up database structure...")
+    def generate_dataset(self, spec, method="batch", batch_size=1000):
+        """Populate the database with a seeded synthetic dataset (see synthetic_data.py)"""
+        print(f"🧪 Generating dataset (seed {spec.seed}) via {method}: {spec.users:,} users, {spec.recipes:,} recipes, "
+              f"~{spec.follows:,} follows, ~{spec.votes:,} votes, ~{spec.saves:,} saves, ~{spec.views:,} views")
         print("="*50)
         
-        success_count = 0
-        total_operations = 8
+        start = time.perf_counter()
+        if method == "copy":
+            if not self._copy_dataset(spec, batch_size):
+                return False
+        else:
+            if not is_local_url(self.supabase_url):
+                # PostgREST can't create auth.users rows, and profiles.id references them
+                print("❌ Batch inserts only work against the local stand-in (SUPABASE_URL=sqlite:///...)")
+                print("   For Supabase, set DATABASE_URL and use --method copy")
+                return False
+            for table, generator, _ in TABLES:
+                self._insert_batches(table, generator(spec), batch_size)
         
-        operations = [
-            ("Profiles table", self.create_profiles_table),
-            ("Recipes table", self.create_recipes_table),
-            ("Recipe votes table", self.create_recipe_votes_table),
-            ("Follows table", self.create_follows_table),
-            ("Saved recipes table", self.create_saved_recipes_table),
-            ("Activities table", self.create_activities_table),
-            ("Hashtags table", self.create_hashtags_table),
-            ("Avatar URL column", self.add_avatar_url_column),
-        ]
+        print("="*50)
+        print(f"✅ Dataset generated in {time.perf_counter() - start:.1f}s")
+        return True
+
+    def _insert_batches(self, table, rows, batch_size):
+        """Stream rows into a table through PostgREST in fixed-size bulk inserts"""
+        start = time.perf_counter()
+        total = 0
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= batch_size:
+                self._insert_batch(table, batch)
+                total += len(batch)
+                batch = []
+                if total % (batch_size * 20) == 0:
+                    print(f"   {table}: {total:,} rows ({total / (time.perf_counter() - start):,.0f} rows/s)")
+        if batch:
+            self._insert_batch(table, batch)
+            total += len(batch)
+        print(f"✅ {table}: {total:,} rows in {time.perf_counter() - start:.1f}s")
+
+    def _insert_batch(self, table, batch):
+        self.supabase.table(table).insert(batch, returning="minimal").execute()
+        if table == "recipes":
+            # Hashtags are linked by the app, one set-based call per batch
+            sync_recipe_hashtags(self.supabase, batch)
+
+    def _copy_dataset(self, spec, batch_size):
+        """Stream the dataset over a direct Postgres connection with COPY (needs DATABASE_URL and psycopg)"""
+        database_url = os.getenv("DATABASE_URL")
+        if not database_url:
+            print("❌ DATABASE_URL must be set for --method copy")
+            return False
+        try:
+            import psycopg
+        except ImportError:
+            print("❌ --method copy needs psycopg: pip install 'psycopg[binary]'")
+            return False
+        
+        with psycopg.connect(database_url) as conn:
+            self._copy_rows(conn, "auth.users", generate_auth_users(spec), batch_size)
+            for table, generator, _ in TABLES:
+                self._copy_rows(conn, f"public.{table}", generator(spec), batch_size)
+            self._copy_hashtags(conn, spec, batch_size)
+        return True
+
+    def _copy_hashtags(self, conn, spec, batch_size):
+        """Link the copied recipes to their hashtags with batched sync_recipe_hashtags calls"""
+        start = time.perf_counter()
+        total = 0
+        batch = []
+        with conn.cursor() as cursor:
+            for recipe in generate_recipes(spec):
+                batch.append(recipe_hashtags(recipe))
+                if len(batch) >= batch_size:
+                    cursor.execute("SELECT public.sync_recipe_hashtags(%s::jsonb)", (json.dumps(batch),))
+                    total += len(batch)
+                    batch = []
+            if batch:
+                cursor.execute("SELECT public.sync_recipe_hashtags(%s::jsonb)", (json.dumps(batch),))
+                total += len(batch)
+        conn.commit()
+        print(f"✅ hashtags: {total:,} recipes linked in {time.perf_counter() - start:.1f}s")
+
+    def _copy_rows(self, conn, table, rows, batch_size):
+        rows = iter(rows)
+        first = next(rows, None)
+        if first is None:
+            print(f"✅ {table}: 0 rows")
+            return
+        
+        columns = list(first.keys())
+        start = time.perf_counter()
+        total = 0
+        with conn.cursor() as cursor:
+            with cursor.copy(f"COPY {table} ({', '.join(columns)}) FROM STDIN") as copy:
+                copy.write_row([first[column] for column in columns])
+                total = 1
+                for row in rows:
+                    copy.write_row([row[column] for column in columns])
+                    total += 1
+                    if total % (batch_size * 100) == 0:
+                        print(f"   {table}: {total:,} rows ({total / (time.perf_counter() - start):,.0f} rows/s)")
+        conn.commit()
+        print(f"✅ {table}: {total:,} rows in {time.perf_counter() - start:.1f}s")
+
+    def migrate(self, target=None, dry_run=False, baseline=False):
+        """Apply pending migrations from migrations/ in order (see schema_migrations.py)"""
+        try:
+            migrations = load_migrations()
+        except ValueError as e:
+            print(f"❌ {e}")
+            return False
+        if target and target not in {migration.version for migration in migrations}:
+            print(f"❌ No migration with version {target}")
+            return False
+        
+        database_url = os.getenv("DATABASE_URL")
+        if not database_url:
+            if is_local_url(self.supabase_url):
+                print("✅ The local stand-in creates its schema itself; nothing to migrate")
+                return True
+            print("❌ DATABASE_URL must be set to run migrations (Supabase: session mode connection string, port 5432)")
+            return False
+        try:
+            import psycopg
+        except ImportError:
+            print("❌ Migrations need psycopg: pip install 'psycopg[binary]'")
+            return False
+        
+        with psycopg.connect(database_url, autocommit=True) as conn:
+            runner = MigrationRunner(conn, lock_timeout=MIGRATION_LOCK_TIMEOUT)
+            if not dry_run:
+                runner.ensure_table()
+                runner.lock()
+            try:
+                return self._run_migrations(runner, migrations, target, dry_run, baseline)
+            finally:
+                if not dry_run:
+                    runner.unlock()
+
+    def _run_migrations(self, runner, migrations, target, dry_run, baseline):
+        pending, changed, missing = plan(migrations, runner.applied(), target)
+        for version in missing:
+            print(f"⚠️  {version} is recorded as applied but has no file in migrations/")
+        if changed:
+            for migration in changed:
+                print(f"❌ {migration.label}.sql changed after it was applied (checksum mismatch); add a new migration instead")
+            return False
+        if not pending:
+            print("✅ Schema is up to date")
+            return True
+        
+        action = "record without running" if baseline else "apply"
+        print(f"📋 {len(pending)} pending migration(s) to {action}" + (" (dry run)" if dry_run else ""))
+        for migration in pending:
+            mode = "one transaction" if migration.transactional else f"no transaction, {len(migration.statements())} statements"
+            print(f"   {migration.label} ({mode})")
+            for warning in migration.warnings():
+                print(f"      ⚠️  {warning}")
+            if dry_run and not migration.transactional:
+                for statement in migration.statements():
+                    print(f"      {next(line for line in statement.splitlines() if line.strip() and not line.lstrip().startswith('--'))}")
+        if dry_run:
+            return True
         
-        for name, operation in operations:
-            if operation():
-                success_count += 1
-            print()
+        for migration in pending:
+            if baseline:
+                runner.record(migration)
+                print(f"✅ Recorded {migration.label}")
+                continue
+            print(f"🔄 Applying {migration.label}...")
+            try:
+                seconds = runner.apply(migration)
+            except Exception as e:
+                print(f"❌ {migration.label} failed: {e}")
+                if migration.transactional:
+                    print("   Rolled back; nothing from it was applied")
+                else:
+                    print("   Statements before the failure stay applied; fix the cause and rerun")
+                return False
+            print(f"✅ {migration.label} applied in {seconds:.1f}s")
+        
+        # PostgREST caches the schema; new columns and functions show up after a reload
+        runner.reload_api_schema()
+        return True
+
+    def analyze(self, write=False, min_rows=MIN_SEQ_SCAN_ROWS, only=None):
+        """EXPLAIN ANALYZE the app's hot queries and review indexes (see query_advisor.py)"""
+        catalog = [query for query in QUERY_CATALOG if not only or query.name in only]
+        unknown = set(only or ()) - {query.name for query in QUERY_CATALOG}
+        if unknown:
+            print(f"❌ Unknown queries: {', '.join(sorted(unknown))} (known: {', '.join(q.name for q in QUERY_CATALOG)})")
+            return False
         
-        # Create storage bucket (separate from SQL operations)
-        if self.create_storage_bucket():
-            success_count += 1
+        database_url = os.getenv("DATABASE_URL")
+        if not database_url:
+            print("❌ DATABASE_URL must be set to analyze query plans (the local stand-in is SQLite, not Postgres)")
+            return False
+        try:
+            import psycopg
+        except ImportError:
+            print("❌ Analyzing needs psycopg: pip install 'psycopg[binary]'")
+            return False
         
+        with psycopg.connect(database_url, autocommit=True) as conn:
+            advisor = QueryAdvisor(conn, catalog, statement_timeout=ANALYZE_STATEMENT_TIMEOUT)
+            params = advisor.samples()
+            print("🔍 Query plans (EXPLAIN ANALYZE, rolled back)")
+            print("="*50)
+            for query in catalog:
+                self._print_query_report(advisor.explain(query, params, min_rows))
+            
+            indexes = advisor.indexes()
+            stats_reset = advisor.stats_reset()
+        
+        duplicates = find_duplicates(indexes)
+        unused = find_unused(indexes, duplicates)
+        creates, drops = recommend(catalog, indexes)
+        serves = missing_indexes(catalog, indexes)
+        print()
+        print(f"📇 {len(indexes)} indexes in public" + (f", usage counted since {stats_reset:%Y-%m-%d}" if stats_reset else ""))
+        for index, kept in duplicates:
+            print(f"   ⚠️  {index.name} ({column_list(index.columns)}, {format_size(index.size_bytes)}) duplicates {kept.name} ({column_list(kept.columns)})")
+        for index in unused:
+            print(f"   ⚠️  {index.name} on {index.table} has never been scanned ({format_size(index.size_bytes)})")
+        for index in creates:
+            print(f"   ➕ {index.table}({column_list(index.columns)}) would serve {', '.join(serves[(index.table, index.columns)])}")
+        
+        if not (creates or drops or unused):
+            print("✅ No index changes to recommend")
+            return True
+        migration = render_migration(creates, drops, unused, serves, stats_reset)
+        if write and (creates or drops):
+            path = next_migration_path(MIGRATIONS_DIR)
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(migration)
+            print(f"✅ Wrote {os.path.relpath(path)}; review it, then run: python db_manager.py migrate")
+        else:
+            print("\n📋 Recommended migration:\n")
+            print(migration)
+        return True
+
+    def _print_query_report(self, report):
+        query = report.query
+        if report.error:
+            print(f"❌ {query.name}: {report.error}")
+            return
+        flagged = (report.seq_scans and not query.expect_seq_scan) or report.misestimates
+        status = "⚠️ " if flagged else "✅"
+        print(f"{status} {query.name} ({query.endpoint}): {report.execution_ms:.1f}ms, "
+              f"buffers {report.shared_hit} hit / {report.shared_read} read")
+        for table, rows in report.seq_scans:
+            note = " (expected: no btree serves this filter)" if query.expect_seq_scan else ""
+            print(f"      Seq Scan on {table}: {rows} rows read{note}")
+        for node, estimated, actual in report.misestimates:
+            print(f"      {node}: estimated {estimated} rows, got {actual} (stale statistics? run ANALYZE on the table)")
+
+    def create_all_tables(self):
+        """Apply all pending migrations and create the avatars storage bucket"""
+        print("🚀 Setting up database structure...")
         print("="*50)
-        print(f"✅ Database setup complete: {success_count}/{total_operations + 1} operations successful")
         
-        if success_count == total_operations + 1:
+        migrated = self.migrate()
+        print()
+        bucket_created = self.create_storage_bucket()
+        
+        print("="*50)
+        if migrated and bucket_created:
             print("🎉 All database operations completed successfully!")
             return True
         else:
@@ -458,19 +427,73 @@ class DatabaseManager:
         self.execute_sql(sql, "Setting up storage policies for avatars")
         print("✅ Avatar upload fixes applied")
 
+def parse_generate_args(argv):
+    """Options for the generate command"""
+    defaults = DatasetSpec()
+    parser = argparse.ArgumentParser(prog="db_manager.py generate", description="Generate a seeded synthetic dataset")
+    parser.add_argument("--users", type=int, default=defaults.users)
+    parser.add_argument("--recipes", type=int, default=defaults.recipes)
+    parser.add_argument("--follows", type=int, default=defaults.follows, help="approximate total")
+    parser.add_argument("--votes", type=int, default=defaults.votes, help="approximate total")
+    parser.add_argument("--saves", type=int, default=defaults.saves, help="approximate total")
+    parser.add_argument("--views", type=int, default=defaults.views, help="approximate total")
+    parser.add_argument("--days", type=int, default=defaults.days, help="history length for timestamps")
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+    parser.add_argument("--method", choices=["batch", "copy"], default="batch",
+                        help="batch: bulk PostgREST inserts (local stand-in); copy: COPY over DATABASE_URL")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args(argv)
+    spec = DatasetSpec(
+        users=args.users, recipes=args.recipes, follows=args.follows, votes=args.votes,
+        saves=args.saves, views=args.views, seed=args.seed, days=args.days
+    )
+    return spec, args.method, args.batch_size
+
+def parse_migrate_args(argv):
+    """Options for the migrate command"""
+    parser = argparse.ArgumentParser(prog="db_manager.py migrate", description="Apply pending schema migrations from migrations/")
+    parser.add_argument("--to", dest="target", help="stop after this version (e.g. 0004)")
+    parser.add_argument("--dry-run", action="store_true", help="show the plan without changing anything")
+    parser.add_argument("--baseline", action="store_true",
+                        help="record pending migrations as applied without running them (databases built from database_setup.sql)")
+    args = parser.parse_args(argv)
+    return args.target, args.dry_run, args.baseline
+
+def parse_analyze_args(argv):
+    """Options for the analyze command"""
+    parser = argparse.ArgumentParser(prog="db_manager.py analyze", description="Check the app's query plans and indexes")
+    parser.add_argument("--write", action="store_true", help="save the recommended index changes as the next migration")
+    parser.add_argument("--min-rows", type=int, default=MIN_SEQ_SCAN_ROWS, help="report sequential scans reading at least this many rows")
+    parser.add_argument("--query", dest="only", action="append", help="only this catalog query (repeatable)")
+    args = parser.parse_args(argv)
+    return args.write, args.min_rows, args.only
+
 def main():
     """Main function to run database operations"""
     if len(sys.argv) < 2:
         print("Usage: python db_manager.py [command]")
         print("\nAvailable commands:")
-        print("  setup     - Create all tables and setup database structure")
+        print("  setup     - Apply all pending migrations and create the avatars bucket")
+        print("  migrate   - Apply pending migrations (migrate --help for --to, --dry-run, --baseline)")
         print("  status    - Check current database status")
+        print("  analyze   - EXPLAIN ANALYZE the app's queries and recommend index changes (analyze --help)")
         print("  fix-avatar - Fix avatar upload issues")
-        print("  profiles  - Create/update profiles table only")
-        print("  recipes   - Create/update recipes table only")
+        print("  profiles  - Migrate up to the base tables (0001)")
+        print("  recipes   - Migrate up to the base tables (0001)")
+        print("  counters  - Migrate up to trigger-maintained profile counters (0002)")
+        print("  hashtags  - Migrate up to the app-driven hashtag sync function (0003)")
+        print("  votes     - Migrate up to recipe vote counters and the batched vote function (0004)")
+        print("  comments  - Migrate up to recipe comment counters and thread indexes (0006)")
+        print("  generate  - Generate a synthetic dataset (generate --help for sizes)")
         return
     
     command = sys.argv[1].lower()
+    if command == "generate":
+        generate_args = parse_generate_args(sys.argv[2:])
+    if command == "migrate":
+        migrate_args = parse_migrate_args(sys.argv[2:])
+    if command == "analyze":
+        analyze_args = parse_analyze_args(sys.argv[2:])
     db = DatabaseManager()
     
     if command == "setup":
@@ -479,10 +502,16 @@ def main():
         db.check_database_status()
     elif command == "fix-avatar":
         db.fix_avatar_upload_issue()
-    elif command == "profiles":
-        db.create_profiles_table()
-    elif command == "recipes":
-        db.create_recipes_table()
+    elif command == "migrate":
+        if not db.migrate(*migrate_args):
+            sys.exit(1)
+    elif command == "analyze":
+        if not db.analyze(*analyze_args):
+            sys.exit(1)
+    elif command in MIGRATION_COMMANDS:
+        db.migrate(target=MIGRATION_COMMANDS[command])
+    elif command == "generate":
+        db.generate_dataset(*generate_args)
     else:
         print(f"❌ Unknown command: {command}")
         return
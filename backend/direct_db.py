@@ -0,0 +1,146 @@
+"""
+Direct Postgres access for What'sYourRecipe
+An optional asyncpg connection pool for the hottest read queries (follow/save/vote status,
+public profiles and stats), skipping PostgREST's HTTP round trip, JSON encoding and JWT handling.
+Every statement is prepared on each pooled connection when it opens, so requests only send
+parameters. DIRECT_DB_QUERIES picks which query families use it (see main.py); the rest, and
+all writes, stay on PostgREST.
+
+Use a session-mode connection (Supabase: the direct host or the pooler on port 5432);
+transaction-mode poolers (port 6543) can't keep prepared statements, so set
+DIRECT_DB_STATEMENT_CACHE=0 there, which also disables preparing.
+"""
+
+import time
+import uuid
+from datetime import date, datetime
+from decimal import Decimal
+
+from supabase_instrumentation import UpstreamCall
+
+try:
+    import asyncpg
+except ImportError:  # optional; without it every query family stays on PostgREST
+    asyncpg = None
+
+# Query families, each a group of statements one config switch moves to the direct path
+QUERY_FAMILIES = {
+    "status": ("follow_status", "save_status", "saved_batch", "votes_batch", "following_batch"),
+    "profiles": ("public_profile", "user_stats"),
+}
+
+STATEMENTS = {
+    "follow_status": "SELECT EXISTS (SELECT 1 FROM public.follows WHERE follower_id = $1::uuid AND following_id = $2::uuid)",
+    "save_status": "SELECT EXISTS (SELECT 1 FROM public.saved_recipes WHERE user_id = $1::uuid AND recipe_id = $2::uuid)",
+    "saved_batch": "SELECT recipe_id FROM public.saved_recipes WHERE user_id = $1::uuid AND recipe_id = ANY($2::uuid[])",
+    "votes_batch": "SELECT recipe_id, vote_type FROM public.recipe_votes WHERE user_id = $1::uuid AND recipe_id = ANY($2::uuid[])",
+    "following_batch": "SELECT following_id FROM public.follows WHERE follower_id = $1::uuid AND following_id = ANY($2::uuid[])",
+    "public_profile": "SELECT id, username, full_name, bio, avatar_url, created_at FROM public.profiles WHERE id = $1::uuid",
+    "user_stats": "SELECT followers_count, following_count, recipes_count FROM public.profiles WHERE id = $1::uuid",
+}
+
+
+def parse_families(value):
+    """DIRECT_DB_QUERIES: comma-separated family names, 'all', or empty for none"""
+    names = {name.strip() for name in (value or "").split(",") if name.strip()}
+    if "all" in names:
+        return set(QUERY_FAMILIES)
+    unknown = names - set(QUERY_FAMILIES)
+    if unknown:
+        raise ValueError(f"Unknown DIRECT_DB_QUERIES families: {', '.join(sorted(unknown))} (known: {', '.join(QUERY_FAMILIES)})")
+    return names
+
+
+def _json_value(value):
+    """Render values the way PostgREST's JSON would (uuids and timestamps as strings)"""
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    return value
+
+
+def _row(record):
+    return {key: _json_value(value) for key, value in record.items()}
+
+
+class DirectDB:
+    """asyncpg pool serving the statements of the enabled query families"""
+
+    def __init__(self, dsn, families, min_size=1, max_size=10, statement_cache_size=100, listeners=()):
+        self.dsn = dsn
+        self.families = set(families)
+        self.min_size = min_size
+        self.max_size = max_size
+        self.statement_cache_size = statement_cache_size
+        self.listeners = list(listeners)
+        self.pool = None
+
+    def serves(self, family):
+        """True when this family's queries should take the direct path"""
+        return self.pool is not None and family in self.families
+
+    async def _prepare(self, connection):
+        # Fills the connection's statement cache, so the first request on it skips the parse step
+        for family in self.families:
+            for name in QUERY_FAMILIES[family]:
+                await connection.prepare(STATEMENTS[name])
+
+    async def start(self):
+        """Open the pool; on failure the families stay on PostgREST"""
+        if asyncpg is None:
+            print("DIRECT_DB_QUERIES is set but asyncpg is not installed; using PostgREST")
+            return False
+        if not self.dsn:
+            print("DIRECT_DB_QUERIES is set but neither DIRECT_DB_URL nor DATABASE_URL is; using PostgREST")
+            return False
+        try:
+            self.pool = await asyncpg.create_pool(
+                self.dsn,
+                min_size=self.min_size,
+                max_size=self.max_size,
+                statement_cache_size=self.statement_cache_size,
+                init=self._prepare if self.statement_cache_size else None,
+            )
+        except (OSError, asyncpg.PostgresError) as e:
+            print(f"Could not open the direct database pool, using PostgREST: {e}")
+            self.pool = None
+            return False
+        print(f"Direct database pool open ({self.min_size}-{self.max_size} connections) for: {', '.join(sorted(self.families))}")
+        return True
+
+    async def close(self):
+        if self.pool is not None:
+            pool, self.pool = self.pool, None
+            await pool.close()
+
+    async def _run(self, method, name, *args):
+        call = UpstreamCall(kind="sql", target=name, operation="select")
+        try:
+            result = await getattr(self.pool, method)(STATEMENTS[name], *args)
+        except Exception as e:
+            call.error = str(e)
+            raise
+        else:
+            call.rows = len(result) if isinstance(result, list) else int(result is not None)
+            return result
+        finally:
+            call.duration = time.perf_counter() - call.started_at
+            for listener in self.listeners:
+                try:
+                    listener(call)
+                except Exception as e:
+                    print(f"Instrumentation listener error: {e}")
+
+    async def fetch(self, name, *args):
+        """All rows as PostgREST-shaped dicts"""
+        return [_row(record) for record in await self._run("fetch", name, *args)]
+
+    async def fetchrow(self, name, *args):
+        record = await self._run("fetchrow", name, *args)
+        return _row(record) if record is not None else None
+
+    async def fetchval(self, name, *args):
+        return await self._run("fetchval", name, *args)
@@ -0,0 +1,91 @@
+"""
+Conditional GET support for What'sYourRecipe
+Adds weak ETags to JSON GET responses and answers a matching If-None-Match with 304,
+so clients revalidating cached data don't download it again
+"""
+
+import hashlib
+
+
+def make_etag(body):
+    return 'W/"' + hashlib.blake2b(body, digest_size=12).hexdigest() + '"'
+
+
+def etag_matches(if_none_match, etag):
+    """Weak comparison against an If-None-Match header (a list of tags or *)"""
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == opaque:
+            return True
+    return False
+
+
+class ETagMiddleware:
+    """ASGI middleware that tags complete 200 JSON responses to GET/HEAD requests.
+
+    Streaming responses and responses that already carry an ETag pass through untouched.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in ("GET", "HEAD"):
+            await self.app(scope, receive, send)
+            return
+
+        if_none_match = None
+        for name, value in scope.get("headers", []):
+            if name == b"if-none-match":
+                if_none_match = value.decode("latin-1")
+                break
+
+        start_message = None
+
+        async def send_wrapper(message):
+            nonlocal start_message
+            if message["type"] == "http.response.start":
+                if not _eligible(message):
+                    await send(message)
+                    return
+                start_message = message  # held until the body is known
+                return
+
+            if message["type"] != "http.response.body" or start_message is None:
+                await send(message)
+                return
+
+            start, start_message = start_message, None
+            if message.get("more_body", False):
+                await send(start)
+                await send(message)
+                return
+
+            etag = make_etag(message.get("body", b""))
+            headers = list(start.get("headers", [])) + [(b"etag", etag.encode("latin-1"))]
+            if if_none_match and etag_matches(if_none_match, etag):
+                headers = [(name, value) for name, value in headers if name not in (b"content-length", b"content-type")]
+                await send({"type": "http.response.start", "status": 304, "headers": headers})
+                await send({"type": "http.response.body", "body": b""})
+                return
+            await send({**start, "headers": headers})
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+
+def _eligible(start_message):
+    if start_message["status"] != 200:
+        return False
+    content_type = b""
+    for name, value in start_message.get("headers", []):
+        if name == b"etag":
+            return False
+        if name == b"content-type":
+            content_type = value
+    return content_type.startswith(b"application/json")
@@ -0,0 +1,89 @@
+"""
+Fast JSON responses for What'sYourRecipe
+orjson-backed response class plus a route class that skips FastAPI's jsonable_encoder pass
+"""
+
+import functools
+import inspect
+from datetime import date, datetime, time
+from decimal import Decimal
+from enum import Enum
+from uuid import UUID
+
+from fastapi.datastructures import DefaultPlaceholder
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, Response
+from fastapi.routing import APIRoute
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the stdlib encoder
+    orjson = None
+
+
+def _default(value):
+    """Encode the types orjson doesn't handle natively the same way jsonable_encoder does"""
+    if isinstance(value, Decimal):
+        # Matches fastapi.encoders.decimal_encoder: whole numbers stay ints
+        return int(value) if value.as_tuple().exponent >= 0 else float(value)
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    if isinstance(value, (set, frozenset, tuple)):
+        return list(value)
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, bytes):
+        return value.decode()
+    return jsonable_encoder(value)
+
+
+def dumps(content) -> bytes:
+    """Serialize content to compact JSON bytes"""
+    if orjson is not None:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return JSONResponse(jsonable_encoder(content)).body
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response rendered with orjson (datetime/UUID/Decimal output matches JSONResponse)"""
+
+    def render(self, content) -> bytes:
+        return dumps(content)
+
+
+# Types FastAPI would pass through jsonable_encoder before rendering
+_PASSTHROUGH_TYPES = (dict, list, str, int, float, bool, type(None), datetime, date, time, UUID, Decimal)
+
+
+class FastJSONRoute(APIRoute):
+    """Route that renders plain dict/list results directly with FastJSONResponse.
+
+    FastAPI runs jsonable_encoder over every un-modelled return value before the
+    response class sees it, which walks the whole nested structure in Python. For
+    routes without a response_model we wrap the endpoint so it hands its result
+    straight to FastJSONResponse instead.
+    """
+
+    def __init__(self, path, endpoint, **kwargs):
+        if not self._has_response_model(endpoint, kwargs.get("response_model")) and inspect.iscoroutinefunction(endpoint):
+            endpoint = self._wrap_endpoint(endpoint, kwargs.get("status_code"))
+        super().__init__(path, endpoint, **kwargs)
+
+    @staticmethod
+    def _has_response_model(endpoint, response_model):
+        if isinstance(response_model, DefaultPlaceholder):
+            # FastAPI infers the model from the return annotation in this case
+            return inspect.signature(endpoint).return_annotation is not inspect.Signature.empty
+        return response_model is not None
+
+    @staticmethod
+    def _wrap_endpoint(endpoint, status_code):
+        @functools.wraps(endpoint)
+        async def wrapper(*args, **kwargs):
+            result = await endpoint(*args, **kwargs)
+            if isinstance(result, Response) or not isinstance(result, _PASSTHROUGH_TYPES):
+                return result
+            return FastJSONResponse(result, status_code=status_code or 200)
+
+        return wrapper
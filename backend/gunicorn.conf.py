@@ -0,0 +1,88 @@
+"""
+Gunicorn settings for running What'sYourRecipe with several worker processes
+Usage: gunicorn -c gunicorn.conf.py main:app
+
+The app is imported once in the master (preload_app) and the workers are forked from it, so
+startup cost is paid once and the code pages are shared. Each worker then opens its own
+Supabase connection (post_fork). State that every worker must see lives in shared_store.py.
+
+Rolling restarts: `kill -HUP <master pid>` re-reads this config and replaces the workers,
+letting the old ones finish in-flight requests within GRACEFUL_TIMEOUT. Preloaded code is not
+re-imported by HUP; to deploy new code in place, `kill -USR2` the master (starts a new master
+and workers alongside), then `kill -TERM` the old master once the new one is serving.
+Workers are also recycled after MAX_REQUESTS requests (plus jitter, so they don't all restart at once).
+"""
+
+import os
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+def cgroup_cpu_quota():
+    """CPUs granted by the container's CFS quota (cgroup v2 cpu.max, else v1), or None when unlimited"""
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as f:
+            quota, period = f.read().split()[:2]
+        return None if quota == "max" else int(quota) / int(period)
+    except (OSError, ValueError):
+        pass
+    try:
+        with open("/sys/fs/cgroup/cpu/cpu.cfs_quota_us") as f:
+            quota = int(f.read())
+        with open("/sys/fs/cgroup/cpu/cpu.cfs_period_us") as f:
+            period = int(f.read())
+        return quota / period if quota > 0 else None
+    except (OSError, ValueError):
+        return None
+
+
+def default_workers():
+    """One worker per CPU this process may use: the affinity mask, capped by the cgroup CPU quota
+
+    Inside a container the affinity mask (and os.cpu_count) still lists the host's CPUs; the quota is
+    what the container actually gets, and every worker carries its own pool, caches and client.
+    """
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+    quota = cgroup_cpu_quota()
+    if quota is not None:
+        cpus = min(cpus, int(quota))  # a fractional CPU doesn't pay for another worker
+    return max(cpus, 1)
+
+
+bind = f"0.0.0.0:{os.getenv('PORT', 8000)}"
+workers = int(os.getenv("WEB_CONCURRENCY", 0)) or default_workers()
+worker_class = "uvicorn_worker.UvicornWorker"
+
+# The write-behind vote buffer lives in one process: with several, a toggle landing on a worker
+# that hasn't seen the buffered vote would read the stale stored one and apply the wrong toggle
+if workers > 1 and os.getenv("VOTE_WRITE_BEHIND", "false").lower() == "true":
+    raise RuntimeError(f"VOTE_WRITE_BEHIND needs a single worker process (WEB_CONCURRENCY=1), not {workers}")
+preload_app = True
+
+# Lifecycles
+max_requests = int(os.getenv("MAX_REQUESTS", 5000))
+max_requests_jitter = int(os.getenv("MAX_REQUESTS_JITTER", max_requests // 10))
+timeout = int(os.getenv("WORKER_TIMEOUT", 60))
+graceful_timeout = int(os.getenv("GRACEFUL_TIMEOUT", 30))
+
+# Connections: set KEEPALIVE above the proxy's idle timeout so it never reuses a socket we just closed
+keepalive = int(os.getenv("KEEPALIVE", 5))
+backlog = int(os.getenv("BACKLOG", 2048))
+
+accesslog = os.getenv("ACCESS_LOG") or None
+forwarded_allow_ips = os.getenv("FORWARDED_ALLOW_IPS", "127.0.0.1")
+
+
+def post_fork(server, worker):
+    # The preloaded app's Supabase connection belongs to the master; give each worker its own
+    import main
+    main.reconnect_supabase()
+
+
+def on_starting(server):
+    print(f"🚀 Starting {workers} worker(s) on {bind} (max_requests {max_requests}±{max_requests_jitter}, keepalive {keepalive}s)")
@@ -0,0 +1,43 @@
+"""
+Hashtag extraction for What'sYourRecipe
+Tags are extracted from recipe text in the app and applied with one set-based
+sync_recipe_hashtags call, which diffs them against the stored links and adjusts
+usage_count by the difference only
+"""
+
+import re
+
+HASHTAG_PATTERN = re.compile(r"^#([a-zA-Z0-9_]{2,})$")
+
+# Recipe columns hashtags are read from
+HASHTAG_SOURCE_FIELDS = ("description", "brewing_notes")
+
+
+def extract_hashtags(description, brewing_notes=None):
+    """Lowercased, de-duplicated #tags (2+ word characters) from whitespace-separated text"""
+    if description is None:
+        return []
+    text = description + " " + (brewing_notes or "")
+    return sorted({match.group(1).lower() for match in map(HASHTAG_PATTERN.match, text.split()) if match})
+
+
+def recipe_hashtags(recipe):
+    """Desired tag set for one recipe row, in the shape sync_recipe_hashtags expects"""
+    return {"recipe_id": recipe["id"], "tags": extract_hashtags(recipe.get("description"), recipe.get("brewing_notes"))}
+
+
+def sync_recipe_hashtags(client, recipes):
+    """Bring the hashtag links of these recipe rows in line with their text, in one round trip.
+
+    The recipes are already saved, so a failure here is logged rather than raised;
+    syncing the same rows again later repairs the links.
+    """
+    changes = [recipe_hashtags(recipe) for recipe in recipes]
+    if not changes:
+        return True
+    try:
+        client.rpc("sync_recipe_hashtags", {"changes": changes}).execute()
+        return True
+    except Exception as e:
+        print(f"Error syncing hashtags for {len(changes)} recipe(s): {e}")
+        return False
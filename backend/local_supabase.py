@@ -0,0 +1,1208 @@
+"""
+Local Supabase stand-in for What'sYourRecipe
+SQLite-backed implementation of the subset of the PostgREST, RPC and Auth API the app uses,
+so the backend, maintenance scripts and benchmarks can run without a Supabase project.
+
+Point SUPABASE_URL at a SQLite database to use it (see supabase_client.py):
+    SUPABASE_URL=sqlite:///local.db     file database (relative path; sqlite:////abs/path.db for absolute)
+    SUPABASE_URL=sqlite://              in-memory database (one per process)
+
+Round-trip latency can be simulated with LOCAL_SUPABASE_LATENCY_MS (fixed) and
+LOCAL_SUPABASE_JITTER_MS (uniform random extra) so round-trip costs show up like they do against Supabase.
+"""
+
+import hashlib
+import json
+import os
+import random
+import re
+import secrets
+import sqlite3
+import threading
+import time
+import uuid
+from collections import defaultdict
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from urllib.parse import urlencode
+
+# SQLite translation of database_setup.sql (tables, indexes and the triggers the app relies on).
+# gen_random_uuid(), now() and current_setting() are registered as SQL functions on the connection.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS profiles (
+    id TEXT PRIMARY KEY,
+    username TEXT UNIQUE NOT NULL CHECK (length(username) >= 3),
+    full_name TEXT,
+    email TEXT,
+    avatar_url TEXT,
+    bio TEXT,
+    website TEXT,
+    location TEXT,
+    followers_count INTEGER NOT NULL DEFAULT 0,
+    following_count INTEGER NOT NULL DEFAULT 0,
+    recipes_count INTEGER NOT NULL DEFAULT 0,
+    created_at TEXT DEFAULT (now()),
+    updated_at TEXT DEFAULT (now())
+);
+
+CREATE TABLE IF NOT EXISTS recipes (
+    id TEXT PRIMARY KEY DEFAULT (gen_random_uuid()),
+    user_id TEXT NOT NULL REFERENCES profiles(id) ON DELETE CASCADE,
+    recipe_name TEXT NOT NULL,
+    description TEXT NOT NULL,
+    rating REAL CHECK (rating >= 1 AND rating <= 10),
+    date_created TEXT NOT NULL,
+    bean_variety TEXT,
+    bean_region TEXT,
+    india_estate TEXT,
+    processing_type TEXT,
+    roast_type TEXT,
+    roast_level TEXT,
+    crack_time TEXT,
+    roast_time REAL,
+    development_time REAL,
+    brew_method TEXT,
+    grind_microns INTEGER,
+    water_composition TEXT,
+    tds INTEGER,
+    calcium REAL,
+    magnesium REAL,
+    potassium REAL,
+    sodium REAL,
+    coffee_amount REAL,
+    water_amount REAL,
+    water_temp INTEGER,
+    brew_time REAL,
+    milk_preference TEXT,
+    serving_temp TEXT,
+    sweetener TEXT,
+    sweetener_quantity REAL,
+    serving_size INTEGER,
+    aroma_notes TEXT,
+    body TEXT,
+    acidity_type TEXT,
+    sweetness TEXT,
+    balance TEXT,
+    aftertaste TEXT,
+    clean_cup TEXT,
+    uniformity TEXT,
+    cupping_score REAL CHECK (cupping_score >= 60 AND cupping_score <= 100),
+    cupping_method TEXT,
+    defects TEXT,
+    overall_impression TEXT,
+    brewing_notes TEXT,
+    is_public BOOLEAN DEFAULT 1,
+    view_count INTEGER DEFAULT 0,
+    upvotes_count INTEGER NOT NULL DEFAULT 0,
+    downvotes_count INTEGER NOT NULL DEFAULT 0,
+    comments_count INTEGER NOT NULL DEFAULT 0,
+    created_at TEXT DEFAULT (now()),
+    updated_at TEXT DEFAULT (now())
+);
+
+CREATE TABLE IF NOT EXISTS recipe_votes (
+    id TEXT PRIMARY KEY DEFAULT (gen_random_uuid()),
+    recipe_id TEXT NOT NULL REFERENCES recipes(id) ON DELETE CASCADE,
+    user_id TEXT NOT NULL REFERENCES profiles(id) ON DELETE CASCADE,
+    vote_type TEXT NOT NULL CHECK (vote_type IN ('up', 'down')),
+    created_at TEXT DEFAULT (now()),
+    UNIQUE(recipe_id, user_id)
+);
+
+CREATE TABLE IF NOT EXISTS follows (
+    id TEXT PRIMARY KEY DEFAULT (gen_random_uuid()),
+    follower_id TEXT NOT NULL REFERENCES profiles(id) ON DELETE CASCADE,
+    following_id TEXT NOT NULL REFERENCES profiles(id) ON DELETE CASCADE,
+    created_at TEXT DEFAULT (now()),
+    UNIQUE(follower_id, following_id),
+    CHECK (follower_id != following_id)
+);
+
+CREATE TABLE IF NOT EXISTS saved_recipes (
+    id TEXT PRIMARY KEY DEFAULT (gen_random_uuid()),
+    user_id TEXT NOT NULL REFERENCES profiles(id) ON DELETE CASCADE,
+    recipe_id TEXT NOT NULL REFERENCES recipes(id) ON DELETE CASCADE,
+    created_at TEXT DEFAULT (now()),
+    UNIQUE(user_id, recipe_id)
+);
+
+CREATE TABLE IF NOT EXISTS recipe_comments (
+    id TEXT PRIMARY KEY DEFAULT (gen_random_uuid()),
+    recipe_id TEXT NOT NULL REFERENCES recipes(id) ON DELETE CASCADE,
+    user_id TEXT NOT NULL REFERENCES profiles(id) ON DELETE CASCADE,
+    content TEXT NOT NULL,
+    created_at TEXT DEFAULT (now()),
+    updated_at TEXT DEFAULT (now())
+);
+
+CREATE TABLE IF NOT EXISTS activities (
+    id TEXT PRIMARY KEY DEFAULT (gen_random_uuid()),
+    user_id TEXT NOT NULL REFERENCES profiles(id) ON DELETE CASCADE,
+    target_user_id TEXT REFERENCES profiles(id) ON DELETE CASCADE,
+    recipe_id TEXT REFERENCES recipes(id) ON DELETE CASCADE,
+    activity_type TEXT NOT NULL,
+    content TEXT,
+    created_at TEXT DEFAULT (now())
+);
+
+CREATE TABLE IF NOT EXISTS hashtags (
+    id TEXT PRIMARY KEY DEFAULT (gen_random_uuid()),
+    tag TEXT UNIQUE NOT NULL,
+    usage_count INTEGER DEFAULT 0,
+    created_at TEXT DEFAULT (now()),
+    last_used TEXT DEFAULT (now())
+);
+
+CREATE TABLE IF NOT EXISTS recipe_hashtags (
+    id TEXT PRIMARY KEY DEFAULT (gen_random_uuid()),
+    recipe_id TEXT NOT NULL REFERENCES recipes(id) ON DELETE CASCADE,
+    hashtag_id TEXT NOT NULL REFERENCES hashtags(id) ON DELETE CASCADE,
+    created_at TEXT DEFAULT (now()),
+    UNIQUE(recipe_id, hashtag_id)
+);
+
+CREATE TABLE IF NOT EXISTS recipe_views (
+    id TEXT PRIMARY KEY DEFAULT (gen_random_uuid()),
+    recipe_id TEXT NOT NULL REFERENCES recipes(id) ON DELETE CASCADE,
+    user_id TEXT REFERENCES profiles(id) ON DELETE CASCADE,
+    ip_address TEXT,
+    user_agent TEXT,
+    created_at TEXT DEFAULT (now())
+);
+
+CREATE INDEX IF NOT EXISTS idx_recipes_user_id_created_at ON recipes(user_id, created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_recipes_created_at ON recipes(created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_recipes_public ON recipes(is_public, created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_recipe_votes_recipe_id_vote_type ON recipe_votes(recipe_id, vote_type);
+CREATE INDEX IF NOT EXISTS idx_recipe_votes_user_id_vote_type ON recipe_votes(user_id, vote_type);
+CREATE INDEX IF NOT EXISTS idx_follows_following ON follows(following_id);
+CREATE INDEX IF NOT EXISTS idx_activities_user ON activities(user_id, created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_activities_target_user ON activities(target_user_id, created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_hashtags_last_used ON hashtags(last_used DESC);
+CREATE INDEX IF NOT EXISTS idx_recipe_hashtags_hashtag ON recipe_hashtags(hashtag_id);
+CREATE INDEX IF NOT EXISTS idx_recipe_comments_thread ON recipe_comments(recipe_id, created_at, id);
+CREATE INDEX IF NOT EXISTS idx_recipe_comments_user ON recipe_comments(user_id);
+
+-- Activity and counter triggers (see handle_* functions in database_setup.sql)
+CREATE TRIGGER IF NOT EXISTS on_recipe_created AFTER INSERT ON recipes BEGIN
+    UPDATE profiles SET recipes_count = recipes_count + 1 WHERE id = NEW.user_id AND NEW.is_public = 1;
+    INSERT INTO activities (user_id, recipe_id, activity_type, content)
+    SELECT NEW.user_id, NEW.id, 'create_recipe', NEW.recipe_name WHERE NEW.is_public = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS on_recipe_deleted AFTER DELETE ON recipes WHEN OLD.is_public = 1 BEGIN
+    UPDATE profiles SET recipes_count = max(recipes_count - 1, 0) WHERE id = OLD.user_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS release_hashtags_on_recipe_delete BEFORE DELETE ON recipes BEGIN
+    UPDATE hashtags SET usage_count = max(usage_count - 1, 0)
+    WHERE id IN (SELECT hashtag_id FROM recipe_hashtags WHERE recipe_id = OLD.id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS on_recipe_visibility_changed AFTER UPDATE OF is_public, user_id ON recipes
+WHEN OLD.is_public IS NOT NEW.is_public OR OLD.user_id IS NOT NEW.user_id BEGIN
+    UPDATE profiles SET recipes_count = max(recipes_count - 1, 0) WHERE id = OLD.user_id AND OLD.is_public = 1;
+    UPDATE profiles SET recipes_count = recipes_count + 1 WHERE id = NEW.user_id AND NEW.is_public = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS on_vote_created AFTER INSERT ON recipe_votes BEGIN
+    INSERT INTO activities (user_id, target_user_id, recipe_id, activity_type)
+    SELECT NEW.user_id, recipes.user_id, NEW.recipe_id, CASE WHEN NEW.vote_type = 'up' THEN 'like' ELSE 'dislike' END
+    FROM recipes WHERE recipes.id = NEW.recipe_id;
+END;
+
+-- current_setting() reads LocalDatabase.settings; apply_vote_changes defers these to one update per recipe
+CREATE TRIGGER IF NOT EXISTS on_vote_counted AFTER INSERT ON recipe_votes
+WHEN current_setting('app.defer_vote_counts') IS NOT 'on' BEGIN
+    UPDATE recipes SET upvotes_count = upvotes_count + (NEW.vote_type = 'up'), downvotes_count = downvotes_count + (NEW.vote_type = 'down')
+    WHERE id = NEW.recipe_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS on_vote_uncounted AFTER DELETE ON recipe_votes
+WHEN current_setting('app.defer_vote_counts') IS NOT 'on' BEGIN
+    UPDATE recipes SET upvotes_count = max(upvotes_count - (OLD.vote_type = 'up'), 0), downvotes_count = max(downvotes_count - (OLD.vote_type = 'down'), 0)
+    WHERE id = OLD.recipe_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS on_vote_recounted AFTER UPDATE OF vote_type ON recipe_votes
+WHEN current_setting('app.defer_vote_counts') IS NOT 'on' BEGIN
+    UPDATE recipes SET upvotes_count = max(upvotes_count - (OLD.vote_type = 'up'), 0), downvotes_count = max(downvotes_count - (OLD.vote_type = 'down'), 0)
+    WHERE id = OLD.recipe_id;
+    UPDATE recipes SET upvotes_count = upvotes_count + (NEW.vote_type = 'up'), downvotes_count = downvotes_count + (NEW.vote_type = 'down')
+    WHERE id = NEW.recipe_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS on_comment_counted AFTER INSERT ON recipe_comments BEGIN
+    UPDATE recipes SET comments_count = comments_count + 1 WHERE id = NEW.recipe_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS on_comment_uncounted AFTER DELETE ON recipe_comments BEGIN
+    UPDATE recipes SET comments_count = max(comments_count - 1, 0) WHERE id = OLD.recipe_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS on_follow_created AFTER INSERT ON follows BEGIN
+    UPDATE profiles SET followers_count = followers_count + 1 WHERE id = NEW.following_id;
+    UPDATE profiles SET following_count = following_count + 1 WHERE id = NEW.follower_id;
+    INSERT INTO activities (user_id, target_user_id, activity_type) VALUES (NEW.follower_id, NEW.following_id, 'follow');
+END;
+
+CREATE TRIGGER IF NOT EXISTS on_follow_deleted AFTER DELETE ON follows BEGIN
+    UPDATE profiles SET followers_count = max(followers_count - 1, 0) WHERE id = OLD.following_id;
+    UPDATE profiles SET following_count = max(following_count - 1, 0) WHERE id = OLD.follower_id;
+END;
+
+-- Auth (stand-in for auth.users and its sessions)
+CREATE TABLE IF NOT EXISTS auth_users (
+    id TEXT PRIMARY KEY DEFAULT (gen_random_uuid()),
+    email TEXT UNIQUE NOT NULL,
+    password_hash TEXT NOT NULL,
+    user_metadata TEXT DEFAULT '{}',
+    email_confirmed_at TEXT,
+    created_at TEXT DEFAULT (now())
+);
+
+CREATE TABLE IF NOT EXISTS auth_sessions (
+    access_token TEXT PRIMARY KEY,
+    refresh_token TEXT NOT NULL,
+    user_id TEXT NOT NULL REFERENCES auth_users(id) ON DELETE CASCADE,
+    created_at TEXT DEFAULT (now())
+);
+
+CREATE TABLE IF NOT EXISTS storage_buckets (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    public BOOLEAN DEFAULT 0,
+    created_at TEXT DEFAULT (now())
+);
+"""
+
+# PostgREST's error codes for the constraint violations the app can hit
+_INTEGRITY_CODES = (
+    ("UNIQUE", "23505"),
+    ("FOREIGN KEY", "23503"),
+    ("CHECK", "23514"),
+    ("NOT NULL", "23502"),
+)
+
+_FILTER_OPERATORS = ("eq", "neq", "gt", "gte", "lt", "lte", "like", "ilike", "in", "is")
+_COMPARISONS = {"eq": "=", "neq": "<>", "gt": ">", "gte": ">=", "lt": "<", "lte": "<="}
+
+_EMBED_PATTERN = re.compile(r"^(?:(\w+):)?(\w+)(?:!(\w+))?\((.*)\)$", re.S)
+_COLUMN_PATTERN = re.compile(r"^(?:(\w+):)?(\w+)(?:::\w+)?$")
+
+
+def _now():
+    return datetime.now(timezone.utc).isoformat()
+
+
+class APIError(Exception):
+    """PostgREST-style error (same attributes as postgrest.exceptions.APIError)"""
+
+    def __init__(self, message, code=None, details=None, hint=None):
+        super().__init__(message)
+        self.message = message
+        self.code = code
+        self.details = details
+        self.hint = hint
+
+
+class AuthError(Exception):
+    """Auth failure (mirrors gotrue's AuthApiError message and status)"""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.message = message
+        self.status = status
+
+
+@dataclass
+class APIResponse:
+    data: object
+    count: int = None
+
+
+@dataclass
+class User:
+    id: str
+    email: str
+    user_metadata: dict = field(default_factory=dict)
+    email_confirmed_at: str = None
+    created_at: str = None
+    aud: str = "authenticated"
+    role: str = "authenticated"
+
+
+@dataclass
+class Session:
+    access_token: str
+    refresh_token: str
+    user: User
+    token_type: str = "bearer"
+    expires_in: int = 3600
+
+
+@dataclass
+class AuthResponse:
+    user: User = None
+    session: Session = None
+
+
+@dataclass
+class UserResponse:
+    user: User
+
+
+def _split_top_level(text):
+    """Split on commas that are not inside parentheses or double quotes"""
+    parts, current, depth, quoted = [], [], 0, False
+    for char in text:
+        if char == '"':
+            quoted = not quoted
+        elif not quoted and char == "(":
+            depth += 1
+        elif not quoted and char == ")":
+            depth -= 1
+        elif not quoted and char == "," and depth == 0:
+            parts.append("".join(current).strip())
+            current = []
+            continue
+        current.append(char)
+    parts.append("".join(current).strip())
+    return [part for part in parts if part]
+
+
+def _unquote(value):
+    if len(value) >= 2 and value[0] == value[-1] == '"':
+        return value[1:-1]
+    return value
+
+
+def _parse_select(text):
+    """Parse a PostgREST select list into [(alias, column)] and [(alias, table, hint, inner select)]"""
+    columns, embeds = [], []
+    for item in _split_top_level("".join(text.split()) or "*"):
+        match = _EMBED_PATTERN.match(item)
+        if match:
+            alias, table, hint, inner = match.groups()
+            embeds.append((alias or table, table, hint, inner or "*"))
+            continue
+        if item == "*":
+            columns.append(("*", "*"))
+            continue
+        match = _COLUMN_PATTERN.match(item)
+        if not match:
+            raise APIError(f"failed to parse select parameter ({text})", code="PGRST100")
+        alias, name = match.groups()
+        columns.append((alias or name, name))
+    return columns, embeds
+
+
+def _parse_filter_value(operator, raw):
+    if operator == "in":
+        inner = raw.strip()
+        if inner.startswith("(") and inner.endswith(")"):
+            inner = inner[1:-1]
+        return [_unquote(value) for value in _split_top_level(inner)]
+    if operator == "is":
+        return {"null": None, "true": True, "false": False}.get(raw.lower(), raw)
+    return _unquote(raw)
+
+
+def _format_value(operator, value):
+    if operator == "in":
+        return "(" + ",".join(str(v) for v in value) + ")"
+    if value is None:
+        return "null"
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return str(value)
+
+
+class LocalDatabase:
+    """SQLite connection, schema metadata and the server-side behaviour PostgREST would provide"""
+
+    def __init__(self, path=":memory:", latency_ms=0.0, jitter_ms=0.0):
+        self.path = path
+        self.latency = latency_ms / 1000
+        self.jitter = jitter_ms / 1000
+        self._lock = threading.RLock()
+        # Transaction-local settings, the stand-in for Postgres set_config()/current_setting()
+        self.settings = {}
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.create_function("gen_random_uuid", 0, lambda: str(uuid.uuid4()))
+        self.conn.create_function("now", 0, _now)
+        self.conn.create_function("current_setting", 1, self.settings.get)
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        if path != ":memory:":
+            self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.executescript(SCHEMA)
+        self._load_metadata()
+
+    def _load_metadata(self):
+        self.columns = {}
+        self.foreign_keys = {}
+        tables = [row[0] for row in self.conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")]
+        for table in tables:
+            self.columns[table] = {row["name"]: (row["type"] or "").upper() for row in self.conn.execute(f'PRAGMA table_info("{table}")')}
+            self.foreign_keys[table] = [
+                (row["from"], row["table"], row["to"]) for row in self.conn.execute(f'PRAGMA foreign_key_list("{table}")')
+            ]
+
+    def round_trip(self):
+        """Simulated network latency for one Supabase round trip"""
+        delay = self.latency + (random.uniform(0, self.jitter) if self.jitter else 0)
+        if delay > 0:
+            time.sleep(delay)
+
+    @contextmanager
+    def transaction(self):
+        with self._lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self.conn
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+            else:
+                self.conn.execute("COMMIT")
+
+    def query(self, sql, params=()):
+        with self._lock:
+            return [dict(row) for row in self.conn.execute(sql, params)]
+
+    def check_table(self, table):
+        if table not in self.columns:
+            raise APIError(f'relation "public.{table}" does not exist', code="42P01")
+        return self.columns[table]
+
+    def check_column(self, table, column):
+        if column not in self.check_table(table):
+            raise APIError(f"column {table}.{column} does not exist", code="42703")
+        return f'"{column}"'
+
+    def encode(self, table, column, value):
+        """Python/PostgREST value -> SQLite value for a column"""
+        column_type = self.columns.get(table, {}).get(column, "")
+        if isinstance(value, (dict, list)):
+            return json.dumps(value)
+        if isinstance(value, datetime):
+            return value.isoformat()
+        if column_type == "BOOLEAN" and isinstance(value, str):
+            return {"true": 1, "false": 0}.get(value.lower(), value)
+        return value
+
+    def decode(self, table, row):
+        """SQLite row -> dict with PostgREST types (booleans come back as bools)"""
+        types = self.columns.get(table, {})
+        decoded = dict(row)
+        for column, value in decoded.items():
+            if value is not None and types.get(column) == "BOOLEAN":
+                decoded[column] = bool(value)
+        return decoded
+
+    def relationship(self, source, target, hint=None):
+        """Resolve an embed: ("one", local, remote) for many-to-one, ("many", local, remote) for one-to-many"""
+        candidates = []
+        for column, table, remote in self.foreign_keys.get(source, []):
+            if table == target:
+                candidates.append(("one", column, remote, column, f"{source}_{column}_fkey"))
+        for column, table, remote in self.foreign_keys.get(target, []):
+            if table == source:
+                candidates.append(("many", remote, column, column, f"{target}_{column}_fkey"))
+        if hint:
+            candidates = [c for c in candidates if hint in (c[3], c[4])]
+        if not candidates:
+            raise APIError(f"Could not find a relationship between '{source}' and '{target}' in the schema cache", code="PGRST200")
+        if len(candidates) > 1:
+            raise APIError(f"Could not embed because more than one relationship was found for '{source}' and '{target}'", code="PGRST201")
+        return candidates[0][:3]
+
+    def materialize(self, table, rows, select):
+        """Project raw rows to a select list, resolving embeds with one query per embedded table"""
+        columns, embeds = _parse_select(select)
+        embedded = [(alias, self._embed(table, rows, target, hint, inner)) for alias, target, hint, inner in embeds]
+
+        result = []
+        for index, row in enumerate(rows):
+            decoded = self.decode(table, row)
+            item = {}
+            for alias, column in columns:
+                if column == "*":
+                    item.update(decoded)
+                else:
+                    self.check_column(table, column)
+                    item[alias] = decoded[column]
+            for alias, values in embedded:
+                item[alias] = values[index]
+            result.append(item)
+        return result
+
+    def _embed(self, source, rows, target, hint, select):
+        kind, local, remote = self.relationship(source, target, hint)
+        keys = list({row[local] for row in rows if row[local] is not None})
+        children = []
+        if keys:
+            placeholders = ",".join("?" * len(keys))
+            children = self.query(f'SELECT * FROM "{target}" WHERE "{remote}" IN ({placeholders})', keys)
+        projected = self.materialize(target, children, select)
+
+        if kind == "one":
+            lookup = {child[remote]: item for child, item in zip(children, projected)}
+            return [lookup.get(row[local]) for row in rows]
+        grouped = defaultdict(list)
+        for child, item in zip(children, projected):
+            grouped[child[remote]].append(item)
+        return [grouped.get(row[local], []) for row in rows]
+
+
+class LocalQueryBuilder:
+    """PostgREST request builder: table(...).select/insert/update/delete/upsert, filters, modifiers, execute()"""
+
+    def __init__(self, db, table):
+        self._db = db
+        self._table = table
+        self._method = "GET"
+        self._select = "*"
+        self._count = None
+        self._payload = None
+        self._upsert = None
+        self._filters = []
+        self._order = []
+        self._limit = None
+        self._offset = None
+        self._single = None
+        self._returning = "representation"
+        self._negate_next = False
+        self._query = []
+
+    @property
+    def request(self):
+        """Request description in the shape the instrumentation reads (http_method, params, headers)"""
+        headers = {}
+        if self._upsert is not None:
+            headers["prefer"] = "resolution=" + ("ignore-duplicates" if self._upsert["ignore"] else "merge-duplicates")
+        if self._count:
+            headers["prefer"] = ", ".join(filter(None, [headers.get("prefer"), f"count={self._count}"]))
+        return SimpleNamespace(http_method=self._method, params=urlencode(self._query, safe="(),*:!.%"), headers=headers)
+
+    # Operations
+    def select(self, *columns, count=None, head=None):
+        self._select = ",".join(columns) or "*"
+        self._count = count
+        self._query.append(("select", "".join(self._select.split())))
+        return self
+
+    def insert(self, json, *, count=None, returning=None, upsert=False, default_to_null=True):
+        self._method = "POST"
+        self._payload = json if isinstance(json, list) else [json]
+        self._count = count
+        self._returning = returning or "representation"
+        if upsert:
+            self._upsert = {"on_conflict": "", "ignore": False}
+        return self
+
+    def upsert(self, json, *, count=None, returning=None, ignore_duplicates=False, on_conflict="", default_to_null=True):
+        self.insert(json, count=count, returning=returning)
+        self._upsert = {"on_conflict": on_conflict, "ignore": ignore_duplicates}
+        if on_conflict:
+            self._query.append(("on_conflict", on_conflict))
+        return self
+
+    def update(self, json, *, count=None, returning=None):
+        self._method = "PATCH"
+        self._payload = json
+        self._count = count
+        self._returning = returning or "representation"
+        return self
+
+    def delete(self, *, count=None, returning=None):
+        self._method = "DELETE"
+        self._count = count
+        self._returning = returning or "representation"
+        return self
+
+    # Filters
+    @property
+    def not_(self):
+        self._negate_next = True
+        return self
+
+    def filter(self, column, operator, criteria):
+        negate = self._negate_next
+        if operator.startswith("not."):
+            negate, operator = not negate, operator[4:]
+        if isinstance(criteria, str):
+            criteria = _parse_filter_value(operator, criteria)
+        return self._add(column, operator, criteria, negate)
+
+    def _add(self, column, operator, value, negate=None):
+        if negate is None:
+            negate = self._negate_next
+        self._negate_next = False
+        self._filters.append(("filter", column, operator, value, negate))
+        self._query.append((column, ("not." if negate else "") + f"{operator}.{_format_value(operator, value)}"))
+        return self
+
+    def eq(self, column, value):
+        return self._add(column, "eq", value)
+
+    def neq(self, column, value):
+        return self._add(column, "neq", value)
+
+    def gt(self, column, value):
+        return self._add(column, "gt", value)
+
+    def gte(self, column, value):
+        return self._add(column, "gte", value)
+
+    def lt(self, column, value):
+        return self._add(column, "lt", value)
+
+    def lte(self, column, value):
+        return self._add(column, "lte", value)
+
+    def like(self, column, pattern):
+        return self._add(column, "like", pattern)
+
+    def ilike(self, column, pattern):
+        return self._add(column, "ilike", pattern)
+
+    def is_(self, column, value):
+        return self._add(column, "is", value)
+
+    def in_(self, column, values):
+        return self._add(column, "in", list(values))
+
+    def or_(self, filters, reference_table=None):
+        negate = self._negate_next
+        self._negate_next = False
+        self._filters.append(("or", filters, negate))
+        self._query.append(("not.or" if negate else "or", f"({filters})"))
+        return self
+
+    def match(self, query):
+        for column, value in query.items():
+            self.eq(column, value)
+        return self
+
+    # Modifiers
+    def order(self, column, *, desc=False, nullsfirst=None, foreign_table=None):
+        self._order.append((column, desc, nullsfirst))
+        self._query.append(("order", f"{column}.{'desc' if desc else 'asc'}"))
+        return self
+
+    def limit(self, size, *, foreign_table=None):
+        self._limit = size
+        self._query.append(("limit", str(size)))
+        return self
+
+    def range(self, start, end, foreign_table=None):
+        self._offset = start
+        self._limit = end - start + 1
+        self._query.append(("offset", str(start)))
+        self._query.append(("limit", str(self._limit)))
+        return self
+
+    def single(self):
+        self._single = "single"
+        return self
+
+    def maybe_single(self):
+        self._single = "maybe"
+        return self
+
+    # SQL compilation
+    def _condition(self, column, operator, value):
+        db, table = self._db, self._table
+        name = db.check_column(table, column)
+        if operator in _COMPARISONS:
+            return f"{name} {_COMPARISONS[operator]} ?", [db.encode(table, column, value)]
+        if operator == "ilike":
+            return f"{name} LIKE ?", [str(value).replace("*", "%")]
+        if operator == "like":
+            return f"{name} GLOB ?", [str(value).replace("*", "%").replace("%", "*").replace("_", "?")]
+        if operator == "in":
+            if not value:
+                return "0", []
+            return f"{name} IN ({','.join('?' * len(value))})", [db.encode(table, column, v) for v in value]
+        if operator == "is":
+            if value is None:
+                return f"{name} IS NULL", []
+            return f"{name} IS ?", [1 if value else 0]
+        raise APIError(f'"failed to parse filter ({operator})"', code="PGRST100")
+
+    def _logic_tree(self, text, joiner="OR"):
+        clauses, params = [], []
+        for item in _split_top_level(text):
+            negate = item.startswith("not.")
+            if negate:
+                item = item[4:]
+            group = re.match(r"^(or|and)\((.*)\)$", item, re.S)
+            if group:
+                sql, values = self._logic_tree(group.group(2), group.group(1).upper())
+            else:
+                try:
+                    column, operator, raw = item.split(".", 2)
+                    if operator == "not":
+                        negate = not negate
+                        operator, raw = raw.split(".", 1)
+                except ValueError:
+                    raise APIError(f'"failed to parse logic tree ({text})"', code="PGRST100")
+                if operator not in _FILTER_OPERATORS:
+                    raise APIError(f'"failed to parse logic tree ({text})"', code="PGRST100")
+                sql, values = self._condition(column, operator, _parse_filter_value(operator, raw))
+            clauses.append(f"NOT ({sql})" if negate else sql)
+            params.extend(values)
+        return "(" + f" {joiner} ".join(clauses or ["1"]) + ")", params
+
+    def _where(self):
+        clauses, params = [], []
+        for entry in self._filters:
+            if entry[0] == "or":
+                sql, values = self._logic_tree(entry[1])
+                negate = entry[2]
+            else:
+                _, column, operator, value, negate = entry
+                sql, values = self._condition(column, operator, value)
+            clauses.append(f"NOT ({sql})" if negate else sql)
+            params.extend(values)
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def _order_by(self):
+        terms = []
+        for column, desc, nullsfirst in self._order:
+            name = self._db.check_column(self._table, column)
+            if nullsfirst is None:
+                nullsfirst = desc  # Postgres default: NULLS LAST ascending, NULLS FIRST descending
+            terms.append(f"{name} {'DESC' if desc else 'ASC'} NULLS {'FIRST' if nullsfirst else 'LAST'}")
+        return (" ORDER BY " + ", ".join(terms)) if terms else ""
+
+    # Execution
+    def execute(self):
+        self._db.check_table(self._table)
+        self._db.round_trip()
+        if self._method == "GET":
+            response = self._execute_select()
+        else:
+            response = self._execute_write()
+
+        if self._single:
+            rows = response.data
+            if len(rows) == 1:
+                response.data = rows[0]
+            elif self._single == "maybe" and not rows:
+                response.data = None
+            else:
+                raise APIError(
+                    "JSON object requested, multiple (or no) rows returned",
+                    code="PGRST116",
+                    details=f"The result contains {len(rows)} rows"
+                )
+        return response
+
+    def _execute_select(self):
+        db, table = self._db, self._table
+        where, params = self._where()
+        count = None
+        if self._count:
+            count = db.query(f'SELECT COUNT(*) AS n FROM "{table}"{where}', params)[0]["n"]
+
+        columns, embeds = _parse_select(self._select)
+        if columns == [("count", "count")] and not embeds and "count" not in db.columns[table]:
+            # select("count") aggregate
+            total = count if count is not None else db.query(f'SELECT COUNT(*) AS n FROM "{table}"{where}', params)[0]["n"]
+            return APIResponse(data=[{"count": total}], count=count)
+
+        sql = f'SELECT * FROM "{table}"{where}{self._order_by()}'
+        if self._limit is not None or self._offset is not None:
+            sql += " LIMIT ? OFFSET ?"
+            params = params + [self._limit if self._limit is not None else -1, self._offset or 0]
+        rows = db.query(sql, params)
+        return APIResponse(data=db.materialize(table, rows, self._select), count=count)
+
+    def _execute_write(self):
+        db, table = self._db, self._table
+        try:
+            with db.transaction() as conn:
+                if self._method == "POST":
+                    rows = [self._insert_row(conn, row) for row in self._payload]
+                    rows = [row for row in rows if row is not None]
+                elif self._method == "PATCH":
+                    values = dict(self._payload)
+                    if "updated_at" in db.columns[table] and "updated_at" not in values:
+                        values["updated_at"] = _now()  # handle_updated_at trigger
+                    assignments = ", ".join(f"{db.check_column(table, column)} = ?" for column in values)
+                    where, params = self._where()
+                    params = [db.encode(table, column, value) for column, value in values.items()] + params
+                    rows = [dict(row) for row in conn.execute(f'UPDATE "{table}" SET {assignments}{where} RETURNING *', params)]
+                else:
+                    where, params = self._where()
+                    rows = [dict(row) for row in conn.execute(f'DELETE FROM "{table}"{where} RETURNING *', params)]
+        except sqlite3.IntegrityError as e:
+            message = str(e)
+            code = next((code for marker, code in _INTEGRITY_CODES if marker in message), "23000")
+            raise APIError(message, code=code)
+
+        count = len(rows) if self._count else None
+        if str(self._returning) == "minimal":
+            return APIResponse(data=[], count=count)
+        return APIResponse(data=[db.decode(table, row) for row in rows], count=count)
+
+    def _insert_row(self, conn, row):
+        db, table = self._db, self._table
+        columns = list(row.keys())
+        names = ", ".join(db.check_column(table, column) for column in columns)
+        values = [db.encode(table, column, row[column]) for column in columns]
+        sql = f'INSERT INTO "{table}" ({names}) VALUES ({", ".join("?" * len(columns))})'
+
+        if self._upsert is not None:
+            conflict = self._upsert["on_conflict"] or "id"
+            target = ", ".join(db.check_column(table, column.strip()) for column in conflict.split(","))
+            updates = [column for column in columns if column not in conflict.split(",")]
+            if self._upsert["ignore"] or not updates:
+                sql += f" ON CONFLICT ({target}) DO NOTHING"
+            else:
+                assignments = ", ".join(f'"{column}" = excluded."{column}"' for column in updates)
+                sql += f" ON CONFLICT ({target}) DO UPDATE SET {assignments}"
+
+        result = conn.execute(sql + " RETURNING *", values).fetchone()
+        return dict(result) if result is not None else None
+
+
+# RPC functions (Python versions of the plpgsql functions in database_setup.sql)
+RPC_FUNCTIONS = {}
+
+
+def register_rpc(name):
+    """Register a Python implementation of a Postgres function for supabase.rpc(name, params)"""
+    def decorator(fn):
+        RPC_FUNCTIONS[name] = fn
+        return fn
+    return decorator
+
+
+@register_rpc("get_trending_hashtags")
+def _get_trending_hashtags(db, limit_count=10, days_back=1):
+    cutoff = (datetime.now(timezone.utc) - timedelta(days=days_back)).isoformat()
+    return db.query(
+        """
+        SELECT h.tag, h.usage_count, COUNT(rh.id) AS recent_usage_count
+        FROM hashtags h
+        LEFT JOIN recipe_hashtags rh ON h.id = rh.hashtag_id
+        LEFT JOIN recipes r ON rh.recipe_id = r.id
+        WHERE r.created_at >= ? OR h.last_used >= ?
+        GROUP BY h.id, h.tag, h.usage_count
+        ORDER BY recent_usage_count DESC, h.usage_count DESC
+        LIMIT ?
+        """,
+        (cutoff, cutoff, limit_count)
+    )
+
+
+@register_rpc("get_recipes_by_hashtag")
+def _get_recipes_by_hashtag(db, hashtag_name, sort_by="recent", limit_count=20):
+    order = {
+        "popular": "r.view_count",
+        "trending": "vote_score",
+        "rating": "CAST(r.rating AS INTEGER)",
+    }.get(sort_by, "r.created_at")
+    rows = db.query(
+        f"""
+        SELECT r.id AS recipe_id, r.recipe_name, r.description, r.rating, r.view_count,
+               COALESCE(SUM(v.vote_type = 'up'), 0) - COALESCE(SUM(v.vote_type = 'down'), 0) AS vote_score,
+               r.created_at
+        FROM recipes r
+        JOIN recipe_hashtags rh ON r.id = rh.recipe_id
+        JOIN hashtags h ON rh.hashtag_id = h.id
+        LEFT JOIN recipe_votes v ON v.recipe_id = r.id
+        WHERE h.tag = lower(?) AND r.is_public = 1
+        GROUP BY r.id
+        ORDER BY {order} DESC
+        LIMIT ?
+        """,
+        (hashtag_name, limit_count)
+    )
+    return rows
+
+
+@register_rpc("track_recipe_view")
+def _track_recipe_view(db, recipe_uuid, user_uuid=None, ip_addr=None, user_agent_str=None):
+    with db.transaction() as conn:
+        conn.execute(
+            "INSERT INTO recipe_views (recipe_id, user_id, ip_address, user_agent) VALUES (?, ?, ?, ?)",
+            (recipe_uuid, user_uuid, ip_addr, user_agent_str)
+        )
+        conn.execute("UPDATE recipes SET view_count = view_count + 1 WHERE id = ?", (recipe_uuid,))
+    return None
+
+
+@register_rpc("sync_recipe_hashtags")
+def _sync_recipe_hashtags(db, changes):
+    desired = defaultdict(set)
+    for change in changes:
+        desired[change["recipe_id"]].update(tag.lower() for tag in change["tags"])
+    with db.transaction() as conn:
+        for recipe_id, tags in desired.items():
+            current = {
+                row["tag"]: row["id"] for row in conn.execute(
+                    "SELECT h.id, h.tag FROM recipe_hashtags rh JOIN hashtags h ON h.id = rh.hashtag_id WHERE rh.recipe_id = ?",
+                    (recipe_id,)
+                )
+            }
+            for tag in current.keys() - tags:
+                conn.execute("DELETE FROM recipe_hashtags WHERE recipe_id = ? AND hashtag_id = ?", (recipe_id, current[tag]))
+                conn.execute("UPDATE hashtags SET usage_count = max(usage_count - 1, 0) WHERE id = ?", (current[tag],))
+            for tag in tags - current.keys():
+                hashtag = conn.execute(
+                    "INSERT INTO hashtags (tag, usage_count, last_used) VALUES (?, 1, now()) "
+                    "ON CONFLICT (tag) DO UPDATE SET usage_count = usage_count + 1, last_used = now() RETURNING id",
+                    (tag,)
+                ).fetchone()
+                conn.execute("INSERT INTO recipe_hashtags (recipe_id, hashtag_id) VALUES (?, ?)", (recipe_id, hashtag["id"]))
+    return None
+
+
+@register_rpc("apply_vote_changes")
+def _apply_vote_changes(db, changes):
+    desired = {(change["recipe_id"], change["user_id"]): change.get("vote_type") for change in changes}
+    deltas = defaultdict(lambda: [0, 0])
+    with db.transaction() as conn:
+        db.settings["app.defer_vote_counts"] = "on"
+        try:
+            for (recipe_id, user_id), vote_type in desired.items():
+                exists = conn.execute(
+                    "SELECT 1 FROM recipes r, profiles p WHERE r.id = ? AND p.id = ?", (recipe_id, user_id)
+                ).fetchone()
+                if not exists or vote_type not in (None, "up", "down"):
+                    continue
+                current = conn.execute(
+                    "SELECT vote_type FROM recipe_votes WHERE recipe_id = ? AND user_id = ?", (recipe_id, user_id)
+                ).fetchone()
+                old_type = current["vote_type"] if current else None
+                if old_type == vote_type:
+                    continue
+                if vote_type is None:
+                    conn.execute("DELETE FROM recipe_votes WHERE recipe_id = ? AND user_id = ?", (recipe_id, user_id))
+                else:
+                    conn.execute(
+                        "INSERT INTO recipe_votes (recipe_id, user_id, vote_type) VALUES (?, ?, ?) "
+                        "ON CONFLICT (recipe_id, user_id) DO UPDATE SET vote_type = excluded.vote_type",
+                        (recipe_id, user_id, vote_type)
+                    )
+                deltas[recipe_id][0] += (vote_type == "up") - (old_type == "up")
+                deltas[recipe_id][1] += (vote_type == "down") - (old_type == "down")
+            for recipe_id, (up_delta, down_delta) in deltas.items():
+                if up_delta or down_delta:
+                    conn.execute(
+                        "UPDATE recipes SET upvotes_count = max(upvotes_count + ?, 0), downvotes_count = max(downvotes_count + ?, 0) WHERE id = ?",
+                        (up_delta, down_delta, recipe_id)
+                    )
+        finally:
+            db.settings.pop("app.defer_vote_counts", None)
+    return None
+
+
+@register_rpc("get_recent_comments")
+def _get_recent_comments(db, recipe_ids, per_recipe=3):
+    if not recipe_ids:
+        return []
+    placeholders = ", ".join("?" for _ in recipe_ids)
+    rows = db.query(
+        f"""
+        SELECT c.id, c.recipe_id, c.user_id, c.content, c.created_at, c.updated_at,
+               p.username, p.full_name, p.avatar_url
+        FROM (
+            SELECT rc.*, ROW_NUMBER() OVER (PARTITION BY rc.recipe_id ORDER BY rc.created_at DESC, rc.id DESC) AS position
+            FROM recipe_comments rc
+            WHERE rc.recipe_id IN ({placeholders})
+        ) c
+        JOIN profiles p ON p.id = c.user_id
+        WHERE c.position <= ?
+        ORDER BY c.recipe_id, c.created_at, c.id
+        """,
+        (*recipe_ids, per_recipe)
+    )
+    for row in rows:
+        row["profiles"] = {
+            "id": row["user_id"],
+            "username": row.pop("username"),
+            "full_name": row.pop("full_name"),
+            "avatar_url": row.pop("avatar_url"),
+        }
+    return rows
+
+
+@register_rpc("execute_sql")
+def _execute_sql(db, query):
+    raise APIError(
+        "execute_sql is not available in the local stand-in; the schema is created automatically",
+        code="PGRST202"
+    )
+
+
+class LocalRPCBuilder:
+    def __init__(self, db, fn, params):
+        self._db = db
+        self._fn = fn
+        self._params = params or {}
+        self.request = SimpleNamespace(http_method="POST", params="", headers={})
+
+    def execute(self):
+        implementation = RPC_FUNCTIONS.get(self._fn)
+        if implementation is None:
+            raise APIError(f"Could not find the function public.{self._fn} in the schema cache", code="PGRST202")
+        self._db.round_trip()
+        try:
+            data = implementation(self._db, **self._params)
+        except TypeError as e:
+            raise APIError(f"Could not find the function public.{self._fn} with the given parameters: {e}", code="PGRST202")
+        except sqlite3.IntegrityError as e:
+            raise APIError(str(e), code="23000")
+        return APIResponse(data=data)
+
+
+class LocalAuth:
+    """Email/password auth with opaque bearer tokens; sign-ups are confirmed immediately"""
+
+    PASSWORD_ITERATIONS = 10_000
+
+    def __init__(self, db):
+        self._db = db
+        self._session = None
+
+    def _hash_password(self, password, salt=None):
+        salt = salt or secrets.token_hex(8)
+        digest = hashlib.pbkdf2_hmac("sha256", password.encode(), salt.encode(), self.PASSWORD_ITERATIONS).hex()
+        return f"{salt}${digest}"
+
+    def _user(self, row):
+        return User(
+            id=row["id"],
+            email=row["email"],
+            user_metadata=json.loads(row["user_metadata"] or "{}"),
+            email_confirmed_at=row["email_confirmed_at"],
+            created_at=row["created_at"]
+        )
+
+    def sign_up(self, credentials):
+        self._db.round_trip()
+        email = credentials["email"].lower()
+        metadata = (credentials.get("options") or {}).get("data") or {}
+        try:
+            with self._db.transaction() as conn:
+                row = conn.execute(
+                    "INSERT INTO auth_users (email, password_hash, user_metadata, email_confirmed_at) VALUES (?, ?, ?, now()) RETURNING *",
+                    (email, self._hash_password(credentials["password"]), json.dumps(metadata))
+                ).fetchone()
+                # handle_new_user trigger
+                conn.execute(
+                    "INSERT INTO profiles (id, email, username, full_name) VALUES (?, ?, ?, ?)",
+                    (row["id"], email, metadata.get("username") or email.split("@")[0], metadata.get("full_name") or "")
+                )
+        except sqlite3.IntegrityError as e:
+            if "auth_users.email" in str(e):
+                raise AuthError("User already registered", status=422)
+            raise AuthError("Database error saving new user", status=500)
+        user = self._user(row)
+        return AuthResponse(user=user, session=self._create_session(user))
+
+    def sign_in_with_password(self, credentials):
+        self._db.round_trip()
+        rows = self._db.query("SELECT * FROM auth_users WHERE email = ?", (credentials["email"].lower(),))
+        if not rows:
+            raise AuthError("Invalid login credentials")
+        salt = rows[0]["password_hash"].split("$", 1)[0]
+        if not secrets.compare_digest(self._hash_password(credentials["password"], salt), rows[0]["password_hash"]):
+            raise AuthError("Invalid login credentials")
+        user = self._user(rows[0])
+        self._session = self._create_session(user)
+        return AuthResponse(user=user, session=self._session)
+
+    def _create_session(self, user):
+        session = Session(access_token=secrets.token_urlsafe(32), refresh_token=secrets.token_urlsafe(16), user=user)
+        with self._db.transaction() as conn:
+            conn.execute(
+                "INSERT INTO auth_sessions (access_token, refresh_token, user_id) VALUES (?, ?, ?)",
+                (session.access_token, session.refresh_token, user.id)
+            )
+        return session
+
+    def get_user(self, jwt=None):
+        self._db.round_trip()
+        token = jwt or (self._session.access_token if self._session else None)
+        rows = self._db.query(
+            "SELECT u.* FROM auth_sessions s JOIN auth_users u ON u.id = s.user_id WHERE s.access_token = ?",
+            (token,)
+        )
+        if not rows:
+            raise AuthError("invalid JWT: unable to parse or verify signature", status=403)
+        return UserResponse(user=self._user(rows[0]))
+
+    def sign_out(self, options=None):
+        self._db.round_trip()
+        if self._session:
+            with self._db.transaction() as conn:
+                conn.execute("DELETE FROM auth_sessions WHERE access_token = ?", (self._session.access_token,))
+            self._session = None
+
+    def resend(self, credentials):
+        # Nothing to send: local sign-ups are already confirmed
+        self._db.round_trip()
+        return AuthResponse()
+
+
+class LocalStorage:
+    """Bucket bookkeeping only (used by db_manager.py); object uploads are not emulated"""
+
+    def __init__(self, db):
+        self._db = db
+
+    def list_buckets(self):
+        self._db.round_trip()
+        return [SimpleNamespace(**self._db.decode("storage_buckets", row)) for row in self._db.query("SELECT * FROM storage_buckets")]
+
+    def create_bucket(self, id, options=None):
+        self._db.round_trip()
+        with self._db.transaction() as conn:
+            conn.execute(
+                "INSERT OR IGNORE INTO storage_buckets (id, name, public) VALUES (?, ?, ?)",
+                (id, id, bool((options or {}).get("public")))
+            )
+        return {"name": id}
+
+
+class LocalClient:
+    """Drop-in for supabase.Client backed by LocalDatabase"""
+
+    def __init__(self, db):
+        self.db = db
+        self.auth = LocalAuth(db)
+        self.storage = LocalStorage(db)
+
+    def table(self, table_name):
+        return LocalQueryBuilder(self.db, table_name)
+
+    def from_(self, table_name):
+        return self.table(table_name)
+
+    def rpc(self, fn, params=None, *args, **kwargs):
+        return LocalRPCBuilder(self.db, fn, params)
+
+
+def is_local_url(url):
+    return bool(url) and url.startswith("sqlite:")
+
+
+def create_local_client(url="sqlite://", latency_ms=None, jitter_ms=None):
+    """Create a stand-in client from a sqlite:// URL (latency defaults come from the environment)"""
+    path = url[len("sqlite:///"):] if url.startswith("sqlite:///") else ""
+    if latency_ms is None:
+        latency_ms = float(os.getenv("LOCAL_SUPABASE_LATENCY_MS", 0))
+    if jitter_ms is None:
+        jitter_ms = float(os.getenv("LOCAL_SUPABASE_JITTER_MS", 0))
+    db = LocalDatabase(path or ":memory:", latency_ms=latency_ms, jitter_ms=jitter_ms)
+    print(f"Using local Supabase stand-in: {path or 'in-memory'} (latency {latency_ms:g}ms + jitter {jitter_ms:g}ms)")
+    return LocalClient(db)
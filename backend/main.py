@@ -1,28 +1,69 @@
-from fastapi import FastAPI, HTTPException, Depends, status, Request, File, UploadFile
+import time
+IMPORT_STARTED = time.perf_counter()  # reported as the "import" startup phase at the end of this module
+
+from fastapi import FastAPI, HTTPException, Depends, status, Request, Header
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import HTTPBearer
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import FileResponse
 from fastapi.exceptions import RequestValidationError
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
 from pydantic import BaseModel, EmailStr, ValidationError
 from typing import Optional, List
 import os
+import json
+import uuid
+import asyncio
+from contextlib import asynccontextmanager
 from datetime import datetime, timedelta
-from supabase import create_client, Client
+from supabase_client import close_client, get_client
 import jwt
 from dotenv import load_dotenv
 
-# Load environment variables
+# Load environment variables (before the app modules below read their settings at import)
 load_dotenv()
 
+from fast_json import FastJSONResponse, FastJSONRoute
+from compression import CompressionMiddleware, configure_route
+from etag import ETagMiddleware
+from admission import AdmissionMiddleware, LimitOverrides, configure_limit, configure_variant, remember_verified_token, remove_limit, snapshot as admission_snapshot
+from avatars import AVATAR_DIR, AVATAR_FILENAME_PATTERN, AVATAR_SIZES, AvatarError, avatar_url, initials_svg, shutdown_pool, store_avatar
+from caches import DEFAULT_SNAPSHOT_PATH, CacheInvalidations, TTLCache, load_snapshot, save_snapshot
+from direct_db import DirectDB, parse_families
+from metrics import MetricsMiddleware, WorkerMetrics, observe_upstream_call, process_age, record_startup
+from supabase_instrumentation import InstrumentedClient
+from tracing import RoundTripTracerMiddleware, trace_upstream_call
+from profiling import PROFILES, ProfilingMiddleware, start_session
+from shared_store import SHARED_STORE
+from hashtags import HASHTAG_SOURCE_FIELDS, sync_recipe_hashtags
+from vote_buffer import VoteBuffer
+from static_assets import ASSETS, ASSETS_DIR, DIST_DIR, IMMUTABLE, REVALIDATE, asset_response, ensure_built
+from recipe_import import IMPORTS, RecipeImporter, detect_format, iter_lines, iter_records
+from recipe_export import EXPORT_FORMATS, chunked, csv_lines, gzip_stream, iter_rows, keyset_filter, make_cursor, ndjson_lines, parse_cursor
+from starlette.requests import ClientDisconnect
+import hmac
+
+@asynccontextmanager
+async def lifespan(app):
+    """Per-worker startup and shutdown (start_worker / stop_worker, defined at the end of this module)"""
+    await start_worker()
+    try:
+        yield
+    finally:
+        await stop_worker()
+
 # Initialize FastAPI app
 app = FastAPI(
     title="What'sYourRecipe API",
     description="Social media platform for coffee recipe sharing",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=FastJSONResponse,
+    lifespan=lifespan
 )
 
+# Render plain dict/list results with orjson, skipping FastAPI's jsonable_encoder pass
+app.router.route_class = FastJSONRoute
+
 # Add validation error handler
 @app.exception_handler(RequestValidationError)
 async def validation_exception_handler(request: Request, exc: RequestValidationError):
@@ -64,6 +105,44 @@ async def get_script():
 async def get_api():
     return FileResponse("static/api.js", media_type="application/javascript")
 
+# Minified, content-hashed, precompressed copies of the above (see static_assets.py)
+ASSET_MANIFEST = ensure_built()
+ASSET_FILES = {hashed: name for name, hashed in ASSET_MANIFEST["files"].items()} if ASSET_MANIFEST else {}
+
+@app.get("/assets/{filename}")
+async def get_asset(filename: str, request: Request):
+    if filename not in ASSET_FILES:
+        raise HTTPException(status_code=404, detail="Not found")
+    return asset_response(
+        os.path.join(ASSETS_DIR, filename),
+        ASSETS[ASSET_FILES[filename]],
+        filename,
+        request.headers.get("accept-encoding"),
+        request.headers.get("if-none-match"),
+        IMMUTABLE,
+    )
+
+# Admission control (see admission.py): expensive endpoints get capped concurrency with short
+# queues plus per-user limits, so they shed load (429/503 + Retry-After) instead of starving
+# cheap ones. ADMISSION_LIMITS (JSON, route -> settings or null) overrides these at startup,
+# /admin/limits at runtime (shared by every worker, each re-reading every ADMISSION_REFRESH_SECONDS). Installed inside CORS so rejections still carry CORS headers.
+ADMISSION_CONTROL = os.getenv("ADMISSION_CONTROL", "true").lower() == "true"
+configure_variant("/recipes", lambda params: "trending" if params.get("view") == "trending" else None)
+configure_limit("/recipes[trending]", max_concurrency=4, max_queue=16, queue_timeout=3, per_user_concurrency=2, per_user_rate=1, per_user_burst=5)
+configure_limit("/recipes/search/{query}", max_concurrency=8, max_queue=32, queue_timeout=2, per_user_concurrency=2, per_user_rate=3, per_user_burst=10)
+configure_limit("/users/search/{query}", max_concurrency=8, max_queue=32, queue_timeout=2, per_user_concurrency=2, per_user_rate=3, per_user_burst=10)
+configure_limit("/recommended-users", max_concurrency=4, max_queue=16, queue_timeout=3, per_user_concurrency=1, per_user_rate=0.5, per_user_burst=3)
+configure_limit("/export/recipes", max_concurrency=4, per_user_concurrency=1)
+for limit_key, limit_settings in json.loads(os.getenv("ADMISSION_LIMITS") or "{}").items():
+    if limit_settings is None:
+        remove_limit(limit_key)
+    else:
+        configure_limit(limit_key, **limit_settings)
+LIMIT_OVERRIDES = LimitOverrides(SHARED_STORE, interval=float(os.getenv("ADMISSION_REFRESH_SECONDS", 2)))
+
+if ADMISSION_CONTROL:
+    app.add_middleware(AdmissionMiddleware, fastapi_app=app)
+
 # CORS middleware - Allow frontend communication
 app.add_middleware(
     CORSMiddleware,
@@ -78,18 +157,105 @@ app.add_middleware(
         # Your deployed app URL
     ] + (os.getenv("FRONTEND_URLS", "").split(",") if os.getenv("FRONTEND_URLS") else []),
     allow_credentials=True,
-    allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
+    allow_methods=["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"],
     allow_headers=["*"],
+    expose_headers=["ETag", "Retry-After"],  # ETag is read by the api.js cache for If-None-Match revalidation
+)
+
+# Weak ETags on JSON GET responses; a matching If-None-Match gets an empty 304
+app.add_middleware(ETagMiddleware)
+
+# Compress JSON/text responses (brotli or gzip, negotiated) above COMPRESSION_MIN_SIZE bytes
+app.add_middleware(CompressionMiddleware, minimum_size=int(os.getenv("COMPRESSION_MIN_SIZE", 1024)))
+
+# Per-route compression overrides (small, frequently polled responses aren't worth compressing)
+configure_route("/health", enabled=False)
+configure_route("/env", enabled=False)
+
+# Admin token for diagnostics endpoints (profiling); admin features are disabled when unset
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+PROFILE_SAMPLE_INTERVAL = float(os.getenv("PROFILE_SAMPLE_INTERVAL_MS", 5)) / 1000
+
+# On-demand request profiling (X-Profile: 1 + X-Admin-Token); not installed at all without ADMIN_TOKEN
+if ADMIN_TOKEN:
+    app.add_middleware(ProfilingMiddleware, admin_token=ADMIN_TOKEN, interval=PROFILE_SAMPLE_INTERVAL)
+
+# Per-request Supabase round-trip tracing: Server-Timing header in debug mode, warnings over budget
+app.add_middleware(
+    RoundTripTracerMiddleware,
+    fastapi_app=app,
+    budget=int(os.getenv("ROUNDTRIP_BUDGET", 5)),
+    debug=os.getenv("DEBUG", "false").lower() == "true"
 )
 
-# Supabase client
-supabase: Client = create_client(
-    os.getenv("SUPABASE_URL"),
-    os.getenv("SUPABASE_SERVICE_KEY")  # Use service key for backend operations
+# Request count, latency and in-flight gauges per route template (exposed on /metrics)
+app.add_middleware(MetricsMiddleware, fastapi_app=app)
+# Each worker publishes its samples every METRICS_PUBLISH_SECONDS; /metrics serves all workers' series
+WORKER_METRICS = WorkerMetrics(SHARED_STORE, interval=float(os.getenv("METRICS_PUBLISH_SECONDS", 5)))
+
+# Supabase client (instrumented: every round trip is timed and counted per table/RPC)
+# SUPABASE_URL=sqlite:///local.db switches to the local stand-in (see local_supabase.py)
+supabase = InstrumentedClient(
+    get_client(
+        os.getenv("SUPABASE_URL"),
+        os.getenv("SUPABASE_SERVICE_KEY")  # Use service key for backend operations
+    ),
+    listeners=[observe_upstream_call, trace_upstream_call]
 )
 
+
+def reconnect_supabase():
+    """Give this process its own Supabase connection (called in each forked worker, see gunicorn.conf.py)"""
+    supabase.replace_client(get_client(os.getenv("SUPABASE_URL"), os.getenv("SUPABASE_SERVICE_KEY")))
+
+# Optional direct Postgres path for hot reads (see direct_db.py). DIRECT_DB_QUERIES lists the
+# query families to serve over an asyncpg pool ("status", "profiles", or "all"); anything not
+# listed, every write, and any family whose pool failed to open goes through PostgREST.
+DIRECT_DB_FAMILIES = parse_families(os.getenv("DIRECT_DB_QUERIES"))
+direct_db = DirectDB(
+    os.getenv("DIRECT_DB_URL") or os.getenv("DATABASE_URL"),
+    DIRECT_DB_FAMILIES,
+    min_size=int(os.getenv("DIRECT_DB_POOL_MIN", 1)),
+    max_size=int(os.getenv("DIRECT_DB_POOL_MAX", 10)),
+    statement_cache_size=int(os.getenv("DIRECT_DB_STATEMENT_CACHE", 100)),
+    listeners=[observe_upstream_call, trace_upstream_call]
+) if DIRECT_DB_FAMILIES else None
+
+def use_direct(family):
+    return direct_db is not None and direct_db.serves(family)
+
+# Short-lived caches for hot public reads (see caches.py); a TTL of 0 disables a cache.
+# Writes invalidate this worker's entries at once and every other worker's within CACHE_INVALIDATION_SECONDS.
+CACHE_INVALIDATIONS = CacheInvalidations(SHARED_STORE, interval=float(os.getenv("CACHE_INVALIDATION_SECONDS", 1)))
+TRENDING_CACHE = TTLCache("trending", float(os.getenv("TRENDING_CACHE_TTL", 30)), max_entries=64, invalidations=CACHE_INVALIDATIONS)
+HASHTAG_CACHE = TTLCache("trending_hashtags", float(os.getenv("HASHTAG_CACHE_TTL", 60)), max_entries=64, invalidations=CACHE_INVALIDATIONS)
+PROFILE_CACHE = TTLCache("public_profiles", float(os.getenv("PROFILE_CACHE_TTL", 60)), max_entries=4096, invalidations=CACHE_INVALIDATIONS)
+CACHE_SNAPSHOT_PATH = os.getenv("CACHE_SNAPSHOT_PATH") or DEFAULT_SNAPSHOT_PATH
+CACHE_SNAPSHOT_MAX_AGE = float(os.getenv("CACHE_SNAPSHOT_MAX_AGE", 300))
+
+# Startup warm-up: open pooled Supabase connections and fill the caches before serving
+STARTUP_WARMUP = os.getenv("STARTUP_WARMUP", "true").lower() == "true"
+WARMUP_TIMEOUT = float(os.getenv("WARMUP_TIMEOUT_SECONDS", 10))
+WARM_CONNECTIONS = int(os.getenv("SUPABASE_WARM_CONNECTIONS", 4))
+
+def invalidate_recipe_caches():
+    """Drop cached trending data after a recipe write (in every worker)"""
+    TRENDING_CACHE.invalidate()
+    HASHTAG_CACHE.invalidate()
+
+# Optional write-behind voting (see vote_buffer.py): votes are buffered per recipe and
+# flushed as net changes every VOTE_FLUSH_INTERVAL_MS instead of written one by one
+VOTE_WRITE_BEHIND = os.getenv("VOTE_WRITE_BEHIND", "false").lower() == "true"
+VOTE_FLUSH_INTERVAL = float(os.getenv("VOTE_FLUSH_INTERVAL_MS", 250)) / 1000
+vote_buffer = VoteBuffer(supabase, interval=VOTE_FLUSH_INTERVAL) if VOTE_WRITE_BEHIND else None
+
+def with_buffered_votes(recipes):
+    """Show votes still waiting in the write-behind buffer on recipes read from the database"""
+    return vote_buffer.overlay(recipes) if vote_buffer and recipes else recipes
+
 # Security
 security = HTTPBearer()
+optional_security = HTTPBearer(auto_error=False)  # endpoints readable signed out
 
 # Pydantic models
 class UserSignup(BaseModel):
@@ -166,10 +332,65 @@ class Recipe(BaseModel):
     # Additional notes
     brewing_notes: Optional[str] = None
 
+class RecipePatch(Recipe):
+    # Every field is optional; only the fields the client sends are written
+    recipe_name: Optional[str] = None
+    description: Optional[str] = None
+    is_public: Optional[bool] = None
+
 class Vote(BaseModel):
     recipe_id: str
     vote_type: str  # 'up' or 'down'
 
+class Comment(BaseModel):
+    content: str
+
+# Recipe projections: named column sets mapped to explicit PostgREST select lists
+RECIPE_COLUMNS = ["id", "user_id"] + list(Recipe.model_fields) + ["view_count", "upvotes_count", "downvotes_count", "comments_count", "created_at", "updated_at"]
+
+RECIPE_EMBEDS = {
+    "profiles": "profiles!recipes_user_id_fkey(id, username, full_name, avatar_url)",
+    "recipe_votes": "recipe_votes(vote_type, user_id)",
+}
+
+RECIPE_PROJECTIONS = {
+    # What a feed/search card renders
+    "card": [
+        "id", "user_id", "recipe_name", "description", "rating", "is_public",
+        "bean_variety", "bean_region", "roast_level", "brew_method",
+        "coffee_amount", "water_amount", "milk_preference", "upvotes_count", "downvotes_count", "comments_count", "created_at",
+        "profiles",
+    ],
+    # Full recipe page / edit form
+    "detail": RECIPE_COLUMNS + ["profiles", "recipe_votes"],
+    # Flat rows for exports (no embeds)
+    "export": RECIPE_COLUMNS,
+}
+
+def recipe_select(fields: Optional[str] = None, default: str = "card") -> str:
+    """Build the PostgREST select list for a named projection or a comma-separated field list"""
+    fields = (fields or default).strip()
+    
+    if fields in RECIPE_PROJECTIONS:
+        requested = RECIPE_PROJECTIONS[fields]
+    else:
+        requested = [field.strip() for field in fields.split(",") if field.strip()]
+        unknown = [field for field in requested if field not in RECIPE_COLUMNS and field not in RECIPE_EMBEDS]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown recipe fields: {', '.join(unknown)}")
+        # Clients key cards by id, so always return it
+        if "id" not in requested:
+            requested = ["id"] + requested
+    
+    return ", ".join(RECIPE_EMBEDS.get(field, field) for field in requested)
+
+class StatusBatchRequest(BaseModel):
+    recipe_ids: List[str] = []
+    user_ids: List[str] = []
+
+# Upper bound on ids per batch status lookup (keeps the PostgREST in.() filter URL short)
+MAX_STATUS_BATCH_IDS = 200
+
 # Helper functions
 def get_current_user(token: str = Depends(security)):
     try:
@@ -177,15 +398,26 @@ def get_current_user(token: str = Depends(security)):
         response = supabase.auth.get_user(token.credentials)
         if not response or not hasattr(response, 'user') or not response.user:
             raise HTTPException(status_code=401, detail="Invalid token")
+        remember_verified_token(token.credentials, response.user.id)  # per-user admission limits
         return response.user
     except Exception as e:
         print(f"Auth error: {e}")
         raise HTTPException(status_code=401, detail="Invalid token")
 
+def get_optional_user(token = Depends(optional_security)):
+    """The signed-in user, or None without an Authorization header"""
+    return get_current_user(token) if token else None
+
 def verify_user_access(user_id: str, current_user):
     if current_user.id != user_id:
         raise HTTPException(status_code=403, detail="Access denied")
 
+def require_admin(x_admin_token: Optional[str] = Header(None)):
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not found")
+    if not x_admin_token or not hmac.compare_digest(x_admin_token.encode(), ADMIN_TOKEN.encode()):
+        raise HTTPException(status_code=403, detail="Access denied")
+
 # Auth endpoints
 @app.post("/auth/signup")
 async def signup(user_data: UserSignup):
@@ -297,11 +529,28 @@ async def ensure_user_profile(current_user):
 async def get_user_profile(current_user = Depends(get_current_user)):
     return await ensure_user_profile(current_user)
 
+# Columns anyone may read from a profile
+PUBLIC_PROFILE_COLUMNS = "id, username, full_name, bio, avatar_url, created_at"
+
 @app.get("/users/{user_id}")
 async def get_user_by_id(user_id: str):
+    cached = PROFILE_CACHE.get(user_id)
+    if cached is not None:
+        return cached
+    if use_direct("profiles"):
+        try:
+            profile = await direct_db.fetchrow("public_profile", user_id)
+        except Exception as e:
+            print(f"Direct profile lookup failed: {e}")
+            raise HTTPException(status_code=404, detail="User not found")
+        if profile is None:
+            raise HTTPException(status_code=404, detail="User not found")
+        PROFILE_CACHE.set(user_id, profile)
+        return profile
     try:
-        result = supabase.table("profiles").select("id, username, full_name, bio, avatar_url, created_at").eq("id", user_id).single().execute()
+        result = supabase.table("profiles").select(PUBLIC_PROFILE_COLUMNS).eq("id", user_id).single().execute()
         if result.data:
+            PROFILE_CACHE.set(user_id, result.data)
             return result.data
         else:
             raise HTTPException(status_code=404, detail="User not found")
@@ -330,6 +579,7 @@ async def update_profile(profile_data: ProfileUpdate, current_user = Depends(get
         
         # Update the profile in the database
         result = supabase.table("profiles").update(update_data).eq("id", current_user.id).execute()
+        PROFILE_CACHE.invalidate(current_user.id)
         
         if result.data:
             return result.data[0]
@@ -341,50 +591,38 @@ async def update_profile(profile_data: ProfileUpdate, current_user = Depends(get
         raise HTTPException(status_code=500, detail="Error updating profile")
 
 @app.post("/profile/avatar")
-async def upload_avatar(avatar: UploadFile = File(...), current_user = Depends(get_current_user)):
+async def upload_avatar(request: Request, current_user = Depends(get_current_user)):
+    """Accepts a multipart 'avatar' file; stores resized WebP copies under a content hash"""
     try:
         print(f"Avatar upload request from user: {current_user.id}")
-        print(f"File: {avatar.filename}, Content-Type: {avatar.content_type}")
-        
-        # Validate file type
-        if not avatar.content_type.startswith('image/'):
-            raise HTTPException(status_code=400, detail="File must be an image")
-        
-        # Validate file size (5MB limit)
-        contents = await avatar.read()
-        if len(contents) > 5 * 1024 * 1024:
-            raise HTTPException(status_code=400, detail="File size must be less than 5MB")
         
         # Ensure user has a profile first
         await ensure_user_profile(current_user)
         
-        # Generate a beautiful placeholder avatar URL based on user info
-        user_profile = await get_user_profile(current_user)
-        display_name = user_profile.get('username', user_profile.get('full_name', 'User'))
-        
-        # Create a more personalized avatar URL
-        import urllib.parse
-        encoded_name = urllib.parse.quote(display_name)
-        placeholder_avatar_url = f"https://ui-avatars.com/api/?name={encoded_name}&background=8B4513&color=fff&size=200&bold=true&format=png"
+        key = await store_avatar(request, "avatar")
+        new_avatar_url = avatar_url(key)
         
-        print(f"Generated avatar URL: {placeholder_avatar_url}")
+        print(f"Stored avatar: {new_avatar_url}")
         
         # Update profile with avatar URL
         result = supabase.table("profiles").update({
-            "avatar_url": placeholder_avatar_url,
+            "avatar_url": new_avatar_url,
             "updated_at": "now()"
         }).eq("id", current_user.id).execute()
         
+        PROFILE_CACHE.invalidate(current_user.id)
         if not result.data:
             raise HTTPException(status_code=500, detail="Failed to update profile with avatar")
         
         print(f"Successfully updated avatar for user {current_user.id}")
         return {
-            "avatar_url": placeholder_avatar_url, 
+            "avatar_url": new_avatar_url, 
             "message": "Avatar uploaded successfully",
             "user_id": current_user.id
         }
         
+    except AvatarError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
     except HTTPException:
         raise
     except Exception as e:
@@ -394,6 +632,24 @@ async def upload_avatar(avatar: UploadFile = File(...), current_user = Depends(g
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=f"Error uploading avatar: {str(e)}")
 
+# Avatars are content-addressed, so a URL never changes meaning
+@app.get("/avatars/{filename}")
+async def get_avatar(filename: str):
+    match = AVATAR_FILENAME_PATTERN.match(filename)
+    path = os.path.join(AVATAR_DIR, filename)
+    if not match or int(match.group(1)) not in AVATAR_SIZES or not os.path.exists(path):
+        raise HTTPException(status_code=404, detail="Avatar not found")
+    return FileResponse(path, media_type="image/webp", headers={"Cache-Control": IMMUTABLE})
+
+# Initials avatar for users without an uploaded one
+@app.get("/avatars/initials/{name}.svg")
+async def get_initials_avatar(name: str):
+    return Response(
+        content=initials_svg(name[:64]),
+        media_type="image/svg+xml",
+        headers={"Cache-Control": "public, max-age=604800"}
+    )
+
 # Recipe endpoints
 @app.post("/recipes")
 async def create_recipe(recipe_data: Recipe, current_user = Depends(get_current_user)):
@@ -411,6 +667,8 @@ async def create_recipe(recipe_data: Recipe, current_user = Depends(get_current_
         
         if result.data:
             print(f"Recipe created successfully: {result.data[0]['id']}")
+            sync_recipe_hashtags(supabase, result.data)
+            invalidate_recipe_caches()
             return result.data[0]
         else:
             raise HTTPException(status_code=400, detail="Failed to create recipe")
@@ -418,15 +676,74 @@ async def create_recipe(recipe_data: Recipe, current_user = Depends(get_current_
         print(f"Error creating recipe: {e}")
         raise HTTPException(status_code=400, detail=str(e))
 
+# Rows per insert round trip for bulk imports
+BULK_IMPORT_BATCH_SIZE = int(os.getenv("BULK_IMPORT_BATCH_SIZE", 100))
+MAX_BULK_IMPORT_BATCH_SIZE = 1000
+
+@app.post("/recipes/bulk")
+async def bulk_import_recipes(
+    request: Request,
+    format: Optional[str] = None,  # ndjson or csv; defaults from Content-Type
+    batch_size: int = BULK_IMPORT_BATCH_SIZE,
+    import_id: Optional[str] = None,  # re-send the same file with this id to resume
+    current_user = Depends(get_current_user)
+):
+    """Import recipes from a streamed NDJSON or CSV upload, validating and inserting in batches"""
+    if not 1 <= batch_size <= MAX_BULK_IMPORT_BATCH_SIZE:
+        raise HTTPException(status_code=400, detail=f"batch_size must be between 1 and {MAX_BULK_IMPORT_BATCH_SIZE}")
+    try:
+        fmt = detect_format(request.headers.get("content-type"), format)
+        state = IMPORTS.start(import_id, current_user.id, fmt)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except PermissionError as e:
+        raise HTTPException(status_code=403, detail=str(e))
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+    try:
+        await ensure_user_profile(current_user)
+    except Exception:
+        state.status = "interrupted"
+        IMPORTS.save(state)
+        raise
+
+    today = datetime.utcnow().date().isoformat()
+
+    def insert_rows(rows):
+        for row in rows:
+            # Ids are assigned here so the batch can skip returning rows and still sync hashtags
+            row.setdefault("id", str(uuid.uuid4()))
+            row["user_id"] = current_user.id
+            row["date_created"] = row.get("date_created") or today
+        supabase.table("recipes").insert(rows, returning="minimal").execute()
+        sync_recipe_hashtags(supabase, rows)
+        invalidate_recipe_caches()
+
+    print(f"Bulk import {state.import_id} ({fmt}) for user {current_user.id}, resuming after line {state.committed_line}")
+    importer = RecipeImporter(Recipe, insert_rows, batch_size, checkpoint=IMPORTS.save)
+    try:
+        await importer.run(state, iter_records(iter_lines(request.stream()), fmt))
+    except ClientDisconnect:
+        print(f"Bulk import {state.import_id} interrupted after line {state.committed_line}")
+    except Exception as e:
+        print(f"Error during bulk import {state.import_id}: {e}")
+        raise HTTPException(status_code=400, detail=str(e))
+
+    print(f"Bulk import {state.import_id} {state.status}: {state.inserted} inserted, {state.failed} failed")
+    return state.summary()
+
+@app.get("/recipes/bulk/{import_id}")
+async def get_bulk_import(import_id: str, current_user = Depends(get_current_user)):
+    """Progress of a bulk import; committed_line is where a resumed upload picks up"""
+    state = IMPORTS.get(import_id)
+    if not state or state.user_id != current_user.id:
+        raise HTTPException(status_code=404, detail="Import not found")
+    return state.summary()
+
 @app.put("/recipes/{recipe_id}")
 async def update_recipe(recipe_id: str, recipe_data: Recipe, current_user = Depends(get_current_user)):
     try:
-        # Check if the recipe exists and belongs to the user
-        existing_recipe = supabase.table("recipes").select("*").eq("id", recipe_id).eq("user_id", current_user.id).execute()
-        
-        if not existing_recipe.data:
-            raise HTTPException(status_code=404, detail="Recipe not found or you don't have permission to edit it")
-        
         # Convert to dict using model_dump (Pydantic v2 method)
         recipe_dict = recipe_data.model_dump()
         
@@ -435,13 +752,16 @@ async def update_recipe(recipe_id: str, recipe_data: Recipe, current_user = Depe
         
         print(f"Updating recipe {recipe_id}: {recipe_data.recipe_name}")
         
+        # The owner filter doubles as the permission check
         result = supabase.table("recipes").update(recipe_dict).eq("id", recipe_id).eq("user_id", current_user.id).execute()
         
         if result.data:
             print(f"Recipe updated successfully: {result.data[0]['id']}")
+            sync_recipe_hashtags(supabase, result.data)
+            invalidate_recipe_caches()
             return result.data[0]
         else:
-            raise HTTPException(status_code=400, detail="Failed to update recipe")
+            raise HTTPException(status_code=404, detail="Recipe not found or you don't have permission to edit it")
             
     except HTTPException:
         raise
@@ -449,24 +769,72 @@ async def update_recipe(recipe_id: str, recipe_data: Recipe, current_user = Depe
         print(f"Error updating recipe: {e}")
         raise HTTPException(status_code=400, detail=str(e))
 
+@app.patch("/recipes/{recipe_id}")
+async def patch_recipe(recipe_id: str, changes: RecipePatch, current_user = Depends(get_current_user)):
+    """Update only the fields sent, in one UPDATE filtered by owner"""
+    updates = changes.model_dump(exclude_unset=True)
+    
+    # These columns are NOT NULL, so an explicit null can't be written
+    for field in ("recipe_name", "description", "is_public"):
+        if field in updates and updates[field] is None:
+            raise HTTPException(status_code=400, detail=f"{field} cannot be null")
+    
+    if not updates:
+        raise HTTPException(status_code=400, detail="No fields to update")
+    
+    try:
+        print(f"Patching recipe {recipe_id}: {', '.join(updates)}")
+        
+        result = supabase.table("recipes").update(updates).eq("id", recipe_id).eq("user_id", current_user.id).execute()
+        
+        # No row matched: the recipe doesn't exist or belongs to someone else
+        if not result.data:
+            raise HTTPException(status_code=404, detail="Recipe not found or you don't have permission to edit it")
+        invalidate_recipe_caches()
+        
+        # Tags only depend on the text fields; other edits leave the links alone
+        if any(field in updates for field in HASHTAG_SOURCE_FIELDS):
+            sync_recipe_hashtags(supabase, result.data)
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"Error patching recipe: {e}")
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    return result.data[0]
+
+TRENDING_RANK_COLUMNS = ["upvotes_count", "downvotes_count"]
+
+def trending_select(fields: Optional[str] = None) -> str:
+    """Select list for trending: ranking is by the vote counters, so they are selected even when not requested"""
+    select_query = recipe_select(fields)
+    selected = select_query.split(", ")
+    return ", ".join(selected + [column for column in TRENDING_RANK_COLUMNS if column not in selected])
+
+def load_trending_candidates(trending_days: int, select_query: str):
+    """Public recipes created in the last trending_days days, newest first (ranked per request)"""
+    days_ago = (datetime.now() - timedelta(days=trending_days)).isoformat()
+    result = supabase.table("recipes").select(select_query).eq("is_public", True).gte("created_at", days_ago).order("created_at", desc=True).execute()
+    return result.data or []
+
 @app.get("/recipes")
 async def get_recipes(
     page: int = 1,
     limit: int = 10,
     view: str = "feed",  # feed, trending, following, saved
     trending_days: int = 7,  # 1 for daily, 7 for weekly trending
+    fields: Optional[str] = None,  # card (default), detail, export or a comma-separated field list
+    comments: int = 0,  # preload this many of each recipe's latest comments (as recent_comments)
     current_user = Depends(get_current_user)
 ):
+    base_query = trending_select(fields) if view == "trending" else recipe_select(fields)
+    if not 0 <= comments <= MAX_PRELOADED_COMMENTS:
+        raise HTTPException(status_code=400, detail=f"comments must be between 0 and {MAX_PRELOADED_COMMENTS}")
+    
     try:
         offset = (page - 1) * limit
         print(f"Getting recipes: page={page}, limit={limit}, view={view}, user={current_user.id}")
         
-        base_query = """
-            *, 
-            profiles!recipes_user_id_fkey(id, username, full_name, avatar_url),
-            recipe_votes(vote_type, user_id)
-        """
-        
         if view == "following":
             # Get recipes from followed users
             followed_users_result = supabase.table("follows").select("following_id").eq("follower_id", current_user.id).execute()
@@ -489,17 +857,19 @@ async def get_recipes(
         
         elif view == "trending":
             # Get trending recipes (most upvotes in specified timeframe) 
-            days_ago = (datetime.now() - timedelta(days=trending_days)).isoformat()
+            # All public recipes from the timeframe, shared by every page for TRENDING_CACHE_TTL
+            candidates = TRENDING_CACHE.get_or_load(
+                f"{trending_days}:{base_query}", lambda: load_trending_candidates(trending_days, base_query)
+            )
+            # Copies: the ranking and vote overlay below modify the rows
+            result = type('obj', (object,), {'data': [dict(recipe) for recipe in candidates]})
             
-            # First get all public recipes from specified timeframe
-            result = supabase.table("recipes").select(base_query).eq("is_public", True).gte("created_at", days_ago).order("created_at", desc=True).execute()
-            
-            # Sort by upvote count in Python since Supabase doesn't support complex aggregations in this context
+            # Rank by the recipes' vote counters in Python (the candidate list is cached, the score isn't)
             if result.data:
+                # Rank with buffered votes included
+                with_buffered_votes(result.data)
                 for recipe in result.data:
-                    upvotes = len([v for v in recipe.get("recipe_votes", []) if v["vote_type"] == "up"])
-                    downvotes = len([v for v in recipe.get("recipe_votes", []) if v["vote_type"] == "down"])
-                    recipe["vote_score"] = upvotes - downvotes
+                    recipe["vote_score"] = (recipe.get("upvotes_count") or 0) - (recipe.get("downvotes_count") or 0)
                 
                 # Sort by vote score
                 result.data.sort(key=lambda x: x.get("vote_score", 0), reverse=True)
@@ -520,7 +890,7 @@ async def get_recipes(
                 
                 # Combine and sort by creation date
                 combined_recipes = (followed_result.data or []) + (trending_result.data or [])
-                combined_recipes.sort(key=lambda x: x["created_at"], reverse=True)
+                combined_recipes.sort(key=lambda x: x.get("created_at") or "", reverse=True)
                 
                 result = type('obj', (object,), {'data': combined_recipes[:limit]})
             else:
@@ -528,6 +898,10 @@ async def get_recipes(
                 result = supabase.table("recipes").select(base_query).eq("is_public", True).order("created_at", desc=True).range(offset, offset + limit - 1).execute()
         
         print(f"Recipes result count: {len(result.data) if result.data else 0}")
+        if view != "trending":  # trending applied them before ranking
+            with_buffered_votes(result.data)
+        if comments and result.data:
+            attach_recent_comments(result.data, comments)
         return result.data or []
     except Exception as e:
         print(f"Error getting recipes: {e}")
@@ -535,17 +909,14 @@ async def get_recipes(
         return []
 
 @app.get("/recipes/{recipe_id}")
-async def get_recipe(recipe_id: str):
+async def get_recipe(recipe_id: str, fields: Optional[str] = None):
+    select_query = recipe_select(fields, default="detail")
+    
     try:
-        # Use the same query pattern as other recipe endpoints
-        result = supabase.table("recipes").select("""
-            *, 
-            profiles(id, username, full_name, avatar_url),
-            recipe_votes(id, vote_type, user_id)
-        """).eq("id", recipe_id).single().execute()
+        result = supabase.table("recipes").select(select_query).eq("id", recipe_id).single().execute()
         
         if result.data:
-            return result.data
+            return with_buffered_votes([result.data])[0]
         else:
             raise HTTPException(status_code=404, detail="Recipe not found")
     except Exception as e:
@@ -553,14 +924,12 @@ async def get_recipe(recipe_id: str):
         raise HTTPException(status_code=404, detail="Recipe not found")
 
 @app.get("/recipes/search/{query}")
-async def search_recipes(query: str, limit: int = 10):
+async def search_recipes(query: str, limit: int = 10, fields: Optional[str] = None):
+    select_query = recipe_select(fields)
+    
     try:
-        result = supabase.table("recipes").select("""
-            *, 
-            profiles!recipes_user_id_fkey(id, username, full_name, avatar_url),
-            recipe_votes(vote_type, user_id)
-        """).or_(f"recipe_name.ilike.%{query}%,description.ilike.%{query}%,brewing_notes.ilike.%{query}%").eq("is_public", True).limit(limit).execute()
-        return result.data or []
+        result = supabase.table("recipes").select(select_query).or_(f"recipe_name.ilike.%{query}%,description.ilike.%{query}%,brewing_notes.ilike.%{query}%").eq("is_public", True).limit(limit).execute()
+        return with_buffered_votes(result.data or [])
     except Exception as e:
         print(f"Recipe search error: {e}")
         return []
@@ -572,6 +941,9 @@ async def cast_vote(vote_data: Vote, current_user = Depends(get_current_user)):
         # Ensure user profile exists
         await ensure_user_profile(current_user)
         
+        if vote_buffer:
+            return buffer_vote(vote_data, current_user.id)
+        
         # Check if user already voted
         existing_vote = supabase.table("recipe_votes").select("*").eq("recipe_id", vote_data.recipe_id).eq("user_id", current_user.id).execute()
         
@@ -580,22 +952,155 @@ async def cast_vote(vote_data: Vote, current_user = Depends(get_current_user)):
             if existing_vote.data[0]["vote_type"] == vote_data.vote_type:
                 # Remove vote if same type
                 supabase.table("recipe_votes").delete().eq("id", existing_vote.data[0]["id"]).execute()
+                TRENDING_CACHE.invalidate()
                 return {"message": "Vote removed", "action": "removed"}
             else:
                 # Update vote type
                 result = supabase.table("recipe_votes").update({"vote_type": vote_data.vote_type}).eq("id", existing_vote.data[0]["id"]).execute()
+                TRENDING_CACHE.invalidate()
                 return {"message": "Vote updated", "action": "updated", "vote": result.data[0]}
         else:
             # Create new vote
             vote_dict = vote_data.model_dump()
             vote_dict["user_id"] = current_user.id
             result = supabase.table("recipe_votes").insert(vote_dict).execute()
+            TRENDING_CACHE.invalidate()
             return {"message": "Vote cast", "action": "created", "vote": result.data[0]}
             
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Vote error: {e}")
         raise HTTPException(status_code=400, detail=str(e))
 
+def buffer_vote(vote_data: Vote, user_id: str):
+    """Write-behind path for cast_vote: same toggle rules, written on the next flush"""
+    if vote_data.vote_type not in ("up", "down"):
+        raise HTTPException(status_code=400, detail="vote_type must be 'up' or 'down'")
+    
+    def load_stored():
+        stored = supabase.table("recipe_votes").select("vote_type").eq("recipe_id", vote_data.recipe_id).eq("user_id", user_id).execute()
+        return stored.data[0]["vote_type"] if stored.data else None
+    
+    action, vote_type = vote_buffer.cast(vote_data.recipe_id, user_id, vote_data.vote_type, load_stored)
+    if action == "removed":
+        return {"message": "Vote removed", "action": "removed"}
+    vote = {"recipe_id": vote_data.recipe_id, "user_id": user_id, "vote_type": vote_type}
+    if action == "updated":
+        return {"message": "Vote updated", "action": "updated", "vote": vote}
+    return {"message": "Vote cast", "action": "created", "vote": vote}
+
+# Comment endpoints
+# Longest comment accepted, and the page size bounds for comment threads and feed previews
+MAX_COMMENT_LENGTH = int(os.getenv("MAX_COMMENT_LENGTH", 2000))
+MAX_COMMENT_PAGE_SIZE = 100
+MAX_PRELOADED_COMMENTS = 10
+
+COMMENT_SELECT = "id, recipe_id, user_id, content, created_at, updated_at, profiles(id, username, full_name, avatar_url)"
+
+def attach_recent_comments(recipes, per_recipe: int):
+    """Set recent_comments (oldest first) on each recipe from one get_recent_comments call"""
+    by_recipe = {recipe["id"]: [] for recipe in recipes if recipe.get("id")}
+    try:
+        result = supabase.rpc("get_recent_comments", {"recipe_ids": list(by_recipe), "per_recipe": per_recipe}).execute()
+        for comment in result.data or []:
+            by_recipe.get(comment["recipe_id"], []).append(comment)
+    except Exception as e:
+        # Cards still render without previews; their comments_count is unaffected
+        print(f"Error preloading comments: {e}")
+        return recipes
+    for recipe in recipes:
+        recipe["recent_comments"] = by_recipe.get(recipe.get("id"), [])
+    return recipes
+
+@app.post("/recipes/{recipe_id}/comments")
+async def create_comment(recipe_id: str, comment_data: Comment, current_user = Depends(get_current_user)):
+    content = comment_data.content.strip()
+    if not content:
+        raise HTTPException(status_code=400, detail="Comment cannot be empty")
+    if len(content) > MAX_COMMENT_LENGTH:
+        raise HTTPException(status_code=400, detail=f"Comment is longer than {MAX_COMMENT_LENGTH} characters")
+    
+    try:
+        profile = await ensure_user_profile(current_user)
+        
+        # Only public recipes, or the author's own, can be commented on
+        recipe = supabase.table("recipes").select("id, user_id, is_public").eq("id", recipe_id).limit(1).execute()
+        if not recipe.data or not (recipe.data[0]["is_public"] or recipe.data[0]["user_id"] == current_user.id):
+            raise HTTPException(status_code=404, detail="Recipe not found")
+        
+        result = supabase.table("recipe_comments").insert({
+            "recipe_id": recipe_id,
+            "user_id": current_user.id,
+            "content": content
+        }).execute()
+        if not result.data:
+            raise HTTPException(status_code=400, detail="Failed to add comment")
+        
+        TRENDING_CACHE.invalidate()  # cached cards carry comments_count
+        comment = result.data[0]
+        comment["profiles"] = {key: profile.get(key) for key in ("id", "username", "full_name", "avatar_url")}
+        return comment
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"Comment error: {e}")
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.get("/recipes/{recipe_id}/comments")
+async def get_comments(recipe_id: str, limit: int = 20, cursor: Optional[str] = None, current_user = Depends(get_optional_user)):
+    """A recipe's comments oldest first, paged with keyset pagination on (created_at, id)"""
+    if not 1 <= limit <= MAX_COMMENT_PAGE_SIZE:
+        raise HTTPException(status_code=400, detail=f"limit must be between 1 and {MAX_COMMENT_PAGE_SIZE}")
+    try:
+        after = parse_cursor(cursor) if cursor else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    try:
+        # The service key bypasses RLS: only public recipes' comments, or the author's own, are readable
+        recipe = supabase.table("recipes").select("user_id, is_public").eq("id", recipe_id).limit(1).execute()
+        if not recipe.data or not (recipe.data[0]["is_public"] or (current_user and recipe.data[0]["user_id"] == current_user.id)):
+            raise HTTPException(status_code=404, detail="Recipe not found")
+        
+        # Served by idx_recipe_comments_thread (recipe_id, created_at, id)
+        query = supabase.table("recipe_comments").select(COMMENT_SELECT).eq("recipe_id", recipe_id)
+        if after:
+            query = query.or_(keyset_filter(*after))
+        # One extra row tells whether another page exists
+        rows = query.order("created_at").order("id").limit(limit + 1).execute().data or []
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"Error getting comments for recipe {recipe_id}: {e}")
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    comments = rows[:limit]
+    return {
+        "comments": comments,
+        "next_cursor": make_cursor(comments[-1]) if len(rows) > limit else None
+    }
+
+@app.delete("/comments/{comment_id}")
+async def delete_comment(comment_id: str, current_user = Depends(get_current_user)):
+    """Delete a comment; its author and the recipe's author may"""
+    try:
+        comment = supabase.table("recipe_comments").select("id, user_id, recipes(user_id)").eq("id", comment_id).limit(1).execute()
+        if not comment.data:
+            raise HTTPException(status_code=404, detail="Comment not found")
+        recipe_owner = (comment.data[0].get("recipes") or {}).get("user_id")
+        if current_user.id not in (comment.data[0]["user_id"], recipe_owner):
+            raise HTTPException(status_code=403, detail="Access denied")
+        
+        supabase.table("recipe_comments").delete().eq("id", comment_id).execute()
+        TRENDING_CACHE.invalidate()
+        return {"message": "Comment deleted", "action": "deleted"}
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"Delete comment error: {e}")
+        raise HTTPException(status_code=400, detail=str(e))
+
 # Follow endpoints
 @app.post("/follow/{user_id}")
 async def follow_user(user_id: str, current_user = Depends(get_current_user)):
@@ -634,6 +1139,8 @@ async def follow_user(user_id: str, current_user = Depends(get_current_user)):
 @app.get("/follow-status/{user_id}")
 async def get_follow_status(user_id: str, current_user = Depends(get_current_user)):
     try:
+        if use_direct("status"):
+            return {"following": await direct_db.fetchval("follow_status", current_user.id, user_id)}
         result = supabase.table("follows").select("*").eq("follower_id", current_user.id).eq("following_id", user_id).execute()
         return {"following": len(result.data) > 0}
     except Exception as e:
@@ -643,14 +1150,17 @@ async def get_follow_status(user_id: str, current_user = Depends(get_current_use
 @app.get("/user-stats/{user_id}")
 async def get_user_stats(user_id: str):
     try:
-        followers = supabase.table("follows").select("*", count="exact").eq("following_id", user_id).execute()
-        following = supabase.table("follows").select("*", count="exact").eq("follower_id", user_id).execute()
-        recipes = supabase.table("recipes").select("*", count="exact").eq("user_id", user_id).eq("is_public", True).execute()
+        # Counters are maintained on the profile row by triggers (see migrations/0002_profile_counters.sql)
+        if use_direct("profiles"):
+            stats = await direct_db.fetchrow("user_stats", user_id) or {}
+        else:
+            result = supabase.table("profiles").select("followers_count, following_count, recipes_count").eq("id", user_id).limit(1).execute()
+            stats = result.data[0] if result.data else {}
         
         return {
-            "followers_count": followers.count or 0,
-            "following_count": following.count or 0,
-            "recipes_count": recipes.count or 0
+            "followers_count": stats.get("followers_count") or 0,
+            "following_count": stats.get("following_count") or 0,
+            "recipes_count": stats.get("recipes_count") or 0
         }
     except Exception as e:
         print(f"User stats error: {e}")
@@ -658,21 +1168,86 @@ async def get_user_stats(user_id: str):
 
 # Get user's recipes
 @app.get("/users/{user_id}/recipes")
-async def get_user_recipes(user_id: str, page: int = 1, limit: int = 20):
+async def get_user_recipes(user_id: str, page: int = 1, limit: int = 20, fields: Optional[str] = None):
+    select_query = recipe_select(fields)
+    
     try:
         offset = (page - 1) * limit
         
-        result = supabase.table("recipes").select("""
-            *, 
-            profiles!recipes_user_id_fkey(id, username, full_name, avatar_url),
-            recipe_votes(vote_type, user_id)
-        """).eq("user_id", user_id).eq("is_public", True).order("created_at", desc=True).range(offset, offset + limit - 1).execute()
+        result = supabase.table("recipes").select(select_query).eq("user_id", user_id).eq("is_public", True).order("created_at", desc=True).range(offset, offset + limit - 1).execute()
         
-        return result.data or []
+        return with_buffered_votes(result.data or [])
     except Exception as e:
         print(f"Error getting user recipes: {e}")
         return []
 
+# Rows fetched per keyset page while streaming an export
+EXPORT_PAGE_SIZE = int(os.getenv("EXPORT_PAGE_SIZE", 500))
+
+@app.get("/export/recipes")
+async def export_recipes(
+    format: str = "ndjson",  # ndjson or csv
+    scope: str = "mine",  # mine (including private) or public
+    user_id: Optional[str] = None,  # with scope=public, only this user's recipes
+    cursor: Optional[str] = None,  # "<created_at>|<id>" of the last row received, to resume
+    since: Optional[str] = None,  # created_at lower bound (inclusive)
+    until: Optional[str] = None,  # created_at upper bound (exclusive)
+    fields: Optional[str] = None,  # comma-separated columns; defaults to every recipe column
+    gzip: bool = False,  # download a .gz file
+    current_user = Depends(get_current_user)
+):
+    """Stream recipes oldest first as NDJSON or CSV, paging with keyset pagination on (created_at, id)"""
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail="format must be ndjson or csv")
+    if scope not in ("mine", "public"):
+        raise HTTPException(status_code=400, detail="scope must be mine or public")
+
+    columns = list(RECIPE_PROJECTIONS["export"])
+    if fields:
+        columns = [field.strip() for field in fields.split(",") if field.strip()]
+        unknown = [field for field in columns if field not in RECIPE_COLUMNS]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown recipe fields: {', '.join(unknown)}")
+        # The keyset needs id and created_at on every row
+        columns = [field for field in ("id", "created_at") if field not in columns] + columns
+
+    try:
+        after = parse_cursor(cursor) if cursor else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    select_query = ", ".join(columns)
+
+    def fetch_page(after, limit):
+        query = supabase.table("recipes").select(select_query)
+        if scope == "mine":
+            query = query.eq("user_id", current_user.id)
+        else:
+            query = query.eq("is_public", True)
+            if user_id:
+                query = query.eq("user_id", user_id)
+        if since:
+            query = query.gte("created_at", since)
+        if until:
+            query = query.lt("created_at", until)
+        if after:
+            query = query.or_(keyset_filter(*after))
+        return query.order("created_at").order("id").limit(limit).execute().data or []
+
+    rows = iter_rows(fetch_page, EXPORT_PAGE_SIZE, after)
+    lines = ndjson_lines(rows) if format == "ndjson" else csv_lines(rows, columns)
+    body = chunked(lines)
+
+    media_type, extension = EXPORT_FORMATS[format]
+    filename = f"recipes-{scope}.{extension}"
+    if gzip:
+        body = gzip_stream(body)
+        media_type = "application/gzip"
+        filename += ".gz"
+
+    print(f"Exporting recipes ({scope}, {format}) for user {current_user.id}" + (f" from cursor {cursor}" if cursor else ""))
+    return StreamingResponse(body, media_type=media_type, headers={"Content-Disposition": f'attachment; filename="{filename}"'})
+
 # Get intelligent user recommendations 
 @app.get("/recommended-users")
 async def get_recommended_users(limit: int = 5, current_user = Depends(get_current_user)):
@@ -789,14 +1364,17 @@ async def get_activity_feed(limit: int = 10, current_user = Depends(get_current_
         return []
 
 # Get trending hashtags
+def load_trending_hashtags(limit: int, days_back: int):
+    result = supabase.rpc('get_trending_hashtags', {
+        'limit_count': limit,
+        'days_back': days_back
+    }).execute()
+    return result.data or []
+
 @app.get("/trending-hashtags")
 async def get_trending_hashtags_endpoint(limit: int = 10, days_back: int = 1):
     try:
-        result = supabase.rpc('get_trending_hashtags', {
-            'limit_count': limit,
-            'days_back': days_back
-        }).execute()
-        return result.data or []
+        return HASHTAG_CACHE.get_or_load(f"{limit}:{days_back}", lambda: load_trending_hashtags(limit, days_back))
     except Exception as e:
         print(f"Error getting trending hashtags: {e}")
         # Fallback: get some hashtags from recent recipes
@@ -808,7 +1386,9 @@ async def get_trending_hashtags_endpoint(limit: int = 10, days_back: int = 1):
 
 # Get recipes by hashtag
 @app.get("/recipes/hashtag/{hashtag}")
-async def get_recipes_by_hashtag_endpoint(hashtag: str, sort_by: str = "recent", limit: int = 20):
+async def get_recipes_by_hashtag_endpoint(hashtag: str, sort_by: str = "recent", limit: int = 20, fields: Optional[str] = None):
+    select_query = recipe_select(fields)
+    
     try:
         result = supabase.rpc('get_recipes_by_hashtag', {
             'hashtag_name': hashtag,
@@ -819,13 +1399,9 @@ async def get_recipes_by_hashtag_endpoint(hashtag: str, sort_by: str = "recent",
         # Enhance with profile information
         if result.data:
             recipe_ids = [recipe["recipe_id"] for recipe in result.data]
-            recipes_with_profiles = supabase.table("recipes").select("""
-                *, 
-                profiles!recipes_user_id_fkey(id, username, full_name, avatar_url),
-                recipe_votes(vote_type, user_id)
-            """).in_("id", recipe_ids).execute()
+            recipes_with_profiles = supabase.table("recipes").select(select_query).in_("id", recipe_ids).execute()
             
-            return recipes_with_profiles.data or []
+            return with_buffered_votes(recipes_with_profiles.data or [])
         
         return []
     except Exception as e:
@@ -835,7 +1411,17 @@ async def get_recipes_by_hashtag_endpoint(hashtag: str, sort_by: str = "recent",
 # Serve the frontend at root
 @app.get("/")
 @app.head("/")
-async def serve_frontend():
+async def serve_frontend(request: Request):
+    if ASSET_MANIFEST:
+        # Revalidated on every visit; the hashed assets it references are cached for good
+        return asset_response(
+            os.path.join(DIST_DIR, "index.html"),
+            "text/html; charset=utf-8",
+            ASSET_MANIFEST["index_hash"],
+            request.headers.get("accept-encoding"),
+            request.headers.get("if-none-match"),
+            REVALIDATE,
+        )
     return FileResponse("static/index.html")
 
 # Environment detection
@@ -870,11 +1456,59 @@ async def save_recipe(recipe_id: str, current_user = Depends(get_current_user)):
 @app.get("/save-status/{recipe_id}")
 async def get_save_status(recipe_id: str, current_user = Depends(get_current_user)):
     try:
+        if use_direct("status"):
+            return {"saved": await direct_db.fetchval("save_status", current_user.id, recipe_id)}
         result = supabase.table("saved_recipes").select("*").eq("user_id", current_user.id).eq("recipe_id", recipe_id).execute()
         return {"saved": len(result.data) > 0}
     except Exception as e:
         return {"saved": False}
 
+# Batch saved/voted/following status for many recipes and users in one request
+@app.post("/status/batch")
+async def get_status_batch(status_request: StatusBatchRequest, current_user = Depends(get_current_user)):
+    # Preserve order while dropping duplicates
+    recipe_ids = list(dict.fromkeys(status_request.recipe_ids))
+    user_ids = list(dict.fromkeys(status_request.user_ids))
+    
+    if len(recipe_ids) > MAX_STATUS_BATCH_IDS or len(user_ids) > MAX_STATUS_BATCH_IDS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_STATUS_BATCH_IDS} recipe_ids and user_ids per request")
+    
+    saved = {recipe_id: False for recipe_id in recipe_ids}
+    votes = {recipe_id: None for recipe_id in recipe_ids}
+    following = {user_id: False for user_id in user_ids}
+    
+    try:
+        # One in_() query per table, regardless of how many ids were asked for
+        direct = use_direct("status")
+        if recipe_ids:
+            if direct:
+                saved_rows = await direct_db.fetch("saved_batch", current_user.id, recipe_ids)
+                vote_rows = await direct_db.fetch("votes_batch", current_user.id, recipe_ids)
+            else:
+                saved_rows = supabase.table("saved_recipes").select("recipe_id").eq("user_id", current_user.id).in_("recipe_id", recipe_ids).execute().data
+                vote_rows = supabase.table("recipe_votes").select("recipe_id, vote_type").eq("user_id", current_user.id).in_("recipe_id", recipe_ids).execute().data
+            for row in saved_rows or []:
+                saved[row["recipe_id"]] = True
+            for row in vote_rows or []:
+                votes[row["recipe_id"]] = row["vote_type"]
+            if vote_buffer:
+                for recipe_id in recipe_ids:
+                    buffered, vote_type = vote_buffer.user_vote(recipe_id, current_user.id)
+                    if buffered:
+                        votes[recipe_id] = vote_type
+        
+        if user_ids:
+            if direct:
+                follow_rows = await direct_db.fetch("following_batch", current_user.id, user_ids)
+            else:
+                follow_rows = supabase.table("follows").select("following_id").eq("follower_id", current_user.id).in_("following_id", user_ids).execute().data
+            for row in follow_rows or []:
+                following[row["following_id"]] = True
+    except Exception as e:
+        print(f"Batch status error: {e}")
+    
+    return {"saved": saved, "votes": votes, "following": following}
+
 # Health check
 @app.get("/health")
 async def health_check():
@@ -884,6 +1518,64 @@ async def health_check():
         "timestamp": datetime.now().isoformat()
     }
 
+# Prometheus metrics
+@app.get("/metrics")
+async def metrics():
+    return PlainTextResponse(await asyncio.to_thread(WORKER_METRICS.render), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+# Profiling (admin only)
+@app.get("/admin/profiles")
+async def list_profiles(_: None = Depends(require_admin)):
+    return {"profiles": PROFILES.list()}
+
+@app.get("/admin/profiles/{profile_id}")
+async def get_profile(profile_id: str, _: None = Depends(require_admin)):
+    """Collapsed stacks for one profile; pipe into flamegraph.pl or load into speedscope"""
+    profile = PROFILES.get(profile_id)
+    if not profile:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return PlainTextResponse(profile["collapsed"])
+
+@app.post("/admin/profiles/session")
+async def start_profiling_session(seconds: int = 30, _: None = Depends(require_admin)):
+    """Sample every thread in this worker for a fixed time; the result appears in /admin/profiles"""
+    session = start_session(seconds, PROFILE_SAMPLE_INTERVAL)
+    if not session:
+        raise HTTPException(status_code=409, detail="A profiling session is already running")
+    return session
+
+# Admission limits (admin only); changes go through the shared store and reach every worker
+class LimitUpdate(BaseModel):
+    route: str  # route template, or route[variant] such as /recipes[trending]
+    max_concurrency: Optional[int] = None
+    max_queue: int = 0
+    queue_timeout: float = 2.0
+    rate: Optional[float] = None
+    burst: Optional[int] = None
+    per_user_concurrency: Optional[int] = None
+    per_user_rate: Optional[float] = None
+    per_user_burst: Optional[int] = None
+
+@app.get("/admin/limits")
+async def get_limits(_: None = Depends(require_admin)):
+    await asyncio.to_thread(LIMIT_OVERRIDES.refresh)
+    return {"enabled": ADMISSION_CONTROL, "limits": admission_snapshot()}
+
+@app.put("/admin/limits")
+async def set_limit(update: LimitUpdate, _: None = Depends(require_admin)):
+    """Replace one route's limits; omitted settings fall back to their defaults (no limit)"""
+    settings = update.model_dump(exclude={"route"})
+    if any(value is not None and value < 0 for value in settings.values()):
+        raise HTTPException(status_code=400, detail="Limits must not be negative")
+    await asyncio.to_thread(LIMIT_OVERRIDES.set, update.route, settings)
+    return {"route": update.route, "limits": admission_snapshot()[update.route]}
+
+@app.delete("/admin/limits")
+async def delete_limit(route: str, _: None = Depends(require_admin)):
+    if not await asyncio.to_thread(LIMIT_OVERRIDES.remove, route):
+        raise HTTPException(status_code=404, detail="No limits configured for this route")
+    return {"route": route, "removed": True}
+
 # Environment info endpoint
 @app.get("/env")
 async def environment_info():
@@ -913,6 +1605,78 @@ async def test_database():
             "supabase_key": os.getenv("SUPABASE_SERVICE_KEY") is not None
         }
 
+# Worker lifecycle (see lifespan at the top): warm up before serving, release resources on exit
+def warm_connection():
+    """One cheap query; run several at once so the pool holds that many open connections"""
+    supabase.table("profiles").select("id").limit(1).execute()
+
+def warm_caches():
+    """Fill the caches the home and trending pages hit first"""
+    select_query = trending_select()
+    for trending_days in (7, 1):  # the weekly and daily tabs
+        TRENDING_CACHE.set(f"{trending_days}:{select_query}", load_trending_candidates(trending_days, select_query))
+    for days_back in (1, 7):
+        HASHTAG_CACHE.set(f"10:{days_back}", load_trending_hashtags(10, days_back))
+
+    # Profiles of the authors on the weekly trending page, in one round trip
+    weekly = TRENDING_CACHE.get(f"7:{select_query}") or []
+    author_ids = list(dict.fromkeys(recipe["user_id"] for recipe in weekly if recipe.get("user_id")))[:MAX_STATUS_BATCH_IDS]
+    if author_ids:
+        profiles = supabase.table("profiles").select(PUBLIC_PROFILE_COLUMNS).in_("id", author_ids).execute()
+        for profile in profiles.data or []:
+            PROFILE_CACHE.set(profile["id"], profile)
+
+async def warm_up():
+    started = time.perf_counter()
+    try:
+        await asyncio.gather(*(asyncio.to_thread(warm_connection) for _ in range(WARM_CONNECTIONS)))
+        await asyncio.to_thread(warm_caches)
+        record_startup("warmup", time.perf_counter() - started)
+    except Exception as e:
+        print(f"Warm-up failed (serving cold): {e}")
+
+async def start_worker():
+    if supabase.closed:  # a previous lifespan in this process closed it
+        reconnect_supabase()
+    loaded = load_snapshot(CACHE_SNAPSHOT_PATH, CACHE_SNAPSHOT_MAX_AGE)
+    if loaded:
+        print(f"Loaded {loaded} cache entries from {CACHE_SNAPSHOT_PATH}")
+    await CACHE_INVALIDATIONS.start()  # drops snapshot entries other workers invalidated since
+    if direct_db:
+        await direct_db.start()  # opens DIRECT_DB_POOL_MIN connections with statements prepared
+    if STARTUP_WARMUP:
+        # Serve once warm, or after WARMUP_TIMEOUT with the warm-up finishing in the background
+        warmup = app.state.warmup = asyncio.create_task(warm_up())
+        await asyncio.wait({warmup}, timeout=WARMUP_TIMEOUT)
+        if not warmup.done():
+            print(f"Warm-up still running after {WARMUP_TIMEOUT:g}s, serving anyway")
+    if vote_buffer:
+        vote_buffer.start()
+    if ADMISSION_CONTROL:
+        await LIMIT_OVERRIDES.start()
+    WORKER_METRICS.start()
+    ready = process_age()
+    if ready is not None:
+        record_startup("ready", ready)
+
+async def stop_worker():
+    await CACHE_INVALIDATIONS.stop()
+    await LIMIT_OVERRIDES.stop()
+    await WORKER_METRICS.stop()
+    if vote_buffer:
+        await vote_buffer.stop()
+    shutdown_pool()
+    if direct_db:
+        await direct_db.close()
+    try:
+        saved = save_snapshot(CACHE_SNAPSHOT_PATH)
+        print(f"Saved {saved} cache entries to {CACHE_SNAPSHOT_PATH}")
+    except OSError as e:
+        print(f"Could not save cache snapshot: {e}")
+    supabase.close(close_client)
+
+record_startup("import", time.perf_counter() - IMPORT_STARTED)
+
 if __name__ == "__main__":
     import uvicorn
     port = int(os.getenv("PORT", 8000))
@@ -926,4 +1690,8 @@ if __name__ == "__main__":
     print(f"❤️  Health Check: http://localhost:{port}/health")
     print("="*50)
     
-    uvicorn.run(app, host="0.0.0.0", port=port) 
\ No newline at end of file
+    # Several processes need an import string; production uses gunicorn.conf.py instead
+    workers = int(os.getenv("WEB_CONCURRENCY", 1))
+    if workers > 1 and VOTE_WRITE_BEHIND:
+        raise SystemExit("❌ VOTE_WRITE_BEHIND buffers votes in one process; set WEB_CONCURRENCY=1 or turn it off")
+    uvicorn.run("main:app" if workers > 1 else app, host="0.0.0.0", port=port, workers=workers) 
\ No newline at end of file
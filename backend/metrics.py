@@ -0,0 +1,311 @@
+"""
+Prometheus-style metrics for What'sYourRecipe
+Minimal in-process counters, gauges and histograms with text exposition, plus the HTTP middleware.
+With several workers, WorkerMetrics publishes each worker's samples to the shared store so that
+any worker's /metrics answers with every worker's series, labelled worker="<pid>".
+"""
+
+import asyncio
+import os
+import threading
+import time
+
+from starlette.routing import Match
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _format_labels(labelnames, labelvalues, *extra):
+    pairs = list(zip(labelnames, labelvalues)) + [pair for pair in extra if pair]
+    if not pairs:
+        return ""
+    escaped = (
+        (name, str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"'))
+        for name, value in pairs
+    )
+    return "{" + ",".join(f'{name}="{value}"' for name, value in escaped) + "}"
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+        REGISTRY.register(self)
+
+    def _key(self, labels):
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def header(self):
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+    def render(self):
+        return self.header() + self.samples()
+
+    def samples(self, extra=None):
+        """Sample lines; extra is one more (name, value) label, e.g. the worker"""
+        with self._lock:
+            items = list(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, labelvalues, extra)} {value}" for labelvalues, value in items]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self._values.get(self._key(labels), 0)
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def value(self, **labels):
+        return self._values.get(self._key(labels), 0)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * len(self.buckets), 0, 0.0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[0][index] += 1
+                    break
+            state[1] += 1
+            state[2] += value
+
+    def samples(self, extra=None):
+        lines = []
+        with self._lock:
+            items = [(key, (list(state[0]), state[1], state[2])) for key, state in self._values.items()]
+        for labelvalues, (bucket_counts, count, total) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, bucket_counts):
+                cumulative += bucket_count
+                labels = _format_labels(self.labelnames, labelvalues, extra, ("le", repr(bound)))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, labelvalues, extra, ("le", "+Inf"))
+            lines.append(f"{self.name}_bucket{labels} {count}")
+            plain = _format_labels(self.labelnames, labelvalues, extra)
+            lines.append(f"{self.name}_count{plain} {count}")
+            lines.append(f"{self.name}_sum{plain} {total}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+
+    def render(self):
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def samples(self, worker):
+        """{metric name: sample lines} labelled with the worker, as WorkerMetrics publishes them"""
+        return {metric.name: metric.samples(("worker", worker)) for metric in self._metrics}
+
+    def render_workers(self, snapshots):
+        """Exposition text for several workers' published samples, one HELP/TYPE per metric"""
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.header())
+            for snapshot in snapshots:
+                lines.extend(snapshot.get(metric.name, []))
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+
+class WorkerMetrics:
+    """Shares this worker's samples through the shared store; a worker that stops publishing drops out after 3 intervals"""
+
+    def __init__(self, store, registry=REGISTRY, interval=5.0):
+        self.store = store
+        self.registry = registry
+        self.interval = interval
+        self._task = None
+
+    def _key(self):
+        return f"metrics:{os.getpid()}"  # read per call: workers fork after this is created
+
+    def publish(self):
+        self.store.set(self._key(), self.registry.samples(str(os.getpid())), self.interval * 3)
+
+    def render(self):
+        """Every live worker's series, with this worker's current and the others' last published"""
+        self.publish()
+        return self.registry.render_workers([snapshot for _, snapshot in sorted(self.store.scan("metrics:"))])
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await asyncio.to_thread(self.publish)
+            except Exception as e:
+                print(f"Could not publish metrics: {e}")
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        try:
+            await asyncio.to_thread(self.store.delete, self._key())
+        except Exception as e:
+            print(f"Could not remove published metrics: {e}")
+
+# HTTP
+HTTP_REQUESTS = Counter("http_requests_total", "HTTP requests handled", ("method", "route", "status"))
+HTTP_LATENCY = Histogram("http_request_duration_seconds", "HTTP request latency", ("method", "route"))
+HTTP_IN_FLIGHT = Gauge("http_requests_in_flight", "HTTP requests currently being handled", ("method", "route"))
+
+# Upstream Supabase calls
+UPSTREAM_CALLS = Counter("supabase_calls_total", "Supabase round trips", ("kind", "target", "operation", "outcome"))
+UPSTREAM_LATENCY = Histogram("supabase_call_duration_seconds", "Supabase round-trip latency", ("kind", "target", "operation"))
+UPSTREAM_BYTES = Counter("supabase_payload_bytes_total", "Response body bytes returned by Supabase", ("kind", "target", "operation"))
+
+# Caches
+CACHE_HITS = Counter("cache_hits_total", "Cache hits", ("cache",))
+CACHE_MISSES = Counter("cache_misses_total", "Cache misses", ("cache",))
+
+# Vote write-behind buffer (vote_buffer.py)
+VOTE_INTENTS = Counter("vote_intents_total", "Votes accepted into the write-behind buffer", ("outcome",))
+VOTE_FLUSHES = Counter("vote_flushes_total", "Write-behind vote flushes", ("outcome",))
+VOTE_BUFFERED = Gauge("votes_buffered", "Net vote changes waiting to be flushed")
+
+# Admission control (admission.py); outcome is admitted or the reason a request was shed
+ADMISSION_DECISIONS = Counter("admission_decisions_total", "Admission decisions per limited route", ("route", "outcome"))
+ADMISSION_ACTIVE = Gauge("admission_active_requests", "Admitted requests running per limited route", ("route",))
+ADMISSION_QUEUED = Gauge("admission_queued_requests", "Requests waiting for a slot per limited route", ("route",))
+ADMISSION_QUEUE_WAIT = Histogram("admission_queue_wait_seconds", "Time queued requests waited for a slot", ("route",))
+
+
+# Cold start (see the lifespan in main.py)
+STARTUP_SECONDS = Gauge("process_startup_seconds", "Cold start timings of this process", ("phase",))
+
+_first_request = {"pending": True}
+
+
+def record_startup(phase, seconds):
+    """Report one cold start phase: import, warmup, ready or first_request"""
+    STARTUP_SECONDS.set(round(seconds, 4), phase=phase)
+    print(f"⏱️  Startup {phase}: {seconds * 1000:.0f}ms")
+
+
+def process_age():
+    """Seconds since this process started (forked workers count from the fork), or None off Linux"""
+    try:
+        with open("/proc/self/stat") as f:
+            # Fields after the parenthesised command name; starttime is field 22 overall
+            started_ticks = int(f.read().rsplit(")", 1)[1].split()[19])
+        with open("/proc/uptime") as f:
+            uptime = float(f.read().split()[0])
+        return uptime - started_ticks / os.sysconf("SC_CLK_TCK")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def record_cache(cache, hit):
+    """Count a lookup against a named cache"""
+    (CACHE_HITS if hit else CACHE_MISSES).inc(cache=cache)
+
+
+def observe_upstream_call(call):
+    """Supabase instrumentation listener (see supabase_instrumentation.py)"""
+    UPSTREAM_CALLS.inc(kind=call.kind, target=call.target, operation=call.operation, outcome="error" if call.error else "ok")
+    UPSTREAM_LATENCY.observe(call.duration, kind=call.kind, target=call.target, operation=call.operation)
+    if call.payload_bytes:
+        UPSTREAM_BYTES.inc(call.payload_bytes, kind=call.kind, target=call.target, operation=call.operation)
+
+
+def route_template(app, scope):
+    """Resolve the route path template for a request (e.g. /recipes/{recipe_id})"""
+    template = scope.get("route_template")
+    if template is None:
+        template = "unmatched"
+        for route in app.router.routes:
+            match, _ = route.matches(scope)
+            if match == Match.FULL:
+                template = route.path
+                break
+        # Cache on the scope so other middleware doesn't repeat the match
+        scope["route_template"] = template
+    return template
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording request count, latency and in-flight requests per route template"""
+
+    def __init__(self, app, fastapi_app):
+        self.app = app
+        self.fastapi_app = fastapi_app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        route = route_template(self.fastapi_app, scope)
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        HTTP_IN_FLIGHT.inc(method=method, route=route)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_IN_FLIGHT.dec(method=method, route=route)
+            HTTP_LATENCY.observe(time.perf_counter() - start, method=method, route=route)
+            HTTP_REQUESTS.inc(method=method, route=route, status=status["code"])
+            if _first_request["pending"]:
+                _first_request["pending"] = False
+                record_startup("first_request", time.perf_counter() - start)
@@ -0,0 +1,311 @@
+-- Base schema: profiles, recipes, votes, follows, saved recipes, activities, hashtags and comments
+-- Applied by: python db_manager.py migrate (or run it in your Supabase SQL Editor)
+-- Safe to run multiple times: tables and indexes are created if missing and policies are recreated
+
+-- Create profiles table if not exists
+CREATE TABLE IF NOT EXISTS public.profiles (
+    id UUID REFERENCES auth.users(id) ON DELETE CASCADE PRIMARY KEY,
+    username VARCHAR(50) UNIQUE NOT NULL,
+    full_name VARCHAR(100),
+    bio TEXT,
+    avatar_url TEXT,
+    followers_count INTEGER NOT NULL DEFAULT 0,
+    following_count INTEGER NOT NULL DEFAULT 0,
+    recipes_count INTEGER NOT NULL DEFAULT 0,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+-- Create indexes for better performance
+CREATE INDEX IF NOT EXISTS idx_profiles_username ON public.profiles(username);
+CREATE INDEX IF NOT EXISTS idx_profiles_created_at ON public.profiles(created_at);
+
+-- Enable Row Level Security
+ALTER TABLE public.profiles ENABLE ROW LEVEL SECURITY;
+
+-- Create policies
+DROP POLICY IF EXISTS "Public profiles are viewable by everyone" ON public.profiles;
+CREATE POLICY "Public profiles are viewable by everyone"
+ON public.profiles FOR SELECT
+USING (true);
+
+DROP POLICY IF EXISTS "Users can update own profile" ON public.profiles;
+CREATE POLICY "Users can update own profile"
+ON public.profiles FOR UPDATE
+USING (auth.uid() = id);
+
+DROP POLICY IF EXISTS "Users can insert own profile" ON public.profiles;
+CREATE POLICY "Users can insert own profile"
+ON public.profiles FOR INSERT
+WITH CHECK (auth.uid() = id);
+
+-- Older profiles tables predate avatars
+ALTER TABLE public.profiles ADD COLUMN IF NOT EXISTS avatar_url TEXT;
+
+-- Create recipes table if not exists
+CREATE TABLE IF NOT EXISTS public.recipes (
+    id UUID DEFAULT gen_random_uuid() PRIMARY KEY,
+    user_id UUID REFERENCES auth.users(id) ON DELETE CASCADE NOT NULL,
+    recipe_name VARCHAR(200) NOT NULL,
+    description TEXT NOT NULL,
+    rating DECIMAL(3,1) CHECK (rating >= 1 AND rating <= 10),
+    date_created DATE,
+    is_public BOOLEAN DEFAULT true,
+
+    -- Bean information
+    bean_variety VARCHAR(100),
+    bean_region VARCHAR(100),
+    india_estate VARCHAR(100),
+    processing_type VARCHAR(100),
+
+    -- Roasting profile
+    roast_type VARCHAR(100),
+    roast_level VARCHAR(100),
+    crack_time VARCHAR(50),
+    roast_time DECIMAL(5,2),
+    development_time DECIMAL(5,2),
+
+    -- Brewing parameters
+    brew_method VARCHAR(100),
+    grind_microns INTEGER,
+    water_composition VARCHAR(100),
+    tds DECIMAL(5,2),
+    calcium DECIMAL(5,2),
+    magnesium DECIMAL(5,2),
+    potassium DECIMAL(5,2),
+    sodium DECIMAL(5,2),
+    coffee_amount DECIMAL(6,2),
+    water_amount DECIMAL(8,2),
+    water_temp INTEGER,
+    brew_time DECIMAL(6,2),
+
+    -- Serving preferences
+    milk_preference VARCHAR(100),
+    serving_temp VARCHAR(50),
+    sweetener VARCHAR(100),
+    sweetener_quantity DECIMAL(5,2),
+    serving_size DECIMAL(6,2),
+
+    -- Sensory & evaluation
+    aroma_notes TEXT,
+    body VARCHAR(100),
+    acidity_type VARCHAR(100),
+    sweetness VARCHAR(100),
+    balance VARCHAR(100),
+    aftertaste VARCHAR(100),
+    clean_cup VARCHAR(100),
+    uniformity VARCHAR(100),
+    cupping_score DECIMAL(5,2) CHECK (cupping_score >= 0 AND cupping_score <= 100),
+    cupping_method VARCHAR(100),
+    defects TEXT,
+    overall_impression TEXT,
+
+    -- Additional notes
+    brewing_notes TEXT,
+
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+-- Create indexes
+CREATE INDEX IF NOT EXISTS idx_recipes_user_id ON public.recipes(user_id);
+CREATE INDEX IF NOT EXISTS idx_recipes_created_at ON public.recipes(created_at);
+CREATE INDEX IF NOT EXISTS idx_recipes_is_public ON public.recipes(is_public);
+CREATE INDEX IF NOT EXISTS idx_recipes_rating ON public.recipes(rating);
+
+-- Enable Row Level Security
+ALTER TABLE public.recipes ENABLE ROW LEVEL SECURITY;
+
+-- Create policies
+DROP POLICY IF EXISTS "Public recipes are viewable by everyone" ON public.recipes;
+CREATE POLICY "Public recipes are viewable by everyone"
+ON public.recipes FOR SELECT
+USING (is_public = true OR auth.uid() = user_id);
+
+DROP POLICY IF EXISTS "Users can manage own recipes" ON public.recipes;
+CREATE POLICY "Users can manage own recipes"
+ON public.recipes FOR ALL
+USING (auth.uid() = user_id);
+
+-- Create recipe votes table
+CREATE TABLE IF NOT EXISTS public.recipe_votes (
+    id UUID DEFAULT gen_random_uuid() PRIMARY KEY,
+    recipe_id UUID REFERENCES public.recipes(id) ON DELETE CASCADE NOT NULL,
+    user_id UUID REFERENCES auth.users(id) ON DELETE CASCADE NOT NULL,
+    vote_type VARCHAR(10) CHECK (vote_type IN ('up', 'down')) NOT NULL,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    UNIQUE(recipe_id, user_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_recipe_votes_recipe_id ON public.recipe_votes(recipe_id);
+CREATE INDEX IF NOT EXISTS idx_recipe_votes_user_id ON public.recipe_votes(user_id);
+
+-- Enable RLS
+ALTER TABLE public.recipe_votes ENABLE ROW LEVEL SECURITY;
+
+-- Policies
+DROP POLICY IF EXISTS "Recipe votes are viewable by everyone" ON public.recipe_votes;
+CREATE POLICY "Recipe votes are viewable by everyone"
+ON public.recipe_votes FOR SELECT
+USING (true);
+
+DROP POLICY IF EXISTS "Users can manage own votes" ON public.recipe_votes;
+CREATE POLICY "Users can manage own votes"
+ON public.recipe_votes FOR ALL
+USING (auth.uid() = user_id);
+
+-- Create follows table
+CREATE TABLE IF NOT EXISTS public.follows (
+    id UUID DEFAULT gen_random_uuid() PRIMARY KEY,
+    follower_id UUID REFERENCES auth.users(id) ON DELETE CASCADE NOT NULL,
+    following_id UUID REFERENCES auth.users(id) ON DELETE CASCADE NOT NULL,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    UNIQUE(follower_id, following_id),
+    CHECK (follower_id != following_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_follows_follower_id ON public.follows(follower_id);
+CREATE INDEX IF NOT EXISTS idx_follows_following_id ON public.follows(following_id);
+
+-- Enable RLS
+ALTER TABLE public.follows ENABLE ROW LEVEL SECURITY;
+
+-- Policies
+DROP POLICY IF EXISTS "Follows are viewable by everyone" ON public.follows;
+CREATE POLICY "Follows are viewable by everyone"
+ON public.follows FOR SELECT
+USING (true);
+
+DROP POLICY IF EXISTS "Users can manage own follows" ON public.follows;
+CREATE POLICY "Users can manage own follows"
+ON public.follows FOR ALL
+USING (auth.uid() = follower_id);
+
+-- Create saved recipes table
+CREATE TABLE IF NOT EXISTS public.saved_recipes (
+    id UUID DEFAULT gen_random_uuid() PRIMARY KEY,
+    user_id UUID REFERENCES auth.users(id) ON DELETE CASCADE NOT NULL,
+    recipe_id UUID REFERENCES public.recipes(id) ON DELETE CASCADE NOT NULL,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    UNIQUE(user_id, recipe_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_saved_recipes_user_id ON public.saved_recipes(user_id);
+CREATE INDEX IF NOT EXISTS idx_saved_recipes_recipe_id ON public.saved_recipes(recipe_id);
+
+-- Enable RLS
+ALTER TABLE public.saved_recipes ENABLE ROW LEVEL SECURITY;
+
+-- Policies
+DROP POLICY IF EXISTS "Users can manage own saved recipes" ON public.saved_recipes;
+CREATE POLICY "Users can manage own saved recipes"
+ON public.saved_recipes FOR ALL
+USING (auth.uid() = user_id);
+
+-- Create activities table
+CREATE TABLE IF NOT EXISTS public.activities (
+    id UUID DEFAULT gen_random_uuid() PRIMARY KEY,
+    user_id UUID REFERENCES auth.users(id) ON DELETE CASCADE NOT NULL,
+    activity_type VARCHAR(50) NOT NULL,
+    content TEXT,
+    recipe_id UUID REFERENCES public.recipes(id) ON DELETE CASCADE,
+    target_user_id UUID REFERENCES auth.users(id) ON DELETE CASCADE,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_activities_user_id ON public.activities(user_id);
+CREATE INDEX IF NOT EXISTS idx_activities_created_at ON public.activities(created_at);
+CREATE INDEX IF NOT EXISTS idx_activities_type ON public.activities(activity_type);
+
+-- Enable RLS
+ALTER TABLE public.activities ENABLE ROW LEVEL SECURITY;
+
+-- Policies
+DROP POLICY IF EXISTS "Activities are viewable by followers" ON public.activities;
+CREATE POLICY "Activities are viewable by followers"
+ON public.activities FOR SELECT
+USING (
+    auth.uid() = user_id OR
+    EXISTS (
+        SELECT 1 FROM public.follows
+        WHERE follower_id = auth.uid() AND following_id = user_id
+    )
+);
+
+DROP POLICY IF EXISTS "Users can create own activities" ON public.activities;
+CREATE POLICY "Users can create own activities"
+ON public.activities FOR INSERT
+WITH CHECK (auth.uid() = user_id);
+
+-- Create hashtags table
+CREATE TABLE IF NOT EXISTS public.hashtags (
+    id UUID DEFAULT gen_random_uuid() PRIMARY KEY,
+    tag VARCHAR(100) UNIQUE NOT NULL,
+    usage_count INTEGER DEFAULT 1,
+    last_used TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_hashtags_tag ON public.hashtags(tag);
+CREATE INDEX IF NOT EXISTS idx_hashtags_usage_count ON public.hashtags(usage_count);
+CREATE INDEX IF NOT EXISTS idx_hashtags_last_used ON public.hashtags(last_used);
+
+-- Enable RLS
+ALTER TABLE public.hashtags ENABLE ROW LEVEL SECURITY;
+
+-- Policies
+DROP POLICY IF EXISTS "Hashtags are viewable by everyone" ON public.hashtags;
+CREATE POLICY "Hashtags are viewable by everyone"
+ON public.hashtags FOR SELECT
+USING (true);
+
+-- Create recipe hashtag links
+CREATE TABLE IF NOT EXISTS public.recipe_hashtags (
+    id UUID DEFAULT gen_random_uuid() PRIMARY KEY,
+    recipe_id UUID REFERENCES public.recipes(id) ON DELETE CASCADE NOT NULL,
+    hashtag_id UUID REFERENCES public.hashtags(id) ON DELETE CASCADE NOT NULL,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    UNIQUE(recipe_id, hashtag_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_recipe_hashtags_recipe ON public.recipe_hashtags(recipe_id);
+CREATE INDEX IF NOT EXISTS idx_recipe_hashtags_hashtag ON public.recipe_hashtags(hashtag_id);
+
+-- Enable RLS
+ALTER TABLE public.recipe_hashtags ENABLE ROW LEVEL SECURITY;
+
+-- Policies
+DROP POLICY IF EXISTS "Anyone can view recipe hashtags" ON public.recipe_hashtags;
+CREATE POLICY "Anyone can view recipe hashtags"
+ON public.recipe_hashtags FOR SELECT
+USING (true);
+
+-- Create recipe comments table
+CREATE TABLE IF NOT EXISTS public.recipe_comments (
+    id UUID DEFAULT gen_random_uuid() PRIMARY KEY,
+    recipe_id UUID REFERENCES public.recipes(id) ON DELETE CASCADE NOT NULL,
+    user_id UUID REFERENCES public.profiles(id) ON DELETE CASCADE NOT NULL,
+    content TEXT NOT NULL,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+-- Enable RLS
+ALTER TABLE public.recipe_comments ENABLE ROW LEVEL SECURITY;
+
+-- Policies
+DROP POLICY IF EXISTS "Anyone can view comments on public recipes" ON public.recipe_comments;
+CREATE POLICY "Anyone can view comments on public recipes"
+ON public.recipe_comments FOR SELECT
+USING (
+    EXISTS (
+        SELECT 1 FROM public.recipes
+        WHERE recipes.id = recipe_comments.recipe_id
+        AND (recipes.is_public = true OR recipes.user_id = auth.uid())
+    )
+);
+
+DROP POLICY IF EXISTS "Users can manage own comments" ON public.recipe_comments;
+CREATE POLICY "Users can manage own comments"
+ON public.recipe_comments FOR ALL
+USING (auth.uid() = user_id);
@@ -0,0 +1,73 @@
+-- Add trigger-maintained follower/following/recipe counters to profiles
+-- Applied by: python db_manager.py migrate (or run it in your Supabase SQL Editor)
+-- Safe to run multiple times: columns are added if missing and counters are re-backfilled
+
+ALTER TABLE public.profiles ADD COLUMN IF NOT EXISTS followers_count INTEGER NOT NULL DEFAULT 0;
+ALTER TABLE public.profiles ADD COLUMN IF NOT EXISTS following_count INTEGER NOT NULL DEFAULT 0;
+ALTER TABLE public.profiles ADD COLUMN IF NOT EXISTS recipes_count INTEGER NOT NULL DEFAULT 0;
+
+-- Function to maintain follower/following counters on profiles
+CREATE OR REPLACE FUNCTION public.handle_follow_counts()
+RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        UPDATE public.profiles SET followers_count = followers_count + 1 WHERE id = NEW.following_id;
+        UPDATE public.profiles SET following_count = following_count + 1 WHERE id = NEW.follower_id;
+        RETURN NEW;
+    ELSIF TG_OP = 'DELETE' THEN
+        UPDATE public.profiles SET followers_count = GREATEST(followers_count - 1, 0) WHERE id = OLD.following_id;
+        UPDATE public.profiles SET following_count = GREATEST(following_count - 1, 0) WHERE id = OLD.follower_id;
+        RETURN OLD;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+DROP TRIGGER IF EXISTS on_follow_counts_changed ON public.follows;
+CREATE TRIGGER on_follow_counts_changed
+    AFTER INSERT OR DELETE ON public.follows
+    FOR EACH ROW EXECUTE PROCEDURE public.handle_follow_counts();
+
+-- Function to maintain the public recipe counter on profiles
+CREATE OR REPLACE FUNCTION public.handle_recipe_counts()
+RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.is_public = true THEN
+        UPDATE public.profiles SET recipes_count = GREATEST(recipes_count - 1, 0) WHERE id = OLD.user_id;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.is_public = true THEN
+        UPDATE public.profiles SET recipes_count = recipes_count + 1 WHERE id = NEW.user_id;
+    END IF;
+    RETURN COALESCE(NEW, OLD);
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+DROP TRIGGER IF EXISTS on_recipe_counts_changed ON public.recipes;
+CREATE TRIGGER on_recipe_counts_changed
+    AFTER INSERT OR DELETE ON public.recipes
+    FOR EACH ROW EXECUTE PROCEDURE public.handle_recipe_counts();
+
+DROP TRIGGER IF EXISTS on_recipe_visibility_changed ON public.recipes;
+CREATE TRIGGER on_recipe_visibility_changed
+    AFTER UPDATE OF is_public, user_id ON public.recipes
+    FOR EACH ROW
+    WHEN (OLD.is_public IS DISTINCT FROM NEW.is_public OR OLD.user_id IS DISTINCT FROM NEW.user_id)
+    EXECUTE PROCEDURE public.handle_recipe_counts();
+
+-- Backfill counters from the current data (one set-based pass per counter)
+UPDATE public.profiles p SET
+    followers_count = COALESCE((SELECT COUNT(*) FROM public.follows f WHERE f.following_id = p.id), 0),
+    following_count = COALESCE((SELECT COUNT(*) FROM public.follows f WHERE f.follower_id = p.id), 0),
+    recipes_count = COALESCE((SELECT COUNT(*) FROM public.recipes r WHERE r.user_id = p.id AND r.is_public = true), 0);
+
+-- Point the user_stats view at the maintained counters (bigint, as the COUNT(*) columns it replaces
+-- were: CREATE OR REPLACE VIEW can't change a column's type)
+CREATE OR REPLACE VIEW public.user_stats AS
+SELECT
+    p.id,
+    p.username,
+    p.full_name,
+    p.recipes_count::bigint as recipe_count,
+    p.followers_count::bigint as follower_count,
+    p.following_count::bigint as following_count
+FROM public.profiles p;
@@ -0,0 +1,96 @@
+-- Move hashtag extraction out of the recipe triggers and into the app (see hashtags.py)
+-- Applied by: python db_manager.py migrate (or run it in your Supabase SQL Editor)
+-- Safe to run multiple times: usage counts are recomputed from the current links
+
+-- The per-row extraction triggers deleted and re-inserted every link on each write and
+-- bumped usage_count every time; the app now calls sync_recipe_hashtags instead
+DROP TRIGGER IF EXISTS extract_hashtags_on_recipe_change ON public.recipes;
+DROP TRIGGER IF EXISTS extract_hashtags_on_recipe_text_change ON public.recipes;
+DROP FUNCTION IF EXISTS public.extract_hashtags_from_recipe();
+
+-- Apply desired tag sets for many recipes at once:
+-- changes = [{"recipe_id": "...", "tags": ["espresso", "v60"]}, ...]
+-- Only links that differ are touched, and usage_count moves by the number of links added/removed
+CREATE OR REPLACE FUNCTION public.sync_recipe_hashtags(changes JSONB)
+RETURNS void AS $$
+BEGIN
+    -- Links that are no longer wanted
+    WITH targets AS (
+        SELECT DISTINCT (c->>'recipe_id')::uuid AS recipe_id
+        FROM jsonb_array_elements(changes) c
+    ),
+    desired AS (
+        SELECT DISTINCT (c->>'recipe_id')::uuid AS recipe_id, lower(t.tag) AS tag
+        FROM jsonb_array_elements(changes) c
+        CROSS JOIN LATERAL jsonb_array_elements_text(c->'tags') AS t(tag)
+    ),
+    removed AS (
+        DELETE FROM public.recipe_hashtags rh
+        USING targets, public.hashtags h
+        WHERE rh.recipe_id = targets.recipe_id
+        AND h.id = rh.hashtag_id
+        AND NOT EXISTS (SELECT 1 FROM desired d WHERE d.recipe_id = rh.recipe_id AND d.tag = h.tag)
+        RETURNING rh.hashtag_id
+    )
+    UPDATE public.hashtags h
+    SET usage_count = GREATEST(h.usage_count - r.removed_count, 0)
+    FROM (SELECT hashtag_id, COUNT(*) AS removed_count FROM removed GROUP BY hashtag_id) r
+    WHERE h.id = r.hashtag_id;
+
+    -- Links that are new
+    WITH desired AS (
+        SELECT DISTINCT (c->>'recipe_id')::uuid AS recipe_id, lower(t.tag) AS tag
+        FROM jsonb_array_elements(changes) c
+        CROSS JOIN LATERAL jsonb_array_elements_text(c->'tags') AS t(tag)
+    ),
+    added AS (
+        SELECT d.recipe_id, d.tag
+        FROM desired d
+        WHERE NOT EXISTS (
+            SELECT 1 FROM public.recipe_hashtags rh
+            JOIN public.hashtags h ON h.id = rh.hashtag_id
+            WHERE rh.recipe_id = d.recipe_id AND h.tag = d.tag
+        )
+    ),
+    upserted AS (
+        INSERT INTO public.hashtags (tag, usage_count, last_used)
+        SELECT tag, COUNT(*), NOW() FROM added GROUP BY tag
+        ON CONFLICT (tag)
+        DO UPDATE SET
+            usage_count = hashtags.usage_count + EXCLUDED.usage_count,
+            last_used = NOW()
+        RETURNING id, tag
+    )
+    INSERT INTO public.recipe_hashtags (recipe_id, hashtag_id)
+    SELECT a.recipe_id, u.id
+    FROM added a
+    JOIN upserted u ON u.tag = a.tag
+    ON CONFLICT (recipe_id, hashtag_id) DO NOTHING;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+-- Only the backend (service role) may rewrite hashtag links
+REVOKE EXECUTE ON FUNCTION public.sync_recipe_hashtags(JSONB) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION public.sync_recipe_hashtags(JSONB) TO service_role;
+
+-- Deleting a recipe releases its tags (the links themselves go with ON DELETE CASCADE)
+CREATE OR REPLACE FUNCTION public.release_recipe_hashtags()
+RETURNS trigger AS $$
+BEGIN
+    UPDATE public.hashtags h
+    SET usage_count = GREATEST(h.usage_count - 1, 0)
+    FROM public.recipe_hashtags rh
+    WHERE rh.recipe_id = OLD.id AND rh.hashtag_id = h.id;
+    RETURN OLD;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+DROP TRIGGER IF EXISTS release_hashtags_on_recipe_delete ON public.recipes;
+CREATE TRIGGER release_hashtags_on_recipe_delete
+    BEFORE DELETE ON public.recipes
+    FOR EACH ROW EXECUTE PROCEDURE public.release_recipe_hashtags();
+
+-- usage_count now means "recipes currently tagged"; recompute it from the links
+UPDATE public.hashtags h SET usage_count = COALESCE(
+    (SELECT COUNT(*) FROM public.recipe_hashtags rh WHERE rh.hashtag_id = h.id), 0
+);
@@ -0,0 +1,103 @@
+-- Add vote counters to recipes and the batched apply_vote_changes function (see vote_buffer.py)
+-- Applied by: python db_manager.py migrate (or run it in your Supabase SQL Editor)
+-- Safe to run multiple times: columns are added if missing and counters are re-backfilled
+
+ALTER TABLE public.recipes ADD COLUMN IF NOT EXISTS upvotes_count INTEGER NOT NULL DEFAULT 0;
+ALTER TABLE public.recipes ADD COLUMN IF NOT EXISTS downvotes_count INTEGER NOT NULL DEFAULT 0;
+
+-- Per-row counter maintenance for ordinary vote writes.
+-- apply_vote_changes sets app.defer_vote_counts and applies its deltas in one statement instead.
+CREATE OR REPLACE FUNCTION public.handle_vote_counts()
+RETURNS trigger AS $$
+BEGIN
+    IF current_setting('app.defer_vote_counts', true) = 'on' THEN
+        RETURN NULL;
+    END IF;
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        UPDATE public.recipes SET
+            upvotes_count = GREATEST(upvotes_count - (OLD.vote_type = 'up')::int, 0),
+            downvotes_count = GREATEST(downvotes_count - (OLD.vote_type = 'down')::int, 0)
+        WHERE id = OLD.recipe_id;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        UPDATE public.recipes SET
+            upvotes_count = upvotes_count + (NEW.vote_type = 'up')::int,
+            downvotes_count = downvotes_count + (NEW.vote_type = 'down')::int
+        WHERE id = NEW.recipe_id;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+DROP TRIGGER IF EXISTS on_vote_counts_changed ON public.recipe_votes;
+CREATE TRIGGER on_vote_counts_changed
+    AFTER INSERT OR DELETE OR UPDATE OF vote_type ON public.recipe_votes
+    FOR EACH ROW EXECUTE PROCEDURE public.handle_vote_counts();
+
+-- Apply the net vote state for many (recipe, user) pairs at once:
+-- changes = [{"recipe_id": "...", "user_id": "...", "vote_type": "up" | "down" | null}, ...]
+-- null removes the vote. Removed votes are deleted in one statement, new and changed ones
+-- upserted in another, and each recipe's counters move once by the summed difference.
+CREATE OR REPLACE FUNCTION public.apply_vote_changes(changes JSONB)
+RETURNS void AS $$
+BEGIN
+    PERFORM set_config('app.defer_vote_counts', 'on', true);
+
+    -- Serialize with other flushes touching the same recipes so the deltas below stay exact
+    PERFORM 1 FROM public.recipes
+    WHERE id IN (SELECT DISTINCT (c->>'recipe_id')::uuid FROM jsonb_array_elements(changes) c)
+    ORDER BY id
+    FOR UPDATE;
+
+    WITH desired AS (
+        -- Recipes or users deleted since the vote was buffered are skipped
+        SELECT DISTINCT ON (c.recipe_id, c.user_id) c.recipe_id, c.user_id, c.vote_type
+        FROM jsonb_to_recordset(changes) AS c(recipe_id UUID, user_id UUID, vote_type TEXT)
+        JOIN public.recipes r ON r.id = c.recipe_id
+        JOIN public.profiles p ON p.id = c.user_id
+        WHERE c.vote_type IS NULL OR c.vote_type IN ('up', 'down')
+    ),
+    current_votes AS (
+        SELECT d.recipe_id, d.vote_type AS new_type, v.vote_type AS old_type
+        FROM desired d
+        LEFT JOIN public.recipe_votes v ON v.recipe_id = d.recipe_id AND v.user_id = d.user_id
+    ),
+    removed AS (
+        DELETE FROM public.recipe_votes v
+        USING desired d
+        WHERE v.recipe_id = d.recipe_id AND v.user_id = d.user_id AND d.vote_type IS NULL
+        RETURNING v.id
+    ),
+    written AS (
+        INSERT INTO public.recipe_votes (recipe_id, user_id, vote_type)
+        SELECT recipe_id, user_id, vote_type FROM desired WHERE vote_type IS NOT NULL
+        ON CONFLICT (recipe_id, user_id)
+        DO UPDATE SET vote_type = EXCLUDED.vote_type
+        WHERE recipe_votes.vote_type IS DISTINCT FROM EXCLUDED.vote_type
+        RETURNING id
+    ),
+    deltas AS (
+        SELECT recipe_id,
+               SUM((new_type IS NOT DISTINCT FROM 'up')::int - (old_type IS NOT DISTINCT FROM 'up')::int) AS up_delta,
+               SUM((new_type IS NOT DISTINCT FROM 'down')::int - (old_type IS NOT DISTINCT FROM 'down')::int) AS down_delta
+        FROM current_votes
+        GROUP BY recipe_id
+    )
+    UPDATE public.recipes r SET
+        upvotes_count = GREATEST(r.upvotes_count + d.up_delta, 0),
+        downvotes_count = GREATEST(r.downvotes_count + d.down_delta, 0)
+    FROM deltas d
+    WHERE r.id = d.recipe_id AND (d.up_delta <> 0 OR d.down_delta <> 0);
+
+    PERFORM set_config('app.defer_vote_counts', 'off', true);
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+-- Only the backend (service role) may apply buffered votes
+REVOKE EXECUTE ON FUNCTION public.apply_vote_changes(JSONB) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION public.apply_vote_changes(JSONB) TO service_role;
+
+-- Backfill counters from the current votes (one set-based pass)
+UPDATE public.recipes r SET
+    upvotes_count = COALESCE((SELECT COUNT(*) FROM public.recipe_votes v WHERE v.recipe_id = r.id AND v.vote_type = 'up'), 0),
+    downvotes_count = COALESCE((SELECT COUNT(*) FROM public.recipe_votes v WHERE v.recipe_id = r.id AND v.vote_type = 'down'), 0);
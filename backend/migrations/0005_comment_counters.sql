@@ -0,0 +1,51 @@
+-- Comment counts on recipes and the batched get_recent_comments function (thread indexes: 0006)
+-- Applied by: python db_manager.py migrate (or run it in your Supabase SQL Editor)
+-- Safe to run multiple times: the column is added if missing and counts are re-backfilled
+
+ALTER TABLE public.recipes ADD COLUMN IF NOT EXISTS comments_count INTEGER NOT NULL DEFAULT 0;
+
+CREATE OR REPLACE FUNCTION public.handle_comment_counts()
+RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        UPDATE public.recipes SET comments_count = comments_count + 1 WHERE id = NEW.recipe_id;
+    ELSE
+        UPDATE public.recipes SET comments_count = GREATEST(comments_count - 1, 0) WHERE id = OLD.recipe_id;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+DROP TRIGGER IF EXISTS on_comment_counts_changed ON public.recipe_comments;
+CREATE TRIGGER on_comment_counts_changed
+    AFTER INSERT OR DELETE ON public.recipe_comments
+    FOR EACH ROW EXECUTE PROCEDURE public.handle_comment_counts();
+
+-- Latest `per_recipe` comments of each recipe in `recipe_ids`, with the author, in one query
+-- (one index range scan per recipe), for preloading a feed page's comment previews
+CREATE OR REPLACE FUNCTION public.get_recent_comments(recipe_ids UUID[], per_recipe INTEGER DEFAULT 3)
+RETURNS TABLE (
+    id UUID,
+    recipe_id UUID,
+    user_id UUID,
+    content TEXT,
+    created_at TIMESTAMP WITH TIME ZONE,
+    updated_at TIMESTAMP WITH TIME ZONE,
+    profiles JSON
+) AS $$
+    SELECT c.id, c.recipe_id, c.user_id, c.content, c.created_at, c.updated_at,
+           json_build_object('id', p.id, 'username', p.username, 'full_name', p.full_name, 'avatar_url', p.avatar_url)
+    FROM unnest(recipe_ids) AS r(id)
+    CROSS JOIN LATERAL (
+        SELECT rc.* FROM public.recipe_comments rc
+        WHERE rc.recipe_id = r.id
+        ORDER BY rc.created_at DESC, rc.id DESC
+        LIMIT per_recipe
+    ) c
+    JOIN public.profiles p ON p.id = c.user_id
+    ORDER BY c.recipe_id, c.created_at, c.id;
+$$ LANGUAGE sql STABLE;
+
+-- Backfill counts from the current comments (one set-based pass)
+UPDATE public.recipes r SET
+    comments_count = COALESCE((SELECT COUNT(*) FROM public.recipe_comments c WHERE c.recipe_id = r.id), 0);
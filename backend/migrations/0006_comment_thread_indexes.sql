@@ -0,0 +1,7 @@
+-- migrate:no-transaction
+-- Comment thread indexes, built without blocking comment writes on a large recipe_comments table
+-- Applied by: python db_manager.py migrate (or run it in your Supabase SQL Editor, one statement at a time)
+
+-- Threads page by keyset on (recipe_id, created_at, id); user_id backs the profile delete cascade
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_recipe_comments_thread ON public.recipe_comments(recipe_id, created_at, id);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_recipe_comments_user ON public.recipe_comments(user_id);
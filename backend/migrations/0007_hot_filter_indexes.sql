@@ -0,0 +1,29 @@
+-- migrate:no-transaction
+-- Composite indexes for the hot filters, and drops of the single-column indexes they make redundant
+-- Applied by: python db_manager.py migrate (or run it in your Supabase SQL Editor, one statement at a time)
+-- Found with python db_manager.py analyze (see query_advisor.py)
+
+-- Feeds and profile pages filter by is_public or user_id and sort by created_at
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_recipes_public ON public.recipes(is_public, created_at DESC);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_recipes_user_id_created_at ON public.recipes(user_id, created_at DESC);
+-- Recommendations read one user's upvotes, and the upvoters of a set of recipes
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_recipe_votes_user_id_vote_type ON public.recipe_votes(user_id, vote_type);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_recipe_votes_recipe_id_vote_type ON public.recipe_votes(recipe_id, vote_type);
+-- The activity feed is "mine OR from people I follow", newest first
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_activities_user ON public.activities(user_id, created_at DESC);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_activities_target_user ON public.activities(target_user_id, created_at DESC);
+
+-- Leading prefixes of the indexes above or of a UNIQUE constraint's index: every write paid for
+-- them, and the wider index serves the same lookups
+DROP INDEX CONCURRENTLY IF EXISTS public.idx_recipes_is_public;
+DROP INDEX CONCURRENTLY IF EXISTS public.idx_recipes_user_id;
+DROP INDEX CONCURRENTLY IF EXISTS public.idx_recipe_votes_user_id;
+DROP INDEX CONCURRENTLY IF EXISTS public.idx_recipe_votes_recipe_id;
+DROP INDEX CONCURRENTLY IF EXISTS public.idx_activities_user_id;
+DROP INDEX CONCURRENTLY IF EXISTS public.idx_follows_follower_id;
+DROP INDEX CONCURRENTLY IF EXISTS public.idx_follows_follower;
+DROP INDEX CONCURRENTLY IF EXISTS public.idx_saved_recipes_user_id;
+DROP INDEX CONCURRENTLY IF EXISTS public.idx_saved_recipes_user;
+DROP INDEX CONCURRENTLY IF EXISTS public.idx_recipe_hashtags_recipe;
+DROP INDEX CONCURRENTLY IF EXISTS public.idx_hashtags_tag;
+DROP INDEX CONCURRENTLY IF EXISTS public.idx_profiles_username;
@@ -0,0 +1,487 @@
+-- Bring the migration path in line with database_setup.sql: profile contact columns, recipe view
+-- tracking, trending/recommendation caches, activity and updated_at triggers, and the hashtag RPCs
+-- Applied by: python db_manager.py migrate (or run it in your Supabase SQL Editor)
+-- Safe to run multiple times: columns and tables are added if missing, triggers, policies and views are recreated
+
+ALTER TABLE public.profiles
+    ADD COLUMN IF NOT EXISTS email TEXT,
+    ADD COLUMN IF NOT EXISTS website TEXT,
+    ADD COLUMN IF NOT EXISTS location TEXT;
+
+ALTER TABLE public.recipes ADD COLUMN IF NOT EXISTS view_count INTEGER DEFAULT 0;
+
+-- Create recipe views table for analytics
+CREATE TABLE IF NOT EXISTS public.recipe_views (
+    id UUID DEFAULT gen_random_uuid() PRIMARY KEY,
+    recipe_id UUID REFERENCES public.recipes(id) ON DELETE CASCADE NOT NULL,
+    user_id UUID REFERENCES public.profiles(id) ON DELETE CASCADE,
+    ip_address INET,
+    user_agent TEXT,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+-- Create user recommendations cache table
+CREATE TABLE IF NOT EXISTS public.user_recommendations (
+    id UUID DEFAULT gen_random_uuid() PRIMARY KEY,
+    user_id UUID REFERENCES public.profiles(id) ON DELETE CASCADE NOT NULL,
+    recommended_user_id UUID REFERENCES public.profiles(id) ON DELETE CASCADE NOT NULL,
+    score DECIMAL(3,2) DEFAULT 0.0,
+    reason TEXT, -- 'similar_taste', 'popular', 'mutual_follows'
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    expires_at TIMESTAMP WITH TIME ZONE DEFAULT (NOW() + INTERVAL '24 hours'),
+
+    UNIQUE(user_id, recommended_user_id)
+);
+
+-- Create trending cache table
+CREATE TABLE IF NOT EXISTS public.trending_recipes (
+    id UUID DEFAULT gen_random_uuid() PRIMARY KEY,
+    recipe_id UUID REFERENCES public.recipes(id) ON DELETE CASCADE NOT NULL,
+    timeframe TEXT CHECK (timeframe IN ('1day', '7day', '30day')) NOT NULL,
+    score DECIMAL(10,2) DEFAULT 0.0, -- calculated trending score
+    votes_count INTEGER DEFAULT 0,
+    views_count INTEGER DEFAULT 0,
+    comments_count INTEGER DEFAULT 0,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    expires_at TIMESTAMP WITH TIME ZONE DEFAULT (NOW() + INTERVAL '1 hour'),
+
+    UNIQUE(recipe_id, timeframe)
+);
+
+-- One view per user per recipe per (UTC) day; DATE(timestamptz) is not immutable, so index the UTC date
+CREATE UNIQUE INDEX IF NOT EXISTS idx_recipe_views_daily
+    ON public.recipe_views(recipe_id, user_id, ((created_at AT TIME ZONE 'UTC')::date));
+CREATE INDEX IF NOT EXISTS idx_recipe_views_user ON public.recipe_views(user_id);
+CREATE INDEX IF NOT EXISTS idx_recipe_views_created_at ON public.recipe_views(created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_user_recommendations_user ON public.user_recommendations(user_id);
+CREATE INDEX IF NOT EXISTS idx_user_recommendations_expires ON public.user_recommendations(expires_at);
+CREATE INDEX IF NOT EXISTS idx_trending_recipes_timeframe ON public.trending_recipes(timeframe, score DESC);
+CREATE INDEX IF NOT EXISTS idx_trending_recipes_expires ON public.trending_recipes(expires_at);
+
+-- Recipe Views
+ALTER TABLE public.recipe_views ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS "Users can view their own recipe views" ON public.recipe_views;
+CREATE POLICY "Users can view their own recipe views" ON public.recipe_views
+    FOR SELECT USING (auth.uid() = user_id);
+
+DROP POLICY IF EXISTS "Users can track recipe views" ON public.recipe_views;
+CREATE POLICY "Users can track recipe views" ON public.recipe_views
+    FOR INSERT WITH CHECK (auth.uid() = user_id);
+
+DROP POLICY IF EXISTS "Recipe owners can see their recipe views" ON public.recipe_views;
+CREATE POLICY "Recipe owners can see their recipe views" ON public.recipe_views
+    FOR SELECT USING (
+        EXISTS (
+            SELECT 1 FROM public.recipes
+            WHERE recipes.id = recipe_views.recipe_id
+            AND recipes.user_id = auth.uid()
+        )
+    );
+
+-- User Recommendations
+ALTER TABLE public.user_recommendations ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS "Users can view their own recommendations" ON public.user_recommendations;
+CREATE POLICY "Users can view their own recommendations" ON public.user_recommendations
+    FOR SELECT USING (auth.uid() = user_id);
+
+DROP POLICY IF EXISTS "System can manage recommendations" ON public.user_recommendations;
+CREATE POLICY "System can manage recommendations" ON public.user_recommendations
+    FOR ALL USING (true);
+
+-- Trending Recipes
+ALTER TABLE public.trending_recipes ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS "Anyone can view trending recipes" ON public.trending_recipes;
+CREATE POLICY "Anyone can view trending recipes" ON public.trending_recipes
+    FOR SELECT USING (true);
+
+DROP POLICY IF EXISTS "System can manage trending" ON public.trending_recipes;
+CREATE POLICY "System can manage trending" ON public.trending_recipes
+    FOR ALL USING (true);
+
+-- Function to handle new user signup (only for confirmed users)
+CREATE OR REPLACE FUNCTION public.handle_new_user()
+RETURNS trigger AS $$
+BEGIN
+    -- Only create profile if email is confirmed
+    IF NEW.email_confirmed_at IS NOT NULL THEN
+        INSERT INTO public.profiles (id, email, username, full_name)
+        VALUES (
+            new.id,
+            new.email,
+            COALESCE(new.raw_user_meta_data->>'username', split_part(new.email, '@', 1)),
+            COALESCE(new.raw_user_meta_data->>'full_name', '')
+        );
+    END IF;
+    RETURN new;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+DROP TRIGGER IF EXISTS on_auth_user_created ON auth.users;
+CREATE TRIGGER on_auth_user_created
+    AFTER INSERT ON auth.users
+    FOR EACH ROW EXECUTE PROCEDURE public.handle_new_user();
+
+DROP TRIGGER IF EXISTS on_auth_user_confirmed ON auth.users;
+CREATE TRIGGER on_auth_user_confirmed
+    AFTER UPDATE ON auth.users
+    FOR EACH ROW
+    WHEN (OLD.email_confirmed_at IS NULL AND NEW.email_confirmed_at IS NOT NULL)
+    EXECUTE PROCEDURE public.handle_new_user();
+
+-- Function to update updated_at timestamp
+CREATE OR REPLACE FUNCTION public.handle_updated_at()
+RETURNS trigger AS $$
+BEGIN
+    new.updated_at = NOW();
+    RETURN new;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS handle_updated_at_profiles ON public.profiles;
+CREATE TRIGGER handle_updated_at_profiles
+    BEFORE UPDATE ON public.profiles
+    FOR EACH ROW EXECUTE PROCEDURE public.handle_updated_at();
+
+DROP TRIGGER IF EXISTS handle_updated_at_recipes ON public.recipes;
+CREATE TRIGGER handle_updated_at_recipes
+    BEFORE UPDATE ON public.recipes
+    FOR EACH ROW EXECUTE PROCEDURE public.handle_updated_at();
+
+DROP TRIGGER IF EXISTS handle_updated_at_comments ON public.recipe_comments;
+CREATE TRIGGER handle_updated_at_comments
+    BEFORE UPDATE ON public.recipe_comments
+    FOR EACH ROW EXECUTE PROCEDURE public.handle_updated_at();
+
+-- Activity feed rows are written by these triggers, not by the app
+CREATE OR REPLACE FUNCTION public.handle_recipe_creation()
+RETURNS trigger AS $$
+BEGIN
+    IF NEW.is_public = true THEN
+        INSERT INTO public.activities (user_id, recipe_id, activity_type, content)
+        VALUES (NEW.user_id, NEW.id, 'create_recipe', NEW.recipe_name);
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+DROP TRIGGER IF EXISTS on_recipe_created ON public.recipes;
+CREATE TRIGGER on_recipe_created
+    AFTER INSERT ON public.recipes
+    FOR EACH ROW EXECUTE PROCEDURE public.handle_recipe_creation();
+
+CREATE OR REPLACE FUNCTION public.handle_vote_activity()
+RETURNS trigger AS $$
+BEGIN
+    INSERT INTO public.activities (user_id, target_user_id, recipe_id, activity_type)
+    SELECT
+        NEW.user_id,
+        recipes.user_id,
+        NEW.recipe_id,
+        CASE WHEN NEW.vote_type = 'up' THEN 'like' ELSE 'dislike' END
+    FROM public.recipes
+    WHERE recipes.id = NEW.recipe_id;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+DROP TRIGGER IF EXISTS on_vote_created ON public.recipe_votes;
+CREATE TRIGGER on_vote_created
+    AFTER INSERT ON public.recipe_votes
+    FOR EACH ROW EXECUTE PROCEDURE public.handle_vote_activity();
+
+CREATE OR REPLACE FUNCTION public.handle_follow_activity()
+RETURNS trigger AS $$
+BEGIN
+    INSERT INTO public.activities (user_id, target_user_id, activity_type)
+    VALUES (NEW.follower_id, NEW.following_id, 'follow');
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+DROP TRIGGER IF EXISTS on_follow_created ON public.follows;
+CREATE TRIGGER on_follow_created
+    AFTER INSERT ON public.follows
+    FOR EACH ROW EXECUTE PROCEDURE public.handle_follow_activity();
+
+-- Track a recipe view (at most one row per user per recipe per day) and bump the recipe's counter
+CREATE OR REPLACE FUNCTION public.track_recipe_view(
+    recipe_uuid UUID,
+    user_uuid UUID DEFAULT NULL,
+    ip_addr INET DEFAULT NULL,
+    user_agent_str TEXT DEFAULT NULL
+)
+RETURNS void AS $$
+BEGIN
+    INSERT INTO public.recipe_views (recipe_id, user_id, ip_address, user_agent)
+    VALUES (recipe_uuid, user_uuid, ip_addr, user_agent_str)
+    ON CONFLICT (recipe_id, user_id, ((created_at AT TIME ZONE 'UTC')::date)) DO NOTHING;
+
+    UPDATE public.recipes
+    SET view_count = view_count + 1
+    WHERE id = recipe_uuid;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+-- The base schema declares tag and recipe_name as VARCHAR; RETURN QUERY needs the exact declared types
+CREATE OR REPLACE FUNCTION public.get_trending_hashtags(
+    limit_count INTEGER DEFAULT 10,
+    days_back INTEGER DEFAULT 1
+)
+RETURNS TABLE (
+    tag TEXT,
+    usage_count INTEGER,
+    recent_usage_count BIGINT
+) AS $$
+BEGIN
+    RETURN QUERY
+    SELECT
+        h.tag::TEXT,
+        h.usage_count,
+        COUNT(rh.id) as recent_usage_count
+    FROM public.hashtags h
+    LEFT JOIN public.recipe_hashtags rh ON h.id = rh.hashtag_id
+    LEFT JOIN public.recipes r ON rh.recipe_id = r.id
+    WHERE r.created_at >= NOW() - (days_back || ' days')::INTERVAL
+    OR h.last_used >= NOW() - (days_back || ' days')::INTERVAL
+    GROUP BY h.id, h.tag, h.usage_count
+    ORDER BY recent_usage_count DESC, h.usage_count DESC
+    LIMIT limit_count;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+CREATE OR REPLACE FUNCTION public.get_recipes_by_hashtag(
+    hashtag_name TEXT,
+    sort_by TEXT DEFAULT 'recent', -- 'recent', 'popular', 'trending', 'rating'
+    limit_count INTEGER DEFAULT 20
+)
+RETURNS TABLE (
+    recipe_id UUID,
+    recipe_name TEXT,
+    description TEXT,
+    rating DECIMAL,
+    view_count INTEGER,
+    vote_score BIGINT,
+    created_at TIMESTAMP WITH TIME ZONE
+) AS $$
+BEGIN
+    RETURN QUERY
+    SELECT
+        r.id as recipe_id,
+        r.recipe_name::TEXT,
+        r.description,
+        r.rating,
+        r.view_count,
+        COALESCE(votes_up.count, 0) - COALESCE(votes_down.count, 0) as vote_score,
+        r.created_at
+    FROM public.recipes r
+    INNER JOIN public.recipe_hashtags rh ON r.id = rh.recipe_id
+    INNER JOIN public.hashtags h ON rh.hashtag_id = h.id
+    LEFT JOIN (
+        SELECT recipe_id, COUNT(*) as count
+        FROM public.recipe_votes
+        WHERE vote_type = 'up'
+        GROUP BY recipe_id
+    ) votes_up ON r.id = votes_up.recipe_id
+    LEFT JOIN (
+        SELECT recipe_id, COUNT(*) as count
+        FROM public.recipe_votes
+        WHERE vote_type = 'down'
+        GROUP BY recipe_id
+    ) votes_down ON r.id = votes_down.recipe_id
+    WHERE h.tag = lower(hashtag_name)
+    AND r.is_public = true
+    ORDER BY
+        CASE
+            WHEN sort_by = 'popular' THEN r.view_count
+            WHEN sort_by = 'trending' THEN (COALESCE(votes_up.count, 0) - COALESCE(votes_down.count, 0))
+            WHEN sort_by = 'rating' THEN r.rating::INTEGER
+            ELSE EXTRACT(EPOCH FROM r.created_at)::INTEGER
+        END DESC
+    LIMIT limit_count;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+-- Function to calculate trending score
+CREATE OR REPLACE FUNCTION public.calculate_trending_score(
+    votes_up INTEGER,
+    votes_down INTEGER,
+    views_count INTEGER,
+    comments_count INTEGER,
+    hours_old NUMERIC
+)
+RETURNS DECIMAL AS $$
+DECLARE
+    score DECIMAL;
+    vote_score INTEGER;
+BEGIN
+    vote_score := COALESCE(votes_up, 0) - COALESCE(votes_down, 0);
+    score := vote_score * 10;
+    score := score + (COALESCE(views_count, 0) * 0.1);
+    score := score + (COALESCE(comments_count, 0) * 2);
+
+    -- Apply time decay (newer content gets boost)
+    IF hours_old <= 24 THEN
+        score := score * 1.5;
+    ELSIF hours_old <= 168 THEN
+        score := score * (1.0 - (hours_old - 24) / 168 * 0.3);
+    ELSE
+        score := score * 0.7;
+    END IF;
+
+    RETURN GREATEST(score, 0);
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+-- Function to update trending recipes cache
+CREATE OR REPLACE FUNCTION public.update_trending_recipes()
+RETURNS void AS $$
+DECLARE
+    recipe_record RECORD;
+    trending_score DECIMAL;
+    timeframes TEXT[] := ARRAY['1day', '7day', '30day'];
+    tf TEXT;
+    cutoff_time TIMESTAMP WITH TIME ZONE;
+BEGIN
+    DELETE FROM public.trending_recipes WHERE expires_at < NOW();
+
+    FOREACH tf IN ARRAY timeframes
+    LOOP
+        CASE tf
+            WHEN '1day' THEN cutoff_time := NOW() - INTERVAL '1 day';
+            WHEN '7day' THEN cutoff_time := NOW() - INTERVAL '7 days';
+            WHEN '30day' THEN cutoff_time := NOW() - INTERVAL '30 days';
+        END CASE;
+
+        FOR recipe_record IN
+            SELECT
+                r.id,
+                r.created_at,
+                r.view_count,
+                COALESCE(votes_up.count, 0) as votes_up,
+                COALESCE(votes_down.count, 0) as votes_down,
+                COALESCE(comments.count, 0) as comments_count,
+                EXTRACT(EPOCH FROM (NOW() - r.created_at)) / 3600 as hours_old
+            FROM public.recipes r
+            LEFT JOIN (
+                SELECT recipe_id, COUNT(*) as count
+                FROM public.recipe_votes
+                WHERE vote_type = 'up' AND created_at >= cutoff_time
+                GROUP BY recipe_id
+            ) votes_up ON r.id = votes_up.recipe_id
+            LEFT JOIN (
+                SELECT recipe_id, COUNT(*) as count
+                FROM public.recipe_votes
+                WHERE vote_type = 'down' AND created_at >= cutoff_time
+                GROUP BY recipe_id
+            ) votes_down ON r.id = votes_down.recipe_id
+            LEFT JOIN (
+                SELECT recipe_id, COUNT(*) as count
+                FROM public.recipe_comments
+                WHERE created_at >= cutoff_time
+                GROUP BY recipe_id
+            ) comments ON r.id = comments.recipe_id
+            WHERE r.is_public = true
+            AND r.created_at >= cutoff_time
+        LOOP
+            trending_score := public.calculate_trending_score(
+                recipe_record.votes_up,
+                recipe_record.votes_down,
+                recipe_record.view_count,
+                recipe_record.comments_count,
+                recipe_record.hours_old
+            );
+
+            INSERT INTO public.trending_recipes (
+                recipe_id, timeframe, score, votes_count, views_count, comments_count
+            )
+            VALUES (
+                recipe_record.id, tf, trending_score,
+                recipe_record.votes_up, recipe_record.view_count, recipe_record.comments_count
+            )
+            ON CONFLICT (recipe_id, timeframe)
+            DO UPDATE SET
+                score = trending_score,
+                votes_count = recipe_record.votes_up,
+                views_count = recipe_record.view_count,
+                comments_count = recipe_record.comments_count,
+                expires_at = NOW() + INTERVAL '1 hour';
+        END LOOP;
+    END LOOP;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+-- Function to clean up old data
+CREATE OR REPLACE FUNCTION public.cleanup_old_data()
+RETURNS void AS $$
+BEGIN
+    DELETE FROM public.user_recommendations WHERE expires_at < NOW();
+    DELETE FROM public.activities WHERE created_at < NOW() - INTERVAL '30 days';
+    DELETE FROM public.recipe_views WHERE created_at < NOW() - INTERVAL '90 days';
+    DELETE FROM public.hashtags
+    WHERE last_used < NOW() - INTERVAL '30 days'
+    AND id NOT IN (SELECT DISTINCT hashtag_id FROM public.recipe_hashtags);
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+-- r.* is expanded when the view is created, so recreate it to pick up view_count
+DROP VIEW IF EXISTS public.recipe_feed;
+CREATE VIEW public.recipe_feed AS
+SELECT
+    r.*,
+    p.username,
+    p.full_name,
+    p.avatar_url,
+    COALESCE(upvotes.count, 0) as upvote_count,
+    COALESCE(downvotes.count, 0) as downvote_count,
+    COALESCE(comments.count, 0) as comment_count
+FROM public.recipes r
+LEFT JOIN public.profiles p ON r.user_id = p.id
+LEFT JOIN (
+    SELECT recipe_id, COUNT(*) as count
+    FROM public.recipe_votes
+    WHERE vote_type = 'up'
+    GROUP BY recipe_id
+) upvotes ON r.id = upvotes.recipe_id
+LEFT JOIN (
+    SELECT recipe_id, COUNT(*) as count
+    FROM public.recipe_votes
+    WHERE vote_type = 'down'
+    GROUP BY recipe_id
+) downvotes ON r.id = downvotes.recipe_id
+LEFT JOIN (
+    SELECT recipe_id, COUNT(*) as count
+    FROM public.recipe_comments
+    GROUP BY recipe_id
+) comments ON r.id = comments.recipe_id;
+
+CREATE OR REPLACE VIEW public.trending_recipes_view AS
+SELECT
+    tr.recipe_id,
+    tr.timeframe,
+    tr.score as trending_score,
+    tr.votes_count,
+    tr.views_count,
+    r.recipe_name,
+    r.description,
+    r.rating,
+    r.created_at,
+    p.username,
+    p.full_name,
+    p.avatar_url
+FROM public.trending_recipes tr
+JOIN public.recipes r ON tr.recipe_id = r.id
+JOIN public.profiles p ON r.user_id = p.id
+WHERE tr.expires_at > NOW()
+AND r.is_public = true;
+
+GRANT ALL ON public.recipe_views, public.user_recommendations, public.trending_recipes TO postgres, service_role, authenticated;
+GRANT SELECT ON public.recipe_views, public.user_recommendations, public.trending_recipes TO anon;
+GRANT SELECT ON public.recipe_feed, public.trending_recipes_view TO authenticated, anon, service_role;
+GRANT EXECUTE ON FUNCTION public.track_recipe_view TO authenticated, service_role;
+GRANT EXECUTE ON FUNCTION public.get_trending_hashtags TO authenticated, anon, service_role;
+GRANT EXECUTE ON FUNCTION public.get_recipes_by_hashtag TO authenticated, anon, service_role;
+GRANT EXECUTE ON FUNCTION public.update_trending_recipes TO service_role;
+GRANT EXECUTE ON FUNCTION public.cleanup_old_data TO service_role;
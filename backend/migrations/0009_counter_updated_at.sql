@@ -0,0 +1,12 @@
+-- Counter-only updates (votes, comments, views) no longer bump recipes.updated_at
+-- Applied by: python db_manager.py migrate (or run it in your Supabase SQL Editor)
+-- Safe to run multiple times: the trigger is recreated
+
+-- Counters are maintained by triggers on other tables; updated_at tracks edits to the recipe itself
+DROP TRIGGER IF EXISTS handle_updated_at_recipes ON public.recipes;
+CREATE TRIGGER handle_updated_at_recipes
+    BEFORE UPDATE ON public.recipes
+    FOR EACH ROW
+    WHEN ((to_jsonb(NEW) - ARRAY['upvotes_count', 'downvotes_count', 'comments_count', 'view_count', 'updated_at'])
+        IS DISTINCT FROM (to_jsonb(OLD) - ARRAY['upvotes_count', 'downvotes_count', 'comments_count', 'view_count', 'updated_at']))
+    EXECUTE PROCEDURE public.handle_updated_at();
@@ -0,0 +1,179 @@
+"""
+On-demand sampling profiler for What'sYourRecipe
+Samples Python stacks from a background thread and stores flamegraph-ready collapsed stacks
+(the format consumed by flamegraph.pl, speedscope and inferno)
+"""
+
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import datetime
+from hmac import compare_digest
+from urllib.parse import parse_qs
+
+from shared_store import SHARED_STORE
+
+# Longest whole-process session an admin can start
+MAX_SESSION_SECONDS = 300
+# Stored profiles expire after this long
+PROFILE_TTL_SECONDS = 24 * 3600
+
+
+def _frame_label(frame):
+    code = frame.f_code
+    return f"{os.path.basename(code.co_filename)}:{code.co_name}"
+
+
+def _collapse(frame):
+    stack = []
+    while frame is not None:
+        stack.append(_frame_label(frame))
+        frame = frame.f_back
+    stack.reverse()
+    return ";".join(stack)
+
+
+class SamplingProfiler:
+    """Samples the stacks of the given threads (or every thread) at a fixed interval"""
+
+    def __init__(self, interval=0.005, thread_ids=None):
+        self.interval = interval
+        self.thread_ids = set(thread_ids) if thread_ids else None
+        self.samples = Counter()
+        self.sample_count = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        return self
+
+    def _run(self):
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                if self.thread_ids is not None and thread_id not in self.thread_ids:
+                    continue
+                self.samples[_collapse(frame)] += 1
+            self.sample_count += 1
+
+    def collapsed(self):
+        """Collapsed stacks, one "frame;frame;frame count" line per unique stack"""
+        return "\n".join(f"{stack} {count}" for stack, count in self.samples.most_common()) + "\n"
+
+
+class ProfileStore:
+    """Keeps the most recent profiles in the shared store, so any worker can serve them to the admin endpoints"""
+
+    def __init__(self, store, max_profiles=50):
+        self.store = store
+        self.max_profiles = max_profiles
+
+    def add(self, kind, label, duration, profiler, profile_id=None):
+        profile = {
+            "id": profile_id or uuid.uuid4().hex[:12],
+            "kind": kind,
+            "label": label,
+            "pid": os.getpid(),
+            "duration_ms": round(duration * 1000, 1),
+            "samples": profiler.sample_count,
+            "interval_ms": profiler.interval * 1000,
+            "created_at": datetime.now().isoformat(),
+            "collapsed": profiler.collapsed(),
+        }
+        self.store.set(f"profile:{profile['id']}", profile, PROFILE_TTL_SECONDS)
+        for old in self._all()[self.max_profiles:]:
+            self.store.delete(f"profile:{old['id']}")
+        return profile
+
+    def _all(self):
+        return sorted((profile for _, profile in self.store.scan("profile:")), key=lambda p: p["created_at"], reverse=True)
+
+    def list(self):
+        return [{k: v for k, v in profile.items() if k != "collapsed"} for profile in self._all()]
+
+    def get(self, profile_id):
+        return self.store.get(f"profile:{profile_id}")
+
+
+PROFILES = ProfileStore(SHARED_STORE)
+_active_session = {"profiler": None}
+
+
+def start_session(seconds, interval):
+    """Start a time-boxed whole-process sampling session in the background"""
+    if _active_session["profiler"] is not None:
+        return None
+
+    seconds = max(1, min(seconds, MAX_SESSION_SECONDS))
+    profiler = SamplingProfiler(interval=interval).start()
+    _active_session["profiler"] = profiler
+    session_id = uuid.uuid4().hex[:12]
+
+    def finish():
+        time.sleep(seconds)
+        profiler.stop()
+        _active_session["profiler"] = None
+        profile = PROFILES.add("session", f"process {seconds}s", seconds, profiler)
+        print(f"Profiling session {session_id} finished: profile {profile['id']} ({profiler.sample_count} samples)")
+
+    threading.Thread(target=finish, name="profiling-session", daemon=True).start()
+    return {"session_id": session_id, "seconds": seconds, "interval_ms": interval * 1000}
+
+
+class ProfilingMiddleware:
+    """Profiles a single request when asked to with a valid admin token.
+
+    Trigger with the X-Profile: 1 header (or ?__profile=1) plus X-Admin-Token (or ?admin_token=).
+    Only the event loop thread is sampled, so concurrent requests on the same worker show up too.
+    Only added to the app when ADMIN_TOKEN is configured.
+    """
+
+    def __init__(self, app, admin_token, interval=0.005):
+        self.app = app
+        self.admin_token = admin_token
+        self.interval = interval
+
+    def _requested(self, scope):
+        headers = dict(scope.get("headers", []))
+        query = scope.get("query_string", b"").decode("latin-1")
+        if headers.get(b"x-profile") != b"1" and "__profile=1" not in query:
+            return False
+
+        token = headers.get(b"x-admin-token", b"").decode("latin-1")
+        if not token:
+            token = (parse_qs(query).get("admin_token") or [""])[0]
+        return bool(token) and compare_digest(token.encode(), self.admin_token.encode())
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self._requested(scope):
+            await self.app(scope, receive, send)
+            return
+
+        profiler = SamplingProfiler(interval=self.interval, thread_ids=[threading.get_ident()]).start()
+        start = time.perf_counter()
+        profile_id = uuid.uuid4().hex[:12]
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", [])) + [(b"x-profile-id", profile_id.encode())]
+                message = dict(message, headers=headers)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            profiler.stop()
+            PROFILES.add("request", f"{scope['method']} {scope['path']}", time.perf_counter() - start, profiler, profile_id)
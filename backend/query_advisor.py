@@ -0,0 +1,379 @@
+"""
+Query plan analyzer and index advisor for What'sYourRecipe
+Runs EXPLAIN (ANALYZE, BUFFERS) on a catalog of the queries main.py sends through PostgREST,
+written as the SQL PostgREST generates for them, with sample ids taken from the data
+(the busiest follower, author and recipe, so plans reflect the heavy end of the distribution).
+
+It reports sequential scans over large tables and row estimates that are off by 10x or more. It
+lists the public schema's indexes and flags duplicate ones, where one btree's columns are a
+leading prefix of another's, and unused ones (no scans since the statistics were reset). It
+checks each hot filter against the index that should serve it and renders the resulting
+CREATE/DROP INDEX CONCURRENTLY statements as a no-transaction migration (see schema_migrations.py).
+
+Column order is compared, sort direction is not: a btree scans both ways.
+"""
+
+import re
+from dataclasses import dataclass, field
+from datetime import datetime
+
+# Thresholds for what the report calls out
+MIN_SEQ_SCAN_ROWS = 1000
+ESTIMATE_ERROR_RATIO = 10
+MIN_ESTIMATE_ROWS = 100
+
+
+@dataclass(frozen=True)
+class CatalogQuery:
+    name: str
+    endpoint: str
+    sql: str
+    indexes: tuple = ()  # (table, (columns...)) that should serve this query
+    expect_seq_scan: bool = False  # e.g. ilike '%...%' search, which no btree serves
+
+
+# Sample parameters, resolved once per run
+SAMPLES_SQL = """
+SELECT
+    (SELECT follower_id FROM public.follows GROUP BY follower_id ORDER BY COUNT(*) DESC LIMIT 1) AS user_id,
+    (SELECT user_id FROM public.recipes GROUP BY user_id ORDER BY COUNT(*) DESC LIMIT 1) AS author_id,
+    (SELECT recipe_id FROM public.recipe_votes GROUP BY recipe_id ORDER BY COUNT(*) DESC LIMIT 1) AS recipe_id,
+    (SELECT recipe_id FROM public.recipe_comments GROUP BY recipe_id ORDER BY COUNT(*) DESC LIMIT 1) AS comment_recipe_id
+"""
+
+SAMPLE_LISTS_SQL = {
+    "followed_ids": "SELECT COALESCE(array_agg(following_id), '{}') FROM public.follows WHERE follower_id = %(user_id)s",
+    "page_ids": "SELECT COALESCE(array_agg(id), '{}') FROM (SELECT id FROM public.recipes WHERE is_public ORDER BY created_at DESC LIMIT 20) r",
+    "upvoted_ids": "SELECT COALESCE(array_agg(recipe_id), '{}') FROM public.recipe_votes WHERE user_id = %(user_id)s AND vote_type = 'up'",
+    "author_ids": "SELECT COALESCE(array_agg(DISTINCT user_id), '{}') FROM (SELECT user_id FROM public.recipes WHERE is_public ORDER BY created_at DESC LIMIT 50) r",
+}
+
+CARD_COLUMNS = "r.id, r.user_id, r.recipe_name, r.description, r.rating, r.is_public, r.upvotes_count, r.downvotes_count, r.comments_count, r.created_at"
+
+QUERY_CATALOG = [
+    CatalogQuery(
+        "feed_public", "GET /recipes (feed, no follows)",
+        f"SELECT {CARD_COLUMNS} FROM public.recipes r WHERE r.is_public ORDER BY r.created_at DESC LIMIT 10",
+        indexes=(("recipes", ("is_public", "created_at")),),
+    ),
+    CatalogQuery(
+        "followed_ids", "GET /recipes, /activity-feed, /recommended-users",
+        "SELECT following_id FROM public.follows WHERE follower_id = %(user_id)s",
+        indexes=(("follows", ("follower_id", "following_id")),),
+    ),
+    CatalogQuery(
+        "following_feed", "GET /recipes?view=following",
+        f"SELECT {CARD_COLUMNS} FROM public.recipes r WHERE r.user_id = ANY(%(followed_ids)s::uuid[]) AND r.is_public "
+        "ORDER BY r.created_at DESC LIMIT 10",
+        indexes=(("recipes", ("user_id", "created_at")),),
+    ),
+    CatalogQuery(
+        "trending_candidates", "GET /recipes?view=trending",
+        f"SELECT {CARD_COLUMNS} FROM public.recipes r WHERE r.is_public AND r.created_at >= NOW() - INTERVAL '7 days' "
+        "ORDER BY r.created_at DESC",
+        indexes=(("recipes", ("is_public", "created_at")),),
+    ),
+    CatalogQuery(
+        "recipe_votes", "recipe_votes embed on the recipe page (cards use the vote counters)",
+        "SELECT recipe_id, vote_type, user_id FROM public.recipe_votes WHERE recipe_id = %(recipe_id)s",
+        indexes=(("recipe_votes", ("recipe_id",)),),
+    ),
+    CatalogQuery(
+        "card_authors", "profiles embed on every recipe card",
+        "SELECT id, username, full_name, avatar_url FROM public.profiles WHERE id = ANY(%(author_ids)s::uuid[])",
+        indexes=(("profiles", ("id",)),),
+    ),
+    CatalogQuery(
+        "saved_ids", "GET /recipes?view=saved",
+        "SELECT recipe_id FROM public.saved_recipes WHERE user_id = %(user_id)s",
+        indexes=(("saved_recipes", ("user_id", "recipe_id")),),
+    ),
+    CatalogQuery(
+        "user_recipes", "GET /users/{id}/recipes",
+        f"SELECT {CARD_COLUMNS} FROM public.recipes r WHERE r.user_id = %(author_id)s AND r.is_public "
+        "ORDER BY r.created_at DESC LIMIT 20",
+        indexes=(("recipes", ("user_id", "created_at")),),
+    ),
+    CatalogQuery(
+        "export_page", "GET /export/recipes (scope=mine)",
+        "SELECT * FROM public.recipes WHERE user_id = %(author_id)s ORDER BY created_at, id LIMIT 500",
+        indexes=(("recipes", ("user_id", "created_at")),),
+    ),
+    CatalogQuery(
+        "status_batch", "POST /status/batch",
+        "SELECT s.recipe_id, v.vote_type FROM unnest(%(page_ids)s::uuid[]) AS p(id) "
+        "LEFT JOIN public.saved_recipes s ON s.user_id = %(user_id)s AND s.recipe_id = p.id "
+        "LEFT JOIN public.recipe_votes v ON v.user_id = %(user_id)s AND v.recipe_id = p.id",
+        indexes=(("saved_recipes", ("user_id", "recipe_id")), ("recipe_votes", ("recipe_id", "user_id"))),
+    ),
+    CatalogQuery(
+        "follow_status", "GET /follow-status/{id}, POST /follow/{id}",
+        "SELECT id FROM public.follows WHERE follower_id = %(user_id)s AND following_id = %(author_id)s",
+        indexes=(("follows", ("follower_id", "following_id")),),
+    ),
+    CatalogQuery(
+        "existing_vote", "POST /votes",
+        "SELECT * FROM public.recipe_votes WHERE recipe_id = %(recipe_id)s AND user_id = %(user_id)s",
+        indexes=(("recipe_votes", ("recipe_id", "user_id")),),
+    ),
+    CatalogQuery(
+        "upvoted_by_user", "GET /recommended-users",
+        "SELECT recipe_id FROM public.recipe_votes WHERE user_id = %(user_id)s AND vote_type = 'up'",
+        indexes=(("recipe_votes", ("user_id", "vote_type")),),
+    ),
+    CatalogQuery(
+        "co_voters", "GET /recommended-users",
+        "SELECT user_id FROM public.recipe_votes WHERE recipe_id = ANY(%(upvoted_ids)s::uuid[]) AND vote_type = 'up' "
+        "AND user_id <> %(user_id)s",
+        indexes=(("recipe_votes", ("recipe_id", "vote_type")),),
+    ),
+    CatalogQuery(
+        "activity_feed", "GET /activity-feed",
+        "SELECT * FROM public.activities WHERE target_user_id = %(user_id)s OR user_id = ANY(%(followed_ids)s::uuid[]) "
+        "ORDER BY created_at DESC LIMIT 10",
+        indexes=(("activities", ("user_id", "created_at")), ("activities", ("target_user_id", "created_at"))),
+    ),
+    CatalogQuery(
+        "comment_thread", "GET /recipes/{id}/comments",
+        "SELECT * FROM public.recipe_comments WHERE recipe_id = %(comment_recipe_id)s ORDER BY created_at, id LIMIT 21",
+        indexes=(("recipe_comments", ("recipe_id", "created_at", "id")),),
+    ),
+    CatalogQuery(
+        "recent_hashtags", "GET /trending-hashtags (fallback)",
+        "SELECT * FROM public.hashtags ORDER BY last_used DESC LIMIT 10",
+        indexes=(("hashtags", ("last_used",)),),
+    ),
+    CatalogQuery(
+        "search_recipes", "GET /recipes/search/{query}",
+        "SELECT id FROM public.recipes WHERE (recipe_name ILIKE '%%latte%%' OR description ILIKE '%%latte%%' "
+        "OR brewing_notes ILIKE '%%latte%%') AND is_public LIMIT 10",
+        expect_seq_scan=True,
+    ),
+]
+
+INDEXES_SQL = """
+SELECT c.relname AS name, t.relname AS table_name, am.amname AS method,
+       i.indisunique AS is_unique, i.indisprimary AS is_primary, i.indpred IS NOT NULL AS is_partial,
+       EXISTS (SELECT 1 FROM pg_constraint con WHERE con.conindid = i.indexrelid) AS backs_constraint,
+       ARRAY(
+           SELECT a.attname FROM unnest(i.indkey::int2[]) WITH ORDINALITY AS k(attnum, position)
+           LEFT JOIN pg_attribute a ON a.attrelid = i.indrelid AND a.attnum = k.attnum
+           WHERE k.position <= i.indnkeyatts
+           ORDER BY k.position
+       ) AS columns,
+       COALESCE(s.idx_scan, 0) AS scans,
+       pg_relation_size(i.indexrelid) AS size_bytes
+FROM pg_index i
+JOIN pg_class c ON c.oid = i.indexrelid
+JOIN pg_class t ON t.oid = i.indrelid
+JOIN pg_namespace n ON n.oid = t.relnamespace
+JOIN pg_am am ON am.oid = c.relam
+LEFT JOIN pg_stat_user_indexes s ON s.indexrelid = i.indexrelid
+WHERE n.nspname = 'public'
+ORDER BY t.relname, c.relname
+"""
+
+
+@dataclass
+class Index:
+    name: str
+    table: str
+    columns: tuple  # None entries are expression columns
+    method: str = "btree"
+    unique: bool = False
+    primary: bool = False
+    partial: bool = False
+    backs_constraint: bool = False
+    scans: int = 0
+    size_bytes: int = 0
+
+    @property
+    def droppable(self):
+        """Plain indexes only; unique ones and constraint indexes enforce something"""
+        return not (self.unique or self.primary or self.backs_constraint)
+
+    @property
+    def comparable(self):
+        return self.method == "btree" and not self.partial and None not in self.columns
+
+    def covers(self, columns):
+        """True when this index leads with `columns`, so it serves the same lookups"""
+        return self.method == "btree" and not self.partial and tuple(self.columns[:len(columns)]) == tuple(columns)
+
+
+@dataclass
+class QueryReport:
+    query: CatalogQuery
+    execution_ms: float = 0.0
+    shared_hit: int = 0
+    shared_read: int = 0
+    seq_scans: list = field(default_factory=list)  # (table, rows scanned)
+    misestimates: list = field(default_factory=list)  # (node, estimated, actual)
+    error: str = None
+
+
+def walk(plan):
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from walk(child)
+
+
+def read_plan(query, explain, min_rows=MIN_SEQ_SCAN_ROWS):
+    """QueryReport from EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) output"""
+    top = explain[0] if isinstance(explain, list) else explain
+    plan = top["Plan"]
+    report = QueryReport(
+        query=query,
+        execution_ms=top.get("Execution Time", 0.0),
+        shared_hit=plan.get("Shared Hit Blocks", 0),
+        shared_read=plan.get("Shared Read Blocks", 0),
+    )
+    for node in walk(plan):
+        loops = max(node.get("Actual Loops", 1), 1)
+        if node["Node Type"] == "Seq Scan":
+            scanned = (node.get("Actual Rows", 0) + node.get("Rows Removed by Filter", 0)) * loops
+            if scanned >= min_rows:
+                report.seq_scans.append((node.get("Relation Name"), scanned))
+        estimated, actual = node.get("Plan Rows", 0), node.get("Actual Rows", 0)
+        if max(estimated, actual) >= MIN_ESTIMATE_ROWS and max(estimated, actual) >= ESTIMATE_ERROR_RATIO * max(min(estimated, actual), 1):
+            target = node.get("Relation Name") or node.get("Index Name")
+            report.misestimates.append((node["Node Type"] + (f" on {target}" if target else ""), estimated, actual))
+    return report
+
+
+def find_duplicates(indexes):
+    """(redundant, kept) pairs: droppable btrees whose columns lead another index on the table"""
+    duplicates = []
+    for index in indexes:
+        if not (index.droppable and index.comparable):
+            continue
+        wider = [other for other in indexes if other is not index and other.table == index.table and other.covers(index.columns)]
+        # Of two identical plain indexes keep the busier one (then the first by name)
+        wider = [other for other in wider
+                 if len(other.columns) > len(index.columns) or not other.droppable
+                 or (other.scans, other.name < index.name) > (index.scans, False)]
+        if wider:
+            kept = max(wider, key=lambda other: (not other.droppable, -len(other.columns)))
+            duplicates.append((index, kept))
+    return duplicates
+
+
+def find_unused(indexes, duplicates=()):
+    """Droppable indexes never scanned since the statistics were last reset"""
+    redundant = {index.name for index, _ in duplicates}
+    return [index for index in indexes if index.droppable and index.scans == 0 and index.name not in redundant]
+
+
+def missing_indexes(catalog, indexes):
+    """{(table, columns): [query names]} for catalog filters no existing index leads with"""
+    missing = {}
+    for query in catalog:
+        for table, columns in query.indexes:
+            if not any(index.table == table and index.covers(columns) for index in indexes):
+                missing.setdefault((table, tuple(columns)), []).append(query.name)
+    return missing
+
+
+def column_list(columns):
+    return ", ".join(column or "(expression)" for column in columns)
+
+
+def index_name(table, columns):
+    return f"idx_{table}_{'_'.join(columns)}"[:63]
+
+
+def recommend(catalog, indexes):
+    """(creates, drops): proposed Index objects and (redundant, kept) pairs after adding them"""
+    creates = [Index(name=index_name(table, columns), table=table, columns=columns)
+               for (table, columns) in missing_indexes(catalog, indexes)]
+    # Adding a wider index can make an existing one redundant
+    drops = [(index, kept) for index, kept in find_duplicates(indexes + creates) if index not in creates]
+    return creates, drops
+
+
+def render_migration(creates, drops, unused=(), queries_by_index=None, stats_reset=None):
+    """A no-transaction migration: new indexes first, then drops of the ones they make redundant"""
+    queries_by_index = queries_by_index or {}
+    lines = [
+        "-- migrate:no-transaction",
+        f"-- Index changes recommended by python db_manager.py analyze ({datetime.now():%Y-%m-%d})",
+        "-- Review before applying: new indexes are built first, redundant ones dropped after",
+        "",
+    ]
+    for index in creates:
+        used_by = ", ".join(queries_by_index.get((index.table, tuple(index.columns)), []))
+        if used_by:
+            lines.append(f"-- Serves: {used_by}")
+        lines.append(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {index.name} ON public.{index.table}({column_list(index.columns)});")
+    if creates and drops:
+        lines.append("")
+    for index, kept in drops:
+        lines.append(f"-- ({column_list(index.columns)}) is a leading prefix of {kept.name} ({column_list(kept.columns)})")
+        lines.append(f"DROP INDEX CONCURRENTLY IF EXISTS public.{index.name};")
+    if unused:
+        lines.append("")
+        since = f" since {stats_reset:%Y-%m-%d}" if stats_reset else ""
+        lines.append(f"-- Never scanned{since}; check replicas and rare jobs before dropping:")
+        for index in unused:
+            lines.append(f"-- DROP INDEX CONCURRENTLY IF EXISTS public.{index.name};  -- {format_size(index.size_bytes)}")
+    return "\n".join(lines) + "\n"
+
+
+def format_size(size_bytes):
+    for unit in ("B", "kB", "MB", "GB"):
+        if size_bytes < 1024 or unit == "GB":
+            return f"{size_bytes:.0f}{unit}" if unit == "B" else f"{size_bytes:.1f}{unit}"
+        size_bytes /= 1024
+
+
+class QueryAdvisor:
+    """Runs the catalog and reads the index inventory over a psycopg connection (autocommit=True)"""
+
+    def __init__(self, conn, catalog=QUERY_CATALOG, statement_timeout="30s"):
+        self.conn = conn
+        self.catalog = catalog
+        self.statement_timeout = statement_timeout
+
+    def samples(self):
+        with self.conn.cursor() as cursor:
+            cursor.execute(SAMPLES_SQL)
+            names = [column.name for column in cursor.description]
+            params = dict(zip(names, cursor.fetchone()))
+            for name, sql in SAMPLE_LISTS_SQL.items():
+                cursor.execute(sql, params)
+                params[name] = cursor.fetchone()[0]
+        return params
+
+    def explain(self, query, params, min_rows=MIN_SEQ_SCAN_ROWS):
+        """EXPLAIN ANALYZE one query in a transaction that is always rolled back"""
+        try:
+            with self.conn.transaction(force_rollback=True), self.conn.cursor() as cursor:
+                cursor.execute("SELECT set_config('statement_timeout', %s, true)", (self.statement_timeout,))
+                cursor.execute("EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) " + query.sql, params)
+                return read_plan(query, cursor.fetchone()[0], min_rows)
+        except Exception as e:
+            return QueryReport(query=query, error=str(e).strip().splitlines()[0])
+
+    def indexes(self):
+        with self.conn.cursor() as cursor:
+            cursor.execute(INDEXES_SQL)
+            return [
+                Index(name=name, table=table, method=method, unique=is_unique, primary=is_primary, partial=is_partial,
+                      backs_constraint=backs_constraint, columns=tuple(columns), scans=scans, size_bytes=size_bytes)
+                for name, table, method, is_unique, is_primary, is_partial, backs_constraint, columns, scans, size_bytes
+                in cursor.fetchall()
+            ]
+
+    def stats_reset(self):
+        with self.conn.cursor() as cursor:
+            cursor.execute("SELECT stats_reset FROM pg_stat_database WHERE datname = current_database()")
+            row = cursor.fetchone()
+            return row[0] if row else None
+
+
+def next_migration_path(directory, name="recommended_indexes"):
+    """Path for a new migration numbered after the highest existing one"""
+    import os
+    versions = [int(match.group(1)) for filename in os.listdir(directory)
+                if (match := re.match(r"^(\d{4})_", filename))]
+    return os.path.join(directory, f"{max(versions, default=0) + 1:04d}_{name}.sql")
@@ -0,0 +1,95 @@
+"""
+Streaming recipe export for What'sYourRecipe
+Pages through recipes with keyset pagination on (created_at, id) and serializes rows
+incrementally as NDJSON or CSV, so memory use does not grow with the size of the export
+"""
+
+import csv
+import io
+import zlib
+
+from fast_json import dumps
+
+# Bytes collected before a chunk is handed to the response
+CHUNK_SIZE = 64 * 1024
+
+EXPORT_FORMATS = {
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "csv": ("text/csv; charset=utf-8", "csv"),
+}
+
+
+def make_cursor(row):
+    """Resume token for the row after this one: '<created_at>|<id>'"""
+    return f"{row['created_at']}|{row['id']}"
+
+
+def parse_cursor(cursor):
+    """Split a '<created_at>|<id>' cursor; raises ValueError when malformed"""
+    created_at, separator, row_id = cursor.partition("|")
+    if not separator or not created_at or not row_id:
+        raise ValueError("cursor must be '<created_at>|<id>' of the last row received")
+    # An unencoded '+' in a query string arrives as a space
+    return created_at.replace(" ", "+"), row_id
+
+
+def keyset_filter(created_at, row_id):
+    """PostgREST or= filter for rows strictly after (created_at, id)"""
+    return f'created_at.gt."{created_at}",and(created_at.eq."{created_at}",id.gt.{row_id})'
+
+
+def iter_rows(fetch_page, page_size, after=None):
+    """Yield rows page by page; fetch_page(after, limit) returns rows ordered by (created_at, id)"""
+    while True:
+        rows = fetch_page(after, page_size)
+        yield from rows
+        if len(rows) < page_size:
+            return
+        after = (rows[-1]["created_at"], rows[-1]["id"])
+
+
+def ndjson_lines(rows):
+    for row in rows:
+        yield dumps(row) + b"\n"
+
+
+def csv_lines(rows, columns):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+
+    def take():
+        data = buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+        return data
+
+    writer.writerow(columns)
+    yield take()
+    for row in rows:
+        writer.writerow(["" if row.get(column) is None else row[column] for column in columns])
+        yield take()
+
+
+def chunked(lines, size=CHUNK_SIZE):
+    """Group small byte strings into chunks of roughly `size` bytes"""
+    pending = []
+    pending_size = 0
+    for line in lines:
+        pending.append(line)
+        pending_size += len(line)
+        if pending_size >= size:
+            yield b"".join(pending)
+            pending = []
+            pending_size = 0
+    if pending:
+        yield b"".join(pending)
+
+
+def gzip_stream(chunks, level=6):
+    """Compress a chunk stream into a single .gz file"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
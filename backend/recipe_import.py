@@ -0,0 +1,277 @@
+"""
+Bulk recipe import for What'sYourRecipe
+Streams NDJSON or CSV uploads line by line, validates each record against the Recipe model,
+inserts valid rows in batches and tracks progress so interrupted imports can be resumed
+"""
+
+import codecs
+import csv
+import json
+import re
+import time
+import uuid
+from dataclasses import asdict, dataclass, field
+
+from pydantic import ValidationError
+
+from shared_store import SHARED_STORE
+
+# Longest accepted record (one NDJSON line or one CSV row, including quoted newlines)
+MAX_RECORD_BYTES = 64 * 1024
+# Per-row errors kept for the report; the failed count keeps going past this
+MAX_REPORTED_ERRORS = 500
+# Finished or abandoned imports are forgotten after this long
+IMPORT_TTL_SECONDS = 24 * 3600
+# A running import that hasn't checkpointed for this long is treated as interrupted
+IMPORT_STALE_SECONDS = 300
+
+IMPORT_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]{8,64}$")
+
+_OVERSIZED = object()
+
+
+def detect_format(content_type, requested=None):
+    """Pick ndjson or csv from an explicit ?format= or the request Content-Type"""
+    if requested:
+        if requested not in ("ndjson", "csv"):
+            raise ValueError("format must be ndjson or csv")
+        return requested
+    media_type = (content_type or "").split(";")[0].strip().lower()
+    if media_type in ("text/csv", "application/csv"):
+        return "csv"
+    return "ndjson"
+
+
+async def iter_lines(chunks):
+    """Decode an async byte stream into numbered lines, holding at most one line in memory"""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")(errors="replace")
+    buffer = ""
+    number = 0
+    skipping = False
+    async for chunk in chunks:
+        buffer += decoder.decode(chunk)
+        while True:
+            newline = buffer.find("\n")
+            if newline < 0:
+                break
+            line, buffer = buffer[:newline], buffer[newline + 1:]
+            number += 1
+            if skipping:
+                skipping = False
+                continue
+            yield number, line.rstrip("\r")
+        if len(buffer) > MAX_RECORD_BYTES and not skipping:
+            # Report the oversized line once and discard the rest of it
+            yield number + 1, _OVERSIZED
+            skipping = True
+        if skipping:
+            buffer = ""
+    buffer += decoder.decode(b"", final=True)
+    if buffer and not skipping:
+        yield number + 1, buffer.rstrip("\r")
+
+
+async def iter_records(lines, fmt):
+    """Yield (line number, record dict or None, error or None) for each NDJSON line / CSV row"""
+    if fmt == "ndjson":
+        async for number, line in lines:
+            if line is _OVERSIZED:
+                yield number, None, f"line longer than {MAX_RECORD_BYTES} bytes"
+                continue
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                yield number, None, f"invalid JSON: {e}"
+                continue
+            if not isinstance(record, dict):
+                yield number, None, "expected a JSON object"
+                continue
+            yield number, record, None
+        return
+
+    header = None
+    pending = []
+    start = 0
+    async for number, line in lines:
+        if line is _OVERSIZED:
+            yield number, None, f"line longer than {MAX_RECORD_BYTES} bytes"
+            pending = []
+            continue
+        if not pending:
+            start = number
+        pending.append(line)
+        text = "\n".join(pending)
+        if text.count('"') % 2:
+            # A quoted field continues on the next line
+            if len(text) > MAX_RECORD_BYTES:
+                yield start, None, f"row longer than {MAX_RECORD_BYTES} bytes"
+                pending = []
+            continue
+        pending = []
+        if not text.strip():
+            continue
+
+        fields = next(csv.reader([text]))
+        if header is None:
+            header = [name.strip() for name in fields]
+            continue
+        if len(fields) != len(header):
+            yield start, None, f"expected {len(header)} columns, got {len(fields)}"
+            continue
+        # Empty cells mean "not set": leave them out so the model's defaults apply
+        yield start, {name: value for name, value in zip(header, fields) if value != ""}, None
+
+    if pending:
+        yield start, None, "unterminated quoted field"
+
+
+def _describe_validation_error(error):
+    return "; ".join(
+        f"{'.'.join(str(part) for part in item['loc']) or 'record'}: {item['msg']}" for item in error.errors()
+    )
+
+
+@dataclass
+class ImportState:
+    import_id: str
+    user_id: str
+    format: str
+    status: str = "running"  # running, completed, interrupted
+    committed_line: int = 0  # every line up to here has been inserted or reported
+    resumed_from: int = 0
+    inserted: int = 0
+    failed: int = 0
+    errors: dict = field(default_factory=dict)
+    updated_at: float = field(default_factory=time.time)
+
+    def record_error(self, line, message):
+        if line in self.errors:
+            return  # already reported before a resume
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors[line] = message
+
+    def summary(self):
+        return {
+            "import_id": self.import_id,
+            "status": self.status,
+            "format": self.format,
+            "committed_line": self.committed_line,
+            "resumed_from": self.resumed_from,
+            "inserted": self.inserted,
+            "failed": self.failed,
+            "errors": [{"line": line, "error": message} for line, message in sorted(self.errors.items())],
+            "errors_truncated": self.failed > len(self.errors),
+        }
+
+
+class ImportTracker:
+    """Registry of bulk imports keyed by import_id, kept in the shared store so every worker sees it"""
+
+    def __init__(self, store):
+        self.store = store
+
+    @staticmethod
+    def _key(import_id):
+        return f"import:{import_id}"
+
+    def _load(self, import_id):
+        data = self.store.get(self._key(import_id))
+        if data is None:
+            return None
+        # JSON object keys are strings; error lines are ints
+        data["errors"] = {int(line): message for line, message in data["errors"].items()}
+        return ImportState(**data)
+
+    def save(self, state):
+        state.updated_at = time.time()
+        self.store.set(self._key(state.import_id), asdict(state), IMPORT_TTL_SECONDS)
+
+    def start(self, import_id, user_id, fmt):
+        """Begin a new import, or resume an existing one owned by the same user"""
+        if import_id is not None and not IMPORT_ID_PATTERN.match(import_id):
+            raise ValueError("import_id must be 8-64 characters of letters, digits, '-' or '_'")
+        state = ImportState(import_id=import_id or uuid.uuid4().hex, user_id=user_id, format=fmt)
+        if self.store.add(self._key(state.import_id), asdict(state), IMPORT_TTL_SECONDS):
+            return state
+
+        state = self._load(state.import_id)
+        if state.user_id != user_id:
+            raise PermissionError("import belongs to another user")
+        # A running import whose worker died stops checkpointing; let it be resumed
+        if state.status == "running" and time.time() - state.updated_at < IMPORT_STALE_SECONDS:
+            raise RuntimeError("import is already running")
+        state.status = "running"
+        state.resumed_from = state.committed_line
+        self.save(state)
+        return state
+
+    def get(self, import_id):
+        return self._load(import_id)
+
+
+class RecipeImporter:
+    """Validates records and inserts them in batches; falls back to single rows to pinpoint failures"""
+
+    def __init__(self, model, insert_rows, batch_size=100, checkpoint=None):
+        self.model = model
+        self.insert_rows = insert_rows
+        self.batch_size = batch_size
+        # Called with the state after every committed batch and when the run ends
+        self.checkpoint = checkpoint or (lambda state: None)
+
+    async def run(self, state, records):
+        batch = []
+        line = state.committed_line
+        try:
+            async for line, record, error in records:
+                if line <= state.committed_line:
+                    continue  # handled before the import was interrupted
+                if error:
+                    state.record_error(line, error)
+                    continue
+                try:
+                    row = self.model.model_validate(record).model_dump()
+                except ValidationError as e:
+                    state.record_error(line, _describe_validation_error(e))
+                    continue
+                batch.append((line, row))
+                if len(batch) >= self.batch_size:
+                    self._flush(state, batch)
+                    batch = []
+        except BaseException:
+            # Client went away (or the stream broke): keep the complete records we already have
+            if batch:
+                self._flush(state, batch)
+            state.status = "interrupted"
+            state.updated_at = time.time()
+            self.checkpoint(state)
+            raise
+
+        if batch:
+            self._flush(state, batch)
+        state.committed_line = max(state.committed_line, line)
+        state.status = "completed"
+        state.updated_at = time.time()
+        self.checkpoint(state)
+        return state
+
+    def _flush(self, state, batch):
+        try:
+            self.insert_rows([row for _, row in batch])
+            state.inserted += len(batch)
+        except Exception:
+            for line, row in batch:
+                try:
+                    self.insert_rows([row])
+                    state.inserted += 1
+                except Exception as e:
+                    state.record_error(line, str(e))
+        state.committed_line = batch[-1][0]
+        state.updated_at = time.time()
+        self.checkpoint(state)
+
+
+IMPORTS = ImportTracker(SHARED_STORE)
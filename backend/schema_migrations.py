@@ -0,0 +1,242 @@
+"""
+Versioned schema migrations for What'sYourRecipe
+Numbered SQL files in migrations/ (0001_base_schema.sql, 0002_...) are applied in order, each
+once. public.schema_migrations records every applied file with its checksum, so a deploy runs
+only what is pending and stops when a file that was already applied has since been edited.
+
+Each migration runs in one transaction together with its schema_migrations row, under a short
+lock_timeout so a migration stuck behind long-running queries fails instead of stalling traffic.
+A file whose header has the line `-- migrate:no-transaction` runs statement by statement outside
+a transaction instead, which CREATE INDEX CONCURRENTLY needs; write those statements with
+IF NOT EXISTS so a rerun after a failure is safe.
+
+Migrations need a direct Postgres connection (DATABASE_URL, psycopg): the execute_sql RPC runs
+inside a transaction and can't build indexes concurrently.
+"""
+
+import hashlib
+import os
+import re
+import time
+from dataclasses import dataclass
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "migrations")
+FILENAME_PATTERN = re.compile(r"^(\d{4})_([a-z0-9_]+)\.sql$")
+NO_TRANSACTION_MARKER = "-- migrate:no-transaction"
+
+# Serializes concurrent deploys: the second waits, then finds nothing pending
+ADVISORY_LOCK_ID = 7_238_411_026
+
+SCHEMA_MIGRATIONS_TABLE = """
+CREATE TABLE IF NOT EXISTS public.schema_migrations (
+    version TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    checksum TEXT NOT NULL,
+    applied_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+    duration_ms INTEGER
+)
+"""
+
+CONCURRENT_INDEX_PATTERN = re.compile(
+    r"CREATE\s+(?:UNIQUE\s+)?INDEX\s+CONCURRENTLY\s+(?:IF\s+NOT\s+EXISTS\s+)?(?:\w+\.)?\"?(\w+)\"?", re.IGNORECASE
+)
+CREATE_TABLE_PATTERN = re.compile(r"CREATE\s+TABLE\s+(?:IF\s+NOT\s+EXISTS\s+)?([\w.\"]+)", re.IGNORECASE)
+BLOCKING_INDEX_PATTERN = re.compile(
+    r"CREATE\s+(?:UNIQUE\s+)?INDEX\s+(?!CONCURRENTLY)(?:IF\s+NOT\s+EXISTS\s+)?\"?\w+\"?\s+ON\s+(?:ONLY\s+)?([\w.\"]+)", re.IGNORECASE
+)
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: str
+    name: str
+    path: str
+    sql: str
+    checksum: str
+    transactional: bool
+
+    @property
+    def label(self):
+        return f"{self.version}_{self.name}"
+
+    def statements(self):
+        return split_statements(self.sql)
+
+    def warnings(self):
+        """Statements likely to lock a large table for their whole duration"""
+        if not self.transactional:
+            return []
+        sql = _strip_comments(self.sql)
+        created = {_table_name(table) for table in CREATE_TABLE_PATTERN.findall(sql)}  # new tables are empty
+        tables = dict.fromkeys(_table_name(table) for table in BLOCKING_INDEX_PATTERN.findall(sql))
+        return [f"CREATE INDEX on {table} blocks writes to it while it builds; use a no-transaction migration with CONCURRENTLY for large tables"
+                for table in tables if table not in created]
+
+
+def load_migrations(directory=MIGRATIONS_DIR):
+    """Migrations in version order; raises ValueError on misnamed files or duplicate versions"""
+    migrations = {}
+    for filename in sorted(os.listdir(directory)):
+        if not filename.endswith(".sql"):
+            continue
+        match = FILENAME_PATTERN.match(filename)
+        if not match:
+            raise ValueError(f"Migration files must be named NNNN_name.sql (lowercase): {filename}")
+        version, name = match.groups()
+        if version in migrations:
+            raise ValueError(f"Duplicate migration version {version}: {migrations[version].label}.sql and {filename}")
+
+        path = os.path.join(directory, filename)
+        with open(path, encoding="utf-8") as f:
+            sql = f.read().replace("\r\n", "\n")
+        header = sql.split("\n\n", 1)[0].splitlines()
+        transactional = NO_TRANSACTION_MARKER not in (line.strip().lower() for line in header)
+        if transactional and CONCURRENT_INDEX_PATTERN.search(_strip_comments(sql)):
+            raise ValueError(f"{filename}: CONCURRENTLY can't run inside a transaction; add '{NO_TRANSACTION_MARKER}' to its header")
+
+        migrations[version] = Migration(
+            version=version,
+            name=name,
+            path=path,
+            sql=sql,
+            checksum=hashlib.sha256(sql.encode("utf-8")).hexdigest(),
+            transactional=transactional,
+        )
+    return list(migrations.values())
+
+
+def plan(migrations, applied, target=None):
+    """Split migrations against the applied {version: row} map.
+
+    Returns (pending, changed, missing): migrations not yet applied (up to `target`), applied
+    ones whose file no longer matches its recorded checksum, and applied versions with no file.
+    """
+    known = {migration.version for migration in migrations}
+    pending = [m for m in migrations if m.version not in applied and (target is None or m.version <= target)]
+    changed = [m for m in migrations if m.version in applied and applied[m.version]["checksum"] != m.checksum]
+    missing = sorted(version for version in applied if version not in known)
+    return pending, changed, missing
+
+
+def split_statements(sql):
+    """Split SQL on top-level semicolons (quotes, comments and $$ bodies are respected)"""
+    statements = []
+    start = i = 0
+    length = len(sql)
+    while i < length:
+        char = sql[i]
+        if sql.startswith("--", i):
+            end = sql.find("\n", i)
+            i = length if end == -1 else end
+        elif sql.startswith("/*", i):
+            end = sql.find("*/", i + 2)
+            i = length if end == -1 else end + 2
+        elif char in ("'", '"'):
+            i += 1
+            while i < length:
+                if sql[i] == char:
+                    if sql.startswith(char * 2, i):  # escaped quote
+                        i += 2
+                        continue
+                    break
+                i += 1
+            i += 1
+        elif char == "$" and (match := re.match(r"\$(\w*)\$", sql[i:])):
+            tag = match.group(0)
+            end = sql.find(tag, i + len(tag))
+            i = length if end == -1 else end + len(tag)
+        elif char == ";":
+            statements.append(sql[start:i])
+            i += 1
+            start = i
+        else:
+            i += 1
+    statements.append(sql[start:])
+    return [statement.strip() for statement in statements if _strip_comments(statement).strip()]
+
+
+def _table_name(name):
+    name = name.replace('"', "").lower()
+    return name if "." in name else f"public.{name}"
+
+
+def _strip_comments(sql):
+    return re.sub(r"--[^\n]*", "", sql)
+
+
+class MigrationRunner:
+    """Applies migrations over a psycopg connection opened with autocommit=True"""
+
+    def __init__(self, conn, lock_timeout="5s"):
+        self.conn = conn
+        self.lock_timeout = lock_timeout
+
+    def ensure_table(self):
+        with self.conn.cursor() as cursor:
+            cursor.execute(SCHEMA_MIGRATIONS_TABLE)
+
+    def applied(self):
+        """{version: {"name", "checksum", "applied_at"}}; empty when nothing was ever recorded"""
+        with self.conn.cursor() as cursor:
+            cursor.execute("SELECT to_regclass('public.schema_migrations')")
+            if cursor.fetchone()[0] is None:
+                return {}
+            cursor.execute("SELECT version, name, checksum, applied_at FROM public.schema_migrations")
+            return {version: {"name": name, "checksum": checksum, "applied_at": applied_at}
+                    for version, name, checksum, applied_at in cursor.fetchall()}
+
+    def lock(self):
+        with self.conn.cursor() as cursor:
+            cursor.execute("SELECT pg_advisory_lock(%s)", (ADVISORY_LOCK_ID,))
+
+    def unlock(self):
+        with self.conn.cursor() as cursor:
+            cursor.execute("SELECT pg_advisory_unlock(%s)", (ADVISORY_LOCK_ID,))
+
+    def apply(self, migration):
+        """Run one migration and record it; returns the seconds it took"""
+        start = time.perf_counter()
+        if migration.transactional:
+            with self.conn.transaction(), self.conn.cursor() as cursor:
+                cursor.execute("SELECT set_config('lock_timeout', %s, true)", (self.lock_timeout,))
+                cursor.execute(migration.sql)
+                self._record(cursor, migration, time.perf_counter() - start)
+        else:
+            with self.conn.cursor() as cursor:
+                self._drop_invalid_indexes(cursor, migration)
+                for statement in migration.statements():
+                    cursor.execute(statement)
+                self._record(cursor, migration, time.perf_counter() - start)
+        return time.perf_counter() - start
+
+    def record(self, migration):
+        """Mark a migration applied without running it (for databases built another way)"""
+        with self.conn.cursor() as cursor:
+            self._record(cursor, migration, None)
+
+    def reload_api_schema(self):
+        """Ask PostgREST to reload its schema cache"""
+        with self.conn.cursor() as cursor:
+            cursor.execute("NOTIFY pgrst, 'reload schema'")
+
+    def _record(self, cursor, migration, seconds):
+        cursor.execute(
+            "INSERT INTO public.schema_migrations (version, name, checksum, duration_ms) VALUES (%s, %s, %s, %s) "
+            "ON CONFLICT (version) DO NOTHING",
+            (migration.version, migration.name, migration.checksum, None if seconds is None else round(seconds * 1000))
+        )
+
+    def _drop_invalid_indexes(self, cursor, migration):
+        # A failed CREATE INDEX CONCURRENTLY leaves an INVALID index behind, which IF NOT EXISTS
+        # would then skip; drop those so the rerun builds them again
+        names = CONCURRENT_INDEX_PATTERN.findall(_strip_comments(migration.sql))
+        if not names:
+            return
+        cursor.execute(
+            "SELECT n.nspname, c.relname FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+            "JOIN pg_namespace n ON n.oid = c.relnamespace WHERE NOT i.indisvalid AND c.relname = ANY(%s)",
+            (names,)
+        )
+        for schema, name in cursor.fetchall():
+            print(f"   dropping invalid index {schema}.{name} left by an interrupted build")
+            cursor.execute(f'DROP INDEX CONCURRENTLY IF EXISTS "{schema}"."{name}"')
@@ -0,0 +1,162 @@
+"""
+Cross-process key/value store for What'sYourRecipe
+State every worker must see (bulk import progress, profiles, admission limit overrides, each
+worker's published metrics, response cache invalidations) lives here instead of in module globals,
+so it survives requests landing on different workers. The cached responses themselves stay per worker.
+
+SHARED_STORE_URL picks the backend:
+    sqlite:////abs/store.db   SQLite file shared by the workers on one host (default: one in the temp dir)
+    redis://host:6379/0       Redis, shared across hosts (needs the redis package)
+    memory://                 plain dict, single process only
+
+Values are JSON-serializable and every entry has a TTL in seconds.
+"""
+
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+try:
+    import redis
+except ImportError:  # optional; only needed for redis:// URLs
+    redis = None
+
+DEFAULT_SQLITE_PATH = os.path.join(tempfile.gettempdir(), "whatsyourrecipe-shared.db")
+
+
+class MemoryStore:
+    def __init__(self):
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def _live(self, key):
+        entry = self._data.get(key)
+        if entry and entry[1] < time.time():
+            del self._data[key]
+            return None
+        return entry
+
+    def get(self, key):
+        with self._lock:
+            entry = self._live(key)
+            return entry[0] if entry else None
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._data[key] = (json.loads(json.dumps(value)), time.time() + ttl)
+
+    def add(self, key, value, ttl):
+        """Set only if absent; True when this call stored the value"""
+        with self._lock:
+            if self._live(key):
+                return False
+            self._data[key] = (json.loads(json.dumps(value)), time.time() + ttl)
+            return True
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def scan(self, prefix):
+        """All live (key, value) pairs whose key starts with prefix"""
+        with self._lock:
+            return [(key, self._live(key)[0]) for key in list(self._data) if key.startswith(prefix) and self._live(key)]
+
+
+class SQLiteStore:
+    """One SQLite file shared by the worker processes of a host (WAL mode, one connection per process)"""
+
+    def __init__(self, path=DEFAULT_SQLITE_PATH):
+        self.path = path
+        self._conn = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def _db(self):
+        # Workers are forked from a preloaded master; never reuse its connection
+        if self._pid != os.getpid():
+            self._conn = sqlite3.connect(self.path, timeout=5, check_same_thread=False, isolation_level=None)
+            self._conn.execute("PRAGMA journal_mode = WAL")
+            self._conn.execute("PRAGMA synchronous = NORMAL")
+            self._conn.execute("CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)")
+            self._pid = os.getpid()
+        return self._conn
+
+    def get(self, key):
+        with self._lock:
+            row = self._db().execute("SELECT value FROM entries WHERE key = ? AND expires_at > ?", (key, time.time())).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._db().execute(
+                "INSERT INTO entries (key, value, expires_at) VALUES (?, ?, ?) "
+                "ON CONFLICT (key) DO UPDATE SET value = excluded.value, expires_at = excluded.expires_at",
+                (key, json.dumps(value), time.time() + ttl)
+            )
+
+    def add(self, key, value, ttl):
+        now = time.time()
+        with self._lock:
+            cursor = self._db().execute(
+                "INSERT INTO entries (key, value, expires_at) VALUES (?, ?, ?) "
+                "ON CONFLICT (key) DO UPDATE SET value = excluded.value, expires_at = excluded.expires_at "
+                "WHERE entries.expires_at <= ?",
+                (key, json.dumps(value), now + ttl, now)
+            )
+            return cursor.rowcount == 1
+
+    def delete(self, key):
+        with self._lock:
+            self._db().execute("DELETE FROM entries WHERE key = ?", (key,))
+
+    def scan(self, prefix):
+        now = time.time()
+        with self._lock:
+            db = self._db()
+            db.execute("DELETE FROM entries WHERE expires_at <= ?", (now,))
+            rows = db.execute(
+                "SELECT key, value FROM entries WHERE substr(key, 1, ?) = ?", (len(prefix), prefix)
+            ).fetchall()
+        return [(key, json.loads(value)) for key, value in rows]
+
+
+class RedisStore:
+    def __init__(self, url):
+        if redis is None:
+            raise RuntimeError("SHARED_STORE_URL is a redis:// URL but the redis package is not installed")
+        self._redis = redis.Redis.from_url(url)
+
+    def get(self, key):
+        value = self._redis.get(key)
+        return json.loads(value) if value is not None else None
+
+    def set(self, key, value, ttl):
+        self._redis.set(key, json.dumps(value), ex=max(1, int(ttl)))
+
+    def add(self, key, value, ttl):
+        return bool(self._redis.set(key, json.dumps(value), ex=max(1, int(ttl)), nx=True))
+
+    def delete(self, key):
+        self._redis.delete(key)
+
+    def scan(self, prefix):
+        keys = list(self._redis.scan_iter(match=prefix.replace("*", r"\*") + "*"))
+        values = self._redis.mget(keys) if keys else []
+        return [(key.decode(), json.loads(value)) for key, value in zip(keys, values) if value is not None]
+
+
+def create_store(url=None):
+    url = url if url is not None else os.getenv("SHARED_STORE_URL", "")
+    if url.startswith(("redis://", "rediss://")):
+        return RedisStore(url)
+    if url.startswith("memory://"):
+        return MemoryStore()
+    path = url[len("sqlite:///"):] if url.startswith("sqlite:///") else DEFAULT_SQLITE_PATH
+    return SQLiteStore(path)
+
+
+SHARED_STORE = create_store()
@@ -5,7 +5,8 @@ Uses Supabase client to create records directly instead of raw SQL
 """
 
 import os
-from supabase import create_client, Client
+from supabase_client import get_client
+from local_supabase import is_local_url
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -16,11 +17,11 @@ def create_sample_hashtags():
     supabase_url = os.getenv("SUPABASE_URL")
     supabase_key = os.getenv("SUPABASE_SERVICE_KEY") or os.getenv("SUPABASE_ANON_KEY")
     
-    if not supabase_url or not supabase_key:
+    if not supabase_url or (not supabase_key and not is_local_url(supabase_url)):
         print("❌ Error: SUPABASE_URL and SUPABASE_SERVICE_KEY (or SUPABASE_ANON_KEY) must be set")
         return False
     
-    supabase: Client = create_client(supabase_url, supabase_key)
+    supabase = get_client(supabase_url, supabase_key)
     
     # Sample hashtags to create
     sample_hashtags = [
@@ -74,7 +75,7 @@ def check_all_tables():
     supabase_url = os.getenv("SUPABASE_URL")
     supabase_key = os.getenv("SUPABASE_SERVICE_KEY") or os.getenv("SUPABASE_ANON_KEY")
     
-    supabase: Client = create_client(supabase_url, supabase_key)
+    supabase = get_client(supabase_url, supabase_key)
     
     tables_to_check = [
         'profiles', 'recipes', 'recipe_votes', 'follows', 
@@ -10,14 +10,76 @@ const API_BASE_URL = isLocalDevelopment
 console.log(`Environment: ${isLocalDevelopment ? 'Local Development' : 'Production'}`);
 console.log(`API Base URL: ${API_BASE_URL}`);
 
+// Status lookups (saved/voted/following) made within this window are collapsed into one /status/batch call
+const STATUS_BATCH_DELAY_MS = 10;
+const STATUS_BATCH_MAX_IDS = 200;
+
+// Client-side response cache: GETs matching these endpoints are reused for `ttl` ms, then
+// revalidated with If-None-Match (a 304 refreshes the entry without downloading it again)
+const CACHE_RULES = [
+    { pattern: /^\/users\/profile$/, ttl: 60000 },
+    { pattern: /^\/users\/search\//, ttl: 30000 },
+    { pattern: /^\/users\/[^/]+\/recipes/, ttl: 30000 },
+    { pattern: /^\/users\/[^/?]+$/, ttl: 60000 },
+    { pattern: /^\/user-stats\//, ttl: 30000 },
+    { pattern: /^\/recipes\?/, ttl: 15000 },
+    { pattern: /^\/recipes\/search\//, ttl: 30000 },
+    { pattern: /^\/recipes\/hashtag\//, ttl: 30000 },
+    { pattern: /^\/recipes\/[^/?]+$/, ttl: 30000 },
+    { pattern: /^\/trending-hashtags/, ttl: 60000 },
+    { pattern: /^\/recommended-users/, ttl: 60000 },
+    { pattern: /^\/activity-feed/, ttl: 15000 },
+];
+// Saved/voted/following flags per id, filled from /status/batch and kept current by mutations
+const STATUS_CACHE_TTL_MS = 30000;
+// Longest Retry-After (seconds) a shed GET waits out before its single retry
+const MAX_RETRY_AFTER_S = 5;
+
+function cacheTTL(endpoint) {
+    const rule = CACHE_RULES.find(rule => rule.pattern.test(endpoint));
+    return rule ? rule.ttl : 0;
+}
+
 class APIClient {
     constructor() {
         this.baseURL = API_BASE_URL;
         this.token = localStorage.getItem('access_token');
+        this.pendingStatusBatch = null;
+        this.userId = null;
+        this.resetCache();
     }
 
-    // Helper method to make authenticated requests
+    resetCache() {
+        this.cache = new Map();        // endpoint -> { data, etag, storedAt, ttl }
+        this.inflight = new Map();     // endpoint -> pending GET promise
+        this.cacheGeneration = 0;      // bumped on invalidation so in-flight GETs don't store stale data
+        this.statusCache = { saved: new Map(), votes: new Map(), following: new Map() };
+    }
+
+    // GETs are served from the cache while fresh and shared while in flight; everything else goes straight out
     async request(endpoint, options = {}) {
+        const method = (options.method || 'GET').toUpperCase();
+        if (method !== 'GET') {
+            return await this.send(endpoint, options);
+        }
+
+        const ttl = cacheTTL(endpoint);
+        const cached = this.cache.get(endpoint);
+        if (cached && Date.now() - cached.storedAt < cached.ttl) {
+            return cached.data;
+        }
+        if (this.inflight.has(endpoint)) {
+            return await this.inflight.get(endpoint);
+        }
+
+        const promise = this.send(endpoint, options, ttl ? { cached, ttl } : null)
+            .finally(() => this.inflight.delete(endpoint));
+        this.inflight.set(endpoint, promise);
+        return await promise;
+    }
+
+    // Helper method to make authenticated requests
+    async send(endpoint, options = {}, caching = null, attempt = 0) {
         const url = `${this.baseURL}${endpoint}`;
         const config = {
             headers: {
@@ -32,9 +94,33 @@ class APIClient {
             config.headers.Authorization = `Bearer ${this.token}`;
         }
 
+        const cached = caching && caching.cached;
+        if (cached && cached.etag) {
+            config.headers['If-None-Match'] = cached.etag;
+        }
+        const generation = this.cacheGeneration;
+
         try {
             const response = await fetch(url, config);
             
+            // Unchanged since we cached it
+            if (response.status === 304 && cached) {
+                cached.storedAt = Date.now();
+                return cached.data;
+            }
+
+            // Shed by the server's admission control: keep showing cached data, or retry a GET once
+            if ((response.status === 429 || response.status === 503) && (config.method || 'GET') === 'GET') {
+                if (cached) {
+                    return cached.data;
+                }
+                const retryAfter = Number(response.headers.get('Retry-After'));
+                if (attempt === 0 && retryAfter > 0 && retryAfter <= MAX_RETRY_AFTER_S) {
+                    await new Promise(resolve => setTimeout(resolve, retryAfter * 1000));
+                    return this.send(endpoint, options, caching, attempt + 1);
+                }
+            }
+
             if (!response.ok) {
                 const errorData = await response.json().catch(() => ({ detail: 'Unknown error' }));
                 
@@ -52,16 +138,107 @@ class APIClient {
 
             // Handle empty responses
             const text = await response.text();
-            return text ? JSON.parse(text) : {};
+            const data = text ? JSON.parse(text) : {};
+
+            if (caching && generation === this.cacheGeneration) {
+                this.cache.set(endpoint, {
+                    data,
+                    etag: response.headers.get('ETag'),
+                    storedAt: Date.now(),
+                    ttl: caching.ttl,
+                });
+            }
+            return data;
         } catch (error) {
             console.error('API Request failed:', error);
             throw error;
         }
     }
 
+    // Drop cached GETs whose endpoint starts with any of the given prefixes (or matches a RegExp)
+    invalidate(...prefixes) {
+        this.cacheGeneration++;
+        for (const key of [...this.cache.keys()]) {
+            if (prefixes.some(prefix => prefix instanceof RegExp ? prefix.test(key) : key.startsWith(prefix))) {
+                this.cache.delete(key);
+            }
+        }
+    }
+
+    // Apply `update` to every cached copy of a recipe (feed pages, user pages, search results, detail)
+    updateCachedRecipe(recipeId, update) {
+        for (const [key, entry] of this.cache) {
+            if (!key.startsWith('/recipes') && !/^\/users\/[^/]+\/recipes/.test(key)) continue;
+            const recipes = Array.isArray(entry.data) ? entry.data : [entry.data];
+            recipes.filter(recipe => recipe && recipe.id === recipeId).forEach(update);
+        }
+    }
+
+    // Apply `update` to cached user stats and profile objects for a user
+    updateCachedUser(userId, update) {
+        [`/user-stats/${userId}`, `/users/${userId}`].forEach(key => {
+            const entry = this.cache.get(key);
+            if (entry && entry.data) update(entry.data);
+        });
+    }
+
+    getCachedStatus(kind, id) {
+        const entry = this.statusCache[kind].get(id);
+        return entry && Date.now() - entry.storedAt < STATUS_CACHE_TTL_MS ? entry : null;
+    }
+
+    setCachedStatus(kind, id, value) {
+        this.statusCache[kind].set(id, { value, storedAt: Date.now() });
+    }
+
+    // The current user's vote on a recipe, from the status cache or any cached copy of the recipe
+    knownVote(recipeId) {
+        const status = this.getCachedStatus('votes', recipeId);
+        if (status) return status.value;
+        let vote = null;
+        this.updateCachedRecipe(recipeId, recipe => {
+            const own = (recipe.recipe_votes || []).find(v => v.user_id === this.userId);
+            if (own) vote = own.vote_type;
+        });
+        return vote;
+    }
+
+    applyVote(recipeId, voteType) {
+        const previous = this.knownVote(recipeId);
+        this.setCachedStatus('votes', recipeId, voteType);
+        if (!this.userId) return;
+        this.updateCachedRecipe(recipeId, recipe => {
+            [['upvotes_count', 'up'], ['downvotes_count', 'down']].forEach(([column, type]) => {
+                if (typeof recipe[column] !== 'number') return;
+                recipe[column] = Math.max(recipe[column] + (voteType === type) - (previous === type), 0);
+            });
+            if (!Array.isArray(recipe.recipe_votes)) return;
+            recipe.recipe_votes = recipe.recipe_votes.filter(v => v.user_id !== this.userId);
+            if (voteType) recipe.recipe_votes.push({ vote_type: voteType, user_id: this.userId });
+        });
+    }
+
+    applyFollow(userId, following) {
+        const previous = this.getCachedStatus('following', userId);
+        this.setCachedStatus('following', userId, following);
+        if (previous && previous.value === following) return;
+        const delta = following ? 1 : -1;
+        this.updateCachedUser(userId, user => {
+            if (typeof user.followers_count === 'number') user.followers_count = Math.max(user.followers_count + delta, 0);
+        });
+        if (this.userId) {
+            this.updateCachedUser(this.userId, user => {
+                if (typeof user.following_count === 'number') user.following_count = Math.max(user.following_count + delta, 0);
+            });
+        }
+    }
+
     // Set authentication token
     setToken(token) {
         this.token = token;
+        // Cached responses belong to the previous session
+        this.userId = null;
+        this.resetCache();
         if (token) {
             localStorage.setItem('access_token', token);
         } else {
@@ -110,7 +287,9 @@ class APIClient {
 
     // User endpoints
     async getUserProfile() {
-        return await this.request('/users/profile');
+        const profile = await this.request('/users/profile');
+        if (profile && profile.id) this.userId = profile.id;
+        return profile;
     }
 
     async getUserById(userId) {
@@ -123,24 +302,54 @@ class APIClient {
 
     // Recipe endpoints
     async createRecipe(recipeData) {
-        return await this.request('/recipes', {
+        const recipe = await this.request('/recipes', {
             method: 'POST',
             body: JSON.stringify(recipeData),
         });
+        // A new recipe changes list membership, counts and tags
+        this.invalidate('/recipes', '/users/', '/user-stats/', '/trending-hashtags', '/activity-feed');
+        return recipe;
     }
 
     async updateRecipe(recipeId, recipeData) {
-        return await this.request(`/recipes/${recipeId}`, {
+        const recipe = await this.request(`/recipes/${recipeId}`, {
             method: 'PUT',
             body: JSON.stringify(recipeData),
         });
+        this.refreshCachedRecipe(recipe);
+        return recipe;
+    }
+
+    // Send only the changed fields; the server writes just those columns
+    async patchRecipe(recipeId, changes) {
+        const recipe = await this.request(`/recipes/${recipeId}`, {
+            method: 'PATCH',
+            body: JSON.stringify(changes),
+        });
+        this.refreshCachedRecipe(recipe);
+        return recipe;
     }
 
-    async getRecipes(page = 1, limit = 10, view = 'feed', trendingDays = 7) {
+    // Copy an updated recipe's columns into cached copies (cards keep only the fields they had)
+    refreshCachedRecipe(recipe) {
+        if (!recipe || !recipe.id) return;
+        this.updateCachedRecipe(recipe.id, cached => {
+            Object.keys(recipe).forEach(key => {
+                if (key in cached) cached[key] = recipe[key];
+            });
+        });
+        this.invalidate('/recipes/hashtag/', '/trending-hashtags', '/recipes/search/');
+    }
+
+    // `comments` > 0 preloads each recipe's latest comments as recipe.recent_comments
+    async getRecipes(page = 1, limit = 10, view = 'feed', trendingDays = 7, comments = 0) {
         let url = `/recipes?page=${page}&limit=${limit}&view=${view}`;
         if (view === 'trending') {
             url += `&trending_days=${trendingDays}`;
         }
+        if (comments) {
+            url += `&comments=${comments}`;
+        }
         return await this.request(url);
     }
 
@@ -152,26 +361,89 @@ class APIClient {
         return await this.request(`/recipes/search/${encodeURIComponent(query)}?limit=${limit}`);
     }
 
-    // Voting endpoints
-    async castVote(recipeId, voteType) {
-        return await this.request('/votes', {
+    // Comment endpoints
+    // Oldest first; pass the previous page's next_cursor to continue
+    async getComments(recipeId, limit = 20, cursor = null) {
+        let url = `/recipes/${recipeId}/comments?limit=${limit}`;
+        if (cursor) {
+            url += `&cursor=${encodeURIComponent(cursor)}`;
+        }
+        return await this.request(url);
+    }
+
+    async addComment(recipeId, content) {
+        const comment = await this.request(`/recipes/${recipeId}/comments`, {
             method: 'POST',
-            body: JSON.stringify({
-                recipe_id: recipeId,
-                vote_type: voteType,
-            }),
+            body: JSON.stringify({ content }),
         });
+        this.applyCommentCount(recipeId, 1);
+        return comment;
     }
 
-    // Follow endpoints
-    async followUser(userId) {
-        return await this.request(`/follow/${userId}`, {
-            method: 'POST',
+    async deleteComment(commentId, recipeId) {
+        const response = await this.request(`/comments/${commentId}`, {
+            method: 'DELETE',
+        });
+        this.applyCommentCount(recipeId, -1);
+        return response;
+    }
+
+    // Move cached comments_count by `delta` and drop the recipe's cached thread pages
+    applyCommentCount(recipeId, delta) {
+        this.updateCachedRecipe(recipeId, recipe => {
+            if (typeof recipe.comments_count === 'number') recipe.comments_count = Math.max(recipe.comments_count + delta, 0);
         });
+        this.invalidate(`/recipes/${recipeId}/comments`);
+    }
+
+    // Voting endpoints
+    // The server toggles: voting the same way twice removes the vote. Cached copies are updated
+    // before the request goes out and rolled back if it fails.
+    async castVote(recipeId, voteType) {
+        const previous = this.knownVote(recipeId);
+        this.applyVote(recipeId, previous === voteType ? null : voteType);
+
+        try {
+            const response = await this.request('/votes', {
+                method: 'POST',
+                body: JSON.stringify({
+                    recipe_id: recipeId,
+                    vote_type: voteType,
+                }),
+            });
+            // Reconcile with what the server actually did
+            this.applyVote(recipeId, response.action === 'removed' ? null : (response.vote ? response.vote.vote_type : voteType));
+            return response;
+        } catch (error) {
+            this.applyVote(recipeId, previous);
+            throw error;
+        }
+    }
+
+    // Follow endpoints (toggle, updated optimistically like votes)
+    async followUser(userId) {
+        const previous = this.getCachedStatus('following', userId);
+        if (previous) this.applyFollow(userId, !previous.value);
+
+        try {
+            const response = await this.request(`/follow/${userId}`, {
+                method: 'POST',
+            });
+            this.applyFollow(userId, response.following);
+            // Following changes what the following feed and recommendations contain
+            this.invalidate(/^\/recipes\?.*view=following/, '/recommended-users', '/activity-feed');
+            return response;
+        } catch (error) {
+            if (previous) this.applyFollow(userId, previous.value);
+            throw error;
+        }
     }
 
     async getFollowStatus(userId) {
-        return await this.request(`/follow-status/${userId}`);
+        const cached = this.getCachedStatus('following', userId);
+        if (cached) return { following: cached.value };
+        const status = await this.queueStatusLookup('user', userId);
+        return { following: status.following[userId] || false };
     }
 
     async getUserStats(userId) {
@@ -198,23 +470,103 @@ class APIClient {
         return await this.request(`/recipes/hashtag/${encodeURIComponent(hashtag)}?sort_by=${sortBy}&limit=${limit}`);
     }
 
-    // Save recipe endpoints
+    // Save recipe endpoints (toggle, updated optimistically like votes)
     async saveRecipe(recipeId) {
-        return await this.request(`/save-recipe/${recipeId}`, {
+        const previous = this.getCachedStatus('saved', recipeId);
+        if (previous) this.setCachedStatus('saved', recipeId, !previous.value);
+
+        try {
+            const response = await this.request(`/save-recipe/${recipeId}`, {
+                method: 'POST',
+            });
+            this.setCachedStatus('saved', recipeId, response.saved);
+            // Saving changes what the saved view contains
+            this.invalidate(/^\/recipes\?.*view=saved/, '/activity-feed');
+            return response;
+        } catch (error) {
+            if (previous) this.setCachedStatus('saved', recipeId, previous.value);
+            throw error;
+        }
+    }
+
+    async getSaveStatus(recipeId) {
+        const cached = this.getCachedStatus('saved', recipeId);
+        if (cached) return { saved: cached.value };
+        const status = await this.queueStatusLookup('recipe', recipeId);
+        return { saved: status.saved[recipeId] || false };
+    }
+
+    async getVoteStatus(recipeId) {
+        const cached = this.getCachedStatus('votes', recipeId);
+        if (cached) return { vote_type: cached.value };
+        const status = await this.queueStatusLookup('recipe', recipeId);
+        return { vote_type: status.votes[recipeId] || null };
+    }
+
+    // Batched status endpoints
+    async getStatusBatch(recipeIds = [], userIds = []) {
+        return await this.request('/status/batch', {
             method: 'POST',
+            body: JSON.stringify({
+                recipe_ids: recipeIds,
+                user_ids: userIds,
+            }),
         });
     }
 
-    async getSaveStatus(recipeId) {
-        return await this.request(`/save-status/${recipeId}`);
+    // Queue a status lookup; lookups queued close together share a single request
+    queueStatusLookup(kind, id) {
+        if (!this.pendingStatusBatch) {
+            this.pendingStatusBatch = {
+                recipeIds: new Set(),
+                userIds: new Set(),
+                waiters: [],
+                timer: setTimeout(() => this.flushStatusLookups(), STATUS_BATCH_DELAY_MS),
+            };
+        }
+
+        const batch = this.pendingStatusBatch;
+        (kind === 'user' ? batch.userIds : batch.recipeIds).add(id);
+
+        const promise = new Promise((resolve, reject) => {
+            batch.waiters.push({ resolve, reject });
+        });
+
+        // Don't let a single batch grow past what the backend accepts
+        if (batch.recipeIds.size >= STATUS_BATCH_MAX_IDS || batch.userIds.size >= STATUS_BATCH_MAX_IDS) {
+            clearTimeout(batch.timer);
+            this.flushStatusLookups();
+        }
+
+        return promise;
+    }
+
+    async flushStatusLookups() {
+        const batch = this.pendingStatusBatch;
+        this.pendingStatusBatch = null;
+        if (!batch) return;
+
+        try {
+            const status = await this.getStatusBatch([...batch.recipeIds], [...batch.userIds]);
+            batch.recipeIds.forEach(id => {
+                this.setCachedStatus('saved', id, status.saved[id] || false);
+                this.setCachedStatus('votes', id, status.votes[id] || null);
+            });
+            batch.userIds.forEach(id => this.setCachedStatus('following', id, status.following[id] || false));
+            batch.waiters.forEach(waiter => waiter.resolve(status));
+        } catch (error) {
+            batch.waiters.forEach(waiter => waiter.reject(error));
+        }
     }
 
     // Profile management
     async updateProfile(profileData) {
-        return await this.request('/profile', {
+        const profile = await this.request('/profile', {
             method: 'PUT',
             body: JSON.stringify(profileData)
         });
+        this.invalidate('/users/', '/recommended-users');
+        return profile;
     }
 
     async uploadAvatar(formData) {
@@ -234,6 +586,7 @@ class APIClient {
                 const errorData = await response.json().catch(() => ({ detail: 'Upload failed' }));
                 throw new Error(errorData.detail || `HTTP ${response.status}`);
             }
+            this.invalidate('/users/', '/recommended-users');
             return await response.json();
         } catch (error) {
             console.error('Avatar upload error:', error);
@@ -5,6 +5,7 @@ class WhatYourRecipeApp {
     constructor() {
         this.currentUser = null;
         this.currentEditingId = null;
+        this.editingOriginal = null;
         this.isFormProMode = false;
         this.isRecipeDetailProMode = false;
         this.feedPage = 0;
@@ -93,7 +94,7 @@ class WhatYourRecipeApp {
         const userAvatar = document.getElementById('userAvatar');
         
         if (this.currentUser.avatar_url) {
-            userAvatar.innerHTML = `<img src="${this.currentUser.avatar_url}" alt="Avatar" style="width: 100%; height: 100%; border-radius: 50%; object-fit: cover;">`;
+            userAvatar.innerHTML = `<img src="${this.avatarSrc(this.currentUser.avatar_url, 96)}" alt="Avatar" style="width: 100%; height: 100%; border-radius: 50%; object-fit: cover;">`;
         } else {
             const initials = this.currentUser.full_name?.charAt(0).toUpperCase() || this.currentUser.username?.charAt(0).toUpperCase() || 'U';
             userAvatar.innerHTML = `<span>${initials}</span>`;
@@ -550,6 +551,8 @@ class WhatYourRecipeApp {
                 recipes.forEach(recipe => {
                     feedContent.appendChild(this.createRecipeCard(recipe));
                 });
+                this.loadSaveStates(recipes);
+                this.loadVoteStates(recipes);
             } else if (this.feedPage === 0) {
                 feedContent.innerHTML = this.getEmptyFeedMessage();
             }
@@ -634,17 +637,17 @@ class WhatYourRecipeApp {
             return `${stars} (${rating}/10)`;
         };
 
-        // Calculate vote counts
-        const upvotes = recipe.recipe_votes?.filter(v => v.vote_type === 'up').length || 0;
-        const downvotes = recipe.recipe_votes?.filter(v => v.vote_type === 'down').length || 0;
-        const userVote = recipe.recipe_votes?.find(v => v.user_id === this.currentUser?.id)?.vote_type;
+        // Cards carry the vote counters; the user's own vote comes from the status cache (see loadVoteStates)
+        const upvotes = recipe.upvotes_count || 0;
+        const downvotes = recipe.downvotes_count || 0;
+        const userVote = this.currentUser ? api.knownVote(recipe.id) : null;
 
         card.innerHTML = `
             <div class="recipe-card-header">
                 <div class="recipe-author" onclick="app.showUserProfile('${recipe.user_id}')">
                     <div class="avatar">
                         ${recipe.profiles?.avatar_url 
-                            ? `<img src="${recipe.profiles.avatar_url}" alt="Avatar" style="width: 100%; height: 100%; border-radius: 50%; object-fit: cover;">`
+                            ? `<img src="${this.avatarSrc(recipe.profiles.avatar_url, 96)}" alt="Avatar" style="width: 100%; height: 100%; border-radius: 50%; object-fit: cover;">`
                             : (recipe.profiles?.username?.charAt(0)?.toUpperCase() || recipe.profiles?.full_name?.charAt(0)?.toUpperCase() || 'U')
                         }
                     </div>
@@ -854,7 +857,7 @@ class WhatYourRecipeApp {
         try {
             await api.castVote(recipeId, voteType);
 
-            // Refresh the feed to show updated vote counts
+            // Re-render the feed; the API client has already updated the cached vote counts
             this.feedPage = 0;
             this.loadFeed();
 
@@ -901,22 +904,57 @@ class WhatYourRecipeApp {
             this.showNotification(response.message, 'success');
             
             // Update the save button state
-            const saveBtn = document.querySelector(`[onclick="app.saveRecipe('${recipeId}')"]`);
-            if (saveBtn) {
-                if (response.action === 'saved') {
-                    saveBtn.innerHTML = '<i class="fas fa-bookmark-solid"></i> Saved';
-                    saveBtn.classList.add('saved');
-                } else {
-                    saveBtn.innerHTML = '<i class="fas fa-bookmark"></i> Save';
-                    saveBtn.classList.remove('saved');
-                }
-            }
+            this.updateSaveButton(recipeId, response.action === 'saved');
         } catch (error) {
             console.error('Error saving recipe:', error);
             this.showNotification('Error saving recipe', 'error');
         }
     }
 
+    updateSaveButton(recipeId, saved) {
+        const saveBtn = document.querySelector(`[onclick="app.saveRecipe('${recipeId}')"]`);
+        if (saveBtn) {
+            if (saved) {
+                saveBtn.innerHTML = '<i class="fas fa-bookmark-solid"></i> Saved';
+                saveBtn.classList.add('saved');
+            } else {
+                saveBtn.innerHTML = '<i class="fas fa-bookmark"></i> Save';
+                saveBtn.classList.remove('saved');
+            }
+        }
+    }
+
+    loadSaveStates(recipes) {
+        if (!this.currentUser) return;
+
+        // The API client batches these lookups into a single /status/batch request
+        recipes.forEach(recipe => {
+            api.getSaveStatus(recipe.id)
+                .then(status => {
+                    if (status.saved) this.updateSaveButton(recipe.id, true);
+                })
+                .catch(error => console.error('Error loading save status:', error));
+        });
+    }
+
+    updateVoteButtons(recipeId, voteType) {
+        const upBtn = document.querySelector(`[onclick="app.voteRecipe('${recipeId}', 'up')"]`);
+        const downBtn = document.querySelector(`[onclick="app.voteRecipe('${recipeId}', 'down')"]`);
+        if (upBtn) upBtn.classList.toggle('voted', voteType === 'up');
+        if (downBtn) downBtn.classList.toggle('downvoted', voteType === 'down');
+    }
+
+    loadVoteStates(recipes) {
+        if (!this.currentUser) return;
+
+        // Collapsed into the same /status/batch request as the save states
+        recipes.forEach(recipe => {
+            api.getVoteStatus(recipe.id)
+                .then(status => this.updateVoteButtons(recipe.id, status.vote_type))
+                .catch(error => console.error('Error loading vote status:', error));
+        });
+    }
+
     showCreateRecipePage(resetForCreate = true) {
         const feedContent = document.getElementById('feedContent');
         
@@ -1312,8 +1350,13 @@ class WhatYourRecipeApp {
             if (this.currentEditingId) {
                 // Update existing recipe
                 console.log('Updating recipe with ID:', this.currentEditingId);
-                await api.updateRecipe(this.currentEditingId, recipe);
-                this.showNotification('Recipe updated successfully!', 'success');
+                const changes = this.diffRecipe(this.editingOriginal || {}, recipe);
+                if (Object.keys(changes).length === 0) {
+                    this.showNotification('No changes to save.', 'info');
+                } else {
+                    await api.patchRecipe(this.currentEditingId, changes);
+                    this.showNotification('Recipe updated successfully!', 'success');
+                }
             } else {
                 // Create new recipe
                 console.log('Creating new recipe');
@@ -1336,6 +1379,18 @@ class WhatYourRecipeApp {
         }
     }
 
+    // Fields whose form value differs from the recipe as loaded for editing
+    diffRecipe(original, updated) {
+        const changes = {};
+        Object.keys(updated).forEach(key => {
+            const before = original[key] === undefined ? null : original[key];
+            if (updated[key] !== before) {
+                changes[key] = updated[key];
+            }
+        });
+        return changes;
+    }
+
     validateRecipe(recipe) {
         const requiredFields = ['recipe_name', 'description', 'rating', 'date_created'];
 
@@ -1430,7 +1485,7 @@ class WhatYourRecipeApp {
                     <div class="recommended-user" onclick="app.showUserProfile('${user.id}')">
                         <div class="avatar">
                             ${user.avatar_url 
-                                ? `<img src="${user.avatar_url}" alt="Avatar" style="width: 100%; height: 100%; border-radius: 50%; object-fit: cover;">`
+                                ? `<img src="${this.avatarSrc(user.avatar_url, 96)}" alt="Avatar" style="width: 100%; height: 100%; border-radius: 50%; object-fit: cover;">`
                                 : (user.full_name?.charAt(0)?.toUpperCase() || user.username?.charAt(0)?.toUpperCase() || 'U')
                             }
                         </div>
@@ -1650,6 +1705,7 @@ class WhatYourRecipeApp {
                 recipes.forEach(recipe => {
                     container.appendChild(this.createRecipeCard(recipe));
                 });
+                this.loadVoteStates(recipes);
             } else {
                 container.innerHTML = `
                     <div class="empty-hashtag">
@@ -1715,7 +1771,7 @@ class WhatYourRecipeApp {
                         <div class="search-dropdown-item" onclick="app.showUserProfile('${user.id}'); app.hideSearchDropdown(); document.getElementById('searchInput').value = '';">
                             <div class="search-item-avatar">
                                     ${user.avatar_url 
-                                        ? `<img src="${user.avatar_url}" alt="Avatar">`
+                                        ? `<img src="${this.avatarSrc(user.avatar_url, 96)}" alt="Avatar">`
                                     : `<span>${user.full_name?.charAt(0)?.toUpperCase() || user.username?.charAt(0)?.toUpperCase() || 'U'}</span>`
                                     }
                                 </div>
@@ -1812,7 +1868,7 @@ class WhatYourRecipeApp {
                         <div class="profile-main">
                             <div class="profile-avatar-large">
                                 ${userProfile.avatar_url 
-                                    ? `<img src="${userProfile.avatar_url}" alt="Avatar">`
+                                    ? `<img src="${this.avatarSrc(userProfile.avatar_url, 256)}" alt="Avatar">`
                                     : `<div class="avatar-placeholder">${userProfile.full_name?.charAt(0)?.toUpperCase() || userProfile.username?.charAt(0)?.toUpperCase() || 'U'}</div>`
                                 }
                             </div>
@@ -1913,6 +1969,7 @@ class WhatYourRecipeApp {
                 recipes.forEach(recipe => {
                     container.appendChild(this.createRecipeCard(recipe));
                 });
+                this.loadVoteStates(recipes);
             } else {
                 container.innerHTML = `
                     <div class="no-recipes">
@@ -2014,6 +2071,7 @@ class WhatYourRecipeApp {
             recipes.forEach(recipe => {
                 feedContent.appendChild(this.createRecipeCard(recipe));
             });
+            this.loadVoteStates(recipes);
         } else {
             // Show header without button + empty state with button when no recipes
             const headerWithoutButton = `
@@ -2061,7 +2119,7 @@ class WhatYourRecipeApp {
         // Show current avatar
         const avatarPreview = document.getElementById('avatarPreview');
         if (this.currentUser.avatar_url) {
-            avatarPreview.innerHTML = `<img src="${this.currentUser.avatar_url}" alt="Current Avatar" style="width: 100%; height: 100%; border-radius: 50%; object-fit: cover;">`;
+            avatarPreview.innerHTML = `<img src="${this.avatarSrc(this.currentUser.avatar_url, 256)}" alt="Current Avatar" style="width: 100%; height: 100%; border-radius: 50%; object-fit: cover;">`;
         } else {
             const initials = this.currentUser.full_name?.charAt(0).toUpperCase() || this.currentUser.username?.charAt(0).toUpperCase() || 'U';
             avatarPreview.innerHTML = `<span>${initials}</span>`;
@@ -2183,7 +2241,7 @@ class WhatYourRecipeApp {
                 <div class="recipe-author">
                     <div class="avatar">
                         ${recipe.profiles?.avatar_url 
-                            ? `<img src="${recipe.profiles.avatar_url}" alt="Avatar" style="width: 100%; height: 100%; border-radius: 50%; object-fit: cover;">`
+                            ? `<img src="${this.avatarSrc(recipe.profiles.avatar_url, 96)}" alt="Avatar" style="width: 100%; height: 100%; border-radius: 50%; object-fit: cover;">`
                             : (recipe.profiles?.username?.charAt(0)?.toUpperCase() || recipe.profiles?.full_name?.charAt(0)?.toUpperCase() || 'U')
                         }
                     </div>
@@ -2376,28 +2434,13 @@ class WhatYourRecipeApp {
         try {
             console.log('Starting recipe edit for ID:', recipeId);
             
-            // First check if we have cached recipe data in the card
-            const recipeCard = document.querySelector(`[data-recipe-id="${recipeId}"]`);
-            let recipe = null;
-            
-            if (recipeCard && recipeCard.dataset.recipeData) {
-                // Try to use cached data first
-                try {
-                    recipe = JSON.parse(recipeCard.dataset.recipeData);
-                    console.log('Using cached recipe data for edit:', recipe);
-                } catch (parseError) {
-                    console.log('Failed to parse cached data, fetching from API');
-                }
-            }
-            
-            // If no cached data or parsing failed, fetch from API
-            if (!recipe) {
-                console.log('Fetching recipe from API for editing...');
-                recipe = await api.getRecipe(recipeId);
-                console.log('Received recipe data from API:', recipe);
-            }
+            // Cards only carry the "card" projection, so always load the full recipe for editing
+            console.log('Fetching recipe from API for editing...');
+            const recipe = await api.getRecipe(recipeId);
+            console.log('Received recipe data from API:', recipe);
 
             this.currentEditingId = recipeId;
+            this.editingOriginal = recipe;
             console.log('Showing create recipe page for editing...');
             this.showCreateRecipePage(false);
             
@@ -2576,6 +2619,20 @@ class WhatYourRecipeApp {
         this.uploadAvatar(file);
     }
 
+    // Resolve a stored avatar_url to an image URL. Uploaded avatars are served by the API
+    // in fixed sizes (48, 96, 256), and old ui-avatars.com links use the local initials avatar.
+    avatarSrc(url, size = 96) {
+        if (!url) return url;
+        if (url.startsWith('/avatars/')) {
+            return `${api.baseURL}${url.replace(/-\d+\.webp$/, `-${size}.webp`)}`;
+        }
+        if (url.includes('ui-avatars.com')) {
+            const name = new URL(url).searchParams.get('name') || 'User';
+            return `${api.baseURL}/avatars/initials/${encodeURIComponent(name)}.svg`;
+        }
+        return url;
+    }
+
     async uploadAvatar(file) {
         try {
             const formData = new FormData();
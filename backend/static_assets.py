@@ -0,0 +1,167 @@
+"""
+Static asset pipeline for What'sYourRecipe
+Minifies the frontend CSS/JS, writes content-hashed copies with precompressed gzip and
+brotli variants, and rewrites index.html to reference them.
+Run `python static_assets.py` at build time; the app also rebuilds on startup when the
+output is missing or older than the sources.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import re
+
+from fastapi.responses import FileResponse, Response
+
+from compression import brotli, choose_encoding
+
+try:
+    import rcssmin
+except ImportError:  # optional; falls back to comment/whitespace stripping
+    rcssmin = None
+
+try:
+    import rjsmin
+except ImportError:  # optional; falls back to indentation stripping
+    rjsmin = None
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static")
+DIST_DIR = os.path.join(STATIC_DIR, "dist")
+ASSETS_DIR = os.path.join(DIST_DIR, "assets")
+MANIFEST_PATH = os.path.join(DIST_DIR, "manifest.json")
+
+# Files fingerprinted and referenced from index.html
+ASSETS = {
+    "styles.css": "text/css; charset=utf-8",
+    "api.js": "application/javascript; charset=utf-8",
+    "script.js": "application/javascript; charset=utf-8",
+}
+
+# Bump when the build output format changes so existing builds are redone
+PIPELINE_VERSION = "1"
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "no-cache"
+
+_REFERENCE_PATTERN = re.compile(r'(href|src)="(' + "|".join(re.escape(name) for name in ASSETS) + r')(\?[^"]*)?"')
+_CSS_COMMENT_PATTERN = re.compile(r"/\*.*?\*/", re.S)
+
+
+def minify_css(text):
+    if rcssmin is not None:
+        return rcssmin.cssmin(text)
+    text = _CSS_COMMENT_PATTERN.sub("", text)
+    return "\n".join(line.strip() for line in text.splitlines() if line.strip())
+
+
+def minify_js(text):
+    if rjsmin is not None:
+        return rjsmin.jsmin(text)
+    # Strip indentation and blank lines, leaving multi-line template literals untouched
+    lines = []
+    in_template = False
+    for line in text.splitlines():
+        if in_template:
+            lines.append(line)
+        elif line.strip():
+            lines.append(line.strip())
+        in_template ^= len(re.findall(r"(?<!\\)`", line)) % 2 == 1
+    return "\n".join(lines)
+
+
+def source_digest():
+    """Hash of everything the build reads, used to detect stale output"""
+    digest = hashlib.sha256(PIPELINE_VERSION.encode())
+    digest.update(b"rcssmin" if rcssmin else b"-")
+    digest.update(b"rjsmin" if rjsmin else b"-")
+    for name in list(ASSETS) + ["index.html"]:
+        with open(os.path.join(STATIC_DIR, name), "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def _write_variants(path, data):
+    """Write a file plus .gz and .br siblings (maximum compression, done once at build time)"""
+    with open(path, "wb") as f:
+        f.write(data)
+    with open(path + ".gz", "wb") as f:
+        f.write(gzip.compress(data, compresslevel=9, mtime=0))
+    if brotli is not None:
+        with open(path + ".br", "wb") as f:
+            f.write(brotli.compress(data, quality=11))
+
+
+def build():
+    """Build static/dist and return the manifest"""
+    os.makedirs(ASSETS_DIR, exist_ok=True)
+    for name in os.listdir(ASSETS_DIR):
+        os.remove(os.path.join(ASSETS_DIR, name))
+
+    files = {}
+    for name in ASSETS:
+        with open(os.path.join(STATIC_DIR, name), encoding="utf-8") as f:
+            source = f.read()
+        minified = (minify_css(source) if name.endswith(".css") else minify_js(source)).encode("utf-8")
+        stem, extension = os.path.splitext(name)
+        hashed = f"{stem}.{hashlib.sha256(minified).hexdigest()[:12]}{extension}"
+        _write_variants(os.path.join(ASSETS_DIR, hashed), minified)
+        files[name] = hashed
+        print(f"   {name}: {len(source.encode('utf-8')):,} -> {len(minified):,} bytes ({hashed})")
+
+    with open(os.path.join(STATIC_DIR, "index.html"), encoding="utf-8") as f:
+        index = f.read()
+    index = _REFERENCE_PATTERN.sub(lambda m: f'{m.group(1)}="assets/{files[m.group(2)]}"', index).encode("utf-8")
+    _write_variants(os.path.join(DIST_DIR, "index.html"), index)
+
+    manifest = {
+        "source": source_digest(),
+        "files": files,
+        "index_hash": hashlib.sha256(index).hexdigest()[:16],
+    }
+    with open(MANIFEST_PATH, "w") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def load_manifest():
+    try:
+        with open(MANIFEST_PATH) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def ensure_built():
+    """Return an up-to-date manifest, building first if needed; None if the build can't run"""
+    manifest = load_manifest()
+    try:
+        if manifest and manifest.get("source") == source_digest():
+            return manifest
+        print("📦 Building static assets...")
+        return build()
+    except OSError as e:
+        print(f"⚠️  Could not build static assets, serving unbundled files: {e}")
+        return None
+
+
+def asset_response(path, media_type, version, accept_encoding, if_none_match, cache_control):
+    """Serve a built file, picking its precompressed variant and answering revalidations with 304"""
+    encoding = choose_encoding(accept_encoding) if accept_encoding else None
+    suffix = {"br": ".br", "gzip": ".gz"}.get(encoding)
+    if suffix and not os.path.exists(path + suffix):
+        encoding, suffix = None, None
+
+    etag = f'"{version}-{encoding or "identity"}"'
+    headers = {"Cache-Control": cache_control, "Vary": "Accept-Encoding", "ETag": etag}
+    if if_none_match and etag in [tag.strip() for tag in if_none_match.split(",")]:
+        return Response(status_code=304, headers=headers)
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    return FileResponse(path + (suffix or ""), media_type=media_type, headers=headers)
+
+
+if __name__ == "__main__":
+    print("📦 Building static assets...")
+    result = build()
+    print(f"✅ Wrote {len(result['files'])} assets and index.html to {DIST_DIR}")
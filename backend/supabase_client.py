@@ -0,0 +1,38 @@
+"""
+Supabase client factory for What'sYourRecipe
+Returns a real Supabase client, or the local SQLite stand-in when SUPABASE_URL is a sqlite:// URL.
+Real clients share one pooled HTTP client between PostgREST and Auth, so warm connections are reused.
+"""
+
+import os
+
+from local_supabase import create_local_client, is_local_url
+
+# Connection pool for the real client (per worker process)
+POOL_SIZE = int(os.getenv("SUPABASE_POOL_SIZE", 20))
+POOL_KEEPALIVE_SECONDS = float(os.getenv("SUPABASE_POOL_KEEPALIVE_SECONDS", 60))
+REQUEST_TIMEOUT_SECONDS = float(os.getenv("SUPABASE_TIMEOUT_SECONDS", 30))
+
+
+def get_client(url=None, key=None):
+    """Create a client for SUPABASE_URL / SUPABASE_SERVICE_KEY (or the given url and key)"""
+    url = url or os.getenv("SUPABASE_URL")
+    if is_local_url(url):
+        return create_local_client(url)
+
+    import httpx
+    from supabase import ClientOptions, create_client
+
+    http_client = httpx.Client(
+        limits=httpx.Limits(max_connections=POOL_SIZE, max_keepalive_connections=POOL_SIZE, keepalive_expiry=POOL_KEEPALIVE_SECONDS),
+        timeout=httpx.Timeout(REQUEST_TIMEOUT_SECONDS, connect=5.0),
+    )
+    return create_client(url, key or os.getenv("SUPABASE_SERVICE_KEY"), options=ClientOptions(httpx_client=http_client))
+
+
+def close_client(client):
+    """Close a client's HTTP connections (the stand-in keeps its database open for the process)"""
+    options = getattr(client, "options", None)
+    http_client = getattr(options, "httpx_client", None)
+    if http_client is not None:
+        http_client.close()
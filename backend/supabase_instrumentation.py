@@ -0,0 +1,171 @@
+"""
+Supabase client instrumentation for What'sYourRecipe
+Wraps the client so every PostgREST/RPC/Auth round trip is timed and reported to listeners
+"""
+
+import threading
+import time
+from dataclasses import dataclass, field
+
+
+@dataclass
+class UpstreamCall:
+    """One Supabase round trip"""
+    kind: str  # table, rpc or auth
+    target: str  # table name, RPC function or auth method
+    operation: str  # select/insert/update/delete/upsert/rpc, or the auth method
+    params: str = ""  # PostgREST query string (filters, select list, ordering)
+    duration: float = 0.0
+    rows: int = 0
+    payload_bytes: int = 0  # HTTP response body size; 0 with the local stand-in, which has no HTTP layer
+    error: str = None
+    started_at: float = field(default_factory=time.perf_counter)
+
+
+_OPERATIONS = {"GET": "select", "HEAD": "count", "POST": "insert", "PATCH": "update", "DELETE": "delete"}
+
+
+def _describe_request(builder):
+    request = getattr(builder, "request", None)
+    method = getattr(request, "http_method", "") if request is not None else ""
+    method = str(getattr(method, "value", method)).upper()
+    params = str(getattr(request, "params", "") or "")
+    headers = getattr(request, "headers", None) or {}
+    if method == "POST" and "resolution=merge-duplicates" in headers.get("prefer", ""):
+        return "upsert", params
+    return _OPERATIONS.get(method, method.lower() or "call"), params
+
+
+_executing = threading.local()  # call whose request the current thread is sending
+
+
+def _record_response_size(response):
+    """httpx response hook: size the body from Content-Length instead of re-serializing the parsed result"""
+    call = getattr(_executing, "call", None)
+    if call is not None:
+        length = response.headers.get("content-length")
+        call.payload_bytes = int(length) if length is not None else len(response.read())
+
+
+def _hook_session(builder):
+    session = getattr(getattr(builder, "request", None), "session", None)
+    hooks = getattr(session, "event_hooks", None)
+    if hooks is not None and _record_response_size not in hooks["response"]:
+        hooks["response"].append(_record_response_size)
+
+
+class _InstrumentedBuilder:
+    """Proxy around a PostgREST request builder; execute() is timed and reported"""
+
+    def __init__(self, builder, client, kind, target):
+        self._builder = builder
+        self._client = client
+        self._kind = kind
+        self._target = target
+
+    def __getattr__(self, name):
+        attr = getattr(self._builder, name)
+        if callable(attr):
+            def call(*args, **kwargs):
+                return self._wrap(attr(*args, **kwargs))
+            return call
+        return self._wrap(attr)
+
+    def _wrap(self, value):
+        # Filters/modifiers return builders; keep them wrapped so execute() stays instrumented
+        if hasattr(value, "execute") and not isinstance(value, _InstrumentedBuilder):
+            return _InstrumentedBuilder(value, self._client, self._kind, self._target)
+        return value
+
+    def execute(self):
+        operation, params = _describe_request(self._builder)
+        if self._kind == "rpc":
+            operation = "rpc"
+        call = UpstreamCall(kind=self._kind, target=self._target, operation=operation, params=params)
+        _hook_session(self._builder)
+        _executing.call = call
+        try:
+            response = self._builder.execute()
+        except Exception as e:
+            call.error = str(e)
+            raise
+        else:
+            data = getattr(response, "data", None)
+            if isinstance(data, list):
+                call.rows = len(data)
+            elif data is not None:
+                call.rows = 1
+            return response
+        finally:
+            _executing.call = None
+            call.duration = time.perf_counter() - call.started_at
+            self._client._notify(call)
+
+
+class _InstrumentedAuth:
+    """Proxy around the auth client; each method call is one round trip"""
+
+    def __init__(self, auth, client):
+        self._auth = auth
+        self._client = client
+
+    def __getattr__(self, name):
+        attr = getattr(self._auth, name)
+        if not callable(attr) or name.startswith("_"):
+            return attr
+
+        def call(*args, **kwargs):
+            record = UpstreamCall(kind="auth", target=name, operation=name)
+            try:
+                return attr(*args, **kwargs)
+            except Exception as e:
+                record.error = str(e)
+                raise
+            finally:
+                record.duration = time.perf_counter() - record.started_at
+                self._client._notify(record)
+
+        return call
+
+
+class InstrumentedClient:
+    """Drop-in wrapper for a supabase Client that reports every round trip to its listeners"""
+
+    def __init__(self, client, listeners=()):
+        self._listeners = list(listeners)
+        self.replace_client(client)
+
+    def replace_client(self, client):
+        """Swap the wrapped client (e.g. for a fresh connection in a forked worker)"""
+        self._client = client
+        self.auth = _InstrumentedAuth(client.auth, self)
+        self.closed = False
+
+    def close(self, close_client):
+        """Release the wrapped client's connections with close_client(client); replace_client reopens"""
+        if not self.closed:
+            close_client(self._client)
+            self.closed = True
+
+    def add_listener(self, listener):
+        self._listeners.append(listener)
+
+    def _notify(self, call):
+        for listener in self._listeners:
+            try:
+                listener(call)
+            except Exception as e:
+                print(f"Instrumentation listener error: {e}")
+
+    def table(self, table_name):
+        return _InstrumentedBuilder(self._client.table(table_name), self, "table", table_name)
+
+    def from_(self, table_name):
+        return self.table(table_name)
+
+    def rpc(self, fn, params=None, *args, **kwargs):
+        builder = self._client.rpc(fn, params or {}, *args, **kwargs)
+        return _InstrumentedBuilder(builder, self, "rpc", fn)
+
+    def __getattr__(self, name):
+        return getattr(self._client, name)
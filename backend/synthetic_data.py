@@ -0,0 +1,256 @@
+"""
+Synthetic dataset generator for What'sYourRecipe
+Seeded, reproducible, streaming generators for scale testing: power-law distributed users, follows,
+recipes (with realistic brewing parameters and hashtags), votes, saves and views.
+
+Rows are yielded one at a time so millions of rows never sit in memory; ids are derived from
+(seed, table, index) so every table can be generated independently and still reference the others.
+Used by `python db_manager.py generate`.
+"""
+
+import json
+import random
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from itertools import accumulate
+
+# Pareto shape for per-entity activity (lower = heavier tail); E[x] = a / (a - 1)
+POPULARITY_SHAPE = 1.3
+
+BREW_PROFILES = {
+    # method: (coffee g, water g, grind microns, water temp C, brew time min)
+    "espresso": ((17, 21), (34, 45), (200, 300), (90, 94), (0.4, 0.5)),
+    "pourover": ((14, 22), (230, 360), (500, 800), (90, 96), (2.5, 4.0)),
+    "v60": ((12, 20), (200, 330), (500, 750), (90, 96), (2.5, 3.5)),
+    "aeropress": ((11, 18), (180, 250), (350, 650), (80, 92), (1.5, 2.5)),
+    "frenchPress": ((15, 30), (250, 500), (900, 1200), (92, 96), (4.0, 6.0)),
+    "coldBrew": ((60, 100), (500, 1000), (1000, 1400), (18, 24), (720, 1080)),
+    "chemex": ((25, 40), (400, 650), (650, 900), (92, 96), (3.5, 5.0)),
+    "southIndianFilter": ((15, 25), (120, 200), (300, 500), (92, 98), (10, 15)),
+}
+ROAST_LEVELS = ["light", "medium-light", "medium", "medium-dark", "dark"]
+BEAN_VARIETIES = ["arabica", "robusta", "sln795", "chandragiri", "geisha", "bourbon", "typica", "catuai"]
+REGIONS = ["chikmagalur", "coorg", "wayanad", "araku", "nilgiris", "ethiopia", "colombia", "kenya", "brazil", "sumatra"]
+INDIA_ESTATES = ["Baba Budangiri", "Ratnagiri", "Kerehaklu", "Riverdale", "Thogarihunkal", "Harley"]
+PROCESSING = ["washed", "natural", "honey", "monsooned", "anaerobic"]
+MILK = [None, None, "whole", "oat", "almond", "skim"]
+AROMAS = ["jaggery", "citrus", "cocoa", "stone fruit", "jasmine", "caramel", "spice", "berry", "toffee"]
+HASHTAGS = [
+    "espresso", "pourover", "v60", "aeropress", "coldbrew", "chemex", "frenchpress", "filterkaapi",
+    "lightroast", "darkroast", "naturals", "washed", "chikmagalur", "coorg", "singleorigin", "latteart",
+    "homebarista", "specialtycoffee", "morningbrew", "decaf",
+]
+FIRST_NAMES = ["Aarav", "Diya", "Ishaan", "Meera", "Kabir", "Ananya", "Rohan", "Saanvi", "Vikram", "Priya", "Arjun", "Nisha"]
+LAST_NAMES = ["Rao", "Iyer", "Sharma", "Menon", "Reddy", "Nair", "Gowda", "Kapoor", "Shetty", "Das"]
+
+
+@dataclass
+class DatasetSpec:
+    users: int = 1_000
+    recipes: int = 10_000
+    follows: int = 20_000
+    votes: int = 100_000
+    saves: int = 20_000
+    views: int = 50_000
+    seed: int = 42
+    days: int = 365  # how far back created_at timestamps go
+
+
+# Offsets keep each table's random stream independent of the sizes of the others
+_STREAMS = {"profiles": 1, "recipes": 2, "follows": 3, "recipe_votes": 4, "saved_recipes": 5, "recipe_views": 6, "popularity": 7}
+
+
+def entity_id(spec, kind, index):
+    """Deterministic UUID for row `index` of `kind` (so tables can reference each other without lookups)"""
+    return str(uuid.UUID(int=((spec.seed & 0xFFFFFFFF) << 96) | (_STREAMS[kind] << 64) | index, version=4))
+
+
+def _rng(spec, kind):
+    return random.Random(spec.seed * 1_000 + _STREAMS[kind])
+
+
+def _activity(rng):
+    """Heavy-tailed activity multiplier with mean 1"""
+    return rng.paretovariate(POPULARITY_SHAPE) * (POPULARITY_SHAPE - 1) / POPULARITY_SHAPE
+
+
+class _UserPopularity:
+    """Zipf-like popularity over users: popular users get followed, voted and read more"""
+
+    def __init__(self, spec):
+        rng = _rng(spec, "popularity")
+        ranks = list(range(spec.users))
+        rng.shuffle(ranks)
+        self.indexes = list(range(spec.users))
+        self.cum_weights = list(accumulate(1.0 / (rank + 1) ** 0.9 for rank in ranks))
+
+    def sample(self, rng, k, exclude=None):
+        """Up to k distinct user indexes, drawn by popularity"""
+        k = min(k, len(self.indexes) - (1 if exclude is not None else 0))
+        chosen = set()
+        attempts = 0
+        while len(chosen) < k and attempts < 8:
+            for index in rng.choices(self.indexes, cum_weights=self.cum_weights, k=(k - len(chosen)) * 2):
+                if index != exclude:
+                    chosen.add(index)
+                    if len(chosen) == k:
+                        break
+            attempts += 1
+        if len(chosen) < k:
+            # Tail of a near-complete sample: fill uniformly
+            remaining = [i for i in self.indexes if i not in chosen and i != exclude]
+            chosen.update(rng.sample(remaining, k - len(chosen)))
+        return chosen
+
+
+def _timeline(spec):
+    # Anchored to today (UTC midnight) so reruns on the same day are identical but data stays "recent"
+    end = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    return end - timedelta(days=spec.days), end
+
+
+def recipe_created_at(spec, index):
+    """Recipes are generated in chronological order, so their timestamps are derivable from the index"""
+    start, end = _timeline(spec)
+    return start + (end - start) * (index + 0.5) / max(spec.recipes, 1)
+
+
+def generate_auth_users(spec):
+    """auth.users rows for the profiles (Postgres only: profiles.id references auth.users)"""
+    start, _ = _timeline(spec)
+    for index in range(spec.users):
+        yield {
+            "id": entity_id(spec, "profiles", index),
+            "instance_id": "00000000-0000-0000-0000-000000000000",
+            "aud": "authenticated",
+            "role": "authenticated",
+            "email": f"brewer_{index}@example.com",
+            "raw_user_meta_data": json.dumps({"username": f"brewer_{index}"}),
+            "created_at": start.isoformat(),
+        }
+
+
+def generate_profiles(spec):
+    rng = _rng(spec, "profiles")
+    start, end = _timeline(spec)
+    for index in range(spec.users):
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        yield {
+            "id": entity_id(spec, "profiles", index),
+            "username": f"brewer_{index}",
+            "full_name": f"{first} {last}",
+            "email": f"brewer_{index}@example.com",
+            "bio": f"Home barista from {rng.choice(REGIONS).title()}. Mostly {rng.choice(list(BREW_PROFILES))}." if rng.random() < 0.6 else None,
+            "location": rng.choice(REGIONS).title() if rng.random() < 0.4 else None,
+            "created_at": (start + (end - start) * rng.random() * 0.5).isoformat(),
+        }
+
+
+def generate_recipes(spec):
+    rng = _rng(spec, "recipes")
+    authors = _UserPopularity(spec)
+    view_counts = interaction_counts(spec, "recipe_views", spec.views)
+    for index in range(spec.recipes):
+        method = rng.choice(list(BREW_PROFILES))
+        coffee, water, grind, temp, brew_time = BREW_PROFILES[method]
+        roast = rng.choice(ROAST_LEVELS)
+        region = rng.choice(REGIONS)
+        aromas = rng.sample(AROMAS, 2)
+        tags = rng.sample(HASHTAGS, rng.choice([0, 1, 1, 2, 2, 3, 4]))
+        created = recipe_created_at(spec, index)
+        author = next(iter(authors.sample(rng, 1)))
+        yield {
+            "id": entity_id(spec, "recipes", index),
+            "user_id": entity_id(spec, "profiles", author),
+            "recipe_name": f"{roast.title()} {region.title()} {method}",
+            "description": f"{rng.choice(['Bright', 'Syrupy', 'Clean', 'Bold', 'Juicy'])} cup with notes of {aromas[0]} and {aromas[1]}. "
+                           + " ".join(f"#{tag}" for tag in tags),
+            "rating": round(min(10, max(1, rng.gauss(7.5, 1.2))), 1),
+            "date_created": created.date().isoformat(),
+            "bean_variety": rng.choice(BEAN_VARIETIES),
+            "bean_region": region,
+            "india_estate": rng.choice(INDIA_ESTATES) if region in ("chikmagalur", "coorg", "wayanad", "araku", "nilgiris") else None,
+            "processing_type": rng.choice(PROCESSING),
+            "roast_level": roast,
+            "brew_method": method,
+            "grind_microns": rng.randint(*grind),
+            "coffee_amount": round(rng.uniform(*coffee), 1),
+            "water_amount": round(rng.uniform(*water), 1),
+            "water_temp": rng.randint(*temp),
+            "brew_time": round(rng.uniform(*brew_time), 2),
+            "tds": rng.randint(40, 150),
+            "milk_preference": rng.choice(MILK),
+            "aroma_notes": ", ".join(aromas),
+            "cupping_score": round(rng.uniform(78, 92), 2) if rng.random() < 0.2 else None,
+            "brewing_notes": f"Bloom 30s. #{rng.choice(HASHTAGS)}" if rng.random() < 0.3 else None,
+            "is_public": rng.random() < 0.95,
+            "view_count": next(view_counts),  # matches the recipe_views rows generated for it
+            "created_at": created.isoformat(),
+        }
+
+
+def generate_follows(spec):
+    rng = _rng(spec, "follows")
+    targets = _UserPopularity(spec)
+    mean = spec.follows / max(spec.users, 1)
+    _, end = _timeline(spec)
+    for follower in range(spec.users):
+        degree = min(int(round(mean * _activity(rng))), spec.users - 1)
+        for following in sorted(targets.sample(rng, degree, exclude=follower)):
+            yield {
+                "follower_id": entity_id(spec, "profiles", follower),
+                "following_id": entity_id(spec, "profiles", following),
+                "created_at": (end - timedelta(days=spec.days * rng.random())).isoformat(),
+            }
+
+
+def interaction_counts(spec, kind, total):
+    """Heavy-tailed number of interactions per recipe (own random stream, so recipes can replay it)"""
+    rng = random.Random(spec.seed * 1_000 + _STREAMS[kind] + 500)
+    mean = total / max(spec.recipes, 1)
+    for _ in range(spec.recipes):
+        yield min(int(round(mean * _activity(rng))), spec.users)
+
+
+def _per_recipe(spec, kind, total, row):
+    """Distribute `total` interactions over recipes by popularity, picking users by popularity"""
+    rng = _rng(spec, kind)
+    users = _UserPopularity(spec)
+    _, end = _timeline(spec)
+    for recipe, count in enumerate(interaction_counts(spec, kind, total)):
+        if not count:
+            continue
+        created = recipe_created_at(spec, recipe)
+        for user in sorted(users.sample(rng, count)):
+            at = created + (end - created) * rng.random() ** 3  # most interactions soon after posting
+            yield row(rng, entity_id(spec, "recipes", recipe), entity_id(spec, "profiles", user), at.isoformat())
+
+
+def generate_votes(spec):
+    return _per_recipe(spec, "recipe_votes", spec.votes, lambda rng, recipe_id, user_id, at: {
+        "recipe_id": recipe_id, "user_id": user_id, "vote_type": "up" if rng.random() < 0.85 else "down", "created_at": at,
+    })
+
+
+def generate_saves(spec):
+    return _per_recipe(spec, "saved_recipes", spec.saves, lambda rng, recipe_id, user_id, at: {
+        "recipe_id": recipe_id, "user_id": user_id, "created_at": at,
+    })
+
+
+def generate_views(spec):
+    return _per_recipe(spec, "recipe_views", spec.views, lambda rng, recipe_id, user_id, at: {
+        "recipe_id": recipe_id, "user_id": user_id, "created_at": at,
+    })
+
+
+# Insert order respects foreign keys; sizes are approximate for the per-entity tables (heavy tails)
+TABLES = [
+    ("profiles", generate_profiles, "users"),
+    ("recipes", generate_recipes, "recipes"),
+    ("follows", generate_follows, "follows"),
+    ("recipe_votes", generate_votes, "votes"),
+    ("saved_recipes", generate_saves, "saves"),
+    ("recipe_views", generate_views, "views"),
+]
@@ -0,0 +1,108 @@
+"""
+Per-request Supabase round-trip tracing for What'sYourRecipe
+Records every upstream call made while handling a request, reports them via Server-Timing in
+debug mode, and warns about requests that blow their round-trip budget or repeat identical queries
+"""
+
+import time
+from collections import Counter
+from contextvars import ContextVar
+
+from metrics import Counter as MetricCounter, route_template
+
+_current_trace = ContextVar("current_trace", default=None)
+
+# Per-route round-trip budgets keyed by route template; routes not listed use the default budget
+ROUTE_BUDGETS = {}
+
+BUDGET_EXCEEDED = MetricCounter("roundtrip_budget_exceeded_total", "Requests over their Supabase round-trip budget", ("route",))
+REPEATED_QUERIES = MetricCounter("repeated_upstream_queries_total", "Identical Supabase queries repeated within one request", ("route", "target"))
+
+# Server-Timing entries beyond this are summarised to keep the header small
+MAX_TIMING_ENTRIES = 20
+
+
+def set_route_budget(path, budget):
+    """Override the round-trip budget for one route template"""
+    ROUTE_BUDGETS[path] = budget
+
+
+class RequestTrace:
+    def __init__(self, method, route):
+        self.method = method
+        self.route = route
+        self.calls = []
+        self.started_at = time.perf_counter()
+
+    @property
+    def upstream_seconds(self):
+        return sum(call.duration for call in self.calls)
+
+    def repeated_queries(self):
+        """Identical calls (same target, operation and query string) issued more than once"""
+        keys = Counter((call.kind, call.target, call.operation, call.params) for call in self.calls if call.kind != "auth")
+        return [(key, count) for key, count in keys.items() if count > 1]
+
+    def server_timing(self):
+        entries = [f'supabase;dur={self.upstream_seconds * 1000:.1f};desc="{len(self.calls)} round trips"']
+        for index, call in enumerate(self.calls[:MAX_TIMING_ENTRIES]):
+            desc = f"{call.operation} {call.target} ({call.rows} rows)"
+            entries.append(f'sb{index};dur={call.duration * 1000:.1f};desc="{desc}"')
+        return ", ".join(entries)
+
+
+def current_trace():
+    return _current_trace.get()
+
+
+def trace_upstream_call(call):
+    """Supabase instrumentation listener: attach the call to the active request trace"""
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.calls.append(call)
+
+
+class RoundTripTracerMiddleware:
+    """ASGI middleware that traces Supabase round trips per request"""
+
+    def __init__(self, app, fastapi_app, budget=5, debug=False):
+        self.app = app
+        self.fastapi_app = fastapi_app
+        self.budget = budget
+        self.debug = debug
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        trace = RequestTrace(scope["method"], route_template(self.fastapi_app, scope))
+        token = _current_trace.set(trace)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start" and self.debug:
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", trace.server_timing().encode("latin-1", "replace")))
+                headers.append((b"x-upstream-calls", str(len(trace.calls)).encode("latin-1")))
+                message = dict(message, headers=headers)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current_trace.reset(token)
+            self.report(trace)
+
+    def report(self, trace):
+        budget = ROUTE_BUDGETS.get(trace.route, self.budget)
+        if len(trace.calls) > budget:
+            BUDGET_EXCEEDED.inc(route=trace.route)
+            summary = ", ".join(f"{call.operation} {call.target}" for call in trace.calls)
+            print(
+                f"WARNING: {trace.method} {trace.route} made {len(trace.calls)} Supabase round trips "
+                f"(budget {budget}, {trace.upstream_seconds * 1000:.0f}ms upstream): {summary}"
+            )
+
+        for (kind, target, operation, params), count in trace.repeated_queries():
+            REPEATED_QUERIES.inc(route=trace.route, target=target)
+            print(f"WARNING: {trace.method} {trace.route} repeated {operation} {target} {count}x with identical query: {params}")
@@ -0,0 +1,167 @@
+"""
+Write-behind vote buffer for What'sYourRecipe
+With VOTE_WRITE_BEHIND=true, cast_vote records intents in an in-process buffer keyed by recipe
+and user instead of writing each one. Repeated toggles by the same user collapse into their net
+change, and a background task flushes the net changes on a short interval with one
+apply_vote_changes call, which writes them in multi-row statements and moves each recipe's
+counters once. Reads overlay the buffered state, so a voter sees their vote immediately.
+
+The buffer lives in one worker process: votes still buffered when a process dies are lost.
+It needs a single worker (gunicorn.conf.py refuses to start more): a toggle served by another
+worker would read the stored vote, not the buffered one, and apply the wrong toggle.
+"""
+
+import asyncio
+from dataclasses import dataclass
+from typing import Optional
+
+from metrics import VOTE_BUFFERED, VOTE_FLUSHES, VOTE_INTENTS
+
+
+@dataclass
+class PendingVote:
+    base: Optional[str]     # vote the database holds (or will hold once the in-flight flush lands)
+    current: Optional[str]  # vote after the buffered intents; None means no vote
+
+
+class VoteBuffer:
+    def __init__(self, client, interval=0.25, max_batch=5000):
+        self.client = client
+        self.interval = interval
+        self.max_batch = max_batch
+        self.pending = {}   # recipe_id -> {user_id: PendingVote}
+        self.flushing = {}  # same shape; the batch currently being written
+        self._lock = asyncio.Lock()
+        self._task = None
+
+    def _lookup(self, recipe_id, user_id):
+        return self.pending.get(recipe_id, {}).get(user_id) or self.flushing.get(recipe_id, {}).get(user_id)
+
+    def user_vote(self, recipe_id, user_id):
+        """(True, vote_type) when the user's vote on this recipe is buffered, else (False, None)"""
+        vote = self._lookup(recipe_id, user_id)
+        return (True, vote.current) if vote else (False, None)
+
+    def cast(self, recipe_id, user_id, vote_type, load_stored):
+        """Apply one vote intent with cast_vote's toggle rules; returns (action, resulting vote_type).
+
+        load_stored() returns the user's stored vote and is only called when nothing is
+        buffered for them yet, so repeated toggles don't read the database again.
+        """
+        known = self._lookup(recipe_id, user_id)
+        current = known.current if known else load_stored()
+        result = None if current == vote_type else vote_type
+
+        votes = self.pending.setdefault(recipe_id, {})
+        entry = votes.get(user_id)
+        if entry is None:
+            entry = votes[user_id] = PendingVote(base=current, current=result)
+        entry.current = result
+        if entry.current == entry.base:
+            # Toggled back to what is stored: nothing to write
+            del votes[user_id]
+            VOTE_INTENTS.inc(outcome="collapsed")
+        else:
+            VOTE_INTENTS.inc(outcome="buffered")
+        if not votes:
+            del self.pending[recipe_id]
+        VOTE_BUFFERED.set(self.size())
+
+        if current is None:
+            return "created", result
+        return ("removed" if result is None else "updated"), result
+
+    def size(self):
+        return sum(len(votes) for votes in self.pending.values())
+
+    def _entries(self, recipe_id):
+        """Buffered votes for one recipe as {user_id: (vote stored now, vote after flushing)}"""
+        entries = {user_id: (vote.base, vote.current) for user_id, vote in self.flushing.get(recipe_id, {}).items()}
+        for user_id, vote in self.pending.get(recipe_id, {}).items():
+            base = entries[user_id][0] if user_id in entries else vote.base
+            entries[user_id] = (base, vote.current)
+        return entries
+
+    def overlay(self, recipes):
+        """Apply buffered votes to recipe rows read from the database (embedded votes and counters)"""
+        if not self.pending and not self.flushing:
+            return recipes
+        for recipe in recipes:
+            entries = self._entries(recipe.get("id"))
+            if not entries:
+                continue
+            if isinstance(recipe.get("recipe_votes"), list):
+                votes = [vote for vote in recipe["recipe_votes"] if vote.get("user_id") not in entries]
+                votes += [{"vote_type": current, "user_id": user_id} for user_id, (_, current) in entries.items() if current]
+                recipe["recipe_votes"] = votes
+            for column, vote_type in (("upvotes_count", "up"), ("downvotes_count", "down")):
+                if column in recipe:
+                    delta = sum((current == vote_type) - (base == vote_type) for base, current in entries.values())
+                    recipe[column] = max((recipe[column] or 0) + delta, 0)
+        return recipes
+
+    async def flush(self):
+        """Write the buffered net changes; returns how many (recipe, user) votes were written"""
+        async with self._lock:
+            if not self.pending:
+                return 0
+            self.flushing, self.pending = self.pending, {}
+            VOTE_BUFFERED.set(0)
+            changes = [
+                {"recipe_id": recipe_id, "user_id": user_id, "vote_type": vote.current}
+                for recipe_id, votes in self.flushing.items()
+                for user_id, vote in votes.items()
+            ]
+            try:
+                for start in range(0, len(changes), self.max_batch):
+                    batch = changes[start:start + self.max_batch]
+                    await asyncio.to_thread(lambda: self.client.rpc("apply_vote_changes", {"changes": batch}).execute())
+            except asyncio.CancelledError:
+                self._requeue()
+                raise
+            except Exception as e:
+                # apply_vote_changes writes absolute states, so resending the batch is safe
+                print(f"Error flushing {len(changes)} buffered vote(s), will retry: {e}")
+                VOTE_FLUSHES.inc(outcome="error")
+                self._requeue()
+                return 0
+            self.flushing = {}
+            VOTE_FLUSHES.inc(outcome="ok")
+            return len(changes)
+
+    def _requeue(self):
+        """Put a failed batch back under any intents that arrived while it was in flight"""
+        for recipe_id, votes in self.flushing.items():
+            pending_votes = self.pending.setdefault(recipe_id, {})
+            for user_id, vote in votes.items():
+                newer = pending_votes.get(user_id)
+                if newer is None:
+                    pending_votes[user_id] = vote
+                    continue
+                newer.base = vote.base
+                if newer.current == newer.base:
+                    del pending_votes[user_id]
+            if not pending_votes:
+                del self.pending[recipe_id]
+        self.flushing = {}
+        VOTE_BUFFERED.set(self.size())
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.flush()
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        """Stop the flush loop and write whatever is still buffered"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
@@ -14,6 +14,12 @@ CREATE TABLE IF NOT EXISTS public.profiles (
     bio TEXT,
     website TEXT,
     location TEXT,
+    
+    -- Denormalized counters (maintained by triggers, see below)
+    followers_count INTEGER NOT NULL DEFAULT 0,
+    following_count INTEGER NOT NULL DEFAULT 0,
+    recipes_count INTEGER NOT NULL DEFAULT 0,
+    
     created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
     updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
     
@@ -84,6 +90,9 @@ CREATE TABLE IF NOT EXISTS public.recipes (
     -- Social Features
     is_public BOOLEAN DEFAULT true,
     view_count INTEGER DEFAULT 0,
+    upvotes_count INTEGER NOT NULL DEFAULT 0,
+    downvotes_count INTEGER NOT NULL DEFAULT 0,
+    comments_count INTEGER NOT NULL DEFAULT 0,
     
     -- Timestamps
     created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
@@ -169,10 +178,7 @@ CREATE TABLE IF NOT EXISTS public.recipe_views (
     user_id UUID REFERENCES public.profiles(id) ON DELETE CASCADE,
     ip_address INET,
     user_agent TEXT,
-    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
-    
-    -- Allow one view per user per recipe per day
-    UNIQUE(recipe_id, user_id, DATE(created_at))
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
 );
 
 -- Create user recommendations cache table
@@ -204,23 +210,22 @@ CREATE TABLE IF NOT EXISTS public.trending_recipes (
 );
 
 -- Create indexes for better performance
-CREATE INDEX IF NOT EXISTS idx_recipes_user_id ON public.recipes(user_id);
+-- (UNIQUE constraints already index their leading columns: follows(follower_id),
+-- saved_recipes(user_id), recipe_votes(recipe_id), hashtags(tag); see migrations/0007_hot_filter_indexes.sql)
+CREATE INDEX IF NOT EXISTS idx_recipes_user_id_created_at ON public.recipes(user_id, created_at DESC);
 CREATE INDEX IF NOT EXISTS idx_recipes_created_at ON public.recipes(created_at DESC);
 CREATE INDEX IF NOT EXISTS idx_recipes_public ON public.recipes(is_public, created_at DESC);
-CREATE INDEX IF NOT EXISTS idx_recipe_votes_recipe_id ON public.recipe_votes(recipe_id);
-CREATE INDEX IF NOT EXISTS idx_recipe_votes_user_id ON public.recipe_votes(user_id);
-CREATE INDEX IF NOT EXISTS idx_follows_follower ON public.follows(follower_id);
+CREATE INDEX IF NOT EXISTS idx_recipe_votes_recipe_id_vote_type ON public.recipe_votes(recipe_id, vote_type);
+CREATE INDEX IF NOT EXISTS idx_recipe_votes_user_id_vote_type ON public.recipe_votes(user_id, vote_type);
 CREATE INDEX IF NOT EXISTS idx_follows_following ON public.follows(following_id);
-CREATE INDEX IF NOT EXISTS idx_saved_recipes_user ON public.saved_recipes(user_id);
 CREATE INDEX IF NOT EXISTS idx_activities_user ON public.activities(user_id, created_at DESC);
 
 -- New indexes for advanced features
-CREATE INDEX IF NOT EXISTS idx_hashtags_tag ON public.hashtags(tag);
 CREATE INDEX IF NOT EXISTS idx_hashtags_usage_count ON public.hashtags(usage_count DESC);
 CREATE INDEX IF NOT EXISTS idx_hashtags_last_used ON public.hashtags(last_used DESC);
-CREATE INDEX IF NOT EXISTS idx_recipe_hashtags_recipe ON public.recipe_hashtags(recipe_id);
 CREATE INDEX IF NOT EXISTS idx_recipe_hashtags_hashtag ON public.recipe_hashtags(hashtag_id);
-CREATE INDEX IF NOT EXISTS idx_recipe_views_recipe ON public.recipe_views(recipe_id);
+-- One view per user per recipe per (UTC) day; DATE(timestamptz) is not immutable, so index the UTC date
+CREATE UNIQUE INDEX IF NOT EXISTS idx_recipe_views_daily ON public.recipe_views(recipe_id, user_id, ((created_at AT TIME ZONE 'UTC')::date));
 CREATE INDEX IF NOT EXISTS idx_recipe_views_user ON public.recipe_views(user_id);
 CREATE INDEX IF NOT EXISTS idx_recipe_views_created_at ON public.recipe_views(created_at DESC);
 CREATE INDEX IF NOT EXISTS idx_user_recommendations_user ON public.user_recommendations(user_id);
@@ -230,6 +235,8 @@ CREATE INDEX IF NOT EXISTS idx_trending_recipes_expires ON public.trending_recip
 CREATE INDEX IF NOT EXISTS idx_activities_target_user ON public.activities(target_user_id, created_at DESC);
 CREATE INDEX IF NOT EXISTS idx_activities_recipe ON public.activities(recipe_id);
 CREATE INDEX IF NOT EXISTS idx_activities_type ON public.activities(activity_type, created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_recipe_comments_thread ON public.recipe_comments(recipe_id, created_at, id);
+CREATE INDEX IF NOT EXISTS idx_recipe_comments_user ON public.recipe_comments(user_id);
 
 -- Row Level Security Policies
 
@@ -445,9 +452,13 @@ CREATE TRIGGER handle_updated_at_profiles
     BEFORE UPDATE ON public.profiles
     FOR EACH ROW EXECUTE PROCEDURE public.handle_updated_at();
 
+-- Counter-only updates (votes, comments, views) leave updated_at alone; it tracks edits to the recipe itself
 CREATE TRIGGER handle_updated_at_recipes
     BEFORE UPDATE ON public.recipes
-    FOR EACH ROW EXECUTE PROCEDURE public.handle_updated_at();
+    FOR EACH ROW
+    WHEN ((to_jsonb(NEW) - ARRAY['upvotes_count', 'downvotes_count', 'comments_count', 'view_count', 'updated_at'])
+        IS DISTINCT FROM (to_jsonb(OLD) - ARRAY['upvotes_count', 'downvotes_count', 'comments_count', 'view_count', 'updated_at']))
+    EXECUTE PROCEDURE public.handle_updated_at();
 
 CREATE TRIGGER handle_updated_at_comments
     BEFORE UPDATE ON public.recipe_comments
@@ -506,10 +517,52 @@ CREATE TRIGGER on_follow_created
     AFTER INSERT ON public.follows
     FOR EACH ROW EXECUTE PROCEDURE public.handle_follow_activity();
 
--- Trigger for hashtag extraction on recipe creation/update
-CREATE TRIGGER extract_hashtags_on_recipe_change
-    AFTER INSERT OR UPDATE ON public.recipes
-    FOR EACH ROW EXECUTE PROCEDURE public.extract_hashtags_from_recipe();
+-- Function to maintain follower/following counters on profiles
+CREATE OR REPLACE FUNCTION public.handle_follow_counts()
+RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        UPDATE public.profiles SET followers_count = followers_count + 1 WHERE id = NEW.following_id;
+        UPDATE public.profiles SET following_count = following_count + 1 WHERE id = NEW.follower_id;
+        RETURN NEW;
+    ELSIF TG_OP = 'DELETE' THEN
+        UPDATE public.profiles SET followers_count = GREATEST(followers_count - 1, 0) WHERE id = OLD.following_id;
+        UPDATE public.profiles SET following_count = GREATEST(following_count - 1, 0) WHERE id = OLD.follower_id;
+        RETURN OLD;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+-- Trigger for follow counters
+CREATE TRIGGER on_follow_counts_changed
+    AFTER INSERT OR DELETE ON public.follows
+    FOR EACH ROW EXECUTE PROCEDURE public.handle_follow_counts();
+
+-- Function to maintain the public recipe counter on profiles
+CREATE OR REPLACE FUNCTION public.handle_recipe_counts()
+RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.is_public = true THEN
+        UPDATE public.profiles SET recipes_count = GREATEST(recipes_count - 1, 0) WHERE id = OLD.user_id;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.is_public = true THEN
+        UPDATE public.profiles SET recipes_count = recipes_count + 1 WHERE id = NEW.user_id;
+    END IF;
+    RETURN COALESCE(NEW, OLD);
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+-- Trigger for recipe counters (only fires when visibility or owner can change)
+CREATE TRIGGER on_recipe_counts_changed
+    AFTER INSERT OR DELETE ON public.recipes
+    FOR EACH ROW EXECUTE PROCEDURE public.handle_recipe_counts();
+
+CREATE TRIGGER on_recipe_visibility_changed
+    AFTER UPDATE OF is_public, user_id ON public.recipes
+    FOR EACH ROW
+    WHEN (OLD.is_public IS DISTINCT FROM NEW.is_public OR OLD.user_id IS DISTINCT FROM NEW.user_id)
+    EXECUTE PROCEDURE public.handle_recipe_counts();
 
 -- Enhanced function to track recipe views
 CREATE OR REPLACE FUNCTION public.track_recipe_view(
@@ -523,7 +576,7 @@ BEGIN
     -- Insert view record (will be ignored if duplicate user+recipe+date)
     INSERT INTO public.recipe_views (recipe_id, user_id, ip_address, user_agent)
     VALUES (recipe_uuid, user_uuid, ip_addr, user_agent_str)
-    ON CONFLICT (recipe_id, user_id, DATE(created_at)) DO NOTHING;
+    ON CONFLICT (recipe_id, user_id, ((created_at AT TIME ZONE 'UTC')::date)) DO NOTHING;
     
     -- Update recipe view count
     UPDATE public.recipes 
@@ -532,45 +585,225 @@ BEGIN
 END;
 $$ LANGUAGE plpgsql SECURITY DEFINER;
 
--- Function to extract and update hashtags from recipe content
-CREATE OR REPLACE FUNCTION public.extract_hashtags_from_recipe()
-RETURNS trigger AS $$
-DECLARE
-    hashtag_text TEXT;
-    hashtag_record RECORD;
-    hashtag_id UUID;
+-- Hashtags are extracted in the app (backend/hashtags.py) and applied with sync_recipe_hashtags
+-- Apply desired tag sets for many recipes at once:
+-- changes = [{"recipe_id": "...", "tags": ["espresso", "v60"]}, ...]
+-- Only links that differ are touched, and usage_count moves by the number of links added/removed
+CREATE OR REPLACE FUNCTION public.sync_recipe_hashtags(changes JSONB)
+RETURNS void AS $$
 BEGIN
-    -- Clear existing hashtags for this recipe
-    DELETE FROM public.recipe_hashtags WHERE recipe_id = NEW.id;
-    
-    -- Extract hashtags from description and brewing notes
-    FOR hashtag_text IN 
-        SELECT DISTINCT lower(trim(regexp_replace(match, '#', ''))) as tag
-        FROM (
-            SELECT regexp_split_to_table(NEW.description || ' ' || COALESCE(NEW.brewing_notes, ''), '\s+') as match
-            WHERE NEW.description IS NOT NULL
-        ) matches
-        WHERE match ~ '^#[a-zA-Z0-9_]+$'
-        AND length(trim(regexp_replace(match, '#', ''))) >= 2
-    LOOP
-        -- Insert or update hashtag
+    -- Links that are no longer wanted
+    WITH targets AS (
+        SELECT DISTINCT (c->>'recipe_id')::uuid AS recipe_id
+        FROM jsonb_array_elements(changes) c
+    ),
+    desired AS (
+        SELECT DISTINCT (c->>'recipe_id')::uuid AS recipe_id, lower(t.tag) AS tag
+        FROM jsonb_array_elements(changes) c
+        CROSS JOIN LATERAL jsonb_array_elements_text(c->'tags') AS t(tag)
+    ),
+    removed AS (
+        DELETE FROM public.recipe_hashtags rh
+        USING targets, public.hashtags h
+        WHERE rh.recipe_id = targets.recipe_id
+        AND h.id = rh.hashtag_id
+        AND NOT EXISTS (SELECT 1 FROM desired d WHERE d.recipe_id = rh.recipe_id AND d.tag = h.tag)
+        RETURNING rh.hashtag_id
+    )
+    UPDATE public.hashtags h
+    SET usage_count = GREATEST(h.usage_count - r.removed_count, 0)
+    FROM (SELECT hashtag_id, COUNT(*) AS removed_count FROM removed GROUP BY hashtag_id) r
+    WHERE h.id = r.hashtag_id;
+
+    -- Links that are new
+    WITH desired AS (
+        SELECT DISTINCT (c->>'recipe_id')::uuid AS recipe_id, lower(t.tag) AS tag
+        FROM jsonb_array_elements(changes) c
+        CROSS JOIN LATERAL jsonb_array_elements_text(c->'tags') AS t(tag)
+    ),
+    added AS (
+        SELECT d.recipe_id, d.tag
+        FROM desired d
+        WHERE NOT EXISTS (
+            SELECT 1 FROM public.recipe_hashtags rh
+            JOIN public.hashtags h ON h.id = rh.hashtag_id
+            WHERE rh.recipe_id = d.recipe_id AND h.tag = d.tag
+        )
+    ),
+    upserted AS (
         INSERT INTO public.hashtags (tag, usage_count, last_used)
-        VALUES (hashtag_text, 1, NOW())
-        ON CONFLICT (tag) 
-        DO UPDATE SET 
-            usage_count = hashtags.usage_count + 1,
+        SELECT tag, COUNT(*), NOW() FROM added GROUP BY tag
+        ON CONFLICT (tag)
+        DO UPDATE SET
+            usage_count = hashtags.usage_count + EXCLUDED.usage_count,
             last_used = NOW()
-        RETURNING id INTO hashtag_id;
-        
-        -- Link recipe to hashtag
-        INSERT INTO public.recipe_hashtags (recipe_id, hashtag_id)
-        VALUES (NEW.id, hashtag_id);
-    END LOOP;
-    
-    RETURN NEW;
+        RETURNING id, tag
+    )
+    INSERT INTO public.recipe_hashtags (recipe_id, hashtag_id)
+    SELECT a.recipe_id, u.id
+    FROM added a
+    JOIN upserted u ON u.tag = a.tag
+    ON CONFLICT (recipe_id, hashtag_id) DO NOTHING;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+-- Only the backend (service role) may rewrite hashtag links
+REVOKE EXECUTE ON FUNCTION public.sync_recipe_hashtags(JSONB) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION public.sync_recipe_hashtags(JSONB) TO service_role;
+
+-- Deleting a recipe releases its tags (the links themselves go with ON DELETE CASCADE)
+CREATE OR REPLACE FUNCTION public.release_recipe_hashtags()
+RETURNS trigger AS $$
+BEGIN
+    UPDATE public.hashtags h
+    SET usage_count = GREATEST(h.usage_count - 1, 0)
+    FROM public.recipe_hashtags rh
+    WHERE rh.recipe_id = OLD.id AND rh.hashtag_id = h.id;
+    RETURN OLD;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+DROP TRIGGER IF EXISTS release_hashtags_on_recipe_delete ON public.recipes;
+CREATE TRIGGER release_hashtags_on_recipe_delete
+    BEFORE DELETE ON public.recipes
+    FOR EACH ROW EXECUTE PROCEDURE public.release_recipe_hashtags();
+
+-- Vote counters on recipes (see backend/migrations/0004_vote_counters.sql)
+-- Per-row counter maintenance for ordinary vote writes.
+-- apply_vote_changes sets app.defer_vote_counts and applies its deltas in one statement instead.
+CREATE OR REPLACE FUNCTION public.handle_vote_counts()
+RETURNS trigger AS $$
+BEGIN
+    IF current_setting('app.defer_vote_counts', true) = 'on' THEN
+        RETURN NULL;
+    END IF;
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        UPDATE public.recipes SET
+            upvotes_count = GREATEST(upvotes_count - (OLD.vote_type = 'up')::int, 0),
+            downvotes_count = GREATEST(downvotes_count - (OLD.vote_type = 'down')::int, 0)
+        WHERE id = OLD.recipe_id;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        UPDATE public.recipes SET
+            upvotes_count = upvotes_count + (NEW.vote_type = 'up')::int,
+            downvotes_count = downvotes_count + (NEW.vote_type = 'down')::int
+        WHERE id = NEW.recipe_id;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+DROP TRIGGER IF EXISTS on_vote_counts_changed ON public.recipe_votes;
+CREATE TRIGGER on_vote_counts_changed
+    AFTER INSERT OR DELETE OR UPDATE OF vote_type ON public.recipe_votes
+    FOR EACH ROW EXECUTE PROCEDURE public.handle_vote_counts();
+
+-- Apply the net vote state for many (recipe, user) pairs at once:
+-- changes = [{"recipe_id": "...", "user_id": "...", "vote_type": "up" | "down" | null}, ...]
+-- null removes the vote. Removed votes are deleted in one statement, new and changed ones
+-- upserted in another, and each recipe's counters move once by the summed difference.
+CREATE OR REPLACE FUNCTION public.apply_vote_changes(changes JSONB)
+RETURNS void AS $$
+BEGIN
+    PERFORM set_config('app.defer_vote_counts', 'on', true);
+
+    -- Serialize with other flushes touching the same recipes so the deltas below stay exact
+    PERFORM 1 FROM public.recipes
+    WHERE id IN (SELECT DISTINCT (c->>'recipe_id')::uuid FROM jsonb_array_elements(changes) c)
+    ORDER BY id
+    FOR UPDATE;
+
+    WITH desired AS (
+        -- Recipes or users deleted since the vote was buffered are skipped
+        SELECT DISTINCT ON (c.recipe_id, c.user_id) c.recipe_id, c.user_id, c.vote_type
+        FROM jsonb_to_recordset(changes) AS c(recipe_id UUID, user_id UUID, vote_type TEXT)
+        JOIN public.recipes r ON r.id = c.recipe_id
+        JOIN public.profiles p ON p.id = c.user_id
+        WHERE c.vote_type IS NULL OR c.vote_type IN ('up', 'down')
+    ),
+    current_votes AS (
+        SELECT d.recipe_id, d.vote_type AS new_type, v.vote_type AS old_type
+        FROM desired d
+        LEFT JOIN public.recipe_votes v ON v.recipe_id = d.recipe_id AND v.user_id = d.user_id
+    ),
+    removed AS (
+        DELETE FROM public.recipe_votes v
+        USING desired d
+        WHERE v.recipe_id = d.recipe_id AND v.user_id = d.user_id AND d.vote_type IS NULL
+        RETURNING v.id
+    ),
+    written AS (
+        INSERT INTO public.recipe_votes (recipe_id, user_id, vote_type)
+        SELECT recipe_id, user_id, vote_type FROM desired WHERE vote_type IS NOT NULL
+        ON CONFLICT (recipe_id, user_id)
+        DO UPDATE SET vote_type = EXCLUDED.vote_type
+        WHERE recipe_votes.vote_type IS DISTINCT FROM EXCLUDED.vote_type
+        RETURNING id
+    ),
+    deltas AS (
+        SELECT recipe_id,
+               SUM((new_type IS NOT DISTINCT FROM 'up')::int - (old_type IS NOT DISTINCT FROM 'up')::int) AS up_delta,
+               SUM((new_type IS NOT DISTINCT FROM 'down')::int - (old_type IS NOT DISTINCT FROM 'down')::int) AS down_delta
+        FROM current_votes
+        GROUP BY recipe_id
+    )
+    UPDATE public.recipes r SET
+        upvotes_count = GREATEST(r.upvotes_count + d.up_delta, 0),
+        downvotes_count = GREATEST(r.downvotes_count + d.down_delta, 0)
+    FROM deltas d
+    WHERE r.id = d.recipe_id AND (d.up_delta <> 0 OR d.down_delta <> 0);
+
+    PERFORM set_config('app.defer_vote_counts', 'off', true);
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+-- Only the backend (service role) may apply buffered votes
+REVOKE EXECUTE ON FUNCTION public.apply_vote_changes(JSONB) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION public.apply_vote_changes(JSONB) TO service_role;
+
+-- Comment counts on recipes (see backend/migrations/0005_comment_counters.sql)
+CREATE OR REPLACE FUNCTION public.handle_comment_counts()
+RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        UPDATE public.recipes SET comments_count = comments_count + 1 WHERE id = NEW.recipe_id;
+    ELSE
+        UPDATE public.recipes SET comments_count = GREATEST(comments_count - 1, 0) WHERE id = OLD.recipe_id;
+    END IF;
+    RETURN NULL;
 END;
 $$ LANGUAGE plpgsql SECURITY DEFINER;
 
+DROP TRIGGER IF EXISTS on_comment_counts_changed ON public.recipe_comments;
+CREATE TRIGGER on_comment_counts_changed
+    AFTER INSERT OR DELETE ON public.recipe_comments
+    FOR EACH ROW EXECUTE PROCEDURE public.handle_comment_counts();
+
+-- Latest `per_recipe` comments of each recipe in `recipe_ids`, with the author, in one query
+-- (one index range scan per recipe), for preloading a feed page's comment previews
+CREATE OR REPLACE FUNCTION public.get_recent_comments(recipe_ids UUID[], per_recipe INTEGER DEFAULT 3)
+RETURNS TABLE (
+    id UUID,
+    recipe_id UUID,
+    user_id UUID,
+    content TEXT,
+    created_at TIMESTAMP WITH TIME ZONE,
+    updated_at TIMESTAMP WITH TIME ZONE,
+    profiles JSON
+) AS $$
+    SELECT c.id, c.recipe_id, c.user_id, c.content, c.created_at, c.updated_at,
+           json_build_object('id', p.id, 'username', p.username, 'full_name', p.full_name, 'avatar_url', p.avatar_url)
+    FROM unnest(recipe_ids) AS r(id)
+    CROSS JOIN LATERAL (
+        SELECT rc.* FROM public.recipe_comments rc
+        WHERE rc.recipe_id = r.id
+        ORDER BY rc.created_at DESC, rc.id DESC
+        LIMIT per_recipe
+    ) c
+    JOIN public.profiles p ON p.id = c.user_id
+    ORDER BY c.recipe_id, c.created_at, c.id;
+$$ LANGUAGE sql STABLE;
+
 -- Function to get trending hashtags
 CREATE OR REPLACE FUNCTION public.get_trending_hashtags(
     limit_count INTEGER DEFAULT 10,
@@ -825,32 +1058,16 @@ LEFT JOIN (
     GROUP BY recipe_id
 ) comments ON r.id = comments.recipe_id;
 
--- User stats view
+-- User stats view (reads the trigger-maintained counters on profiles; bigint like the COUNT(*) columns it replaced)
 CREATE OR REPLACE VIEW public.user_stats AS
 SELECT 
     p.id,
     p.username,
     p.full_name,
-    COALESCE(recipes.count, 0) as recipe_count,
-    COALESCE(followers.count, 0) as follower_count,
-    COALESCE(following.count, 0) as following_count
-FROM public.profiles p
-LEFT JOIN (
-    SELECT user_id, COUNT(*) as count
-    FROM public.recipes
-    WHERE is_public = true
-    GROUP BY user_id
-) recipes ON p.id = recipes.user_id
-LEFT JOIN (
-    SELECT following_id, COUNT(*) as count
-    FROM public.follows
-    GROUP BY following_id
-) followers ON p.id = followers.following_id
-LEFT JOIN (
-    SELECT follower_id, COUNT(*) as count
-    FROM public.follows
-    GROUP BY follower_id
-) following ON p.id = following.follower_id;
+    p.recipes_count::bigint as recipe_count,
+    p.followers_count::bigint as follower_count,
+    p.following_count::bigint as following_count
+FROM public.profiles p;
 
 -- Grant necessary permissions
 GRANT USAGE ON SCHEMA public TO postgres, anon, authenticated, service_role;